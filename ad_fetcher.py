@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+دریافت صفحه آگهی دیوار با HTTP و استفاده از مرورگر فقط در صورت نیاز
+
+بیشتر فیلدهای آگهی در HTML رندرشده سمت سرور وجود دارند، پس صفحه با یک
+requests.Session مشترک (keep-alive، فشرده‌سازی gzip و سقف اتصال برای هر host)
+گرفته و مستقیماً با parse_ad_soup پارس می‌شود. فقط وقتی فیلدهای لازم پیدا نشوند یا
+صفحه چالش ربات باشد، fallback (بارگذاری در Selenium) اجرا می‌شود. سهم صفحاتی که
+بدون مرورگر پردازش شده‌اند در stats گزارش می‌شود.
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from divar_ad_parser import parse_ad_soup, parse_html, has_required_fields
+from challenge_probe import BLOCK_TEXTS, CAPTCHA_SELECTORS, CAPTCHA_TEXTS
+
+DEFAULT_TIMEOUT = 15
+DEFAULT_MAX_CONNECTIONS = 4
+
+DEFAULT_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'fa-IR,fa;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# همان متن‌های check_for_critical_bot_detection (کپچا و مسدودیت)
+CHALLENGE_TEXTS = CAPTCHA_TEXTS + BLOCK_TEXTS
+CHALLENGE_STATUS_CODES = (403, 429)
+
+
+def create_session(max_connections=DEFAULT_MAX_CONNECTIONS, retries=2, headers=None):
+    """
+    ساخت Session با connection pool
+
+    Parameters
+    ----------
+    max_connections : int
+        حداکثر اتصال هم‌زمان به هر host (درخواست‌های بیشتر منتظر آزاد شدن اتصال می‌مانند)
+    retries : int
+        تلاش مجدد برای خطاهای اتصال و 502/503/504
+    headers : dict, optional
+        هدرهای پیش‌فرض (DEFAULT_HEADERS)
+    """
+    session = requests.Session()
+    session.headers.update(headers or DEFAULT_HEADERS)
+    retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=0.5,
+                  status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections, pool_block=True, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _is_hidden(element):
+    """عنصری که در صفحه دیده نمی‌شود (input مخفی، ویژگی hidden یا display:none درون‌خطی)"""
+    if element.name == 'input' and element.get('type', '').lower() == 'hidden':
+        return True
+    style = element.get('style', '').replace(' ', '').lower()
+    return element.has_attr('hidden') or 'display:none' in style or 'visibility:hidden' in style
+
+
+def detect_challenge(soup, status_code=200):
+    """
+    تشخیص صفحه چالش ربات یا مسدودیت؛ None یعنی صفحه عادی
+
+    مثل PROBE_SCRIPT فقط ویجت‌های کپچا (CAPTCHA_SELECTORS) و متن قابل مشاهده صفحه
+    بررسی می‌شوند، نه کل markup؛ اسکریپتی که فقط به recaptcha ارجاع می‌دهد یا متنی
+    داخل bundle های درون‌خطی باعث رفتن آگهی به مرورگر نمی‌شود.
+
+    Parameters
+    ----------
+    soup : BeautifulSoup
+        soup صفحه (parse_html)
+    status_code : int
+        کد وضعیت پاسخ HTTP
+    """
+    if status_code in CHALLENGE_STATUS_CODES:
+        return f"HTTP_{status_code}"
+    for selector in CAPTCHA_SELECTORS:
+        if any(not _is_hidden(element) for element in soup.select(selector)):
+            return f"CAPTCHA_WIDGET: {selector}"
+    # get_text متن script، style و template را شامل نمی‌شود
+    page_text = soup.get_text(' ').lower()
+    for text in CHALLENGE_TEXTS:
+        if text.lower() in page_text:
+            return f"CHALLENGE_TEXT: {text}"
+    return None
+
+
+class AdFetcher:
+    """
+    دریافت HTTP-اول آگهی‌ها با fallback مرورگر
+
+    Parameters
+    ----------
+    session : requests.Session, optional
+        Session مشترک (پیش‌فرض create_session)
+    timeout : float
+        timeout هر درخواست به ثانیه
+    """
+
+    def __init__(self, session=None, timeout=DEFAULT_TIMEOUT):
+        self.session = session or create_session()
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.http_served = 0
+        self.browser_served = 0
+        self.failed = 0
+        self.fallback_reasons = {}
+        self.http_time = 0.0
+        self.browser_time = 0.0
+
+    def fetch_http(self, url):
+        """
+        دریافت و پارس صفحه بدون مرورگر
+
+        Returns
+        -------
+        tuple
+            (ad_data, reason)؛ ad_data فقط وقتی پر است که فیلدهای لازم پیدا شده باشند،
+            در غیر این صورت reason دلیل نیاز به مرورگر است
+        """
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            return None, f"HTTP_ERROR: {type(e).__name__}"
+
+        if response.status_code != 200:
+            return None, f"HTTP_{response.status_code}"
+
+        soup = parse_html(response.text)
+        challenge = detect_challenge(soup, response.status_code)
+        if challenge:
+            return None, challenge
+        ad_data = parse_ad_soup(soup, url)
+        if not has_required_fields(ad_data):
+            return None, "MISSING_FIELDS"
+        return ad_data, None
+
+    def fetch(self, url, fallback=None):
+        """
+        دریافت آگهی: اول HTTP، در صورت نیاز fallback(url)
+
+        Parameters
+        ----------
+        url : str
+            لینک آگهی
+        fallback : callable, optional
+            fallback(url) -> ad_data با مرورگر (مثلاً driver.get + extract_ad_details)
+
+        Returns
+        -------
+        tuple
+            (ad_data, source)؛ source یکی از 'http'، 'browser' یا None (ناموفق)
+        """
+        start_time = time.perf_counter()
+        ad_data, reason = self.fetch_http(url)
+        http_elapsed = time.perf_counter() - start_time
+        if ad_data is not None:
+            with self._lock:
+                self.http_served += 1
+                self.http_time += http_elapsed
+            return ad_data, 'http'
+
+        reason_key = reason.split(':')[0]
+        with self._lock:
+            self.fallback_reasons[reason_key] = self.fallback_reasons.get(reason_key, 0) + 1
+        if fallback is None:
+            with self._lock:
+                self.failed += 1
+            return None, None
+
+        print(f"🌐 نیاز به مرورگر ({reason})")
+        start_time = time.perf_counter()
+        ad_data = fallback(url)
+        with self._lock:
+            self.browser_time += time.perf_counter() - start_time
+            if ad_data:
+                self.browser_served += 1
+            else:
+                self.failed += 1
+        return ad_data, 'browser' if ad_data else None
+
+    def http_share(self):
+        """سهم آگهی‌های پردازش‌شده بدون مرورگر"""
+        total = self.http_served + self.browser_served
+        return self.http_served / total if total else 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'http_served': self.http_served,
+                'browser_served': self.browser_served,
+                'failed': self.failed,
+                'http_share': self.http_share(),
+                'fallback_reasons': dict(self.fallback_reasons),
+                'avg_http_ms': self.http_time / self.http_served * 1000 if self.http_served else 0.0,
+                'avg_browser_ms': self.browser_time / self.browser_served * 1000 if self.browser_served else 0.0,
+            }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"{stats['http_served']} آگهی بدون مرورگر ({stats['http_share']:.0%})، "
+                f"{stats['browser_served']} با مرورگر، {stats['failed']} ناموفق")
+
+    def close(self):
+        self.session.close()
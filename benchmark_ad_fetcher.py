@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک دریافت HTTP-اول آگهی‌ها در برابر بارگذاری همه صفحات در مرورگر
+
+یک سرور HTTP محلی صفحه ذخیره‌شده debug_page_source.html را (با gzip و keep-alive)
+برمی‌گرداند؛ بخشی از لینک‌ها صفحه چالش ربات یا صفحه ناقص هستند تا fallback آزموده
+شود. مرورگر با یک انتظار ثابت (--browser-ms) و پارس همان صفحه شبیه‌سازی می‌شود.
+سهم صفحات بدون مرورگر، تعداد اتصال‌های TCP باز شده و زمان کل گزارش می‌شود.
+
+python benchmark_ad_fetcher.py [--ads 200] [--challenge-rate 0.05] [--partial-rate 0.1] [--browser-ms 1500]
+"""
+
+import argparse
+import gzip
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ad_fetcher import AdFetcher, create_session
+from divar_ad_parser import parse_ad_page
+
+FIXTURE = 'debug_page_source.html'
+CHALLENGE_PAGE = '<html><body><div id="arc-checkbox">من ربات نیستم</div></body></html>'
+PARTIAL_PAGE = '<html><body><div id="app"></div><script src="/app.js"></script></body></html>'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    ad_page = ''
+    connections = 0
+    connections_lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubHandler.connections_lock:
+            StubHandler.connections += 1
+
+    def do_GET(self):
+        if '/challenge-' in self.path:
+            body, status = CHALLENGE_PAGE, 200
+        elif '/partial-' in self.path:
+            body, status = PARTIAL_PAGE, 200
+        elif '/v/' in self.path:
+            body, status = self.ad_page, 200
+        else:
+            body, status = 'not found', 404
+        data = body.encode('utf-8')
+        gzipped = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            data = gzip.compress(data, compresslevel=5)
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_urls(base, ads, challenge_rate, partial_rate):
+    urls = []
+    for i in range(ads):
+        roll = random.random()
+        kind = 'challenge' if roll < challenge_rate else 'partial' if roll < challenge_rate + partial_rate else 'ad'
+        urls.append(f"{base}/v/{kind}-{i}/id{i}")
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک دریافت HTTP-اول آگهی‌ها")
+    parser.add_argument('--ads', type=int, default=200)
+    parser.add_argument('--challenge-rate', type=float, default=0.05)
+    parser.add_argument('--partial-rate', type=float, default=0.1)
+    parser.add_argument('--browser-ms', type=float, default=1500, help="زمان شبیه‌سازی‌شده بارگذاری در Chrome")
+    args = parser.parse_args()
+
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        StubHandler.ad_page = f.read()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    random.seed(1)
+    urls = make_urls(base, args.ads, args.challenge_rate, args.partial_rate)
+
+    def browser_fetch(url):
+        time.sleep(args.browser_ms / 1000)
+        return parse_ad_page(StubHandler.ad_page, url)
+
+    try:
+        fetcher = AdFetcher(create_session())
+        start_time = time.perf_counter()
+        titles = sum(1 for url in urls if (fetcher.fetch(url, fallback=browser_fetch)[0] or {}).get('عنوان آگهی'))
+        elapsed = time.perf_counter() - start_time
+        stats = fetcher.stats()
+        fetcher.close()
+    finally:
+        server.shutdown()
+
+    browser_only = args.ads * args.browser_ms / 1000
+    print(f"\n📊 {args.ads} آگهی ({args.challenge_rate:.0%} چالش، {args.partial_rate:.0%} ناقص)")
+    print(f"📡 {fetcher.summary()}")
+    print(f"🔎 دلایل fallback: {stats['fallback_reasons']}")
+    print(f"⚡ HTTP: میانگین {stats['avg_http_ms']:.1f}ms برای هر آگهی، {StubHandler.connections} اتصال TCP")
+    print(f"⏱️ کل: {elapsed:.2f}s (فقط مرورگر: ~{browser_only:.0f}s، ×{browser_only / elapsed:.1f})")
+    print(f"{'✅' if titles == args.ads else '❌'} آگهی‌های دارای عنوان: {titles}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک زمان استخراج اطلاعات هر آگهی
+
+- بعد: parse_ad_page روی snapshot ذخیره‌شده (بدون مرورگر)
+- قبل: با --browser فایل HTML در Chrome باز می‌شود و فیلدها مثل extract_ad_details
+  تک‌تک با find_element خوانده می‌شوند (هر فراخوانی یک رفت‌وبرگشت WebDriver)
+
+python benchmark_ad_parser.py [--browser] [--repeat 50] [files...]
+"""
+
+import argparse
+import os
+import time
+
+from divar_ad_parser import parse_ad_page, has_required_fields
+
+DEFAULT_FIXTURES = ['debug_page_source.html', 'page_source.html']
+
+# سلکتورهای اصلی extract_ad_details (قبل از پارسر snapshot)
+LEGACY_SELECTORS = [
+    ('عنوان آگهی', 'h1'),
+    ('کیلومتر', '.kt-group-row-item__value'),
+    ('سال', '.kt-group-row-item__value'),
+    ('رنگ', '.kt-group-row-item__value'),
+    ('قیمت آگهی (تومان)', '.kt-unexpandable-row__value'),
+    ('ردیف‌ها', '.kt-base-row, .kt-unexpandable-row'),
+    ('وضعیت موتور', '.kt-base-row__end'),
+    ('وضعیت شاسی', '.kt-score-row__score'),
+    ('وضعیت بدنه', '.kt-score-row__score'),
+    ('برند و تیپ', '.kt-unexpandable-row'),
+    ('توضیحات', '.kt-description-row'),
+    ('زمان و مکان', '.kt-page-title__subtitle'),
+]
+
+
+def benchmark_parser(html, repeat):
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        ad_data = parse_ad_page(html)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000 / repeat
+    return elapsed_ms, ad_data
+
+
+def benchmark_browser(paths, repeat):
+    """مقایسه find_element تک‌فیلدی با یک page_source + پارس در Chrome واقعی"""
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    driver = webdriver.Chrome(options=options)
+
+    try:
+        for path in paths:
+            driver.get('file://' + os.path.abspath(path))
+
+            round_trips = 0
+            start_time = time.perf_counter()
+            for _ in range(repeat):
+                for _field, selector in LEGACY_SELECTORS:
+                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                    round_trips += 1
+                    for element in elements[:10]:
+                        element.text
+                        round_trips += 1
+            legacy_ms = (time.perf_counter() - start_time) * 1000 / repeat
+
+            start_time = time.perf_counter()
+            for _ in range(repeat):
+                parse_ad_page(driver.page_source, driver.current_url)
+            snapshot_ms = (time.perf_counter() - start_time) * 1000 / repeat
+
+            print(f"🌐 {path}")
+            print(f"   قبل (find_element): {legacy_ms:8.1f}ms  | {round_trips // repeat} رفت‌وبرگشت WebDriver")
+            print(f"   بعد (page_source):  {snapshot_ms:8.1f}ms  | 1 رفت‌وبرگشت WebDriver")
+            if snapshot_ms > 0:
+                print(f"   🚀 بهبود: {legacy_ms / snapshot_ms:.1f}x")
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک پارسر صفحه آگهی دیوار")
+    parser.add_argument('files', nargs='*', default=DEFAULT_FIXTURES)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--browser', action='store_true', help="مقایسه با استخراج WebDriver در Chrome")
+    args = parser.parse_args()
+
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        elapsed_ms, ad_data = benchmark_parser(html, args.repeat)
+        status = "✅" if has_required_fields(ad_data) else "⚠️ (فیلدهای اصلی یافت نشد)"
+        print(f"📄 {path} ({len(html) // 1024}KB): {elapsed_ms:.2f}ms برای هر آگهی {status}")
+
+    if args.browser:
+        benchmark_browser(args.files, max(1, args.repeat // 10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک استخر مرورگر: تعداد آگهی در دقیقه برای 1 تا N کارگر
+
+به جای Chrome یک درایور شبیه‌سازی‌شده استفاده می‌شود که بارگذاری هر صفحه را با
+انتظار (مثل شبکه و رندر) و استخراج را با کمی کار CPU شبیه‌سازی می‌کند. با
+--crash-rate بعضی بارگذاری‌ها درایور را از کار می‌اندازند تا راه‌اندازی مجدد هر
+کارگر هم آزموده شود.
+
+python benchmark_browser_pool.py [--ads 200] [--workers 1 2 4 8] [--page-load 0.05] [--crash-rate 0.02]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from browser_pool import BrowserPool
+
+
+class FakeDriver:
+    """درایور شبیه‌سازی‌شده با بارگذاری صفحه کند و crash تصادفی"""
+
+    def __init__(self, page_load, crash_rate):
+        self.page_load = page_load
+        self.crash_rate = crash_rate
+        self.current_url = 'data:,'
+        self.alive = True
+
+    def get(self, url):
+        if not self.alive:
+            raise RuntimeError("invalid session id")
+        time.sleep(self.page_load * random.uniform(0.8, 1.2))
+        if random.random() < self.crash_rate:
+            self.alive = False
+            raise RuntimeError("chrome not reachable")
+        self.current_url = url
+
+    def quit(self):
+        self.alive = False
+
+
+def run(ads, workers, page_load, crash_rate):
+    saved = []
+    save_lock = threading.Lock()
+
+    def handle_ad(driver, url):
+        driver.get(url)
+        # استخراج و قیمت‌گذاری (کار CPU کوتاه)
+        sum(i * i for i in range(2000))
+        with save_lock:
+            saved.append(url)
+        return True
+
+    pool = BrowserPool(lambda: FakeDriver(page_load, crash_rate), handle_ad, workers=workers,
+                       max_restarts=ads, error_delay=None)
+    start_time = time.perf_counter()
+    pool.start()
+    for i in range(ads):
+        pool.submit(f"https://divar.ir/v/ad-{i}/id{i}")
+    pool.join()
+    elapsed = time.perf_counter() - start_time
+    stats = pool.stats()
+    pool.shutdown()
+    return elapsed, len(set(saved)), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک استخر مرورگر")
+    parser.add_argument('--ads', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--page-load', type=float, default=0.05, help="زمان بارگذاری هر صفحه (ثانیه)")
+    parser.add_argument('--crash-rate', type=float, default=0.02)
+    args = parser.parse_args()
+
+    random.seed(1)
+    baseline = None
+    results = []
+    for workers in args.workers:
+        elapsed, saved, stats = run(args.ads, workers, args.page_load, args.crash_rate)
+        ads_per_minute = saved / elapsed * 60
+        baseline = baseline or ads_per_minute / workers
+        results.append((workers, elapsed, saved, stats, ads_per_minute))
+
+    print(f"\n📊 {args.ads} آگهی، بارگذاری هر صفحه {args.page_load * 1000:.0f}ms، احتمال crash {args.crash_rate:.0%}")
+    for workers, elapsed, saved, stats, ads_per_minute in results:
+        print(f"🧵 {workers} کارگر: {elapsed:.2f}s، {ads_per_minute:.0f} آگهی در دقیقه "
+              f"(×{ads_per_minute / baseline:.2f})، {stats['restarts']} راه‌اندازی مجدد، "
+              f"{stats['failed']} ناموفق، {saved} ذخیره‌شده")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک کاتالوگ کلید استاندارد (CarCatalog) در چهار مسیر قیمت‌گذاری
+
+همه مسیرها روی یک snapshot (hamrah_mechanic_prices.csv و z4car_prices.csv) اجرا می‌شوند:
+- get_market_price_for_car در main.py (MarketNameIndex)
+- CarPriceCalculator / find_market_prices_batch (MarketFeatureTable)
+- ImprovedCarPriceCalculator (موتور قیمت‌گذاری)
+- ColumnBasedCarPriceCalculator
+
+«برند و تیپ» آگهی‌ها از نام‌های زد فور (بدون «مدل ...») و چند نمونه واقعی دیوار
+ساخته می‌شوند. هر مسیر یک بار فقط با تطبیق فازی (کاتالوگ خالی) و یک بار با کاتالوگ
+اجرا می‌شود؛ زمان، درصد یافتن در کاتالوگ و درصد آگهی‌هایی که هر چهار مسیر برای آن‌ها
+قیمت یکسان می‌دهند گزارش می‌شود.
+
+python benchmark_car_catalog.py [--ads 300]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from benchmark_market_snapshot import SOURCE_FILES, read_source
+from car_catalog import CarCatalog
+from car_price_calculator import CarPriceCalculator
+from column_based_calculator import ColumnBasedCarPriceCalculator
+from improved_car_calculator import ImprovedCarPriceCalculator
+from market_index import MarketNameIndex
+from market_snapshot import PriceSnapshot
+from pricing_engine import normalize_market_frame
+
+DIVAR_BRAND_TYPES = [
+    'پژو ۲۰۶ تیپ ۲', 'پژو ۲۰۶ صندوق‌دار', 'پراید ۱۳۱ SE', 'پراید ۱۵۱', 'سمند LX EF7 بنزینی', 'سمند LX',
+    'سمند سورن پلاس', 'پژو پارس سال', 'تیبا صندوق‌دار', 'کوییک GXR', 'ساینا S دوگانه سوز', 'دنا پلاس توربو',
+    'پژو ۲۰۷ اتوماتیک', 'رانا پلاس', 'کیا سراتو', 'هیوندای النترا', 'تویوتا کمری هیبرید', 'ام وی ام X22 پرو',
+    'ام وی ام ۳۱۵ صندوق‌دار', 'بی ام و سری ۵', 'مزدا ۳ نیو', 'پژو ۴۰۵ GLX', 'کیا اسپورتیج', 'هیوندای توسان',
+]
+YEARS = [None, 1390, 1395, 1399, 1401, 1403, 2012, 2016]
+MODEL_SUFFIX = re.compile(r'\s*مدل\s*[۰-۹\d\-]+\s*$')
+
+
+def make_ads(snapshot, count):
+    branded = [MODEL_SUFFIX.sub('', name) for name in snapshot.names if 'مدل' in name or ' ' in name]
+    return [(random.choice(DIVAR_BRAND_TYPES + branded), random.choice(YEARS)) for _ in range(count)]
+
+
+def main_path(market_prices, index, catalog):
+    """منطق get_market_price_for_car بدون کش"""
+    def price(brand_type, year):
+        entry = catalog.lookup(brand_type, year)
+        name, score = (entry.name, 1.0) if entry is not None else index.best_match(brand_type)
+        return market_prices[name]['market_price'] if name is not None and score > 0.5 else None
+    return price
+
+
+def run(paths, ads):
+    results = {}
+    timings = {}
+    for label, price in paths.items():
+        start_time = time.perf_counter()
+        results[label] = [price(brand_type, year) for brand_type, year in ads]
+        timings[label] = (time.perf_counter() - start_time) / len(ads) * 1000
+    agree = sum(1 for prices in zip(*results.values()) if prices[0] is not None and len(set(prices)) == 1)
+    return timings, agree / len(ads)
+
+
+def build_paths(snapshot, market_df, use_catalog):
+    empty = CarCatalog([])
+    market_prices = snapshot.to_market_prices()
+    paths = {'main': main_path(market_prices, MarketNameIndex(market_prices),
+                               CarCatalog(market_prices) if use_catalog else empty)}
+
+    calculator = CarPriceCalculator(enable_ml=False)
+    table = calculator.get_market_table(market_df)
+    if not use_catalog:
+        table.catalog = empty
+    paths['CarPriceCalculator'] = lambda brand_type, year: calculator.find_market_price(
+        {'car_name': None, 'year': year}, market_df, brand_type)[0]
+
+    price_dict = dict(zip(market_df['Car Name'].str.lower(), market_df['Numeric Price']))
+    for label, cls in (('Improved', ImprovedCarPriceCalculator), ('ColumnBased', ColumnBasedCarPriceCalculator)):
+        instance = cls()
+        instance.price_dict = price_dict
+        if not use_catalog:
+            instance._catalog, instance._catalog_source = empty, price_dict
+        if cls is ImprovedCarPriceCalculator:
+            paths[label] = lambda brand_type, year, instance=instance: instance.find_market_price(
+                {'car_name': '', 'year': year}, market_df, brand_type)
+        else:
+            paths[label] = lambda brand_type, year, instance=instance: instance.find_market_price(
+                {'car_name': brand_type, 'year': year}, market_df)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک کاتالوگ کلید استاندارد خودروها")
+    parser.add_argument('--ads', type=int, default=300)
+    args = parser.parse_args()
+
+    random.seed(1)
+    snapshot = PriceSnapshot.from_sources({source: read_source(path) for source, path in SOURCE_FILES.items()})
+    market_df = normalize_market_frame(snapshot.to_frame())
+    ads = make_ads(snapshot, args.ads)
+
+    start_time = time.perf_counter()
+    catalog = CarCatalog(snapshot.names)
+    build_ms = (time.perf_counter() - start_time) * 1000
+    start_time = time.perf_counter()
+    CarCatalog(snapshot.names, catalog.keys())
+    stored_ms = (time.perf_counter() - start_time) * 1000
+    hits = sum(1 for brand_type, year in ads if catalog.lookup(brand_type, year) is not None)
+
+    fuzzy_timings, fuzzy_agree = run(build_paths(snapshot, market_df, use_catalog=False), ads)
+    catalog_timings, catalog_agree = run(build_paths(snapshot, market_df, use_catalog=True), ads)
+
+    print(f"\n📊 {len(snapshot)} نام بازار، {len(catalog.table)} کلید؛ {len(ads)} آگهی")
+    print(f"🏗️ ساخت کاتالوگ: {build_ms:.0f}ms (از کلیدهای ذخیره‌شده در snapshot: {stored_ms:.1f}ms)")
+    print(f"🔑 یافته‌شده در کاتالوگ: {hits / len(ads):.0%}")
+    for label in fuzzy_timings:
+        print(f"   {label}: {fuzzy_timings[label]:.3f}ms → {catalog_timings[label]:.3f}ms برای هر آگهی "
+              f"(×{fuzzy_timings[label] / catalog_timings[label]:.1f})")
+    print(f"🤝 قیمت یکسان در هر چهار مسیر: {fuzzy_agree:.0%} → {catalog_agree:.0%}")
+
+
+if __name__ == "__main__":
+    main()
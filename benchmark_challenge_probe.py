@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک بررسی چالش ربات: check_for_critical_bot_detection قبلی در برابر ChallengeMonitor
+
+- قبل: هفت find_elements با is_displayed و دریافت کل page_source قبل از هر آگهی
+- بعد: یک execute_script با خروجی کوچک، حداکثر یک بار برای هر صفحه
+
+بدون --live درایور شبیه‌سازی می‌شود: هر فرمان WebDriver یک رفت و برگشت --rtt میلی‌ثانیه‌ای
+است و page_source با سرعت --bandwidth مگابایت بر ثانیه منتقل می‌شود (صفحه از فایل‌های
+ذخیره‌شده). --ads آگهی پردازش می‌شوند و هر --nav-every آگهی یک بار درایور به صفحه
+دیگری می‌رود (در حالت HTTP درایور اصلی روی صفحه لیست می‌ماند). اجرای اسکریپت در خود
+صفحه در حالت شبیه‌سازی هزینه‌ای جز رفت و برگشت ندارد؛ با --live هر دو روش روی Chrome
+واقعی اندازه‌گیری می‌شوند.
+
+python benchmark_challenge_probe.py [--html page_source.html] [--ads 100] [--nav-every 10] [--live URL]
+"""
+
+import argparse
+import time
+
+from challenge_probe import ChallengeMonitor, scan_page_source
+
+
+class SimulatedDriver:
+    def __init__(self, html, url, rtt, bandwidth):
+        self.html = html
+        self.current_url_value = url
+        self.rtt = rtt
+        self.bandwidth = bandwidth
+        self.round_trips = 0
+        self.transferred = 0
+
+    def round_trip(self, size=0):
+        self.round_trips += 1
+        self.transferred += size
+        time.sleep(self.rtt + size / self.bandwidth)
+
+    def find_elements(self, by, value):
+        self.round_trip()
+        return []
+
+    @property
+    def page_source(self):
+        self.round_trip(len(self.html.encode('utf-8')))
+        return self.html
+
+    @property
+    def current_url(self):
+        self.round_trip()
+        return self.current_url_value
+
+    def execute_script(self, script, *args):
+        self.round_trip(200)
+        return {'url': self.current_url_value, 'captcha': None, 'text': None, 'off_domain': False}
+
+
+def run_legacy(driver, ads):
+    start_time = time.perf_counter()
+    for _ in range(ads):
+        scan_page_source(driver)
+    return time.perf_counter() - start_time
+
+
+def run_monitor(driver, ads, nav_every, sample_rate):
+    monitor = ChallengeMonitor(sample_rate=sample_rate, calibrate=False)
+    start_time = time.perf_counter()
+    for index in range(ads):
+        if index % nav_every == 0:
+            monitor.mark_navigation(driver)
+        monitor.check(driver)
+    return time.perf_counter() - start_time, monitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک بررسی چالش ربات")
+    parser.add_argument('--html', default='page_source.html')
+    parser.add_argument('--ads', type=int, default=100)
+    parser.add_argument('--nav-every', type=int, default=10)
+    parser.add_argument('--sample-rate', type=float, default=1.0)
+    parser.add_argument('--rtt', type=float, default=2.0, help="میلی‌ثانیه برای هر فرمان WebDriver")
+    parser.add_argument('--bandwidth', type=float, default=50.0, help="مگابایت بر ثانیه برای page_source")
+    parser.add_argument('--live', metavar='URL', help="اندازه‌گیری روی Chrome واقعی")
+    args = parser.parse_args()
+
+    if args.live:
+        from driver_factory import get_driver, get_factory
+
+        driver = get_driver('divar')
+        try:
+            driver.get(args.live)
+            legacy = run_legacy(driver, args.ads)
+            fast, monitor = run_monitor(driver, args.ads, args.nav_every, args.sample_rate)
+        finally:
+            driver.quit()
+            get_factory().close()
+        label = args.live
+    else:
+        with open(args.html, 'r', encoding='utf-8') as f:
+            html = f.read()
+        legacy_driver = SimulatedDriver(html, 'https://divar.ir/s/iran/car', args.rtt / 1000, args.bandwidth * 1024 * 1024)
+        legacy = run_legacy(legacy_driver, args.ads)
+        probe_driver = SimulatedDriver(html, 'https://divar.ir/s/iran/car', args.rtt / 1000, args.bandwidth * 1024 * 1024)
+        fast, monitor = run_monitor(probe_driver, args.ads, args.nav_every, args.sample_rate)
+        label = f"{args.html} ({len(html.encode('utf-8')) / 1024:.0f}KB، rtt {args.rtt}ms)"
+        print(f"   قبلی: {legacy_driver.round_trips} فرمان، {legacy_driver.transferred / 1024 / 1024:.1f}MB؛ "
+              f"بعد: {probe_driver.round_trips} فرمان، {probe_driver.transferred / 1024:.1f}KB")
+
+    print(f"\n📄 {label}: {args.ads} آگهی، جابجایی هر {args.nav_every} آگهی")
+    print(f"🐢 check_for_critical_bot_detection قبلی: {legacy:.2f}s ({legacy / args.ads * 1000:.1f}ms در هر آگهی)")
+    print(f"⚡ ChallengeMonitor: {fast:.3f}s ({fast / args.ads * 1000:.2f}ms در هر آگهی، ×{legacy / max(fast, 1e-9):.0f})")
+    print(f"   {monitor.summary()}")
+
+
+if __name__ == "__main__":
+    main()
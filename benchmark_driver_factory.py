@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک کارخانه درایور: پیدا کردن chromedriver و زمان تحویل مرورگر
+
+- مسیر chromedriver: ChromeDriverManager().install() (درخواست شبکه در هر راه‌اندازی، روش
+  قبلی) در برابر مسیر ذخیره‌شده در chromedriver_cache.json
+- تحویل درایور بعد از crash: راه‌اندازی در لحظه در برابر keep_warm
+
+بدون --real به جای Chrome یک درایور شبیه‌سازی‌شده با زمان شروع --chrome-start استفاده
+می‌شود (مثل benchmark_browser_pool.py)؛ با --real مرورگر واقعی با پروفایل داده‌شده باز می‌شود.
+
+python benchmark_driver_factory.py [--restarts 5] [--chrome-start 1.5] [--gap 2] [--real] [--profile prices]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from driver_factory import ChromeDriverManager, DriverFactory
+
+
+class FakeDriver:
+    def __init__(self):
+        self.current_url = 'data:,'
+
+    def quit(self):
+        pass
+
+
+class SimulatedFactory(DriverFactory):
+    """کارخانه با Chrome شبیه‌سازی‌شده (فقط زمان شروع)"""
+
+    def __init__(self, chrome_start, **kwargs):
+        super().__init__(**kwargs)
+        self.chrome_start = chrome_start
+
+    def _start_chrome(self, path, options):
+        time.sleep(self.chrome_start)
+        return FakeDriver()
+
+    def _configure(self, driver, profile):
+        pass
+
+
+def time_resolve(cache_file, runs):
+    """(زمان webdriver-manager یا None، زمان خواندن مسیر ذخیره‌شده)"""
+    install_time = None
+    if ChromeDriverManager is not None:
+        try:
+            start_time = time.perf_counter()
+            path = ChromeDriverManager().install()
+            install_time = time.perf_counter() - start_time
+        except Exception as e:
+            print(f"⚠️ webdriver-manager در دسترس نیست: {e}")
+            path = None
+    else:
+        path = None
+    # اگر chromedriver واقعی پیدا نشد، یک فایل اجرایی موجود جای آن ذخیره می‌شود (فقط زمان خواندن مهم است)
+    DriverFactory(cache_file=cache_file)._save_cache(path or sys.executable)
+
+    times = []
+    for _ in range(runs):
+        factory = DriverFactory(cache_file=cache_file)
+        start_time = time.perf_counter()
+        factory.driver_path()
+        times.append(time.perf_counter() - start_time)
+    return install_time, min(times)
+
+
+def time_restarts(factory, profile, restarts, gap, warm):
+    """زمان انتظار get_driver در هر راه‌اندازی مجدد (مثل restart_driver بعد از crash)"""
+    if warm:
+        factory.keep_warm(profile, 1)
+    waits = []
+    driver = factory.get_driver(profile)
+    for _ in range(restarts):
+        time.sleep(gap)  # کار با درایور تا crash بعدی
+        driver.quit()
+        start_time = time.perf_counter()
+        driver = factory.get_driver(profile)
+        waits.append(time.perf_counter() - start_time)
+    driver.quit()
+    factory.close()
+    return waits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک کارخانه درایور")
+    parser.add_argument('--restarts', type=int, default=5)
+    parser.add_argument('--chrome-start', type=float, default=1.5)
+    parser.add_argument('--gap', type=float, default=2.0)
+    parser.add_argument('--profile', default='prices')
+    parser.add_argument('--real', action='store_true', help="راه‌اندازی Chrome واقعی")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_file = os.path.join(tmp_dir, 'chromedriver_cache.json')
+        install_time, cached_time = time_resolve(cache_file, 20)
+
+        def make_factory():
+            if args.real:
+                return DriverFactory(cache_file=cache_file)
+            return SimulatedFactory(args.chrome_start, cache_file=cache_file)
+
+        cold_factory = make_factory()
+        cold = time_restarts(cold_factory, args.profile, args.restarts, args.gap, warm=False)
+        warm_factory = make_factory()
+        warm = time_restarts(warm_factory, args.profile, args.restarts, args.gap, warm=True)
+
+    print(f"\n📍 پیدا کردن chromedriver: "
+          f"{'نامشخص (بدون شبکه)' if install_time is None else f'{install_time * 1000:.0f}ms'} با webdriver-manager "
+          f"→ {cached_time * 1000:.2f}ms از مسیر ذخیره‌شده")
+    label = 'Chrome واقعی' if args.real else f"Chrome شبیه‌سازی‌شده ({args.chrome_start}s)"
+    print(f"🚀 {label}، {args.restarts} راه‌اندازی مجدد:")
+    print(f"   در لحظه: میانگین انتظار {sum(cold) / len(cold):.2f}s ({cold_factory.summary()})")
+    print(f"   keep_warm: میانگین انتظار {sum(warm) / len(warm):.3f}s ({warm_factory.summary()})")
+
+
+if __name__ == "__main__":
+    main()
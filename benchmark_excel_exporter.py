@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک خروجی اکسل: workbook کامل openpyxl (روش قبلی save_with_coloring) در برابر
+خروجی جریانی excel_exporter
+
+زمان و حداکثر حافظه پایتون (tracemalloc) برای هر روش گزارش می‌شود. ردیف‌های روش
+جریانی از یک generator ساخته می‌شوند تا مثل خواندن از ResultStore هیچ‌وقت همه
+آگهی‌ها با هم در حافظه نباشند.
+
+python benchmark_excel_exporter.py [--ads 20000] [--skip-openpyxl]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import PatternFill
+from openpyxl.utils.dataframe import dataframe_to_rows
+
+from benchmark_result_store import make_ad
+from excel_exporter import export_rows
+
+
+def legacy_export(df, filename):
+    """روش قبلی: کل workbook در حافظه، fill برای هر سلول ردیف‌های فوری و پیمایش همه سلول‌ها برای عرض"""
+    wb = Workbook()
+    ws = wb.active
+    for r in dataframe_to_rows(df, index=False, header=True):
+        ws.append(r)
+    green_fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
+    color_col_index = list(df.columns).index('رنگ‌بندی') + 1
+    for row_idx in range(2, len(df) + 2):
+        if ws.cell(row=row_idx, column=color_col_index).value == 'سبز':
+            for col_idx in range(1, len(df.columns) + 1):
+                ws.cell(row=row_idx, column=col_idx).fill = green_fill
+    for column in ws.columns:
+        max_length = max(len(str(cell.value)) for cell in column)
+        ws.column_dimensions[column[0].column_letter].width = min((max_length + 2) * 1.2, 50)
+    wb.save(filename)
+
+
+def measure(func):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک خروجی جریانی اکسل")
+    parser.add_argument('--ads', type=int, default=20000)
+    parser.add_argument('--skip-openpyxl', action='store_true', help="فقط روش جریانی (برای 100k+ آگهی)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"\n📊 {args.ads} آگهی")
+        if not args.skip_openpyxl:
+            random.seed(1)
+            legacy_file = os.path.join(tmp_dir, 'legacy.xlsx')
+            elapsed, peak = measure(lambda: legacy_export(pd.DataFrame([make_ad(i) for i in range(args.ads)]), legacy_file))
+            print(f"🐢 openpyxl: {elapsed:.2f}s، حداکثر حافظه {peak:.0f}MB")
+
+        random.seed(1)
+        stream_file = os.path.join(tmp_dir, 'stream.xlsx')
+        result = {}
+        elapsed, peak = measure(lambda: result.update(
+            counts=export_rows((make_ad(i) for i in range(args.ads)), stream_file)))
+        rows, urgent_count = result['counts']
+        print(f"⚡ جریانی: {elapsed:.2f}s، حداکثر حافظه {peak:.0f}MB ({urgent_count} آگهی فوری)")
+
+        worksheet = load_workbook(stream_file, read_only=True).active
+        written = sum(1 for _ in worksheet.iter_rows(min_row=2))
+        print(f"{'✅' if written == rows == args.ads else '❌'} ردیف‌های نوشته‌شده: {written}")
+
+
+if __name__ == "__main__":
+    main()
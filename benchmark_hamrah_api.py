@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک به‌روزرسانی قیمت‌های همراه مکانیک: درخواست ساده (روش قبلی) در برابر
+HamrahApiClient با درخواست شرطی
+
+یک سرور HTTP محلی فهرست قیمت‌ها (از hamrah_mechanic_prices.csv) را به صورت JSON با
+ETag و gzip برمی‌گرداند و به If-None-Match با 304 پاسخ می‌دهد. اولین درخواست با
+--fail-first پاسخ 503 می‌گیرد تا تلاش مجدد با jitter هم دیده شود.
+
+python benchmark_hamrah_api.py [--refreshes 20] [--fail-first 1]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import requests
+
+from hamrah_api import HamrahApiClient, parse_car_prices
+
+HAMRAH_FILE = 'hamrah_mechanic_prices.csv'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    body = b''
+    gzipped_body = b''
+    etag = ''
+    failures_left = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with StubHandler.lock:
+            fail = StubHandler.failures_left > 0
+            StubHandler.failures_left -= fail
+        if fail:
+            self._send(503, b'')
+        elif self.headers.get('If-None-Match') == self.etag:
+            self._send(304, b'')
+        elif 'gzip' in self.headers.get('Accept-Encoding', ''):
+            self._send(200, self.gzipped_body, {'Content-Encoding': 'gzip'})
+        else:
+            self._send(200, self.body)
+
+    def _send(self, status, data, headers=None):
+        self.send_response(status)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', self.etag)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def legacy_refresh(url, output_dir):
+    """روش قبلی: requests.get بدون Session، پارس کامل و نوشتن xlsx و csv در هر بار"""
+    response = requests.get(url, headers={'Accept': 'application/json'}, timeout=30)
+    car_data = parse_car_prices(response.json())
+    df = pd.DataFrame([
+        {"Car Name": item['نام خودرو'], "Price": f"{item['قیمت (تومان)']:,} تومان"}
+        for item in car_data
+    ])
+    df.to_excel(os.path.join(output_dir, 'hamrah.xlsx'), index=False)
+    df.to_csv(os.path.join(output_dir, 'hamrah.csv'), index=False, encoding='utf-8')
+    return len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک کلاینت API همراه مکانیک")
+    parser.add_argument('--refreshes', type=int, default=20)
+    parser.add_argument('--fail-first', type=int, default=1, help="تعداد پاسخ 503 اولیه")
+    args = parser.parse_args()
+
+    items = [{'name': row['Car Name'], 'price': re.sub(r'[^\d]', '', str(row['Price']))}
+             for _, row in pd.read_csv(HAMRAH_FILE).iterrows()]
+    StubHandler.body = json.dumps(items, ensure_ascii=False).encode('utf-8')
+    StubHandler.gzipped_body = gzip.compress(StubHandler.body)
+    StubHandler.etag = '"' + hashlib.md5(StubHandler.body).hexdigest() + '"'
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/car-price/all"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            start_time = time.perf_counter()
+            legacy_bytes = [legacy_refresh(url, tmp_dir) for _ in range(args.refreshes)]
+            legacy_time = (time.perf_counter() - start_time) / args.refreshes
+
+            StubHandler.failures_left = args.fail_first
+            client = HamrahApiClient(url, state_file=os.path.join(tmp_dir, 'state.json'), backoff=0.05)
+            car_data, changed = client.fetch()
+            first = (client.last_status, client.last_elapsed, client.last_bytes, len(car_data), changed)
+
+            # کلاینت جدید (مثل اجرای بعدی برنامه) فقط با فایل وضعیت
+            client = HamrahApiClient(url, state_file=os.path.join(tmp_dir, 'state.json'))
+            refresh_times, refresh_bytes, unchanged = [], [], 0
+            for _ in range(args.refreshes):
+                car_data, changed = client.fetch()
+                refresh_times.append(client.last_elapsed)
+                refresh_bytes.append(client.last_bytes)
+                unchanged += not changed and len(car_data) == first[3]
+            client.close()
+    finally:
+        server.shutdown()
+
+    print(f"\n📊 {len(items)} خودرو، {args.refreshes} به‌روزرسانی")
+    print(f"🐢 روش قبلی: {legacy_time * 1000:.0f}ms و {legacy_bytes[0] / 1024:.0f}KB برای هر به‌روزرسانی")
+    print(f"📥 اولین دریافت: HTTP {first[0]}، {first[3]} خودرو، {first[2] / 1024:.0f}KB (gzip) در {first[1] * 1000:.0f}ms")
+    print(f"⚡ به‌روزرسانی شرطی: {sum(refresh_times) / len(refresh_times) * 1000:.1f}ms و "
+          f"{sum(refresh_bytes) / len(refresh_bytes):.0f} بایت برای هر به‌روزرسانی")
+    print(f"{'✅' if unchanged == args.refreshes else '❌'} پاسخ‌های 304 با داده کامل: {unchanged}/{args.refreshes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک تشخیص کلمات کلیدی توضیحات (موتور/گیربکس و فروش فوری): حلقه‌های `in` قدیمی
+در برابر KeywordScanner
+
+توضیحات طولانی مصنوعی از جملات معمولی و جملات دارای کلمه کلیدی (با نسبت --density)
+ساخته می‌شوند و نتایج مسیر قدیمی (هر کلمه یک اسکن کامل متن) با اسکنر یک‌باره
+مقایسه می‌شوند.
+
+python benchmark_keyword_scanner.py [--ads 300] [--sentences 40] [--density 0.2]
+"""
+
+import argparse
+import random
+import time
+
+from keyword_scanner import (ENGINE_ISSUE_KEYWORDS, GEARBOX_ISSUE_KEYWORDS, URGENT_SALE_KEYWORDS,
+                             scan_description)
+
+SENTENCES = [
+    'ماشین در حد صفر است و بدون رنگ', 'یک لکه رنگ روی گلگیر عقب', 'سقف رنگ شده',
+    'موتور تازه تعمیر شده و گیربکس سالم', 'فروش فوری به دلیل مهاجرت', 'پول لازم هستم',
+    'دو جا صافکاری و رنگی', 'تصادف جزیی داشته', 'کارکرد بالا ولی فنی سالم', 'کلاچ خراب است',
+    'بیمه تا آخر سال', 'لاستیک‌ها نو', 'ستون سالم', 'تمام رنگ', 'رنگ شده رنگ شده رنگ',
+    'دنده سخت جا می‌رود', 'قیمت پایین تر از بازار', 'مشکل موتور ندارد', 'نقاشی درب جلو',
+    'Full option با سانروف', 'کیلومتر زیاد', 'ایراد فنی ندارد', 'گیربکس تعمیری',
+    'تعمیر موتور تعمیر گیربکس', 'موتور تعمیر موتور',
+]
+# جملات بدون کلمه کلیدی (بیشتر متن آگهی‌های واقعی از این نوع است)
+FILLER = [
+    'سورن پلاس با موتورEF7 مدل ۱۴۰۰', 'دارای کروز کنترل و آینه تاشو', 'رینگ آلمینیومی',
+    'معاوضه با دنا پلاس توربو اتوماتیک', 'تحویل ۱۴۰۱ بوده', 'لطفا فقط تماس بگیرید',
+    'سند تک برگ به نام', 'بازدید در محل', 'کارت و سند موجود', 'سرویس‌ها به موقع انجام شده',
+    'در حد نو و تمیز', 'لاستیک‌ها ۸۰ درصد', 'بیمه بدنه دارد', 'خریدار واقعی پیام دهد',
+]
+
+
+def legacy_engine_gearbox(description):
+    if not description:
+        return False, []
+    description_lower = description.lower()
+    found_issues = [f"موتور: {issue}" for issue in ENGINE_ISSUE_KEYWORDS if issue in description_lower]
+    found_issues += [f"گیربکس: {issue}" for issue in GEARBOX_ISSUE_KEYWORDS if issue in description_lower]
+    return len(found_issues) > 0, found_issues
+
+
+def legacy_urgent(description):
+    if not description:
+        return False
+    description_lower = description.lower()
+    return any(keyword in description_lower for keyword in URGENT_SALE_KEYWORDS)
+
+
+def scanner_engine_gearbox(description, hits):
+    if not description:
+        return False, []
+    found_issues = [f"موتور: {issue}" for issue in hits.found('engine')]
+    found_issues += [f"گیربکس: {issue}" for issue in hits.found('gearbox')]
+    return len(found_issues) > 0, found_issues
+
+
+def make_descriptions(count, sentences, density, seed=1):
+    random.seed(seed)
+    return ['. '.join(random.choice(SENTENCES if random.random() < density else FILLER)
+                      for _ in range(random.randint(1, sentences)))
+            for _ in range(count)]
+
+
+def timed(func, items):
+    start_time = time.perf_counter()
+    results = [func(item) for item in items]
+    return results, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک اسکنر کلمات کلیدی")
+    parser.add_argument('--ads', type=int, default=300)
+    parser.add_argument('--sentences', type=int, default=40, help="حداکثر تعداد جمله در هر توضیحات")
+    parser.add_argument('--density', type=float, default=0.2, help="سهم جملات دارای کلمه کلیدی")
+    args = parser.parse_args()
+
+    descriptions = make_descriptions(args.ads, args.sentences, args.density)
+
+    def legacy_description(text):
+        return legacy_engine_gearbox(text), legacy_urgent(text)
+
+    def scanner_description(text):
+        hits = scan_description(text)
+        return scanner_engine_gearbox(text, hits), bool(text) and hits.any('urgent')
+
+    cases = [
+        ('توضیحات (موتور/گیربکس + فوری)', legacy_description, scanner_description),
+    ]
+
+    # ساخت اسکنر (یک بار در هر پروسه) جدا از زمان اسکن اندازه‌گیری می‌شود
+    start_time = time.perf_counter()
+    scan_description('')
+    build_time = time.perf_counter() - start_time
+
+    average_length = sum(len(text) for text in descriptions) / len(descriptions)
+    print(f"\n📊 {len(descriptions)} توضیحات - میانگین {average_length:.0f} کاراکتر")
+    print(f"🏗️ ساخت اسکنر: {build_time * 1000:.0f}ms")
+    for name, legacy, scanner in cases:
+        legacy_results, legacy_time = timed(legacy, descriptions)
+        scanner_results, scanner_time = timed(scanner, descriptions)
+        mismatches = sum(1 for a, b in zip(legacy_results, scanner_results) if a != b)
+        status = '✅' if mismatches == 0 else '❌'
+        print(f"{name:42s} قدیمی {legacy_time * 1000:7.1f}ms  اسکنر {scanner_time * 1000:7.1f}ms  "
+              f"x{legacy_time / scanner_time:4.1f}  {status} تفاوت: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
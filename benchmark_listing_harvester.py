@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک جمع‌آوری لینک‌های صفحه لیست: getads قبلی در برابر ListingHarvester
+
+- قبل: بعد از هر اسکرول find_elements('article') و برای هر کارت find_element('a') و
+  get_attribute('href') (همه کارت‌ها، حتی دیده‌شده‌ها)
+- بعد: listing_harvester.harvest (یک execute_script و فقط کارت‌های تازه)
+
+بدون --live صفحه شبیه‌سازی می‌شود: هر فرمان WebDriver یک رفت و برگشت --rtt میلی‌ثانیه‌ای
+است و هر اسکرول --per-scroll کارت اضافه می‌کند تا --target لینک جمع شود. با --live
+همین دو روش روی صفحه واقعی دیوار با Chrome اجرا می‌شوند (انتظار بعد از اسکرول در زمان
+حساب نمی‌شود).
+
+python benchmark_listing_harvester.py [--target 300] [--per-scroll 24] [--rtt 2] [--live URL]
+"""
+
+import argparse
+import time
+
+from selenium.webdriver.common.by import By
+
+from listing_harvester import ListingHarvester
+
+
+class FakeElement:
+    def __init__(self, page, href):
+        self.page = page
+        self.href = href
+
+    def find_element(self, by, value):
+        self.page.round_trip()
+        return self
+
+    def get_attribute(self, name):
+        self.page.round_trip()
+        return self.href
+
+
+class SimulatedListing:
+    """صفحه لیست شبیه‌سازی‌شده با هزینه رفت و برگشت برای هر فرمان WebDriver"""
+
+    def __init__(self, per_scroll, rtt):
+        self.per_scroll = per_scroll
+        self.rtt = rtt
+        self.hrefs = []
+        self.harvested = 0
+        self.round_trips = 0
+        self.scroll()
+
+    def round_trip(self):
+        self.round_trips += 1
+        time.sleep(self.rtt)
+
+    def scroll(self):
+        start = len(self.hrefs)
+        self.hrefs.extend(f"https://divar.ir/v/car/{index}" for index in range(start, start + self.per_scroll))
+
+    def find_elements(self, by, value):
+        self.round_trip()
+        return [FakeElement(self, href) for href in self.hrefs]
+
+    def execute_script(self, script, *args):
+        self.round_trip()
+        cards = [{'href': href, 'title': '', 'lines': []} for href in self.hrefs[self.harvested:]]
+        fresh = self.harvested == 0
+        self.harvested = len(self.hrefs)
+        return {'fresh': fresh, 'cards': cards}
+
+
+def legacy_collect(driver, target, scroll):
+    """حلقه جمع‌آوری getads قبلی تا target لینک"""
+    unique_ads = set()
+    while len(unique_ads) < target:
+        for ad_element in driver.find_elements(By.TAG_NAME, "article"):
+            try:
+                href = ad_element.find_element(By.TAG_NAME, "a").get_attribute('href')
+                if href and '/v/' in href and href not in unique_ads:
+                    unique_ads.add(href)
+            except Exception:
+                continue
+        if len(unique_ads) >= target or not scroll():
+            break
+    return len(unique_ads)
+
+
+def harvester_collect(driver, target, scroll):
+    harvester = ListingHarvester()
+    while True:
+        harvester.harvest(driver)
+        if len(harvester.cards) >= target or not scroll():
+            break
+    return len(harvester.cards)
+
+
+def timed(collect, driver, target, scroll):
+    """(تعداد لینک، زمان جمع‌آوری بدون زمان اسکرول)"""
+    scroll_time = [0.0]
+
+    def timed_scroll():
+        start_time = time.perf_counter()
+        result = scroll()
+        scroll_time[0] += time.perf_counter() - start_time
+        return result
+
+    start_time = time.perf_counter()
+    count = collect(driver, target, timed_scroll)
+    return count, time.perf_counter() - start_time - scroll_time[0]
+
+
+def run_live(url, target):
+    from driver_factory import get_driver, get_factory
+    from page_waits import page_state, wait_for_growth, wait_for_selector
+
+    driver = get_driver('divar')
+    try:
+        def scroll():
+            baseline = page_state(driver, 'article')
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            return wait_for_growth(driver, baseline, 'article', 3, label='scroll')
+
+        results = {}
+        for label, collect in (('قبلی', legacy_collect), ('ListingHarvester', harvester_collect)):
+            driver.get(url)
+            wait_for_selector(driver, 'article', 10, label='listing')
+            results[label] = timed(collect, driver, target, scroll)
+        return results
+    finally:
+        driver.quit()
+        get_factory().close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک جمع‌آوری لینک‌های صفحه لیست")
+    parser.add_argument('--target', type=int, default=300)
+    parser.add_argument('--per-scroll', type=int, default=24)
+    parser.add_argument('--rtt', type=float, default=2.0, help="میلی‌ثانیه برای هر فرمان WebDriver")
+    parser.add_argument('--live', metavar='URL', help="صفحه لیست واقعی دیوار با Chrome")
+    args = parser.parse_args()
+
+    if args.live:
+        results = run_live(args.live, args.target)
+    else:
+        results = {}
+        for label, collect in (('قبلی', legacy_collect), ('ListingHarvester', harvester_collect)):
+            page = SimulatedListing(args.per_scroll, args.rtt / 1000)
+
+            def scroll(page=page):
+                page.scroll()
+                return True
+
+            count, elapsed = timed(collect, page, args.target, scroll)
+            results[label] = (count, elapsed)
+            print(f"   {label}: {page.round_trips} فرمان WebDriver")
+
+    legacy_count, legacy_time = results['قبلی']
+    fast_count, fast_time = results['ListingHarvester']
+    print(f"\n🐢 getads قبلی: {legacy_count} لینک در {legacy_time:.2f}s")
+    print(f"⚡ ListingHarvester: {fast_count} لینک در {fast_time:.3f}s (×{legacy_time / max(fast_time, 1e-9):.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک تطبیق قیمت بازار: find_market_price (تک‌آگهی) در برابر find_market_prices_batch
+
+آگهی‌های مصنوعی از روی نام‌های بازار ساخته می‌شوند و نتایج دو مسیر مقایسه می‌شوند.
+
+python benchmark_market_matcher.py [--ads 500] [--scalar-limit 200]
+"""
+
+import argparse
+import math
+import random
+import time
+
+import pandas as pd
+
+from car_price_calculator import CarPriceCalculator
+
+CAR_NAMES = ['پژو', 'پراید', 'سمند', 'تیبا', 'دنا', 'کیا', 'تویوتا', 'رانا', None]
+YEARS = [None, 1385, 1395, 1399, 1400, 1402, 1403]
+
+
+def make_ads(market_df, count, seed=1):
+    random.seed(seed)
+    names = market_df['Car Name'].astype(str).tolist()
+    ads = []
+    for _ in range(count):
+        words = random.choice(names).split()
+        ads.append({
+            'car_name': random.choice(CAR_NAMES),
+            'year': random.choice(YEARS),
+            'brand_type': ' '.join(words[:random.randint(1, 3)]),
+        })
+    return pd.DataFrame(ads, dtype=object)
+
+
+def same_result(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک تطبیق دسته‌ای قیمت بازار")
+    parser.add_argument('--ads', type=int, default=500)
+    parser.add_argument('--scalar-limit', type=int, default=200, help="تعداد آگهی برای مسیر تک‌آگهی")
+    parser.add_argument('--hamrah', default='hamrah_mechanic_prices.csv')
+    parser.add_argument('--z4car', default='z4car_prices.csv')
+    args = parser.parse_args()
+
+    calculator = CarPriceCalculator(enable_ml=False)
+    market_df = calculator.load_market_prices(args.hamrah, args.z4car)
+    ads_df = make_ads(market_df, args.ads)
+
+    start_time = time.perf_counter()
+    calculator.get_market_table(market_df)
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    batch = calculator.find_market_prices_batch(ads_df, market_df)
+    batch_time = time.perf_counter() - start_time
+
+    scalar_ads = ads_df.head(args.scalar_limit)
+    mismatches = 0
+    start_time = time.perf_counter()
+    for i, ad in scalar_ads.iterrows():
+        car_name = ad['car_name'] if isinstance(ad['car_name'], str) else None
+        year = None if pd.isna(ad['year']) else int(ad['year'])
+        price, source = calculator.find_market_price({'car_name': car_name, 'year': year}, market_df, ad['brand_type'])
+        if not (same_result(price, batch.at[i, 'market_price']) and source == batch.at[i, 'price_source']):
+            mismatches += 1
+    scalar_time = time.perf_counter() - start_time
+
+    scalar_per_ad = scalar_time / max(len(scalar_ads), 1) * 1000
+    batch_per_ad = batch_time / max(len(ads_df), 1) * 1000
+    print(f"\n📊 {len(market_df)} ردیف بازار")
+    print(f"🏗️ ساخت جدول ویژگی‌ها: {build_time * 1000:.0f}ms")
+    print(f"🐢 تک‌آگهی: {scalar_per_ad:.2f}ms برای هر آگهی ({len(scalar_ads)} آگهی)")
+    print(f"⚡ دسته‌ای: {batch_per_ad:.3f}ms برای هر آگهی ({len(ads_df)} آگهی)")
+    if batch_per_ad > 0:
+        print(f"🚀 بهبود: {scalar_per_ad / batch_per_ad:.0f}x")
+    print(f"{'✅' if mismatches == 0 else '❌'} تفاوت نتایج: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
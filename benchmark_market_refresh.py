@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک به‌روزرسانی افزایشی قیمت‌های بازار
+
+snapshot قبلی از hamrah_mechanic_prices.csv و z4car_prices.csv ساخته می‌شود و
+snapshot جدید با حذف، افزودن و تغییر قیمت درصدی از خودروها شبیه‌سازی می‌شود.
+بعد از گرم کردن کش تطبیق با نام‌های جستجو، دو روش مقایسه می‌شوند:
+
+- قبلی: ساخت دوباره market_prices، ایندکس نام‌ها، کاتالوگ و خالی کردن کامل کش
+- افزایشی: diff_snapshots و apply_price_changes
+
+نتیجه تطبیق همه نام‌ها باید با ایندکس و کش تازه‌ای که از market_prices به‌روزشده
+ساخته شود یکسان باشد. (در تساوی امتیاز، نامی که زودتر در دیکشنری آمده برنده است؛
+ترتیب market_prices به‌روزشده با ترتیب snapshot جدید فرق دارد، پس مقایسه روی همان
+ترتیب انجام می‌شود.) قیمت تطبیق‌شده هر نام هم باید با نتیجه روش قبلی برابر باشد.
+
+python benchmark_market_refresh.py [--change-rate 0.05] [--churn-rate 0.02] [--queries 2000]
+"""
+
+import argparse
+import random
+import time
+
+from benchmark_market_snapshot import SOURCE_FILES, read_source
+from car_catalog import CarCatalog
+from market_index import MarketNameIndex
+from market_snapshot import PriceSnapshot, apply_price_changes, diff_snapshots, source_prices
+
+
+def lookup(market_prices, index, catalog, cache, car_name):
+    """همان منطق تطبیق get_market_price_for_car"""
+    key = car_name.strip().lower()
+    if key not in cache:
+        entry = catalog.lookup(car_name)
+        best_match, best_score = (entry.name, 1.0) if entry is not None else index.best_match(car_name)
+        if best_match is not None and best_score > 0.5:
+            result = market_prices[best_match]
+            result['matched_name'] = best_match
+        else:
+            result = {'market_price': None}
+        cache[key] = result
+    return cache[key]
+
+
+def mutate_sources(source_data, change_rate, churn_rate):
+    """شبیه‌سازی به‌روزرسانی بعدی منابع: تغییر قیمت، حذف و افزودن خودرو"""
+    new_data = {}
+    for source, car_data in source_data.items():
+        prices = source_prices(car_data)
+        updated = {}
+        for name, price in prices.items():
+            roll = random.random()
+            if roll < churn_rate:
+                continue
+            if roll < churn_rate + change_rate:
+                price = int(price * random.uniform(0.9, 1.1))
+            updated[name] = price
+        for name in random.sample(list(prices), int(len(prices) * churn_rate)):
+            updated[f"{name} جدید {random.randint(1400, 1404)}"] = prices[name]
+        new_data[source] = [{'نام خودرو': name, 'قیمت (تومان)': price} for name, price in updated.items()]
+    return new_data
+
+
+def make_queries(names, count):
+    """نام‌های جستجو شبیه آگهی‌های دیوار (دو سه کلمه اول نام بازار)"""
+    queries = []
+    for _ in range(count):
+        words = random.choice(names).split()
+        queries.append(' '.join(words[:random.randint(1, min(3, len(words)))]))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک به‌روزرسانی افزایشی قیمت‌های بازار")
+    parser.add_argument('--change-rate', type=float, default=0.05)
+    parser.add_argument('--churn-rate', type=float, default=0.02)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(1)
+    old_data = {source: read_source(path) for source, path in SOURCE_FILES.items()}
+    new_data = mutate_sources(old_data, args.change_rate, args.churn_rate)
+    old_snapshot = PriceSnapshot.from_sources(old_data)
+    new_snapshot = PriceSnapshot.from_sources(new_data)
+    queries = make_queries(old_snapshot.names + new_snapshot.names, args.queries)
+
+    # وضعیت گرم قبل از به‌روزرسانی
+    market_prices = old_snapshot.to_market_prices()
+    index = MarketNameIndex(market_prices.keys())
+    catalog = CarCatalog(market_prices.keys())
+    cache = {}
+    for query in queries:
+        lookup(market_prices, index, catalog, cache, query)
+
+    # روش قبلی: همه چیز از نو
+    start_time = time.perf_counter()
+    full_prices = new_snapshot.to_market_prices()
+    full_index = MarketNameIndex(full_prices.keys())
+    full_catalog = CarCatalog(full_prices.keys())
+    full_cache = {}
+    full_results = [lookup(full_prices, full_index, full_catalog, full_cache, query) for query in queries]
+    full_time = time.perf_counter() - start_time
+
+    # افزایشی
+    start_time = time.perf_counter()
+    changes = diff_snapshots(old_snapshot, new_snapshot)
+    affected_keys = apply_price_changes(market_prices, changes, index, cache, catalog)
+    incremental_results = [lookup(market_prices, index, catalog, cache, query) for query in queries]
+    incremental_time = time.perf_counter() - start_time
+
+    # مرجع: ایندکس و کش تازه روی همان market_prices به‌روزشده
+    expected_index = MarketNameIndex(market_prices.keys())
+    expected_catalog = CarCatalog(market_prices.keys())
+    expected_cache = {}
+    expected_results = [lookup(market_prices, expected_index, expected_catalog, expected_cache, query)
+                        for query in queries]
+
+    mismatches = sum(1 for expected, incremental in zip(expected_results, incremental_results)
+                     if (expected.get('matched_name'), expected['market_price'])
+                     != (incremental.get('matched_name'), incremental['market_price']))
+    # در تساوی امتیاز نام انتخاب‌شده به ترتیب دیکشنری بستگی دارد، پس با ساخت دوباره فقط قیمت‌ها مقایسه می‌شوند
+    full_mismatches = sum(1 for full, incremental in zip(full_results, incremental_results)
+                          if full['market_price'] != incremental['market_price'])
+    same_prices = {name: data['market_price'] for name, data in market_prices.items()} == \
+        {name: data['market_price'] for name, data in full_prices.items()}
+
+    print(f"\n📊 {len(old_snapshot)} → {len(new_snapshot)} خودرو: {changes.summary()}")
+    print(f"🔍 {len(set(q.strip().lower() for q in queries))} نام جستجوی متفاوت در کش، {len(affected_keys)} متأثر از تغییرات")
+    print(f"🐢 ساخت دوباره و تطبیق همه نام‌ها: {full_time * 1000:.0f}ms")
+    print(f"⚡ diff، اعمال تغییرات و تطبیق دوباره: {incremental_time * 1000:.0f}ms (×{full_time / incremental_time:.1f})")
+    print(f"{'✅' if not mismatches and not full_mismatches and same_prices else '❌'} نتایج متفاوت: {mismatches}، "
+          f"قیمت متفاوت با ساخت دوباره: {full_mismatches}، قیمت‌ها برابر snapshot جدید: {same_prices}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک بارگذاری قیمت‌های بازار: read_excel + iterrows (روش قبلی fetch_market_prices)
+در برابر PriceSnapshot.load
+
+snapshot از hamrah_mechanic_prices.csv و z4car_prices.csv ساخته می‌شود، خروجی اکسل
+آن نوشته و هر دو روش بارگذاری مقایسه می‌شوند. برابری قیمت‌ها و رد شدن فایل خراب هم
+بررسی می‌شود.
+
+python benchmark_market_snapshot.py [--repeat 20]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from market_snapshot import PriceSnapshot, SnapshotError
+
+SOURCE_FILES = {'hamrah_mechanic': 'hamrah_mechanic_prices.csv', 'z4car': 'z4car_prices.csv'}
+
+
+def read_source(file_path):
+    df = pd.read_csv(file_path, encoding='utf-8-sig')
+    if 'Car Name' in df.columns:
+        df = df.rename(columns={'Car Name': 'نام خودرو', 'Price': 'قیمت (تومان)'})
+    return df[['نام خودرو', 'قیمت (تومان)']].to_dict('records')
+
+
+def legacy_load(excel_file):
+    """روش قبلی: پارس اکسل با openpyxl و ساخت دیکشنری با iterrows"""
+    df = pd.read_excel(excel_file)
+    market_prices = {}
+    for _, row in df.iterrows():
+        market_prices[row['نام خودرو']] = {'market_price': row['قیمت روز (تومان)']}
+    return market_prices
+
+
+def timed(func, repeat):
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start_time) * 1000 / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک snapshot قیمت‌های بازار")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    snapshot = PriceSnapshot.from_sources({source: read_source(path) for source, path in SOURCE_FILES.items()})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        excel_file = os.path.join(tmp_dir, 'combined_market_prices.xlsx')
+        snapshot_file = os.path.join(tmp_dir, 'market_prices.snapshot')
+        snapshot.export_excel(excel_file)
+        snapshot.save(snapshot_file)
+
+        excel_ms, legacy_prices = timed(lambda: legacy_load(excel_file), max(1, args.repeat // 10))
+        snapshot_ms, new_prices = timed(lambda: PriceSnapshot.load(snapshot_file).to_market_prices(), args.repeat)
+        snapshot_size = os.path.getsize(snapshot_file)
+        excel_size = os.path.getsize(excel_file)
+
+        with open(snapshot_file, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+        try:
+            PriceSnapshot.load(snapshot_file)
+            corrupt_rejected = False
+        except SnapshotError:
+            corrupt_rejected = True
+
+    mismatches = sum(1 for name, data in legacy_prices.items()
+                     if new_prices.get(name, {}).get('market_price') != data['market_price'])
+    counts = '، '.join(f"{source}: {meta['count']}" for source, meta in snapshot.sources.items())
+    print(f"\n📊 {len(snapshot)} خودرو ({counts})")
+    print(f"🐢 read_excel + iterrows: {excel_ms:.1f}ms ({excel_size / 1024:.0f}KB)")
+    print(f"⚡ PriceSnapshot.load: {snapshot_ms:.2f}ms ({snapshot_size / 1024:.0f}KB)، ×{excel_ms / snapshot_ms:.0f}")
+    print(f"{'✅' if not mismatches and len(legacy_prices) == len(new_prices) else '❌'} قیمت‌های متفاوت: {mismatches}")
+    print(f"{'✅' if corrupt_rejected else '❌'} فایل خراب رد شد")
+
+
+if __name__ == "__main__":
+    main()
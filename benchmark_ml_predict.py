@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک پیش‌بینی ML: predict_price قبلی (یک DataFrame و prepare_training_data برای هر
+آگهی) در برابر predict_many (ماتریس ویژگی برداری و یک model.predict برای کل دسته)
+
+یک مدل با آگهی‌های مصنوعی (ستون‌های خروجی main.py) در حافظه آموزش داده می‌شود و
+هیچ فایلی ذخیره نمی‌شود. برای هر اندازه دسته، تأخیر هر آگهی در روش قبلی روی حداکثر
+--legacy-limit آگهی اندازه‌گیری و خروجی دو روش روی همان آگهی‌ها مقایسه می‌شود.
+
+در پایان کدگذاری ستون برند با LabelEncoder قبلی (transform و در صورت مقدار تازه
+ساخت دوباره classes_) و CategoryEncoder مقایسه می‌شود.
+
+python benchmark_ml_predict.py [--batches 1 100 10000] [--train 2000] [--legacy-limit 200]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from sklearn.preprocessing import LabelEncoder
+
+from ml_price_calculator import CategoryEncoder, MachineLearningPriceCalculator
+
+BRANDS = ['پراید', 'پژو ۲۰۶', 'پژو ۴۰۵', 'سمند', 'دنا', 'تیبا', 'ساینا', 'کوییک', 'رانا', 'شاهین', 'تارا', 'هایما']
+ENGINE_STATUSES = ['سالم', 'نیاز به تعمیر', 'تعویض شده']
+CHASSIS_STATUSES = ['سالم و پلمپ', 'ضربه‌خورده', 'رنگ‌شده']
+BODY_STATUSES = ['سالم و بی‌خط و خش', 'خط و خش جزیی', 'دوررنگ', 'تمام‌رنگ']
+ISSUES = ['paint_one_part', 'paint_two_parts', 'paint_three_parts', 'full_paint', 'accident', 'engine_repair',
+          'gearbox_issue', 'high_mileage']
+
+
+def make_ad(rng):
+    """آگهی با ستون‌های main.py (قیمت‌ها و کیلومتر به شکل متن با جداکننده)"""
+    market_price = rng.randrange(300, 2000) * 1_000_000
+    issues = rng.sample(ISSUES, rng.choice([0, 0, 1, 2, 3]))
+    year = rng.randrange(1385, 1404)
+    mileage = rng.randrange(0, 300) * 1000
+    depreciation = min(0.6, (1403 - year) * 0.02 + mileage / 2_000_000 + 0.05 * len(issues))
+    return {
+        'نام خودرو': rng.choice(BRANDS),
+        'سال': str(year),
+        'کیلومتر': f"{mileage:,}",
+        'قیمت روز (تومان)': f"{market_price:,}",
+        'قیمت تخمینی (تومان)': f"{market_price * (1 - depreciation) * rng.uniform(0.95, 1.05):,.0f}",
+        'وضعیت موتور': rng.choice(ENGINE_STATUSES),
+        'وضعیت شاسی': rng.choice(CHASSIS_STATUSES),
+        'وضعیت بدنه': rng.choice(BODY_STATUSES),
+        'مشکلات تشخیص داده شده': ', '.join(issues) if issues else 'هیچ',
+    }
+
+
+def train(calculator, ads):
+    """همان مراحل train_model بدون خواندن اکسل و ذخیره مدل"""
+    data = calculator.prepare_training_data(pd.DataFrame(ads))
+    features = [col for col in calculator.feature_columns if col in data.columns]
+    X, y = data[features], data['estimated_price']
+    mask = ~(X.isna().any(axis=1) | y.isna())
+    calculator.model.fit(X[mask], y[mask])
+
+
+def legacy_predict(calculator, car_data):
+    """predict_price قبلی: DataFrame یک‌سطری، prepare_training_data و predict برای یک آگهی"""
+    data = calculator.prepare_training_data(pd.DataFrame([car_data]))
+    features = [col for col in calculator.feature_columns if col in data.columns]
+    prediction = calculator.model.predict(data[features])[0]
+    return float(prediction) if prediction > 0 else None
+
+
+def legacy_encode(encoder, values):
+    """encode_categorical_features قبلی برای یک ستون"""
+    try:
+        return encoder.transform(values.astype(str))
+    except ValueError:
+        unique_values = list(encoder.classes_) + list(values.unique())
+        encoder.classes_ = np.array(list(set(unique_values)))
+        return encoder.transform(values.astype(str))
+
+
+def bench_encoding(rng, rows, repeats=20):
+    """زمان کدگذاری ستون برند (میکروثانیه برای هر ردیف) با و بدون مقدار تازه"""
+    print(f"\n🔤 کدگذاری ستون برند ({rows} ردیف)")
+    for label, extra in (('مقادیر شناخته', []), ('یک مقدار تازه', ['لامبورگینی'])):
+        values = pd.Series([rng.choice(BRANDS) for _ in range(rows - len(extra))] + extra)
+        timings = {}
+        for name, make, encode in (('LabelEncoder قبلی', lambda: LabelEncoder().fit(BRANDS), legacy_encode),
+                                   ('CategoryEncoder', lambda: CategoryEncoder().fit(BRANDS),
+                                    lambda encoder, column: encoder.transform(column))):
+            encoders = [make() for _ in range(repeats)]
+            start_time = time.perf_counter()
+            for encoder in encoders:
+                encode(encoder, values)
+            timings[name] = (time.perf_counter() - start_time) / repeats / rows * 1e6
+        print(f"   {label}: " + '، '.join(f"{name} {us:.2f}µs" for name, us in timings.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک پیش‌بینی دسته‌ای ML")
+    parser.add_argument('--batches', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--train', type=int, default=2000)
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--legacy-limit', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        calculator = MachineLearningPriceCalculator()
+    calculator.model.set_params(n_estimators=args.trees)
+    start_time = time.perf_counter()
+    train(calculator, [make_ad(rng) for _ in range(args.train)])
+    print(f"🤖 آموزش {args.trees} درخت روی {args.train} آگهی: {time.perf_counter() - start_time:.1f}s")
+
+    for size in args.batches:
+        ads = [make_ad(rng) for _ in range(size)]
+        sample = ads[:args.legacy_limit]
+
+        start_time = time.perf_counter()
+        legacy = [legacy_predict(calculator, ad) for ad in sample]
+        legacy_ms = (time.perf_counter() - start_time) / len(sample) * 1000
+
+        start_time = time.perf_counter()
+        batch = calculator.predict_many(ads)
+        batch_ms = (time.perf_counter() - start_time) / size * 1000
+
+        same = np.allclose(np.array(legacy, dtype=float), np.array(batch[:len(sample)], dtype=float), equal_nan=True)
+        print(f"\n📦 دسته {size} آگهی")
+        print(f"   🐢 predict_price قبلی: {legacy_ms:.2f}ms برای هر آگهی ({len(sample)} آگهی اندازه‌گیری شد)")
+        print(f"   ⚡ predict_many: {batch_ms:.3f}ms برای هر آگهی (×{legacy_ms / batch_ms:.0f})")
+        print(f"   {'✅' if same else '❌'} پیش‌بینی یکسان روی {len(sample)} آگهی: {same}")
+
+    bench_encoding(rng, max(args.batches))
+
+
+if __name__ == "__main__":
+    main()
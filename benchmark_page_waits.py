@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک انتظارهای رویدادمحور در برابر time.sleep ثابت (اسکرول لیست دیوار)
+
+- قبل: بعد از هر اسکرول time.sleep(1.5) و بعد شمارش آگهی‌ها (getads قبلی)
+- بعد: wait_for_growth با سقف SCROLL_WAIT
+
+بدون --live صفحه شبیه‌سازی می‌شود: آگهی‌های هر اسکرول بعد از تأخیر تصادفی
+(--min-delay تا --max-delay) اضافه می‌شوند و بعد از --pages اسکرول لیست تمام می‌شود.
+بارگذاری‌هایی که دیرتر از انتظار ثابت برسند «از دست رفته» حساب می‌شوند (getads آن
+اسکرول را بدون آگهی جدید می‌بیند). با --live همان اسکرول‌ها روی Chrome واقعی انجام
+و مدت هر انتظار گزارش می‌شود.
+
+python benchmark_page_waits.py [--scrolls 20] [--min-delay 0.2] [--max-delay 2.0] [--live URL]
+"""
+
+import argparse
+import random
+import time
+
+from page_waits import WaitStats, page_state, wait_for_growth
+import page_waits
+
+FIXED_SLEEP = 1.5
+SCROLL_WAIT = 3
+ADS_PER_SCROLL = 24
+
+
+class SimulatedPage:
+    """درایور شبیه‌سازی‌شده: فقط PROBE_SCRIPT و اسکرول"""
+
+    def __init__(self, delays, pages):
+        self.delays = list(delays)
+        self.pages = pages
+        self.count = ADS_PER_SCROLL
+        self.loaded = 1
+        self.arrival = None
+        self.last_change = time.perf_counter()
+
+    def _update(self):
+        now = time.perf_counter()
+        if self.arrival is not None and now >= self.arrival:
+            self.count += ADS_PER_SCROLL
+            self.loaded += 1
+            self.last_change = self.arrival
+            self.arrival = None
+
+    def scroll(self):
+        self._update()
+        if self.arrival is None and self.loaded < self.pages and self.delays:
+            self.arrival = time.perf_counter() + self.delays.pop(0)
+
+    def execute_script(self, script, *args):
+        self._update()
+        if len(args) > 1 and args[1]:
+            self.last_change = time.perf_counter()
+        return {'count': self.count, 'height': self.count * 300, 'ready': 'complete',
+                'quiet': time.perf_counter() - self.last_change}
+
+
+def run_fixed(delays, pages):
+    page = SimulatedPage(delays, pages)
+    waited, missed = 0.0, 0
+    for _ in delays:
+        before = page.execute_script(None)['count']
+        page.scroll()
+        time.sleep(FIXED_SLEEP)
+        waited += FIXED_SLEEP
+        if page.execute_script(None)['count'] == before and page.arrival is not None:
+            missed += 1
+    return waited, missed
+
+
+def run_event(delays, pages):
+    page = SimulatedPage(delays, pages)
+    page_waits._stats = WaitStats()
+    missed = 0
+    for _ in delays:
+        baseline = page_state(page, 'article')
+        page.scroll()
+        if not wait_for_growth(page, baseline, 'article', SCROLL_WAIT, label='scroll') and page.arrival is not None:
+            missed += 1
+    return page_waits._stats.total(), missed, page_waits._stats.summary()
+
+
+def run_live(url, scrolls):
+    from driver_factory import get_driver, get_factory
+
+    driver = get_driver('divar')
+    try:
+        driver.get(url)
+        page_waits.wait_for_selector(driver, 'article', 10, label='listing')
+        for _ in range(scrolls):
+            baseline = page_state(driver, 'article')
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            wait_for_growth(driver, baseline, 'article', SCROLL_WAIT, label='scroll')
+        print(f"⏱️ {page_waits.get_wait_stats().summary()}")
+        print(f"   در برابر {FIXED_SLEEP * scrolls:.1f}s انتظار ثابت برای {scrolls} اسکرول")
+    finally:
+        driver.quit()
+        get_factory().close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک انتظارهای رویدادمحور")
+    parser.add_argument('--scrolls', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=15, help="تعداد صفحات لیست تا انتهای آن")
+    parser.add_argument('--min-delay', type=float, default=0.2)
+    parser.add_argument('--max-delay', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--live', metavar='URL', help="اسکرول روی Chrome واقعی")
+    args = parser.parse_args()
+
+    if args.live:
+        run_live(args.live, args.scrolls)
+        return
+
+    rng = random.Random(args.seed)
+    delays = [rng.uniform(args.min_delay, args.max_delay) for _ in range(args.scrolls)]
+    fixed_time, fixed_missed = run_fixed(delays, args.pages)
+    event_time, event_missed, summary = run_event(delays, args.pages)
+
+    print(f"\n📜 {args.scrolls} اسکرول، تأخیر بارگذاری {args.min_delay}-{args.max_delay}s، "
+          f"انتهای لیست بعد از {args.pages} صفحه")
+    print(f"🐢 sleep({FIXED_SLEEP}) ثابت: {fixed_time:.1f}s انتظار، {fixed_missed} بارگذاری از دست رفته")
+    print(f"⚡ wait_for_growth (سقف {SCROLL_WAIT}s): {event_time:.1f}s انتظار، {event_missed} بارگذاری از دست رفته")
+    print(f"   {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک مقیاس‌پذیری process_ads با 1/2/4/8 پروسه
+
+برای هر سه ماشین‌حساب یک فایل آگهی مصنوعی ساخته می‌شود، process_ads با تعداد
+پروسه‌های مختلف اجرا می‌شود و خروجی CSV هر اجرا با اجرای تک‌پروسه مقایسه می‌شود.
+
+python benchmark_parallel_pricing.py [--ads 2000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from car_price_calculator import CarPriceCalculator
+from column_based_calculator import ColumnBasedCarPriceCalculator
+from improved_car_calculator import ImprovedCarPriceCalculator
+
+HAMRAH_FILE = 'hamrah_mechanic_prices.csv'
+Z4CAR_FILE = 'z4car_prices.csv'
+
+DESCRIPTIONS = [
+    'بدون رنگ شاسی ها سالم فنی به شرط',
+    'دوررنگ موتور تعمیر شده گیربکس سالم',
+    'یک لکه رنگ گلگیر عقب، تصادف جزیی',
+    'فوری فروشی بدلیل مهاجرت، کارکرد بالا',
+    'تمیز و سالم، بیمه کامل',
+]
+BODY_STATUSES = ['سالم و بی‌خط و خش', 'خط و خش جزیی', 'دوررنگ', 'رنگ‌شدگی در ۲ ناحیه']
+
+
+def make_divar_file(path, count, seed=1):
+    random.seed(seed)
+    names = pd.read_csv(HAMRAH_FILE)['Car Name'].astype(str).tolist()
+    names += pd.read_csv(Z4CAR_FILE)['نام خودرو'].astype(str).tolist()
+    rows = []
+    for _ in range(count):
+        name = random.choice(names)
+        year = random.randint(1385, 1403)
+        rows.append({
+            'عنوان': f"{name} مدل {year}",
+            'توضیحات': random.choice(DESCRIPTIONS),
+            'برند_و_تیپ': ' '.join(name.split()[:3]),
+            'مدل': str(year),
+            'کارکرد': f"{random.randint(0, 400) * 1000:,}",
+            'موتور': random.choice(['سالم', 'نیاز به تعمیر']),
+            'شاسی': random.choice(['سالم و پلمپ', 'ضربه‌خورده']),
+            'بدنه': random.choice(BODY_STATUSES),
+            'قیمت': f"{random.randint(200, 3000) * 1000000:,} تومان",
+        })
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+
+def run(calculator, divar_file, output_file, workers):
+    if isinstance(calculator, CarPriceCalculator):
+        return calculator.process_ads(divar_file, HAMRAH_FILE, Z4CAR_FILE, output_file, workers=workers)
+    return calculator.process_ads(divar_file, HAMRAH_FILE, output_file, workers=workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک پردازش موازی آگهی‌ها")
+    parser.add_argument('--ads', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    calculators = [
+        ('CarPriceCalculator', CarPriceCalculator(enable_ml=False)),
+        ('ImprovedCarPriceCalculator', ImprovedCarPriceCalculator()),
+        ('ColumnBasedCarPriceCalculator', ColumnBasedCarPriceCalculator()),
+    ]
+
+    summary = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        divar_file = os.path.join(tmp_dir, 'divar_ads.xlsx')
+        make_divar_file(divar_file, args.ads)
+
+        for name, calculator in calculators:
+            baseline = None
+            baseline_time = None
+            for workers in args.workers:
+                output_file = os.path.join(tmp_dir, f"{name}_{workers}.xlsx")
+                start_time = time.perf_counter()
+                results_df = run(calculator, divar_file, output_file, workers)
+                elapsed = time.perf_counter() - start_time
+
+                csv_text = results_df.to_csv(index=False)
+                if baseline is None:
+                    baseline, baseline_time = csv_text, elapsed
+                identical = csv_text == baseline
+                summary.append((name, workers, elapsed, baseline_time / elapsed, identical, len(results_df)))
+
+    print(f"\n📊 {args.ads} آگهی - {os.cpu_count()} هسته")
+    for name, workers, elapsed, speedup, identical, rows in summary:
+        status = "✅ یکسان" if identical else "❌ متفاوت"
+        print(f"{name:32s} workers={workers:<2d} {elapsed:7.2f}s  x{speedup:4.2f}  {rows} ردیف  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک تاریخچه قیمت‌های بازار (PriceHistory)
+
+از hamrah_mechanic_prices.csv و z4car_prices.csv چند ماه snapshot روزانه با تغییر
+تصادفی قیمت‌ها ساخته و ثبت می‌شود، سپس زمان جستجوی قیمت در یک تاریخ، روند ۳۰ روزه و
+قیمت در زمان انتشار آگهی اندازه گرفته و با سری تولیدشده در حافظه مقایسه می‌شود.
+برای مقایسه، خواندن قیمت یک روز از فایل اکسل همان روز (روش قبلی) هم اندازه گرفته می‌شود.
+
+python benchmark_price_history.py [--days 180] [--lookups 2000]
+"""
+
+import argparse
+import bisect
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmark_market_snapshot import SOURCE_FILES, read_source
+from market_snapshot import SOURCES, PriceSnapshot
+from price_history import PriceHistory
+
+
+def daily_snapshots(base, days, start):
+    """snapshotهای روزانه با تغییر تصادفی قیمت حدود ۵٪ خودروها در هر روز"""
+    snapshots = []
+    prices = {source: base.prices[source].copy() for source in SOURCES}
+    for day in range(days):
+        for source in SOURCES:
+            changed = np.random.random(len(base)) < 0.05
+            prices[source][changed] = (prices[source][changed] * np.random.uniform(0.95, 1.08, changed.sum())).astype(np.int64)
+        snapshot = PriceSnapshot(base.names, {source: prices[source].copy() for source in SOURCES},
+                                 base.sources, (start + timedelta(days=day, hours=9)).timestamp())
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def timed_each(func, args_list):
+    times = []
+    results = []
+    for args in args_list:
+        start_time = time.perf_counter()
+        results.append(func(*args))
+        times.append(time.perf_counter() - start_time)
+    times.sort()
+    return results, sum(times) / len(times) * 1000, times[int(len(times) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک تاریخچه قیمت‌های بازار")
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--lookups', type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(1)
+    np.random.seed(1)
+    base = PriceSnapshot.from_sources({source: read_source(path) for source, path in SOURCE_FILES.items()})
+    start = datetime(2025, 1, 1)
+    snapshots = daily_snapshots(base, args.days, start)
+    times = [snapshot.created_at for snapshot in snapshots]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history = PriceHistory(os.path.join(tmp_dir, 'history.db'))
+        start_time = time.perf_counter()
+        rows = sum(history.record_snapshot(snapshot) for snapshot in snapshots)
+        record_time = (time.perf_counter() - start_time) / len(snapshots)
+        duplicate_rows = history.record_snapshot(snapshots[-1])
+        db_size = os.path.getsize(os.path.join(tmp_dir, 'history.db'))
+
+        # روش قبلی: یک فایل اکسل برای هر روز
+        excel_file = os.path.join(tmp_dir, 'day.xlsx')
+        snapshots[args.days // 2].export_excel(excel_file)
+        start_time = time.perf_counter()
+        df = pd.read_excel(excel_file)
+        df[df['نام خودرو'] == base.names[0]]
+        excel_ms = (time.perf_counter() - start_time) * 1000
+
+        queries = []
+        for _ in range(args.lookups):
+            car_id = random.randrange(len(base))
+            when = start + timedelta(days=random.uniform(0, args.days + 2))
+            queries.append((car_id, when))
+
+        point_results, point_ms, point_p99 = timed_each(
+            history.price_at, [(base.names[car_id], when) for car_id, when in queries])
+        trend_results, trend_ms, trend_p99 = timed_each(
+            history.trend, [(base.names[car_id], when - timedelta(days=30), when) for car_id, when in queries])
+        ad_queries = [(base.names[car_id], {'تاریخ ذخیره': when.strftime('%Y-%m-%d %H:%M:%S'),
+                                            'زمان و مکان': f"{random.randint(1, 9)} روز پیش در تهران"})
+                      for car_id, when in queries]
+        ad_results, ad_ms, ad_p99 = timed_each(history.price_for_ad, ad_queries)
+        history.close()
+
+    # مقایسه با سری در حافظه
+    def expected_price(car_id, timestamp):
+        position = bisect.bisect_right(times, timestamp) - 1
+        if position < 0:
+            return None
+        price = int(snapshots[position].market_price[car_id])
+        return (times[position], price) if price else None
+
+    mismatches = 0
+    for (car_id, when), point, trend in zip(queries, point_results, trend_results):
+        expected = expected_price(car_id, when.timestamp())
+        mismatches += (tuple(point) if point else None) != expected
+        low, high = (when - timedelta(days=30)).timestamp(), when.timestamp()
+        expected_trend = [(t, int(s.market_price[car_id])) for t, s in zip(times, snapshots)
+                          if low <= t <= high and s.market_price[car_id]]
+        mismatches += [tuple(row) for row in trend] != expected_trend
+    for (car, ad), result in zip(ad_queries, ad_results):
+        saved_at = datetime.strptime(ad['تاریخ ذخیره'], '%Y-%m-%d %H:%M:%S')
+        days_ago = int(ad['زمان و مکان'].split()[0])
+        expected = expected_price(base.names.index(car), (saved_at - timedelta(days=days_ago)).timestamp())
+        mismatches += (tuple(result) if result else None) != expected
+
+    print(f"\n📊 {args.days} snapshot روزانه از {len(base)} خودرو: {rows:,} ردیف، {db_size / 1024 / 1024:.1f}MB")
+    print(f"📥 ثبت هر snapshot: {record_time * 1000:.0f}ms؛ ثبت دوباره: {duplicate_rows} ردیف")
+    print(f"🐢 قیمت یک روز از فایل اکسل همان روز: {excel_ms:.0f}ms")
+    print(f"⚡ قیمت در یک تاریخ: {point_ms:.3f}ms (p99 {point_p99:.3f}ms)")
+    print(f"⚡ روند ۳۰ روزه: {trend_ms:.3f}ms (p99 {trend_p99:.3f}ms)")
+    print(f"⚡ قیمت در زمان انتشار آگهی: {ad_ms:.3f}ms (p99 {ad_p99:.3f}ms)")
+    print(f"{'✅' if not mismatches else '❌'} نتایج متفاوت با سری در حافظه: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
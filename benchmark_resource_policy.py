@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک مسدودسازی منابع صفحات دیوار
+
+- بدون --live: منابع صفحات ذخیره‌شده (debug_page_source.html، page_source.html) با
+  page_resource_urls استخراج و برای هر نوع صفحه تعداد درخواست‌های مسدود هر گروه و حجم
+  تخمینی صرفه‌جویی گزارش می‌شود
+- با --live: هر آدرس با Chrome واقعی (پروفایل 'divar' کارخانه درایور) یک بار بدون
+  مسدودسازی و یک بار با آن بارگذاری و زمان بارگذاری، تعداد درخواست و بایت‌های دانلودشده
+  (لاگ performance) مقایسه می‌شود
+
+python benchmark_resource_policy.py [--html page_source.html ...] [--live URL ...] [--page-type detail]
+"""
+
+import argparse
+import time
+
+from resource_policy import TYPICAL_BYTES, ResourcePolicy, classify_url, page_resource_urls
+
+FIXTURES = ['debug_page_source.html', 'page_source.html']
+
+
+def offline_report(paths):
+    policy = ResourcePolicy()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            urls = page_resource_urls(f.read())
+        print(f"\n📄 {path}: {len(urls)} منبع")
+        for page_type in policy.policies:
+            by_group = {}
+            for url in urls:
+                if policy.is_blocked(url, page_type):
+                    group = classify_url(url)
+                    by_group[group] = by_group.get(group, 0) + 1
+            blocked = sum(by_group.values())
+            saved = sum(TYPICAL_BYTES.get(group, TYPICAL_BYTES[None]) * count for group, count in by_group.items())
+            groups = '، '.join(f"{group}: {count}" for group, count in sorted(by_group.items(), key=lambda item: -item[1]))
+            print(f"   🚫 {page_type}: {blocked}/{len(urls)} مسدود ({groups or '-'})، ~{saved / 1024:.0f}KB کمتر")
+
+
+def load_page(driver, policy, url, page_type):
+    """(زمان بارگذاری، گزارش شبکه) برای یک بار بارگذاری url"""
+    policy.apply(driver, page_type)
+    policy.record_page(driver, page_type)  # خالی کردن لاگ صفحه قبلی
+    start_time = time.perf_counter()
+    driver.get(url)
+    elapsed = time.perf_counter() - start_time
+    time.sleep(1)  # درخواست‌های بعد از load (اسکریپت‌های آمار، تصاویر lazy)
+    return elapsed, policy.record_page(driver, page_type)
+
+
+def live_report(urls, page_type):
+    from driver_factory import get_driver, get_factory
+
+    driver = get_driver('divar')
+    try:
+        for url in urls:
+            print(f"\n🌐 {url}")
+            for label, enabled in (('بدون مسدودسازی', False), ('با مسدودسازی', True)):
+                elapsed, report = load_page(driver, ResourcePolicy(enabled=enabled), url, page_type)
+                if report is None:
+                    print(f"   ⚠️ {label}: لاگ performance در دسترس نیست ({elapsed:.2f}s)")
+                    continue
+                print(f"   {'⚡' if enabled else '🐢'} {label}: {elapsed:.2f}s، {report['requests']} درخواست، "
+                      f"{report['bytes'] / 1024:.0f}KB، {report['blocked']} مسدود")
+    finally:
+        driver.quit()
+        get_factory().close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک مسدودسازی منابع صفحات دیوار")
+    parser.add_argument('--html', nargs='+', default=FIXTURES)
+    parser.add_argument('--live', nargs='+', metavar='URL', help="بارگذاری با Chrome واقعی")
+    parser.add_argument('--page-type', default='detail')
+    args = parser.parse_args()
+
+    if args.live:
+        live_report(args.live, args.page_type)
+    else:
+        offline_report(args.html)
+
+
+if __name__ == "__main__":
+    main()
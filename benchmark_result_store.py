@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک ذخیره batch: فایل اکسل جدید برای هر batch در برابر ResultStore (SQLite WAL)
+
+زمان نوشتن هر batch در ابتدا و انتهای اجرا گزارش می‌شود تا ثابت ماندن هزینه
+با بزرگ شدن پایگاه داده دیده شود.
+
+python benchmark_result_store.py [--batches 200] [--batch-size 50] [--excel-batches 10]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from result_store import ResultStore
+
+
+def make_ad(i):
+    urgent = random.random() < 0.1
+    return {
+        'عنوان آگهی': f"پژو 206 تیپ {random.randint(2, 6)} مدل {random.randint(1390, 1403)}",
+        'سال': random.randint(1390, 1403),
+        'کیلومتر': f"{random.randint(0, 300) * 1000:,}",
+        'قیمت آگهی (تومان)': random.randint(300, 2000) * 1000000,
+        'قیمت روز (تومان)': random.randint(300, 2000) * 1000000,
+        'توضیحات': 'بدون رنگ، بیمه تا آخر سال، لاستیک‌ها نو ' * random.randint(1, 5),
+        'لینک آگهی': f"https://divar.ir/v/ad-{i}",
+        'فروش فوری': 'بله' if urgent else 'خیر',
+        'رنگ‌بندی': 'سبز' if urgent else 'عادی',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک ذخیره‌ساز نتایج")
+    parser.add_argument('--batches', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--excel-batches', type=int, default=10, help="تعداد batch برای روش اکسل")
+    args = parser.parse_args()
+
+    random.seed(1)
+    batches = [[make_ad(b * args.batch_size + i) for i in range(args.batch_size)] for b in range(args.batches)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        excel_times = []
+        for b, batch in enumerate(batches[:args.excel_batches]):
+            start_time = time.perf_counter()
+            pd.DataFrame(batch).to_excel(os.path.join(tmp_dir, f"batch_{b}.xlsx"), index=False, engine='openpyxl')
+            excel_times.append(time.perf_counter() - start_time)
+
+        store = ResultStore(os.path.join(tmp_dir, 'results.db'))
+        store_times = [store.append_many(batch) for batch in batches]
+
+        start_time = time.perf_counter()
+        df = store.to_dataframe(store.session)
+        read_time = time.perf_counter() - start_time
+        total = store.count()
+        store.close()
+
+    window = max(1, len(store_times) // 10)
+    print(f"\n📊 {args.batches} batch × {args.batch_size} آگهی")
+    print(f"🐢 اکسل برای هر batch: {sum(excel_times) / len(excel_times) * 1000:.1f}ms")
+    print(f"⚡ SQLite برای هر batch: {sum(store_times) / len(store_times) * 1000:.2f}ms "
+          f"(ابتدا {sum(store_times[:window]) / window * 1000:.2f}ms، "
+          f"انتها {sum(store_times[-window:]) / window * 1000:.2f}ms)")
+    print(f"📤 خواندن {len(df)} آگهی برای خروجی: {read_time * 1000:.0f}ms")
+    print(f"{'✅' if total == len(df) == args.batches * args.batch_size else '❌'} تعداد ردیف‌ها: {total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بنچمارک پارسر صفحه قیمت زد فور
+
+- قبل: Z4CarScraper.extract_car_prices با BeautifulSoup(html.parser)، فیلتر کلاس با lambda
+  و find_all تو در تو (مسیر سریع موقتاً غیرفعال می‌شود تا همان کد قبلی اجرا شود)
+- بعد: parse_price_page (lxml و فقط کارت‌های قیمت؛ و بدون lxml با SoupStrainer)
+
+خروجی هر دو روی z4car_debug.html باید یکسان باشد. z4car_prices.csv هم با خروجی مقایسه
+می‌شود؛ این فایل در زمان دیگری ذخیره شده و فقط نام‌ها، وضعیت و سال باید برابر باشند.
+
+python benchmark_z4car_parser.py [--repeat 5] [--html z4car_debug.html] [--csv z4car_prices.csv]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+import combined_scraper
+import z4car_parser
+from combined_scraper import Z4CarScraper
+
+COLUMNS = ['نام خودرو', 'وضعیت', 'سال', 'قیمت (تومان)']
+
+
+def legacy_extract(html):
+    """extract_car_prices بدون مسیر سریع (خروجی و لاگ‌های چاپی کنار گذاشته می‌شوند)"""
+    fast_parser = combined_scraper.parse_price_page
+    combined_scraper.parse_price_page = lambda html_content: []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return Z4CarScraper().extract_car_prices(html)
+    finally:
+        combined_scraper.parse_price_page = fast_parser
+
+
+def soup_extract(html):
+    """parse_price_page وقتی lxml نصب نیست"""
+    z4car_parser.LXML_AVAILABLE = False
+    try:
+        return z4car_parser.parse_price_page(html)
+    finally:
+        z4car_parser.LXML_AVAILABLE = True
+
+
+def timed(func, html, repeat):
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func(html)
+        times.append(time.perf_counter() - start_time)
+    return result, min(times) * 1000
+
+
+def compare_csv(cars_data, csv_file):
+    """(نام‌های برابر، رکوردهای با نام/وضعیت/سال برابر، قیمت‌های برابر، تعداد ردیف csv)"""
+    saved = pd.read_csv(csv_file, dtype=str, encoding='utf-8-sig')
+    saved = {row[0]: row for row in saved[COLUMNS].itertuples(index=False)}
+    parsed = {car['نام خودرو']: tuple(str(car[column]) for column in COLUMNS) for car in cars_data}
+    names = saved.keys() & parsed.keys()
+    same_fields = sum(1 for name in names if saved[name][:3] == parsed[name][:3])
+    same_prices = sum(1 for name in names if saved[name][3] == parsed[name][3])
+    return len(names), same_fields, same_prices, len(saved)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک پارسر صفحه قیمت زد فور")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--html', default='z4car_debug.html')
+    parser.add_argument('--csv', default='z4car_prices.csv')
+    args = parser.parse_args()
+
+    with open(args.html, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    legacy, legacy_ms = timed(legacy_extract, html, args.repeat)
+    fast, fast_ms = timed(z4car_parser.parse_price_page, html, args.repeat)
+    strained, strained_ms = timed(soup_extract, html, args.repeat)
+    names, same_fields, same_prices, csv_rows = compare_csv(fast, args.csv)
+
+    print(f"\n📄 {args.html}: {len(html) / 1024 / 1024:.1f}MB، {len(fast)} خودرو")
+    print(f"🐢 extract_car_prices قبلی: {legacy_ms:.0f}ms")
+    print(f"⚡ parse_price_page (lxml): {fast_ms:.0f}ms (×{legacy_ms / fast_ms:.1f})")
+    print(f"⚡ parse_price_page (SoupStrainer بدون lxml): {strained_ms:.0f}ms (×{legacy_ms / strained_ms:.1f})")
+    print(f"{'✅' if fast == legacy == strained else '❌'} خروجی یکسان با مسیر قبلی: {fast == legacy}، "
+          f"بدون lxml: {strained == legacy}")
+    print(f"📋 {args.csv}: {names}/{csv_rows} نام مشترک، {same_fields} با وضعیت و سال برابر، "
+          f"{same_prices} با قیمت برابر (csv در زمان دیگری ذخیره شده است)")
+
+
+if __name__ == "__main__":
+    main()
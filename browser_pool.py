@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+استخر چند مرورگر برای صفحات جزئیات آگهی‌های دیوار
+
+یک crawler لیست آگهی‌ها لینک‌ها را در یک صف مشترک می‌گذارد و N کارگر، هر کدام
+با یک Chrome مستقل، لینک‌ها را برمی‌دارند و handle_ad(driver, url) را اجرا
+می‌کنند (بارگذاری صفحه، استخراج، قیمت‌گذاری و ذخیره). زمان هر آگهی عمدتاً صرف
+انتظار برای شبکه و مرورگر می‌شود، پس thread کافی است و تعداد آگهی در دقیقه تقریباً
+به نسبت تعداد کارگرها زیاد می‌شود.
+
+هر کارگر crash درایور خودش را تشخیص می‌دهد، فقط همان درایور را دوباره می‌سازد و
+لینکی را که در حال پردازش بود یک بار دیگر با درایور جدید امتحان می‌کند.
+"""
+
+import queue
+import random
+import threading
+import time
+
+# کلمات کلیدی خطاهایی که یعنی خود درایور از دست رفته (نه فقط صفحه)
+DRIVER_CRASH_KEYWORDS = (
+    'invalid session id', 'session not created', 'chrome not reachable',
+    'disconnected', 'crashed', 'no such session', 'session deleted',
+    'connection refused', 'chrome has crashed', 'httpconnectionpool',
+)
+
+DEFAULT_MAX_RESTARTS = 3
+DEFAULT_QUEUE_PER_WORKER = 4
+
+# علامت پایان کار برای هر کارگر
+_STOP = object()
+
+
+def is_driver_crash(error, driver=None):
+    """آیا خطا از crash درایور است؟ اگر driver داده شود زنده بودن آن هم بررسی می‌شود"""
+    error_str = str(error).lower()
+    if any(keyword in error_str for keyword in DRIVER_CRASH_KEYWORDS):
+        return True
+    if driver is None:
+        return False
+    try:
+        driver.current_url
+        return False
+    except Exception:
+        return True
+
+
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class BrowserPool:
+    """
+    استخر کارگرهای مرورگر با صف مشترک لینک‌ها
+
+    Parameters
+    ----------
+    driver_factory : callable
+        ساخت یک درایور جدید؛ None یعنی راه‌اندازی ناموفق
+    handle_ad : callable
+        handle_ad(driver, url) -> bool؛ True یعنی آگهی با موفقیت ذخیره شد
+    workers : int
+        تعداد مرورگرها
+    max_restarts : int
+        حداکثر راه‌اندازی مجدد درایور برای هر کارگر
+    queue_size : int, optional
+        ظرفیت صف؛ وقتی پر باشد submit منتظر می‌ماند تا crawler جلوتر از کارگرها نرود
+    error_delay : tuple
+        بازه انتظار تصادفی (ثانیه) بعد از خطای عادی یک آگهی
+    """
+
+    def __init__(self, driver_factory, handle_ad, workers=2, max_restarts=DEFAULT_MAX_RESTARTS,
+                 queue_size=None, error_delay=(8, 15)):
+        self.driver_factory = driver_factory
+        self.handle_ad = handle_ad
+        self.workers = max(1, workers)
+        self.max_restarts = max_restarts
+        self.error_delay = error_delay
+        if queue_size is None:
+            queue_size = self.workers * DEFAULT_QUEUE_PER_WORKER
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._drivers = {}
+        self._alive = 0
+        self._started_at = None
+
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.restarts = 0
+
+    def start(self):
+        """راه‌اندازی کارگرها (هر کارگر درایور خودش را در thread خودش می‌سازد)"""
+        self._started_at = time.perf_counter()
+        self._alive = self.workers
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run_worker, args=(index,),
+                                      name=f"browser-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"🧵 استخر مرورگر با {self.workers} کارگر راه‌اندازی شد")
+        return self
+
+    @property
+    def alive_workers(self):
+        return self._alive
+
+    def submit(self, url):
+        """افزودن یک لینک به صف (در صورت پر بودن صف منتظر می‌ماند)"""
+        while not self._stop.is_set():
+            if not self._alive:
+                return False
+            try:
+                self._queue.put(url, timeout=0.5)
+            except queue.Full:
+                continue
+            with self._lock:
+                self.submitted += 1
+            return True
+        return False
+
+    def join(self):
+        """انتظار تا همه لینک‌های صف پردازش شوند"""
+        self._queue.join()
+
+    def shutdown(self, wait=True, timeout=None):
+        """
+        توقف استخر و بستن همه درایورها
+
+        Parameters
+        ----------
+        wait : bool
+            True یعنی اول لینک‌های باقی‌مانده صف پردازش شوند؛ False یعنی صف دور ریخته شود
+        timeout : float, optional
+            حداکثر انتظار برای پایان هر کارگر
+        """
+        if not self._threads:
+            return
+        if wait:
+            self.join()
+        else:
+            self._stop.set()
+            self._drain_queue()
+
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(_STOP)
+            except queue.Full:
+                break
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+        with self._lock:
+            drivers = list(self._drivers.values())
+            self._drivers.clear()
+        for driver in drivers:
+            _quit_driver(driver)
+        self._threads = []
+        print(f"🔒 استخر مرورگر بسته شد ({self.summary()})")
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'alive_workers': self._alive,
+                'submitted': self.submitted,
+                'processed': self.processed,
+                'failed': self.failed,
+                'restarts': self.restarts,
+                'elapsed': elapsed,
+                'ads_per_minute': self.processed / elapsed * 60 if elapsed else 0.0,
+            }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"{stats['processed']} آگهی، {stats['failed']} ناموفق، {stats['restarts']} راه‌اندازی مجدد، "
+                f"{stats['ads_per_minute']:.1f} آگهی در دقیقه")
+
+    def _drain_queue(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._queue.task_done()
+
+    def _new_driver(self, index):
+        try:
+            driver = self.driver_factory()
+        except Exception as e:
+            print(f"❌ کارگر {index}: خطا در ساخت درایور: {e}")
+            driver = None
+        with self._lock:
+            if driver is None:
+                self._drivers.pop(index, None)
+            else:
+                self._drivers[index] = driver
+        return driver
+
+    def _restart_driver(self, index, driver, restarts):
+        """راه‌اندازی مجدد درایور یک کارگر؛ None یعنی کارگر باید متوقف شود"""
+        _quit_driver(driver)
+        while restarts < self.max_restarts and not self._stop.is_set():
+            restarts += 1
+            with self._lock:
+                self.restarts += 1
+            print(f"🔄 کارگر {index}: راه‌اندازی مجدد درایور ({restarts}/{self.max_restarts})")
+            driver = self._new_driver(index)
+            if driver is not None:
+                return driver, restarts
+        return None, restarts
+
+    def _handle(self, index, driver, url, restarts):
+        """پردازش یک لینک؛ بعد از crash درایور، همان لینک یک بار با درایور جدید تکرار می‌شود"""
+        for attempt in range(2):
+            try:
+                return bool(self.handle_ad(driver, url)), driver, restarts
+            except Exception as e:
+                if self._stop.is_set():
+                    return None, driver, restarts
+                if not is_driver_crash(e, driver):
+                    print(f"⚠️ کارگر {index}: خطا در پردازش آگهی: {e}")
+                    if self.error_delay:
+                        time.sleep(random.uniform(*self.error_delay))
+                    return False, driver, restarts
+                print(f"🚨 کارگر {index}: crash درایور: {e}")
+                driver, restarts = self._restart_driver(index, driver, restarts)
+                if driver is None:
+                    break
+        return False, driver, restarts
+
+    def _run_worker(self, index):
+        driver = self._new_driver(index)
+        restarts = 0
+        if driver is None:
+            driver, restarts = self._restart_driver(index, None, restarts)
+
+        try:
+            while driver is not None:
+                url = self._queue.get()
+                try:
+                    if url is _STOP:
+                        return
+                    if self._stop.is_set():
+                        continue
+                    ok, driver, restarts = self._handle(index, driver, url, restarts)
+                    if ok is None:
+                        continue
+                    with self._lock:
+                        if ok:
+                            self.processed += 1
+                        else:
+                            self.failed += 1
+                finally:
+                    self._queue.task_done()
+        finally:
+            with self._lock:
+                self._alive -= 1
+                alive = self._alive
+                driver = self._drivers.pop(index, None)
+            if driver is not None:
+                _quit_driver(driver)
+            if not alive and not self._stop.is_set():
+                # هیچ کارگری نمانده؛ صف خالی می‌شود تا join منتظر نماند
+                print("❌ همه کارگرهای مرورگر متوقف شدند")
+                self._drain_queue()
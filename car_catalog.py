@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+کاتالوگ کلید استاندارد خودروها برای تطبیق نام‌های بازار و دیوار
+
+هر نام بازار (همراه مکانیک مثل «کمریهیبرید 2500-2024»، زد فور مثل
+«بی ام و سری ۷ مدل ۲۰۱۶-۲۰۱۸») یک بار به کلید (برند، مدل، تیپ، بازه سال) تبدیل
+و در جدول {(برند، مدل، تیپ): [ورودی‌ها]} نگه داشته می‌شود. «برند و تیپ» آگهی‌های
+دیوار با همان قواعد به کلید تبدیل می‌شوند، پس قیمت‌گذاری یک جستجوی dict است و
+تطبیق فازی هر ماشین‌حساب فقط برای کلیدهایی اجرا می‌شود که در جدول نیستند.
+
+python car_catalog.py "سمند LX ساده" [--year 1400] [--market combined_market_prices.xlsx]
+"""
+
+import argparse
+import re
+from collections import Counter, defaultdict, namedtuple
+
+# برند استاندارد -> نام‌های برند در متن (فارسی و لاتین)
+BRAND_ALIASES = {
+    'پژو': ['پژو', 'peugeot'],
+    'پراید': ['پراید', 'pride'],
+    'سمند': ['سمند', 'samand'],
+    'دنا': ['دنا', 'dena'],
+    'رانا': ['رانا', 'rana'],
+    'تیبا': ['تیبا', 'tiba'],
+    'ساینا': ['ساینا', 'saina'],
+    'کوییک': ['کوییک', 'quick'],
+    'آریو': ['آریو', 'ario'],
+    'شاهین': ['شاهین', 'shahin'],
+    'تارا': ['تارا', 'tara'],
+    'تویوتا': ['تویوتا', 'toyota'],
+    'هوندا': ['هوندا', 'honda'],
+    'نیسان': ['نیسان', 'nissan'],
+    'هیوندای': ['هیوندای', 'هیوندا', 'hyundai'],
+    'کیا': ['کیا', 'kia'],
+    'مزدا': ['مزدا', 'mazda'],
+    'میتسوبیشی': ['میتسوبیشی', 'mitsubishi'],
+    'سوزوکی': ['سوزوکی', 'suzuki'],
+    'بی ام و': ['بی ام و', 'bmw'],
+    'بنز': ['بنز', 'مرسدس بنز', 'مرسدس', 'mercedes'],
+    'آئودی': ['آئودی', 'آودی', 'audi'],
+    'فولکس': ['فولکس واگن', 'فولکس', 'volkswagen'],
+    'رنو': ['رنو', 'renault'],
+    'پورشه': ['پورشه', 'porsche'],
+    'لکسوس': ['لکسوس', 'lexus'],
+    'اینفینیتی': ['اینفینیتی', 'infiniti'],
+    'جگوار': ['جگوار', 'jaguar'],
+    'لندرور': ['لندرور', 'لند روور', 'land rover'],
+    'چری': ['چری', 'chery'],
+    'ام وی ام': ['ام وی ام', 'mvm'],
+    'هاوال': ['هاوال', 'haval'],
+    'گک': ['گک', 'gac'],
+    'لیفان': ['لیفان', 'lifan'],
+    'گریت وال': ['گریت وال', 'great wall'],
+    'جک': ['جک', 'jac'],
+    'جیلی': ['جیلی', 'geely'],
+    'دانگ فنگ': ['دانگ فنگ', 'dongfeng'],
+    'ولوو': ['ولوو', 'volvo'],
+    'مینی': ['مینی', 'mini'],
+    'فیات': ['فیات', 'fiat'],
+    'دوو': ['دوو', 'daewoo'],
+    'اوپل': ['اوپل', 'opel'],
+    'برلیانس': ['برلیانس', 'brilliance'],
+    'بسترن': ['بسترن', 'bestune'],
+    'فونیکس': ['فونیکس', 'fownix'],
+    'کی ام سی': ['کی ام سی', 'kmc'],
+    'اسکودا': ['اسکودا', 'skoda'],
+    'ام جی': ['ام جی', 'mg'],
+    'بیجینگ': ['بیجینگ', 'baic'],
+    'هونگچی': ['هونگچی', 'hongqi'],
+    'سانگ یانگ': ['سانگ یانگ', 'ssangyong'],
+}
+
+# مدل -> برند برای نام‌های بدون برند (نام‌های همراه مکانیک معمولاً با مدل شروع می‌شوند)
+MODEL_BRANDS = {
+    '206': 'پژو', '207': 'پژو', '405': 'پژو', '2008': 'پژو', 'پارس': 'پژو', 'پرشیا': 'پژو',
+    '131': 'پراید', '132': 'پراید', '111': 'پراید',
+    'کمری': 'تویوتا', 'کرولا': 'تویوتا', 'پرادو': 'تویوتا', 'لندکروزر': 'تویوتا', 'هایلوکس': 'تویوتا',
+    'راوفور': 'تویوتا', 'یاریس': 'تویوتا', 'سیویک': 'هوندا', 'آکورد': 'هوندا',
+    'قشقایی': 'نیسان', 'تینا': 'نیسان', 'ماکسیما': 'نیسان', 'مورانو': 'نیسان', 'جوک': 'نیسان',
+    'النترا': 'هیوندای', 'سوناتا': 'هیوندای', 'توسان': 'هیوندای', 'سانتافه': 'هیوندای', 'آزرا': 'هیوندای',
+    'سراتو': 'کیا', 'اپتیما': 'کیا', 'اسپورتیج': 'کیا', 'سورنتو': 'کیا', 'پیکانتو': 'کیا', 'k5': 'کیا',
+    'لنسر': 'میتسوبیشی', 'پاجرو': 'میتسوبیشی', 'اوتلندر': 'میتسوبیشی', 'ویتارا': 'سوزوکی',
+    'پاسات': 'فولکس', 'جتا': 'فولکس', 'گلف': 'فولکس', 'ساندرو': 'رنو', 'تندر': 'رنو', 'فلوئنس': 'رنو',
+    'کاین': 'پورشه', 'ماکان': 'پورشه', 'آریزو': 'چری', 'تیگو': 'چری',
+    'x22': 'ام وی ام', 'x22pro': 'ام وی ام', 'x33': 'ام وی ام', 'x55': 'ام وی ام', 'h6': 'هاوال', 'h9': 'هاوال',
+    'a3': 'آئودی', 'a4': 'آئودی', 'a6': 'آئودی', 'q3': 'آئودی', 'q5': 'آئودی', 'q7': 'آئودی',
+    'اکتاویا': 'اسکودا', 'اوکتاویا': 'اسکودا', 'سوپرب': 'اسکودا',
+}
+
+# کلمات تیپ که در نام‌های همراه مکانیک به مدل چسبیده‌اند («ویتاراهیبرید»)
+GLUED_TRIM_WORDS = sorted([
+    'هیبرید', 'توربو', 'اتوماتیک', 'دنده', 'موتور', 'بنزینی', 'دوگانه', 'فول', 'پرایم', 'پرستیژ',
+    'کراس', 'مکس', 'ادیشن', 'اسپرت', 'پلاس', 'دیزل', 'برقی', 'اکسلنت', 'لاکچری',
+], key=len, reverse=True)
+GLUED_TRIM_PATTERN = re.compile(r'^(.{2,}?)(' + '|'.join(GLUED_TRIM_WORDS) + r')$')
+MODEL_PREFIX_WORDS = {'سری', 'کلاس'}
+SKIP_WORDS = {'مدل', 'تیپ', 'خودرو', 'ماشین', 'سواری', 'و', 'با'}
+
+# ارقام فارسی و عربی، ی و ک عربی؛ نیم‌فاصله حذف می‌شود («صندوق‌دار» = «صندوقدار»)
+PERSIAN_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩يك', '01234567890123456789یک', '\u200c')
+SCRIPT_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[؀-ۿ])|(?<=[؀-ۿ])(?=[a-z0-9])')
+MODEL_YEAR_PATTERN = re.compile(r'مدل\s*(\d{4}|\d{2})(?:\s*-\s*(\d{4}|\d{2}))?(?!\d)')
+TRAILING_YEAR_PATTERN = re.compile(r'-\s*(\d{4})\s*$')
+SEPARATORS = re.compile(r'[\s\-_/(),،]+')
+
+CarKey = namedtuple('CarKey', 'brand model trim years')
+CatalogEntry = namedtuple('CatalogEntry', 'name position key')
+
+
+def to_gregorian(year):
+    """سال شمسی (1300 تا 1499) یا دو رقمی («مدل 96») به میلادی؛ سال میلادی بدون تغییر"""
+    year = int(str(year).translate(PERSIAN_DIGITS))
+    if year < 100:
+        year += 1300 if year >= 50 else 1400
+    return year + 621 if 1300 <= year < 1500 else year
+
+
+def parse_year(value):
+    """سال آگهی («۱۴۰۰»، 1400، «قبل از ۱۳۶۶») به عدد؛ None اگر سال چهار یا دو رقمی نداشته باشد"""
+    digits = re.findall(r'\d+', str(value or '').translate(PERSIAN_DIGITS))
+    return next((int(d) for d in digits if len(d) in (2, 4)), None)
+
+
+def _split_glued(token):
+    match = GLUED_TRIM_PATTERN.match(token)
+    if match is None:
+        return [token]
+    return _split_glued(match.group(1)) + [match.group(2)]
+
+
+def _years(text):
+    """(متن بدون سال، بازه سال میلادی یا None)"""
+    match = MODEL_YEAR_PATTERN.search(text) or TRAILING_YEAR_PATTERN.search(text)
+    if not match:
+        return text, None
+    years = [to_gregorian(year) for year in match.groups() if year]
+    return text[:match.start()] + ' ' + text[match.end():], (min(years), max(years))
+
+
+def tokenize(name):
+    """
+    نرمال‌سازی نام: ارقام فارسی، ی و ک عربی، نیم‌فاصله، حروف کوچک، سال («مدل ۲۰۱۶-۲۰۱۸»
+    یا «-1403»)، جدا کردن فارسی و لاتین چسبیده («207اتوماتیک») و کلمات تیپ چسبیده («کمریهیبرید»)
+
+    Returns
+    -------
+    tuple
+        (توکن‌ها، بازه سال میلادی یا None)
+    """
+    text = str(name).translate(PERSIAN_DIGITS).lower().strip()
+    text, years = _years(text)
+    text = SCRIPT_BOUNDARY.sub(' ', text)
+    tokens = []
+    for token in SEPARATORS.split(text):
+        if token:
+            tokens.extend(_split_glued(token))
+    return tokens, years
+
+
+# کلمه اول نام برند -> [(کلمات نام، برند)] به ترتیب طولانی‌ترین
+_BRAND_PHRASES = defaultdict(list)
+for _brand, _aliases in BRAND_ALIASES.items():
+    for _alias in _aliases:
+        _BRAND_PHRASES[_alias.split()[0]].append((_alias.split(), _brand))
+for _phrases in _BRAND_PHRASES.values():
+    _phrases.sort(key=lambda item: len(item[0]), reverse=True)
+
+
+def parse_car_name(name, model_brands=None):
+    """
+    کلید استاندارد یک نام خودرو
+
+    Parameters
+    ----------
+    name : str
+    model_brands : dict, optional
+        مدل -> برند برای نام‌های بدون برند (پیش‌فرض MODEL_BRANDS)
+
+    Returns
+    -------
+    CarKey
+        brand و model ممکن است None باشند؛ trim رشته توکن‌های باقی‌مانده به ترتیب الفبا
+    """
+    tokens, years = tokenize(name)
+    brand = None
+    for start in range(min(2, len(tokens))):
+        for phrase, phrase_brand in _BRAND_PHRASES.get(tokens[start], ()):
+            if tokens[start:start + len(phrase)] == phrase:
+                brand = phrase_brand
+                del tokens[start:start + len(phrase)]
+                break
+        if brand:
+            break
+
+    tokens = [token for token in tokens if token not in SKIP_WORDS]
+    if not tokens:
+        return CarKey(brand, None, '', years)
+
+    model_length = 2 if (tokens[0] in MODEL_PREFIX_WORDS or tokens[1:2] == ['کلاس']) and len(tokens) > 1 else 1
+    model = ' '.join(tokens[:model_length])
+    if brand is None:
+        brand = (model_brands if model_brands is not None else MODEL_BRANDS).get(model)
+    return CarKey(brand, model, ' '.join(sorted(tokens[model_length:])), years)
+
+
+class CarCatalog:
+    """
+    جدول کلید استاندارد -> نام‌های بازار
+
+    Parameters
+    ----------
+    names : iterable of str
+        نام‌های بازار (ترتیب حفظ می‌شود؛ position هر ورودی همان شماره ردیف است)
+    keys : list of CarKey, optional
+        کلیدهای از پیش محاسبه‌شده هم‌طول با names (مثلاً از فایل snapshot)
+    """
+
+    def __init__(self, names, keys=None):
+        names = list(names)
+        if keys is None:
+            keys = [parse_car_name(name) for name in names]
+        else:
+            keys = [CarKey(*key) for key in keys]
+
+        # مدل‌هایی که در نام‌های برنددار فقط با یک برند آمده‌اند
+        pairs = Counter((key.model, key.brand) for key in keys if key.brand and key.model)
+        brands_per_model = Counter(model for model, _ in pairs)
+        self.model_brands = dict(MODEL_BRANDS)
+        self.model_brands.update({model: brand for (model, brand) in pairs if brands_per_model[model] == 1})
+
+        self.table = defaultdict(list)
+        self.entries = {}
+        self._next_position = 0
+        self._query_keys = {}
+        for name, key in zip(names, keys):
+            if key.brand is None and key.model in self.model_brands:
+                key = key._replace(brand=self.model_brands[key.model])
+            self._add(name, key)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def _add(self, name, key):
+        entry = CatalogEntry(name, self._next_position, key)
+        self._next_position += 1
+        if name in self.entries:
+            return
+        self.entries[name] = entry
+        if key.model:
+            self.table[key[:3]].append(entry)
+
+    def add(self, name):
+        if name not in self.entries:
+            self._add(name, self.parse(name))
+
+    def remove(self, name):
+        entry = self.entries.pop(name, None)
+        if entry is None:
+            return
+        bucket = self.table.get(entry.key[:3], [])
+        bucket[:] = [other for other in bucket if other.name != name]
+        if not bucket:
+            self.table.pop(entry.key[:3], None)
+
+    def apply_changes(self, added=(), removed=()):
+        for name in removed:
+            self.remove(name)
+        for name in added:
+            self.add(name)
+
+    def keys(self):
+        """کلیدها به ترتیب ورودی‌ها (برای ذخیره در snapshot)"""
+        return [tuple(entry.key) for entry in self.entries.values()]
+
+    def parse(self, name):
+        """کلید یک نام با برندهای یادگرفته‌شده از نام‌های بازار (نتیجه کش می‌شود)"""
+        key = self._query_keys.get(name)
+        if key is None:
+            key = parse_car_name(name, self.model_brands)
+            self._query_keys[name] = key
+        return key
+
+    def lookup(self, car_name, year=None):
+        """
+        ورودی بازار با همان برند، مدل و تیپ
+
+        Parameters
+        ----------
+        car_name : str
+            «برند و تیپ» یا نام خودروی آگهی
+        year : int, optional
+            سال آگهی (شمسی یا میلادی)؛ پیش‌فرض سال موجود در car_name
+
+        Returns
+        -------
+        CatalogEntry or None
+            None یعنی کلید در جدول نیست یا بیش از یک ورودی ممکن است (تطبیق فازی لازم است)
+        """
+        if not car_name:
+            return None
+        key = self.parse(car_name)
+        if not key.model:
+            return None
+        # نام‌های بدون برند (بیشتر همراه مکانیک) با همان مدل و تیپ
+        bucket = self.table.get(key[:3]) or self.table.get((None,) + key[1:3])
+        if not bucket:
+            return None
+
+        year = parse_year(year)
+        years = (to_gregorian(year),) * 2 if year else key.years
+        undated = [entry for entry in bucket if entry.key.years is None]
+        if years is None:
+            # بدون سال فقط ورودی بدون سال یا ورودی یکتا قطعی است
+            candidates = undated or bucket
+            return candidates[0] if len(candidates) == 1 else None
+
+        dated = [entry for entry in bucket if entry.key.years]
+        in_range = [entry for entry in dated if entry.key.years[0] <= years[1] and years[0] <= entry.key.years[1]]
+        if in_range:
+            return in_range[0]
+        if len(undated) == 1:
+            return undated[0]
+        if dated and not undated:
+            # نزدیک‌ترین سال (در تساوی، جدیدتر)
+            return min(dated, key=lambda entry: (min(abs(entry.key.years[0] - years[1]),
+                                                     abs(entry.key.years[1] - years[0])), -entry.key.years[1]))
+        return None
+
+    def lookup_terms(self, search_terms, year=None):
+        """اولین عبارت جستجو (به ترتیب اولویت) که در جدول پیدا شود"""
+        for term in search_terms:
+            entry = self.lookup(term, year)
+            if entry is not None:
+                return entry
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="کلید استاندارد و تطبیق یک نام خودرو با کاتالوگ بازار")
+    parser.add_argument('name')
+    parser.add_argument('--year', type=int)
+    parser.add_argument('--market', default='combined_market_prices.xlsx', help="فایل قیمت بازار (snapshot، xlsx یا csv)")
+    args = parser.parse_args()
+
+    from pricing_engine import get_pricing_engine
+
+    market_df = get_pricing_engine(args.market).snapshot.market_df
+    catalog = CarCatalog(market_df['Car Name'].astype(str))
+    print(f"🔑 {catalog.parse(args.name)}")
+    entry = catalog.lookup(args.name, args.year)
+    if entry is None:
+        print(f"⚠️ در کاتالوگ ({len(catalog)} نام، {len(catalog.table)} کلید) پیدا نشد؛ تطبیق فازی لازم است")
+    else:
+        print(f"✅ {entry.name}: {market_df.iloc[entry.position]['Numeric Price']:,.0f} تومان")
+
+
+if __name__ == "__main__":
+    main()
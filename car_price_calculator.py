@@ -11,6 +11,9 @@ except ImportError:
     print("⚠️ سیستم یادگیری ماشین در دسترس نیست")
     print("💡 برای فعال‌سازی: pip install scikit-learn joblib")
 
+from market_matcher import MarketFeatureTable, MODEL_NUMBERS, MODEL_PATTERNS, BRAND_PATTERNS, BRAND_KEYWORDS
+from parallel_pricing import price_ads, add_workers_argument
+
 class CarPriceCalculator:
     def __init__(self, enable_ml=True):
         # راه‌اندازی سیستم یادگیری ماشین
@@ -565,6 +568,12 @@ class CarPriceCalculator:
         
         year = car_info['year']
         
+        # کلید استاندارد (برند، مدل، تیپ، سال)؛ امتیازدهی زیر فقط اگر در کاتالوگ نباشد
+        market_table = self.get_market_table(market_df)
+        row = market_table.catalog_row(search_terms, year)
+        if row is not None:
+            return market_table.prices[row], market_table.sources[row]
+        
         # مرحله 1: جستجوی دقیق بر اساس برند و تیپ و سال
         best_match = None
         best_score = 0
@@ -594,7 +603,7 @@ class CarPriceCalculator:
                 market_lower = market_name.lower()
                 
                 # اگر مدل مشخص در جستجو وجود دارد، باید در نتیجه نیز باشد
-                model_numbers = ['206', '207', '405', '508', '2008', '3008', '5008']
+                model_numbers = MODEL_NUMBERS
                 search_model = None
                 market_model = None
                 
@@ -660,17 +669,7 @@ class CarPriceCalculator:
                 model_in_market = False
                 
                 # بررسی برندهای مختلف
-                brand_patterns = {
-                    'پژو': ['پژو', 'peugeot'],
-                    'پراید': ['پراید', 'pride'],
-                    'سمند': ['سمند', 'samand'],
-                    'تویوتا': ['تویوتا', 'toyota'],
-                    'هوندا': ['هوندا', 'honda'],
-                    'نیسان': ['نیسان', 'nissan'],
-                    'هیوندای': ['هیوندای', 'hyundai'],
-                    'کیا': ['کیا', 'kia'],
-                    'مزدا': ['مزدا', 'mazda']
-                }
+                brand_patterns = BRAND_PATTERNS
                 
                 for brand, patterns in brand_patterns.items():
                     if any(pattern in search_lower for pattern in patterns):
@@ -680,7 +679,7 @@ class CarPriceCalculator:
                             break
                 
                 # بررسی مدل‌های عددی
-                model_patterns = ['206', '207', '405', '508', '2008', '3008', '5008', '131', '132']
+                model_patterns = MODEL_PATTERNS
                 for model in model_patterns:
                     if model in search_lower and model in market_lower:
                         model_in_market = True
@@ -728,52 +727,8 @@ class CarPriceCalculator:
         # مرحله 2: اگر تطبیق دقیق پیدا نشد، جستجوی عمومی‌تر
         if not best_match:
             # جستجوی بر اساس برند اصلی - گسترده شده
-            brand_keywords = {
-                # برندهای ایرانی
-                'پژو': ['پژو', 'peugeot', '206', '207', '405', 'پارس'],
-                'پراید': ['پراید', 'pride', '131', '132'],
-                'سمند': ['سمند', 'samand'],
-                'دنا': ['دنا', 'dena'],
-                'رانا': ['رانا', 'rana'],
-                'تیبا': ['تیبا', 'tiba'],
-                'ساینا': ['ساینا', 'saina'],
-                'آریو': ['آریو', 'ario'],
-                'شاهین': ['شاهین', 'shahin'],
-                'تارا': ['تارا', 'tara'],
-                'کوییک': ['کوییک', 'quick'],
-                # برندهای آسیایی
-                'تویوتا': ['تویوتا', 'toyota', 'کمری', 'کرولا', 'پرادو', 'لندکروزر'],
-                'هوندا': ['هوندا', 'honda', 'سیویک', 'آکورد', 'crv'],
-                'نیسان': ['نیسان', 'nissan', 'قشقایی', 'تینا', 'سانی', 'مورانو'],
-                'هیوندای': ['هیوندای', 'hyundai', 'النترا', 'سوناتا', 'توسان', 'آزرا'],
-                'کیا': ['کیا', 'kia', 'سراتو', 'اسپورتیج', 'سورنتو', 'پیکانتو'],
-                'مزدا': ['مزدا', 'mazda', '323', '626'],
-                'میتسوبیشی': ['میتسوبیشی', 'mitsubishi', 'لنسر', 'پاجرو', 'اوتلندر'],
-                # برندهای اروپایی
-                'بی ام و': ['بی ام و', 'bmw', 'سری', 'x1', 'x3', 'x5', 'x6'],
-                'بنز': ['بنز', 'mercedes', 'مرسدس', 'کلاس'],
-                'آئودی': ['آئودی', 'audi', 'a3', 'a4', 'a6', 'q3', 'q5', 'q7'],
-                'فولکس': ['فولکس', 'volkswagen', 'پاسات', 'جتا', 'گلف'],
-                'رنو': ['رنو', 'renault', 'ساندرو', 'تندر', 'فلوئنس'],
-                'پورشه': ['پورشه', 'porsche', '911', 'کاین', 'ماکان'],
-                # برندهای لوکس
-                'لکسوس': ['لکسوس', 'lexus', 'es', 'ls', 'rx', 'lx', 'nx'],
-                'اینفینیتی': ['اینفینیتی', 'infiniti', 'g35', 'fx35', 'qx56'],
-                'جگوار': ['جگوار', 'jaguar', 'xf', 'xj', 'f-pace'],
-                'لندرور': ['لندرور', 'land rover', 'range rover', 'discovery'],
-                # برندهای چینی
-                'چری': ['چری', 'chery', 'آریزو', 'تیگو'],
-                'ام وی ام': ['ام وی ام', 'mvm', 'x33', 'x22', '315', '110'],
-                'هاوال': ['هاوال', 'haval', 'h2', 'h6', 'h9'],
-                'گک': ['گک', 'gac', 'گونو', 'امزوم', 'امکو'],
-                'لیفان': ['لیفان', 'lifan', 'x60', 'x70', '520', '620'],
-                'گریت وال': ['گریت وال', 'great wall', 'ولکس', 'وینگل'],
-                # برندهای دیگر
-                'ولوو': ['ولوو', 'volvo', 'xc60', 'xc90', 's60', 'v40'],
-                'مینی': ['مینی', 'mini', 'cooper', 'countryman'],
-                'فیات': ['فیات', 'fiat', 'پاندا', 'پونتو'],
-                'دوو': ['دوو', 'daewoo', 'سیلو', 'نکسیا', 'ماتیز']
-            }
+            brand_keywords = BRAND_KEYWORDS
+            car_name = ' '.join(search_terms)
             
             for brand, keywords in brand_keywords.items():
                 if any(keyword in car_name for keyword in keywords):
@@ -794,40 +749,80 @@ class CarPriceCalculator:
         
         return best_match, best_source
     
+    def get_market_table(self, market_df):
+        """جدول ویژگی‌های ستونی بازار؛ برای هر market_df فقط یک بار ساخته می‌شود"""
+        if getattr(self, '_market_table_source', None) is not market_df:
+            self._market_table = MarketFeatureTable(market_df)
+            self._market_table_source = market_df
+        return self._market_table
+    
+    def find_market_prices_batch(self, ads_df, market_df):
+        """
+        یافتن قیمت روز برای یک دسته آگهی به صورت برداری
+        
+        ads_df باید ستون‌های car_name، year و brand_type داشته باشد؛
+        خروجی DataFrame با ستون‌های market_price و price_source است.
+        """
+        if market_df is None:
+            return pd.DataFrame({'market_price': [None] * len(ads_df), 'price_source': [None] * len(ads_df)},
+                                index=ads_df.index, dtype=object)
+        return self.get_market_table(market_df).match_many(ads_df)
+    
     def calculate_estimated_price(self, market_price, total_depreciation, car_data=None):
         """محاسبه قیمت تخمینی با استفاده از ML"""
-        if not market_price:
-            return None
+        return self.calculate_estimated_prices([market_price], [total_depreciation],
+                                               [car_data] if car_data else None)[0]
+    
+    def calculate_estimated_prices(self, market_prices, total_depreciations, cars_data=None):
+        """
+        محاسبه قیمت تخمینی یک دسته آگهی با یک پیش‌بینی ML برای کل دسته
+        
+        Parameters
+        ----------
+        market_prices, total_depreciations : list
+            قیمت روز و درصد افت کل هر آگهی
+        cars_data : list of dict, optional
+            اطلاعات آگهی‌ها برای ML؛ بدون آن فقط روش پایه استفاده می‌شود
+        
+        Returns
+        -------
+        list
+            قیمت تخمینی هر آگهی (None اگر قیمت روز نداشته باشد)
+        """
+        market = pd.to_numeric(pd.Series(market_prices, dtype=object), errors='coerce').fillna(0).to_numpy(dtype=float)
+        depreciation = pd.to_numeric(pd.Series(total_depreciations, dtype=object), errors='coerce').fillna(0).to_numpy(dtype=float)
         
         # محاسبه قیمت پایه
-        base_estimated_price = market_price * (1 - total_depreciation)
-        base_estimated_price = max(base_estimated_price, market_price * 0.3)
+        base = np.maximum(market * (1 - depreciation), market * 0.3)
+        estimated = [float(price) if market_price else None for price, market_price in zip(base, market)]
         
         # استفاده از ML اگر در دسترس است
-        if self.ml_calculator and car_data:
-            try:
-                # آماده‌سازی داده‌ها برای ML
-                ml_data = car_data.copy() if isinstance(car_data, dict) else {}
-                ml_data.update({
-                    'market_price': market_price,
-                    'total_depreciation': total_depreciation,
-                    'base_estimated_price': base_estimated_price
-                })
-                
-                # پیش‌بینی ML
-                ml_prediction = self.ml_calculator.predict_price(ml_data)
-                
-                if ml_prediction and ml_prediction > 0:
-                    # ترکیب پیش‌بینی ML با روش پایه (وزن‌دار)
-                    # 70% ML + 30% روش پایه
-                    final_price = (0.7 * ml_prediction) + (0.3 * base_estimated_price)
-                    print(f"🤖 ML پیش‌بینی: {ml_prediction:,.0f} | پایه: {base_estimated_price:,.0f} | نهایی: {final_price:,.0f}")
-                    return final_price
-                    
-            except Exception as e:
-                print(f"⚠️ خطا در ML، استفاده از روش پایه: {e}")
-        
-        return base_estimated_price
+        if not (self.ml_calculator and cars_data):
+            return estimated
+        rows = [i for i, car_data in enumerate(cars_data) if car_data and market[i]]
+        if not rows:
+            return estimated
+        try:
+            # آماده‌سازی داده‌ها برای ML
+            ml_data = [dict(cars_data[i] if isinstance(cars_data[i], dict) else {},
+                            market_price=market[i], total_depreciation=depreciation[i],
+                            base_estimated_price=base[i]) for i in rows]
+            predictions = self.ml_calculator.predict_many(ml_data)
+        except Exception as e:
+            print(f"⚠️ خطا در ML، استفاده از روش پایه: {e}")
+            return estimated
+        
+        blended = 0
+        for i, ml_prediction in zip(rows, predictions):
+            if ml_prediction and ml_prediction > 0:
+                # ترکیب پیش‌بینی ML با روش پایه (وزن‌دار): 70% ML + 30% روش پایه
+                estimated[i] = (0.7 * ml_prediction) + (0.3 * base[i])
+                blended += 1
+        if len(rows) == 1 and blended:
+            print(f"🤖 ML پیش‌بینی: {predictions[0]:,.0f} | پایه: {base[rows[0]]:,.0f} | نهایی: {estimated[rows[0]]:,.0f}")
+        elif blended:
+            print(f"🤖 ML پیش‌بینی برای {blended} از {len(rows)} آگهی")
+        return estimated
     
     def learn_from_feedback(self, car_data, actual_price, predicted_price):
         """یادگیری از بازخورد کاربر"""
@@ -868,19 +863,10 @@ class CarPriceCalculator:
             return self.ml_calculator.get_model_info()
         return {'ml_available': False}
     
-    def process_ads(self, divar_file, hamrah_file, z4car_file, output_file):
-        """پردازش کامل آگهی‌ها با استفاده از هر دو منبع قیمت"""
-        print("بارگذاری داده‌ها...")
-        market_df = self.load_market_prices(hamrah_file, z4car_file)
-        divar_df = self.load_divar_ads(divar_file)
-        
-        if market_df is None or divar_df is None:
-            print("خطا در بارگذاری فایل‌ها")
-            return
-        
+    def price_rows(self, divar_df, market_df):
+        """قیمت‌گذاری ردیف‌های آگهی و برگرداندن لیست نتایج (هسته process_ads)"""
         results = []
-        
-        print(f"پردازش {len(divar_df)} آگهی...")
+        prepared = []
         
         for index, row in divar_df.iterrows():
             try:
@@ -893,6 +879,7 @@ class CarPriceCalculator:
                 engine_status = str(row.get('موتور', '')) if 'موتور' in row else ''
                 chassis_status = str(row.get('شاسی', '')) if 'شاسی' in row else ''
                 body_status = str(row.get('بدنه', '')) if 'بدنه' in row else ''
+                ad_price_str = str(row.get('قیمت', '')) if 'قیمت' in row else ''
                 
                 # استخراج اطلاعات خودرو با استفاده از ستون‌های مشخص
                 car_info = self.extract_car_info_from_columns(
@@ -904,6 +891,30 @@ class CarPriceCalculator:
                     title, description, engine_status, chassis_status, body_status
                 )
                 
+                prepared.append({
+                    'index': index, 'title': title, 'description': description, 'brand_type': brand_type,
+                    'engine_status': engine_status, 'chassis_status': chassis_status, 'body_status': body_status,
+                    'ad_price_str': ad_price_str, 'car_info': car_info, 'issues': issues
+                })
+            except Exception as e:
+                print(f"خطا در پردازش آگهی {index + 1}: {e}")
+                continue
+        
+        # یافتن قیمت روز همه آگهی‌ها با یک فراخوانی دسته‌ای
+        ads_df = pd.DataFrame({
+            'car_name': [ad['car_info']['car_name'] for ad in prepared],
+            'year': [ad['car_info']['year'] for ad in prepared],
+            'brand_type': [ad['brand_type'] for ad in prepared]
+        }, dtype=object)
+        matches = self.find_market_prices_batch(ads_df, market_df)
+        
+        for ad, market_price, price_source in zip(prepared, matches['market_price'], matches['price_source']):
+            index = ad['index']
+            try:
+                car_info = ad['car_info']
+                issues = ad['issues']
+                description = ad['description']
+                
                 # محاسبه افت کارکرد
                 mileage_depreciation = self.calculate_mileage_depreciation(
                     car_info['mileage'], car_info['year']
@@ -915,28 +926,24 @@ class CarPriceCalculator:
                 # محاسبه کل افت شامل افت مشکلات
                 total_depreciation, issues_depreciation = self.calculate_total_depreciation(issues, mileage_depreciation, age_depreciation)
                 
-                # یافتن قیمت روز با استفاده از برند و تیپ
-                market_price, price_source = self.find_market_price(car_info, market_df, brand_type)
-                
                 # محاسبه قیمت تخمینی
                 estimated_price = self.calculate_estimated_price(market_price, total_depreciation)
                 
                 # استخراج قیمت آگهی
-                ad_price_str = str(row.get('قیمت', '')) if 'قیمت' in row else ''
-                ad_price = self.extract_price_from_text(ad_price_str)
+                ad_price = self.extract_price_from_text(ad['ad_price_str'])
                 
                 result = {
-                    'عنوان آگهی': title,
-                    'برند و تیپ': brand_type or 'نامشخص',
+                    'عنوان آگهی': ad['title'],
+                    'برند و تیپ': ad['brand_type'] or 'نامشخص',
                     'نام خودرو': car_info['car_name'] or 'نامشخص',
                     'سال': car_info['year'] or 'نامشخص',
                     'کیلومتر': f"{car_info['mileage']:,}" if car_info['mileage'] else 'نامشخص',
                     'قیمت آگهی (تومان)': f"{ad_price:,.0f}" if ad_price else 'نامشخص',
                     'قیمت روز (تومان)': f"{market_price:,.0f}" if market_price else 'یافت نشد',
                     'منبع قیمت': price_source or 'نامشخص',
-                    'وضعیت موتور': engine_status or 'نامشخص',
-                    'وضعیت شاسی': chassis_status or 'نامشخص',
-                    'وضعیت بدنه': body_status or 'نامشخص',
+                    'وضعیت موتور': ad['engine_status'] or 'نامشخص',
+                    'وضعیت شاسی': ad['chassis_status'] or 'نامشخص',
+                    'وضعیت بدنه': ad['body_status'] or 'نامشخص',
                     'مشکلات تشخیص داده شده': ', '.join(issues) if issues else 'هیچ',
                     'افت کارکرد': f"{mileage_depreciation:.1%}",
                     'افت سن خودرو': f"{age_depreciation:.1%}",
@@ -955,6 +962,25 @@ class CarPriceCalculator:
                 print(f"خطا در پردازش آگهی {index + 1}: {e}")
                 continue
         
+        return results
+    
+    def process_ads(self, divar_file, hamrah_file, z4car_file, output_file, workers=1):
+        """پردازش کامل آگهی‌ها با استفاده از هر دو منبع قیمت"""
+        print("بارگذاری داده‌ها...")
+        market_df = self.load_market_prices(hamrah_file, z4car_file)
+        divar_df = self.load_divar_ads(divar_file)
+        
+        if market_df is None or divar_df is None:
+            print("خطا در بارگذاری فایل‌ها")
+            return
+        
+        print(f"پردازش {len(divar_df)} آگهی...")
+        
+        # جدول ویژگی‌های بازار قبل از ساخت پروسه‌ها یک بار آماده می‌شود
+        self.get_market_table(market_df)
+        
+        results = price_ads(self, divar_df, market_df, workers)
+        
         # ذخیره نتایج
         results_df = pd.DataFrame(results)
         results_df.to_excel(output_file, index=False, engine='openpyxl')
@@ -976,6 +1002,10 @@ class CarPriceCalculator:
 
 # اجرای اسکریپت
 if __name__ == "__main__":
+    import argparse
+    parser = add_workers_argument(argparse.ArgumentParser(description="پردازش دسته‌ای آگهی‌های دیوار"))
+    args = parser.parse_args()
+    
     calculator = CarPriceCalculator()
     
     # مسیر فایل‌ها
@@ -985,7 +1015,7 @@ if __name__ == "__main__":
     output_file = "/Users/erfantaghavi/PycharmProjects/pythonProject/unified_car_price_analysis.xlsx"
     
     # پردازش آگهی‌ها
-    results = calculator.process_ads(divar_file, hamrah_file, z4car_file, output_file)
+    results = calculator.process_ads(divar_file, hamrah_file, z4car_file, output_file, workers=args.workers)
     
     if results is not None:
         print("\n=== نمونه نتایج ===")
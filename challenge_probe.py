@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بررسی سبک صفحه برای کپچا، پیام مسدودیت و ریدایرکت به دامنه دیگر
+
+check_for_critical_bot_detection قبلی قبل از هر آگهی هفت find_elements با is_displayed
+اجرا می‌کرد و بعد کل driver.page_source (صدها کیلوبایت) را می‌گرفت و در پایتون جستجو
+می‌کرد. اینجا یک اسکریپت (PROBE_SCRIPT) همه بررسی‌ها را در خود صفحه انجام می‌دهد و فقط
+یک وضعیت کوچک برمی‌گرداند:
+    {'url': ..., 'captcha': سلکتور کپچای قابل مشاهده یا None,
+     'text': اولین متن کپچا/مسدودیت در متن صفحه یا None, 'off_domain': bool}
+
+ChallengeMonitor هر صفحه را حداکثر یک بار بررسی می‌کند: بعد از هر جابجایی
+(mark_navigation) اولین check اسکریپت را اجرا می‌کند و check های بعدی روی همان صفحه
+نتیجه قبلی را برمی‌گردانند. با sample_rate کمتر از 1 فقط بخشی از صفحات بررسی می‌شوند.
+هزینه روش قبلی یک بار روی اولین صفحه اندازه‌گیری می‌شود تا summary نشان دهد چقدر از
+زمان هر آگهی کم شده است.
+"""
+
+import random
+import threading
+import time
+import weakref
+
+CAPTCHA_SELECTORS = (
+    "iframe[src*='recaptcha']",
+    ".g-recaptcha",
+    "iframe[src*='hcaptcha']",
+    "#arc-checkbox",  # ARCaptcha
+    "[id*='captcha']",
+    "[class*='captcha']",
+    "input[name='arcaptcha-token']",
+)
+CAPTCHA_TEXTS = ("من ربات نیستم", "i'm not a robot", "verify you are human", "arcaptcha", "recaptcha")
+BLOCK_TEXTS = ("تایید هویت", "مسدود شده", "blocked permanently", "403 forbidden", "access denied", "too many requests")
+# دامنه‌هایی که ریدایرکت به آن‌ها مشکل حساب نمی‌شود
+ALLOWED_HOSTS = ("divar.ir", "google.com", "arcaptcha")
+
+# arguments: سلکتورهای کپچا، متن‌های کپچا، متن‌های مسدودیت، دامنه‌های مجاز
+PROBE_SCRIPT = """
+var visible = function (element) {
+    if (element.type === 'hidden') { return false; }
+    var style = window.getComputedStyle(element);
+    return style.display !== 'none' && style.visibility !== 'hidden' && element.getClientRects().length > 0;
+};
+var captcha = null;
+for (var i = 0; i < arguments[0].length && !captcha; i++) {
+    var elements = document.querySelectorAll(arguments[0][i]);
+    for (var j = 0; j < elements.length; j++) {
+        if (visible(elements[j])) { captcha = arguments[0][i]; break; }
+    }
+}
+var text = null;
+var pageText = (document.body ? document.body.innerText : '').toLowerCase();
+var phrases = arguments[1].concat(arguments[2]);
+for (var k = 0; k < phrases.length; k++) {
+    if (pageText.indexOf(phrases[k].toLowerCase()) !== -1) { text = phrases[k]; break; }
+}
+var url = location.href.toLowerCase();
+var offDomain = !arguments[3].some(function (host) { return url.indexOf(host) !== -1; });
+return {url: location.href, captcha: captcha, text: text, off_domain: offDomain};
+"""
+
+
+def probe_page(driver):
+    """وضعیت کپچا / مسدودیت / ریدایرکت صفحه فعلی با یک execute_script"""
+    return driver.execute_script(PROBE_SCRIPT, list(CAPTCHA_SELECTORS), list(CAPTCHA_TEXTS),
+                                 list(BLOCK_TEXTS), list(ALLOWED_HOSTS))
+
+
+def describe(status):
+    """
+    وضعیت probe_page به پیام check_for_critical_bot_detection
+
+    Returns
+    -------
+    str or None
+        CAPTCHA_DETECTED، CAPTCHA_TEXT: ...، CRITICAL_BLOCK: ...، REDIRECT: ... یا None
+    """
+    if not status:
+        return None
+    if status['captcha']:
+        return "CAPTCHA_DETECTED"
+    if status['text']:
+        kind = "CAPTCHA_TEXT" if status['text'] in CAPTCHA_TEXTS else "CRITICAL_BLOCK"
+        return f"{kind}: {status['text']}"
+    if status['off_domain']:
+        return f"REDIRECT: {status['url'].lower()}"
+    return None
+
+
+def scan_page_source(driver):
+    """روش قبلی (find_elements و جستجو در page_source)؛ فقط برای اندازه‌گیری هزینه آن"""
+    from selenium.webdriver.common.by import By
+
+    for selector in CAPTCHA_SELECTORS:
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        if elements and any(element.is_displayed() for element in elements):
+            return "CAPTCHA_DETECTED"
+    page_text = driver.page_source.lower()
+    for text in CAPTCHA_TEXTS:
+        if text.lower() in page_text:
+            return f"CAPTCHA_TEXT: {text}"
+    for text in BLOCK_TEXTS:
+        if text.lower() in page_text:
+            return f"CRITICAL_BLOCK: {text}"
+    current_url = driver.current_url.lower()
+    if not any(host in current_url for host in ALLOWED_HOSTS):
+        return f"REDIRECT: {current_url}"
+    return None
+
+
+class ChallengeMonitor:
+    """
+    بررسی هر صفحه حداکثر یک بار (و اختیاری نمونه‌برداری) با آمار صرفه‌جویی
+
+    Parameters
+    ----------
+    sample_rate : float
+        سهم صفحاتی که بعد از جابجایی واقعاً بررسی می‌شوند (1 یعنی همه)
+    calibrate : bool
+        اندازه‌گیری یک‌باره هزینه روش قبلی روی اولین صفحه برای summary
+    """
+
+    def __init__(self, sample_rate=1.0, calibrate=True):
+        self.sample_rate = sample_rate
+        self.calibrate = calibrate
+        self._lock = threading.Lock()
+        # درایور -> نتیجه آخرین بررسی روی صفحه فعلی (نبودن کلید یعنی صفحه هنوز بررسی نشده)
+        self._results = weakref.WeakKeyDictionary()
+        self.checks = 0
+        self.probes = 0
+        self.sampled_out = 0
+        self.probe_time = 0.0
+        self.legacy_time = None
+
+    def mark_navigation(self, driver):
+        """درایور به صفحه دیگری رفت؛ check بعدی دوباره بررسی می‌کند"""
+        with self._lock:
+            self._results.pop(driver, None)
+
+    def check(self, driver):
+        """
+        پیام مشکل صفحه فعلی درایور یا None
+
+        Returns
+        -------
+        str or None
+            همان خروجی describe
+        """
+        with self._lock:
+            self.checks += 1
+            if driver in self._results:
+                return self._results[driver]
+            sampled_out = self.sample_rate < 1 and random.random() >= self.sample_rate
+            if sampled_out:
+                self.sampled_out += 1
+                self._results[driver] = None
+                return None
+
+        if self.calibrate and self.legacy_time is None:
+            self._calibrate(driver)
+        start_time = time.perf_counter()
+        try:
+            result = describe(probe_page(driver))
+        except Exception:
+            result = None
+        elapsed = time.perf_counter() - start_time
+        with self._lock:
+            self.probes += 1
+            self.probe_time += elapsed
+            self._results[driver] = result
+        return result
+
+    def _calibrate(self, driver):
+        start_time = time.perf_counter()
+        try:
+            scan_page_source(driver)
+        except Exception:
+            return
+        self.legacy_time = time.perf_counter() - start_time
+
+    def saved_time(self):
+        """زمان کم‌شده نسبت به اجرای روش قبلی در هر check (None اگر اندازه‌گیری نشده باشد)"""
+        if self.legacy_time is None:
+            return None
+        return self.checks * self.legacy_time - self.probe_time
+
+    def summary(self):
+        mean = self.probe_time / self.probes * 1000 if self.probes else 0
+        text = (f"{self.checks} بررسی، {self.probes} اجرای اسکریپت (میانگین {mean:.1f}ms)، "
+                f"{self.checks - self.probes - self.sampled_out} تکراری روی همان صفحه، {self.sampled_out} نمونه‌برداری‌نشده")
+        saved = self.saved_time()
+        if saved is not None:
+            text += (f"؛ روش قبلی {self.legacy_time * 1000:.0f}ms در هر آگهی، "
+                     f"~{saved:.1f}s کمتر ({saved / max(self.checks, 1) * 1000:.0f}ms در هر آگهی)")
+        return text
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+خط فرمان پروژه
+
+main.py هنگام اجرا مرورگر را باز می‌کند و selenium، pandas و sklearn را بارگذاری
+می‌کند. این فایل هیچ کاری در زمان import انجام نمی‌دهد و هر زیرفرمان فقط ماژول‌های
+لازم خودش را (داخل تابع) import می‌کند؛ فرمان‌های قیمت با یک snapshot تازه بدون
+مرورگر و pandas در کسری از ثانیه اجرا می‌شوند.
+
+python cli.py crawl [--refresh-prices] [--price-as-of-posting]
+python cli.py refresh-prices [--force] [--snapshot market_prices.snapshot]
+python cli.py price-file ["پژو 206 تیپ 2" ...] [--year 1399]
+python cli.py export out.xlsx [--session 20250830_120939] [--db divar_results.db]
+"""
+
+import argparse
+import os
+import sys
+
+DEFAULT_SNAPSHOT_FILE = 'market_prices.snapshot'
+DEFAULT_DB_FILE = 'divar_results.db'
+MARKET_EXCEL_FILE = 'combined_market_prices.xlsx'
+# حداقل امتیاز تطبیق فازی نام (همان get_market_price_for_car)
+MIN_MATCH_SCORE = 0.5
+
+
+def crawl(args):
+    """اجرای اسکرپر دیوار (main.py)"""
+    import runpy
+
+    main_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    sys.argv = [main_file] + (['--refresh-prices'] if args.refresh_prices else []) + \
+        (['--price-as-of-posting'] if args.price_as_of_posting else [])
+    runpy.run_path(main_file, run_name='__main__')
+    return 0
+
+
+def refresh_prices(args):
+    """به‌روزرسانی snapshot قیمت‌های بازار (اگر snapshot تازه باشد و --force نباشد، همان استفاده می‌شود)"""
+    from market_snapshot import SNAPSHOT_MAX_AGE_HOURS, PriceSnapshot, diff_snapshots, load_snapshot
+
+    max_age = SNAPSHOT_MAX_AGE_HOURS if args.max_age is None else args.max_age
+    previous = load_snapshot(args.snapshot)
+    if previous is not None and not args.force and previous.age_hours < max_age:
+        print(f"📊 snapshot قیمت‌ها تازه است ({previous.age_hours:.1f} ساعت پیش، {len(previous)} خودرو)؛ "
+              f"برای استخراج مجدد --force")
+        return 0
+
+    from combined_scraper import scrape_market_sources
+
+    print("🔍 در حال دریافت قیمت‌های بازار...")
+    snapshot = PriceSnapshot.from_sources(scrape_market_sources(args.force, timeout=args.timeout))
+    if not len(snapshot):
+        print("❌ قیمتی دریافت نشد؛ snapshot قبلی دست‌نخورده ماند")
+        return 1
+
+    changes = diff_snapshots(previous, snapshot)
+    print(f"🔁 تغییرات قیمت بازار: {changes.summary()}")
+    snapshot.save(args.snapshot)
+    print(f"✅ snapshot قیمت‌های بازار برای {len(snapshot)} خودرو در {args.snapshot} ذخیره شد")
+
+    from price_history import PriceHistory
+
+    history = PriceHistory(args.db)
+    try:
+        rows = history.record_snapshot(snapshot)
+        if rows:
+            print(f"📈 {rows} قیمت به تاریخچه قیمت‌ها اضافه شد")
+    finally:
+        history.close()
+    if changes or not os.path.exists(args.export):
+        snapshot.export_excel(args.export)
+        print(f"✅ قیمت‌های روز در فایل {args.export} ذخیره شدند")
+    return 0
+
+
+def price_file(args):
+    """اطلاعات snapshot قیمت‌ها و قیمت روز خودروهای داده‌شده"""
+    from datetime import datetime
+
+    from market_snapshot import SOURCES, load_snapshot
+
+    snapshot = load_snapshot(args.snapshot)
+    if snapshot is None:
+        print(f"❌ snapshot قیمت‌ها پیدا نشد: {args.snapshot} (python cli.py refresh-prices)")
+        return 1
+    created = datetime.fromtimestamp(snapshot.created_at).strftime('%Y-%m-%d %H:%M')
+    counts = '، '.join(f"{source}: {meta['count']}" for source, meta in snapshot.sources.items())
+    print(f"📦 {args.snapshot}: {len(snapshot)} خودرو ({counts})، ساخته‌شده {created} "
+          f"({snapshot.age_hours:.1f} ساعت پیش)")
+    if not args.cars:
+        return 0
+
+    from market_index import MarketNameIndex
+
+    catalog = snapshot.catalog()
+    index = None
+    market_prices = snapshot.to_market_prices()
+    for car_name in args.cars:
+        entry = catalog.lookup(car_name, args.year)
+        if entry is not None:
+            match, score = entry.name, 1.0
+        else:
+            index = index or MarketNameIndex(snapshot.names)
+            match, score = index.best_match(car_name)
+        if match is None or score <= MIN_MATCH_SCORE:
+            print(f"❓ {car_name}: قیمتی پیدا نشد")
+            continue
+        prices = market_prices[match]
+        sources = '، '.join(f"{source}: {prices[source]:,}" for source in SOURCES if prices[source])
+        print(f"💰 {car_name} → {match} ({score:.2f}): {prices['market_price']:,} تومان ({sources})")
+    return 0
+
+
+def export(args):
+    """خروجی اکسل آگهی‌های ذخیره‌شده در پایگاه نتایج"""
+    if not os.path.exists(args.db):
+        print(f"❌ پایگاه نتایج پیدا نشد: {args.db}")
+        return 1
+
+    from result_store import ResultStore, export_to_excel
+
+    store = ResultStore(args.db)
+    try:
+        return 0 if export_to_excel(store, args.output, args.session) else 1
+    finally:
+        store.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="اسکرپر خودروی دیوار و قیمت‌های بازار")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    crawl_parser = subparsers.add_parser('crawl', help="جمع‌آوری و قیمت‌گذاری آگهی‌های دیوار")
+    crawl_parser.add_argument('--refresh-prices', action='store_true', help="استخراج مجدد قیمت‌ها حتی با snapshot تازه")
+    crawl_parser.add_argument('--price-as-of-posting', action='store_true',
+                              help="قیمت بازار هر آگهی در زمان انتشار آن (از تاریخچه قیمت‌ها)")
+    crawl_parser.set_defaults(func=crawl)
+
+    refresh_parser = subparsers.add_parser('refresh-prices', help="به‌روزرسانی قیمت‌های بازار")
+    refresh_parser.add_argument('--force', action='store_true', help="استخراج مجدد حتی با snapshot تازه")
+    refresh_parser.add_argument('--max-age', type=float, help="حداکثر سن snapshot تازه (ساعت)")
+    refresh_parser.add_argument('--timeout', type=float, default=120)
+    refresh_parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT_FILE)
+    refresh_parser.add_argument('--export', default=MARKET_EXCEL_FILE, help="خروجی اکسل قیمت‌ها")
+    refresh_parser.add_argument('--db', default=DEFAULT_DB_FILE, help="پایگاه تاریخچه قیمت‌ها")
+    refresh_parser.set_defaults(func=refresh_prices)
+
+    price_parser = subparsers.add_parser('price-file', help="اطلاعات snapshot قیمت‌ها و قیمت روز خودروها")
+    price_parser.add_argument('cars', nargs='*', help="نام خودروها")
+    price_parser.add_argument('--year', help="سال ساخت")
+    price_parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT_FILE)
+    price_parser.set_defaults(func=price_file)
+
+    export_parser = subparsers.add_parser('export', help="خروجی اکسل آگهی‌ها")
+    export_parser.add_argument('output')
+    export_parser.add_argument('--session', help="فقط آگهی‌های یک اجرا")
+    export_parser.add_argument('--db', default=DEFAULT_DB_FILE)
+    export_parser.set_defaults(func=export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,8 @@ import re
 from datetime import datetime
 import os
 from difflib import SequenceMatcher
+from parallel_pricing import price_ads, add_workers_argument
+from car_catalog import CarCatalog
 
 class ColumnBasedCarPriceCalculator:
     def __init__(self):
@@ -199,6 +201,13 @@ class ColumnBasedCarPriceCalculator:
         """محاسبه شباهت بین دو رشته"""
         return SequenceMatcher(None, a.lower(), b.lower()).ratio()
     
+    def get_catalog(self):
+        """کاتالوگ کلیدهای استاندارد نام‌های price_dict؛ برای هر price_dict فقط یک بار ساخته می‌شود"""
+        if getattr(self, '_catalog_source', None) is not self.price_dict:
+            self._catalog = CarCatalog(self.price_dict)
+            self._catalog_source = self.price_dict
+        return self._catalog
+    
     def find_market_price(self, car_info, market_df):
         """یافتن قیمت روز خودرو"""
         if market_df is None or not car_info['car_name']:
@@ -207,6 +216,11 @@ class ColumnBasedCarPriceCalculator:
         car_name = car_info['car_name'].lower()
         year = car_info['year']
         
+        # کلید استاندارد (برند، مدل، تیپ، سال)؛ شباهت رشته‌ای فقط اگر در کاتالوگ نباشد
+        entry = self.get_catalog().lookup(car_name, year)
+        if entry is not None:
+            return self.price_dict[entry.name]
+        
         # جستجوی مستقیم
         best_match = None
         best_score = 0
@@ -265,20 +279,10 @@ class ColumnBasedCarPriceCalculator:
         estimated_price = market_price * (1 - total_depreciation)
         return max(estimated_price, market_price * 0.25)  # حداقل 25% قیمت روز
     
-    def process_ads(self, divar_file, market_file, output_file):
-        """پردازش کامل آگهی‌ها"""
-        print("بارگذاری داده‌ها...")
-        market_df = self.load_market_prices(market_file)
-        divar_df = self.load_divar_ads(divar_file)
-        
-        if market_df is None or divar_df is None:
-            print("خطا در بارگذاری فایل‌ها")
-            return
-        
+    def price_rows(self, divar_df, market_df):
+        """قیمت‌گذاری ردیف‌های آگهی و برگرداندن لیست نتایج (هسته process_ads)"""
         results = []
         
-        print(f"پردازش {len(divar_df)} آگهی...")
-        
         for index, row in divar_df.iterrows():
             try:
                 # استخراج اطلاعات خودرو از ستون‌ها
@@ -327,6 +331,22 @@ class ColumnBasedCarPriceCalculator:
                 print(f"خطا در پردازش آگهی {index + 1}: {e}")
                 continue
         
+        return results
+    
+    def process_ads(self, divar_file, market_file, output_file, workers=1):
+        """پردازش کامل آگهی‌ها"""
+        print("بارگذاری داده‌ها...")
+        market_df = self.load_market_prices(market_file)
+        divar_df = self.load_divar_ads(divar_file)
+        
+        if market_df is None or divar_df is None:
+            print("خطا در بارگذاری فایل‌ها")
+            return
+        
+        print(f"پردازش {len(divar_df)} آگهی...")
+        
+        results = price_ads(self, divar_df, market_df, workers)
+        
         # ذخیره نتایج
         results_df = pd.DataFrame(results)
         results_df.to_excel(output_file, index=False, engine='openpyxl')
@@ -349,6 +369,10 @@ class ColumnBasedCarPriceCalculator:
 
 # اجرای اسکریپت بهبود یافته
 if __name__ == "__main__":
+    import argparse
+    parser = add_workers_argument(argparse.ArgumentParser(description="پردازش دسته‌ای آگهی‌های دیوار"))
+    args = parser.parse_args()
+    
     calculator = ColumnBasedCarPriceCalculator()
     
     # مسیر فایل‌ها
@@ -357,7 +381,7 @@ if __name__ == "__main__":
     output_file = "/Users/erfantaghavi/PycharmProjects/pythonProject/column_based_car_analysis.xlsx"
     
     # پردازش آگهی‌ها
-    results = calculator.process_ads(divar_file, market_file, output_file)
+    results = calculator.process_ads(divar_file, market_file, output_file, workers=args.workers)
     
     if results is not None:
         print("\n=== نمونه نتایج بر اساس ستون‌ها ===")
@@ -1,17 +1,16 @@
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 import time
 import re
-import requests
-from selenium.webdriver.chrome.options import Options
+from hamrah_api import get_client as get_hamrah_client
+from z4car_parser import PRICE_CARD_SELECTOR as Z4CAR_PRICE_CARDS, parse_price_page
+from driver_factory import get_driver
+from page_waits import wait_for_selector, wait_for_settle
 from logging_config import HAMRAH_LOG_INTERVAL, Z4CAR_LOG_INTERVAL, log_progress, VERBOSE_LOGGING
 
+# جدول‌های قیمت صفحه همراه مکانیک (همان فیلتر کلاس پارسر پایین)
+HAMRAH_PRICE_TABLES = "[class*='price-table'], [class*='price_table']"
+
 # Code from hamrah_mechanic_scraper.py
 def scrape_hamrah_mechanic(force_update=False):
     """استخراج قیمت خودرو از سایت همراه مکانیک با بهینه‌سازی سرعت
@@ -33,6 +32,11 @@ def scrape_hamrah_mechanic(force_update=False):
             
             if hours_diff < 12:  # اگر کمتر از 12 ساعت گذشته باشد
                 print(f"📊 استفاده از قیمت‌های همراه مکانیک ذخیره شده قبلی ({hours_diff:.1f} ساعت پیش)")
+                # قیمت‌های پارس‌شده آخرین پاسخ API (بدون پارس اکسل)
+                car_data = get_hamrah_client().state.get('car_data')
+                if car_data:
+                    print(f"✅ {len(car_data)} قیمت خودرو از همراه مکانیک بارگذاری شد")
+                    return car_data
                 df = pd.read_excel(output_filename_xlsx)
                 # تبدیل به فرمت مورد نیاز
                 car_data = []
@@ -60,51 +64,27 @@ def scrape_hamrah_mechanic(force_update=False):
     elif force_update:
         print("🔄 درخواست به‌روزرسانی اجباری قیمت‌های همراه مکانیک...")
     
-    # تلاش برای استفاده از API به جای وب اسکرپینگ
+    # تلاش برای استفاده از API به جای وب اسکرپینگ (درخواست شرطی با Session ماندگار)
     try:
         print("🔍 تلاش برای دریافت قیمت‌ها از API همراه مکانیک...")
-        api_url = "https://www.hamrah-mechanic.com/api/v1/car-price/all"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/json',
-            'Referer': 'https://www.hamrah-mechanic.com/carprice/'
-        }
-        
-        response = requests.get(api_url, headers=headers, timeout=30)
-        if response.status_code == 200:
-            try:
-                data = response.json()
-                if isinstance(data, list) and len(data) > 10:
-                    print(f"✅ دریافت موفق {len(data)} قیمت خودرو از API همراه مکانیک")
-                    car_data = []
-                    for item in data:
-                        if 'name' in item and 'price' in item:
-                            car_name = item['name']
-                            # تبدیل قیمت به عدد
-                            price_str = str(item['price'])
-                            price_number = re.sub(r'[^\d]', '', price_str)
-                            if price_number:
-                                price_number = int(price_number)
-                            else:
-                                price_number = 0
-                                
-                            car_data.append({
-                                'نام خودرو': car_name,
-                                'قیمت (تومان)': price_number
-                            })
-                    
-                    # ذخیره در فایل اکسل برای استفاده بعدی
-                    df = pd.DataFrame([
-                        {"Car Name": item['نام خودرو'], "Price": f"{item['قیمت (تومان)']:,} تومان"}
-                        for item in car_data
-                    ])
-                    df.to_excel(output_filename_xlsx, index=False)
-                    df.to_csv("hamrah_mechanic_prices.csv", index=False, encoding='utf-8')
-                    
-                    print(f"✅ {len(car_data)} قیمت خودرو از همراه مکانیک استخراج و ذخیره شد")
-                    return car_data
-            except Exception as e:
-                print(f"⚠️ خطا در پردازش پاسخ API: {e}")
+        client = get_hamrah_client()
+        car_data, changed = client.fetch()
+        if car_data:
+            if changed or not os.path.exists(output_filename_xlsx):
+                print(f"✅ دریافت موفق {len(car_data)} قیمت خودرو از API همراه مکانیک")
+                # ذخیره در فایل اکسل برای استفاده بعدی
+                df = pd.DataFrame([
+                    {"Car Name": item['نام خودرو'], "Price": f"{item['قیمت (تومان)']:,} تومان"}
+                    for item in car_data
+                ])
+                df.to_excel(output_filename_xlsx, index=False)
+                df.to_csv("hamrah_mechanic_prices.csv", index=False, encoding='utf-8')
+                print(f"✅ {len(car_data)} قیمت خودرو از همراه مکانیک استخراج و ذخیره شد")
+            else:
+                # 304: داده‌ها و فایل‌ها تغییری نکرده‌اند؛ فقط زمان فایل برای بررسی 12 ساعته تازه می‌شود
+                os.utime(output_filename_xlsx)
+                print(f"⚡ قیمت‌های همراه مکانیک تغییری نکرده‌اند (304، {client.last_elapsed * 1000:.0f}ms)")
+            return car_data
     except Exception as e:
         print(f"⚠️ خطا در دسترسی به API: {e}")
     
@@ -112,76 +92,20 @@ def scrape_hamrah_mechanic(force_update=False):
     url = "https://www.hamrah-mechanic.com/carprice/"
     print("🔧 راه‌اندازی WebDriver برای Hamrah Mechanic...")
     
-    # تنظیمات Chrome بهینه برای سرعت بیشتر
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-plugins")
-    options.add_argument("--disable-images")
-    options.add_argument("--disable-javascript")
-    options.add_argument("--disable-animations")
-    options.add_argument("--disable-web-security")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    # تنظیمات اضافی برای سرعت بیشتر
-    options.add_argument("--disable-background-networking")
-    options.add_argument("--disable-background-timer-throttling")
-    options.add_argument("--disable-backgrounding-occluded-windows")
-    options.add_argument("--disable-breakpad")
-    options.add_argument("--disable-component-extensions-with-background-pages")
-    options.add_argument("--disable-default-apps")
-    options.add_argument("--disable-hang-monitor")
-    options.add_argument("--disable-ipc-flooding-protection")
-    options.add_argument("--disable-prompt-on-repost")
-    options.add_argument("--disable-renderer-backgrounding")
-    options.add_argument("--disable-sync")
-    options.add_argument("--disable-domain-reliability")
-    options.add_argument("--disable-client-side-phishing-detection")
-    options.add_argument("--disable-features=UserAgentClientHint")
-    options.add_argument("--metrics-recording-only")
-    options.add_argument("--no-default-browser-check")
-    options.add_argument("--no-first-run")
-    options.add_argument("--no-pings")
-    
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    
-    try:
-        print("📥 تلاش برای استفاده از webdriver-manager...")
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        print("✅ WebDriver با webdriver-manager راه‌اندازی شد")
-    except Exception as e:
-        print(f"⚠️ خطا در webdriver-manager: {e}")
-        print("🔄 تلاش برای استفاده از chromedriver سیستم...")
-        try:
-            driver = webdriver.Chrome(options=options)
-            print("✅ WebDriver با chromedriver سیستم راه‌اندازی شد")
-        except Exception as e2:
-            print(f"❌ خطا در راه‌اندازی ChromeDriver: {e2}")
-            raise Exception(f"Unable to locate or obtain driver for chrome: {e2}")
-    
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    driver.set_page_load_timeout(20)  # کاهش تایم‌اوت برای سرعت بیشتر
+    # مرورگر headless پروفایل 'prices' (مسیر chromedriver ذخیره‌شده، بدون درخواست شبکه)
+    driver = get_driver('prices')
+    if driver is None:
+        raise Exception("Unable to locate or obtain driver for chrome")
 
     print(f"Navigating to {url}...")
     driver.get(url)
 
     try:
-        wait = WebDriverWait(driver, 20)  # کاهش زمان انتظار
         print("Waiting for page to load...")
-        time.sleep(5)  # کاهش زمان انتظار
-        
-        # اسکرول سریع‌تر
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-        time.sleep(2)
+        # انتظار تا جدول قیمت ظاهر شود و بعد از اسکرول صفحه آرام شود (به جای 5+2+2 ثانیه ثابت)
+        wait_for_selector(driver, HAMRAH_PRICE_TABLES, 10, label='hamrah_prices')
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
+        wait_for_settle(driver, 3, label='hamrah_scroll')
         driver.execute_script("window.scrollTo(0, 0);")
         
         car_data = []
@@ -271,62 +195,10 @@ class Z4CarScraper:
         try:
             print("🔧 راه‌اندازی WebDriver برای Z4Car...")
             
-            # تنظیمات Chrome بهینه برای سرعت بیشتر
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_argument('--disable-extensions')
-            chrome_options.add_argument('--disable-plugins')
-            chrome_options.add_argument('--disable-images')
-            chrome_options.add_argument('--disable-javascript')
-            chrome_options.add_argument('--disable-animations')
-            chrome_options.add_argument('--disable-web-security')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            # تنظیمات اضافی برای سرعت بیشتر
-            chrome_options.add_argument("--disable-background-networking")
-            chrome_options.add_argument("--disable-background-timer-throttling")
-            chrome_options.add_argument("--disable-backgrounding-occluded-windows")
-            chrome_options.add_argument("--disable-breakpad")
-            chrome_options.add_argument("--disable-component-extensions-with-background-pages")
-            chrome_options.add_argument("--disable-default-apps")
-            chrome_options.add_argument("--disable-hang-monitor")
-            chrome_options.add_argument("--disable-ipc-flooding-protection")
-            chrome_options.add_argument("--disable-prompt-on-repost")
-            chrome_options.add_argument("--disable-renderer-backgrounding")
-            chrome_options.add_argument("--disable-sync")
-            chrome_options.add_argument("--disable-domain-reliability")
-            chrome_options.add_argument("--disable-client-side-phishing-detection")
-            chrome_options.add_argument("--disable-features=UserAgentClientHint")
-            chrome_options.add_argument("--metrics-recording-only")
-            chrome_options.add_argument("--no-default-browser-check")
-            chrome_options.add_argument("--no-first-run")
-            chrome_options.add_argument("--no-pings")
-            
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            try:
-                print("📥 تلاش برای استفاده از webdriver-manager...")
-                service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                print("✅ WebDriver با webdriver-manager راه‌اندازی شد")
-            except Exception as e:
-                print(f"⚠️ خطا در webdriver-manager: {e}")
-                print("🔄 تلاش برای استفاده از chromedriver سیستم...")
-                try:
-                    self.driver = webdriver.Chrome(options=chrome_options)
-                    print("✅ WebDriver با chromedriver سیستم راه‌اندازی شد")
-                except Exception as e2:
-                    print(f"❌ خطا در راه‌اندازی ChromeDriver: {e2}")
-                    raise Exception(f"Unable to locate or obtain driver for chrome: {e2}")
-            
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.set_page_load_timeout(20)  # کاهش تایم‌اوت برای سرعت بیشتر
+            # مرورگر headless پروفایل 'prices' از کارخانه مشترک درایور
+            self.driver = get_driver('prices')
+            if self.driver is None:
+                raise Exception("Unable to locate or obtain driver for chrome")
             return True
         except Exception as e:
             print(f"❌ خطا در راه‌اندازی WebDriver: {e}")
@@ -336,13 +208,10 @@ class Z4CarScraper:
         try:
             print(f"บารยذاری صفحه: {url}")
             self.driver.get(url)
-            WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(2)
-            # اسکرول سریع‌تر برای بهینه‌سازی سرعت
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(1)
+            # انتظار تا کارت‌های قیمت ظاهر شوند و بعد از اسکرول صفحه آرام شود (به جای 2+1+1 ثانیه ثابت)
+            wait_for_selector(self.driver, Z4CAR_PRICE_CARDS, 10, label='z4car_prices')
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
+            wait_for_settle(self.driver, 2, label='z4car_scroll')
             return self.driver.page_source
         except Exception as e:
             print(f"خطا در دریافت صفحه: {e}")
@@ -350,7 +219,7 @@ class Z4CarScraper:
             try:
                 print("🔄 تلاش مجدد با زمان انتظار کمتر...")
                 self.driver.get(url)
-                time.sleep(3)
+                wait_for_settle(self.driver, 3, label='z4car_retry')
                 return self.driver.page_source
             except Exception as e2:
                 print(f"خطا در تلاش مجدد: {e2}")
@@ -396,8 +265,14 @@ class Z4CarScraper:
         return valid_prices
     
     def extract_car_prices(self, html_content):
+        # مسیر سریع: فقط کارت‌های قیمت (div.entry-body) در یک عبور
+        cars_data = parse_price_page(html_content)
+        if cars_data:
+            print(f"⚡ {len(cars_data)} خودرو از کارت‌های قیمت استخراج شد")
+            return cars_data
+        
+        # ساختار صفحه تغییر کرده است: جستجو در کل صفحه
         soup = BeautifulSoup(html_content, 'html.parser')
-        cars_data = []
         print("جستجوی بلوک‌های قیمت خودرو...")
         
         # ذخیره HTML فقط در صورت نیاز برای دیباگ
@@ -759,6 +634,39 @@ def scrape_z4car(force_update=False):
         print("❌ استخراج قیمت‌های Z4Car ناموفق بود")
     return cars_data
 
+MARKET_SOURCES = {'hamrah_mechanic': scrape_hamrah_mechanic, 'z4car': scrape_z4car}
+
+
+def scrape_market_sources(force_update=False, timeout=120):
+    """
+    اجرای هم‌زمان اسکرایپرهای همراه مکانیک و زد فور
+
+    Returns
+    -------
+    dict
+        {منبع: car_data}؛ اگر زمان تمام شود فقط منابعی که تمام شده‌اند برگردانده می‌شوند
+    """
+    import concurrent.futures
+
+    futures = {}
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(MARKET_SOURCES))
+    try:
+        futures = {source: executor.submit(scraper, force_update) for source, scraper in MARKET_SOURCES.items()}
+        return {source: future.result(timeout=timeout) for source, future in futures.items()}
+    except concurrent.futures.TimeoutError:
+        print("⚠️ زمان استخراج قیمت‌ها به پایان رسید. استفاده از داده‌های موجود...")
+        source_data = {}
+        for source, future in futures.items():
+            try:
+                if future.done():
+                    source_data[source] = future.result(timeout=1)
+            except Exception as e:
+                print(f"⚠️ خطا در دریافت داده‌های {source}: {e}")
+        return source_data
+    finally:
+        executor.shutdown(wait=False)
+
+
 if __name__ == "__main__":
     scrape_hamrah_mechanic()
     scrape_z4car()
\ No newline at end of file
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+پارسر صفحه آگهی دیوار از روی یک snapshot کامل HTML
+
+به جای ده‌ها فراخوانی find_element روی WebDriver، یک بار driver.page_source
+گرفته می‌شود و تمام فیلدهای ad_data در پایتون استخراج می‌شوند.
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+# دیکشنری برندهای خودرو با کلمات کلیدی (همان جدول extract_ad_details)
+CAR_BRANDS = {
+    'پراید': ['پراید', 'pride'],
+    'پژو': ['پژو', 'peugeot', '206', '207', '405', '406', 'پارس', 'پرشیا'],
+    'سمند': ['سمند', 'samand'],
+    'دنا': ['دنا', 'dena'],
+    'رانا': ['رانا', 'rana'],
+    'تیبا': ['تیبا', 'tiba'],
+    'ساینا': ['ساینا', 'saina'],
+    'کوییک': ['کوییک', 'quick'],
+    'آریو': ['آریو', 'ario'],
+    'شاهین': ['شاهین', 'shahin'],
+    'تارا': ['تارا', 'tara'],
+    'تویوتا': ['تویوتا', 'toyota', 'کمری', 'کرولا', 'پرادو'],
+    'هوندا': ['هوندا', 'honda', 'سیویک', 'آکورد'],
+    'نیسان': ['نیسان', 'nissan'],
+    'هیوندای': ['هیوندای', 'hyundai', 'النترا', 'سوناتا'],
+    'کیا': ['کیا', 'kia', 'سراتو', 'اپتیما'],
+    'مزدا': ['مزدا', 'mazda'],
+    'فولکس': ['فولکس', 'volkswagen', 'پاسات', 'جتا'],
+    'رنو': ['رنو', 'renault', 'ساندرو', 'تندر'],
+    'چری': ['چری', 'chery', 'تیگو'],
+    'ام وی ام': ['ام وی ام', 'mvm', '110', '315', '530'],
+    'بنز': ['بنز', 'mercedes', 'مرسدس'],
+    'بی ام و': ['بی ام و', 'bmw'],
+    'سوزوکی': ['سوزوکی', 'suzuki', 'ویتارا', 'سوئیفت'],
+    'جک': ['جک', 'jac'],
+    'لیفان': ['لیفان', 'lifan'],
+    'دانگ فنگ': ['دانگ فنگ', 'dongfeng'],
+    'جیلی': ['جیلی', 'geely']
+}
+
+# عنوان ستون‌های جدول بالای آگهی (کارکرد / مدل / رنگ) -> کلید ad_data
+GROUP_ROW_FIELDS = {
+    'کارکرد': 'کیلومتر',
+    'مدل': 'سال',
+    'سال': 'سال',
+    'رنگ': 'رنگ',
+}
+
+# عنوان ردیف‌های kt-unexpandable-row و kt-score-row -> کلید ad_data
+ROW_FIELDS = [
+    ('برند و تیپ', 'برند و تیپ'),
+    ('قیمت', 'قیمت آگهی (تومان)'),
+    ('گیربکس', 'گیربکس'),
+    ('بیمه', 'بیمه شخص ثالث'),
+    ('معاوضه', 'معاوضه'),
+    ('موتور', 'وضعیت موتور'),
+    ('شاسی', 'وضعیت شاسی'),
+    ('بدنه', 'وضعیت بدنه'),
+]
+
+LOCATION_HINTS = ('در', 'پیش', 'لحظاتی', 'ساعت', 'دقیقه')
+EMPTY_DESCRIPTION_TEXTS = ('موردی برای نمایش وجود ندارد',)
+SHAMSI_YEAR_PATTERN = re.compile(r'^\d{4}$')
+
+
+def empty_ad_data(url=''):
+    """دیکشنری خالی آگهی با همان ترتیب ستون‌های extract_ad_details"""
+    return {
+        'عنوان آگهی': '',
+        'برند و تیپ': '',
+        'نام خودرو': '',
+        'سال': '',
+        'کیلومتر': '',
+        'رنگ': '',
+        'قیمت آگهی (تومان)': '',
+        'قیمت روز (تومان)': '',
+        'منبع قیمت': 'دیوار',
+        'وضعیت موتور': '',
+        'وضعیت شاسی': '',
+        'وضعیت بدنه': '',
+        'مشکلات تشخیص داده شده': '',
+        'افت کارکرد': '',
+        'افت سن خودرو': '',
+        'افت مشکلات': '',
+        'درصد افت کل': '',
+        'قیمت تخمینی (تومان)': '',
+        'توضیحات': '',
+        'گیربکس': '',
+        'بیمه شخص ثالث': '',
+        'معاوضه': '',
+        'دسته بندی خودرو': 'خودرو',
+        'شماره تلفن': '',
+        'زمان و مکان': '',
+        'لینک آگهی': url
+    }
+
+
+def _text(element, separator=''):
+    if element is None:
+        return ''
+    return element.get_text(separator, strip=True)
+
+
+def _match_row_field(label):
+    for keyword, field in ROW_FIELDS:
+        if keyword in label:
+            return field
+    return None
+
+
+def _parse_group_rows(soup, ad_data):
+    """جدول kt-group-row: عنوان‌ها در thead و مقادیر در tbody هستند"""
+    for table in soup.select('table.kt-group-row'):
+        titles = [_text(t) for t in table.select('.kt-group-row-item__title')]
+        values = [_text(v) for v in table.select('.kt-group-row-item__value')]
+
+        for index, value in enumerate(values):
+            title = titles[index] if index < len(titles) else ''
+            field = None
+            for keyword, key in GROUP_ROW_FIELDS.items():
+                if keyword in title:
+                    field = key
+                    break
+            # ترتیب پیش‌فرض دیوار: کارکرد، مدل، رنگ
+            if field is None and not titles:
+                field = ('کیلومتر', 'سال', 'رنگ')[index] if index < 3 else None
+            if field and value and not ad_data.get(field):
+                ad_data[field] = value
+
+
+def _parse_labeled_rows(soup, ad_data):
+    """ردیف‌های kt-unexpandable-row و kt-score-row با عنوان و مقدار"""
+    for row in soup.select('.kt-unexpandable-row, .kt-score-row'):
+        label = _text(row.select_one('.kt-unexpandable-row__title, .kt-score-row__title'))
+        field = _match_row_field(label)
+        if not field or ad_data.get(field):
+            continue
+
+        value_elem = row.select_one(
+            '.kt-unexpandable-row__action, .kt-unexpandable-row__value, '
+            '.kt-score-row__score, .kt-base-row__end'
+        )
+        value = _text(value_elem, ' ')
+        if value and len(value) > 1:
+            ad_data[field] = value
+
+
+def _parse_description(soup):
+    """متن توضیحات در اولین kt-description-row بعد از عنوان «توضیحات» قرار دارد"""
+    for title_row in soup.select('.kt-title-row'):
+        if _text(title_row) != 'توضیحات':
+            continue
+        desc_row = title_row.find_next(class_='kt-description-row')
+        if desc_row is None:
+            break
+        primary = desc_row.select_one('.kt-description-row__text--primary') or desc_row
+        desc = primary.get_text('\n').strip()
+        if desc and desc not in EMPTY_DESCRIPTION_TEXTS:
+            return desc
+        break
+    return ''
+
+
+def _parse_location(soup):
+    for selector in ('.kt-page-title__subtitle', 'div.post-header__subtitle'):
+        location_text = _text(soup.select_one(selector), ' ')
+        if location_text and any(hint in location_text for hint in LOCATION_HINTS):
+            return location_text
+    return ''
+
+
+def _detect_brand(text):
+    text_lower = text.lower()
+    for brand, keywords in CAR_BRANDS.items():
+        for keyword in keywords:
+            if keyword.lower() in text_lower:
+                return brand
+    return ''
+
+
+def apply_brand_fields(ad_data):
+    """تنظیم «برند و تیپ» و «نام خودرو» با همان منطق extract_ad_details"""
+    title = ad_data.get('عنوان آگهی', '')
+    brand_type = ad_data.get('برند و تیپ', '')
+    title_parts = title.split()
+
+    detected_brand = _detect_brand(title)
+
+    if brand_type and brand_type != title:
+        if not detected_brand:
+            detected_brand = _detect_brand(brand_type)
+    elif detected_brand:
+        # استخراج مدل از عنوان بدون کلمات برند، سال شمسی و «مدل»
+        all_keywords = [keyword.lower() for keywords in CAR_BRANDS.values() for keyword in keywords]
+        model_parts = []
+        for part in title_parts:
+            part_lower = part.lower()
+            if any(keyword in part_lower for keyword in all_keywords):
+                continue
+            if SHAMSI_YEAR_PATTERN.match(part) and 1300 <= int(part) <= 1410:
+                continue
+            if 'مدل' not in part_lower:
+                model_parts.append(part)
+
+        if model_parts:
+            ad_data['برند و تیپ'] = f"{detected_brand} {' '.join(model_parts[:2])}"
+        else:
+            ad_data['برند و تیپ'] = detected_brand
+    else:
+        ad_data['برند و تیپ'] = title_parts[0] if title_parts else ''
+
+    ad_data['نام خودرو'] = detected_brand if detected_brand else (title_parts[0] if title_parts else '')
+    return ad_data
+
+
+def parse_html(html):
+    """ساخت soup صفحه (برای استفاده مشترک در parse_ad_soup و بررسی‌های دیگر)"""
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def parse_ad_page(html, url=''):
+    """
+    استخراج کامل اطلاعات آگهی دیوار از متن HTML صفحه
+
+    Parameters
+    ----------
+    html : str
+        محتوای کامل صفحه (driver.page_source یا فایل ذخیره‌شده)
+    url : str
+        لینک آگهی برای ستون «لینک آگهی»
+
+    Returns
+    -------
+    dict
+        ad_data با همان کلیدهای extract_ad_details
+    """
+    return parse_ad_soup(parse_html(html), url)
+
+
+def parse_ad_soup(soup, url=''):
+    """استخراج اطلاعات آگهی از soup ساخته‌شده با parse_html (همان parse_ad_page)"""
+    ad_data = empty_ad_data(url)
+
+    ad_data['عنوان آگهی'] = _text(soup.select_one('h1.kt-page-title__title')) or _text(soup.find('h1'))
+
+    _parse_group_rows(soup, ad_data)
+    _parse_labeled_rows(soup, ad_data)
+
+    ad_data['توضیحات'] = _parse_description(soup) or "بدون توضیحات"
+    ad_data['زمان و مکان'] = _parse_location(soup) or "نامشخص"
+
+    return apply_brand_fields(ad_data)
+
+
+def parse_ad_file(file_path, url=''):
+    """خواندن یک فایل HTML ذخیره‌شده و استخراج ad_data"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return parse_ad_page(f.read(), url)
+
+
+def has_required_fields(ad_data):
+    """آیا snapshot برای ادامه پردازش کافی است؟ (عنوان و حداقل یکی از سال/کارکرد/قیمت)"""
+    if not ad_data.get('عنوان آگهی'):
+        return False
+    return any(ad_data.get(field) for field in ('سال', 'کیلومتر', 'قیمت آگهی (تومان)'))
+
+
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:] or ['debug_page_source.html']:
+        data = parse_ad_file(path)
+        print(f"📄 {path}")
+        for key, value in data.items():
+            if value:
+                print(f"   {key}: {str(value)[:80]}")
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+کارخانه مشترک WebDriver برای دیوار و سایت‌های قیمت
+
+ChromeDriverManager().install() در هر راه‌اندازی برای پیدا کردن نسخه chromedriver به
+شبکه درخواست می‌فرستد. اینجا مسیر chromedriver فقط یک بار پیدا و در
+chromedriver_cache.json ذخیره می‌شود، پس راه‌اندازی‌های بعدی (حتی در اجرای بعدی
+برنامه) فقط کار محلی هستند. اگر chromedriver ذخیره‌شده دیگر با Chrome نخواند، مسیر
+یک بار دیگر پیدا می‌شود.
+
+تنظیمات Chrome به صورت پروفایل‌های نام‌دار نگه داشته می‌شوند:
+- 'divar': مرورگر تعاملی دیوار (main.py)
+- 'prices': مرورگر headless بدون JavaScript و تصویر برای صفحات قیمت combined_scraper
+- 'z4car': مرورگر قابل مشاهده با JavaScript و تصویر (Z4CarScraper مستقل)
+- 'hamrah': مرورگر headless با JavaScript (hamrah_mechanic_scraper.py)
+- 'enhanced': مرورگر حداقلی enhanced_main.py (فقط --no-sandbox و --disable-dev-shm-usage)
+
+prewarm / keep_warm مرورگرهای آماده را در پس‌زمینه راه‌اندازی می‌کنند تا
+get_driver (مثلاً بعد از crash) بدون انتظار برای شروع Chrome یک درایور برگرداند.
+زمان هر راه‌اندازی در launches ثبت می‌شود.
+
+python driver_factory.py [--refresh] [--launch divar]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+try:
+    from webdriver_manager.chrome import ChromeDriverManager
+except ImportError:
+    ChromeDriverManager = None
+
+DEFAULT_CACHE_FILE = "chromedriver_cache.json"
+# بعد از این مدت مسیر دوباره از webdriver-manager گرفته می‌شود تا به‌روزرسانی Chrome دنبال شود
+CACHE_MAX_AGE = 7 * 24 * 3600
+
+# خطاهایی که یعنی chromedriver ذخیره‌شده با Chrome نصب‌شده سازگار نیست
+STALE_DRIVER_KEYWORDS = (
+    'only supports chrome version', 'session not created', 'unable to obtain driver',
+    'executable needs to be in path', 'permission denied', 'no such file',
+)
+
+HIDE_WEBDRIVER_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+EXCLUDE_SWITCHES = ['enable-automation']
+
+# تنظیمات بهینه Chrome برای macOS ARM64 و حل مشکل timeout (همان تنظیمات قبلی main.py)
+DIVAR_ARGUMENTS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    # حل مشکل timeout در macOS ARM64
+    '--disable-features=VizDisplayCompositor,VizServiceDisplayCompositor',
+    '--disable-gpu-sandbox',
+    '--disable-software-rasterizer',
+    '--disable-field-trial-config',
+    '--disable-back-forward-cache',
+    '--max_old_space_size=4096',
+    '--js-flags=--max-old-space-size=4096',
+    '--disable-dev-tools',
+    '--disable-logging',
+    '--disable-gpu-process-crash-limit',
+    '--disable-crash-reporter',
+    '--no-crash-upload',
+    '--disable-in-process-stack-traces',
+    '--disable-logging-redirect',
+    '--log-level=3',
+    '--silent',
+    '--disable-gpu-process-for-dx12-vulkan-info-collection',
+    '--single-process',  # اجرا در یک پروسه برای کاهش مشکلات IPC
+    # سرعت
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-plugins',
+    '--disable-infobars',
+    '--disable-notifications',
+    '--disable-popup-blocking',
+    '--disable-save-password-bubble',
+    '--disable-translate',
+    '--disable-web-security',
+    '--disable-features=TranslateUI,BlinkGenPropertyTrees',
+    '--disable-site-isolation-trials',
+    '--ignore-certificate-errors',
+    '--disable-blink-features=AutomationControlled',
+    # حافظه
+    '--aggressive-cache-discard',
+    '--disable-application-cache',
+    '--disable-cache',
+    '--disable-offline-load-stale-cache',
+    '--disk-cache-size=0',
+    # پردازش
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-breakpad',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-default-apps',
+    '--disable-hang-monitor',
+    '--disable-ipc-flooding-protection',
+    '--disable-prompt-on-repost',
+    '--disable-renderer-backgrounding',
+    '--disable-sync',
+    '--disable-domain-reliability',
+    '--disable-client-side-phishing-detection',
+    '--disable-features=UserAgentClientHint',
+    '--metrics-recording-only',
+    '--no-default-browser-check',
+    '--no-first-run',
+    '--no-pings',
+    '--password-store=basic',
+    '--use-mock-keychain',
+    '--process-per-tab',
+    '--enable-low-end-device-mode',
+]
+
+# مرورگر headless سبک برای صفحات قیمت (همان تنظیمات قبلی combined_scraper.py)
+PRICE_ARGUMENTS = [
+    '--headless',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-extensions',
+    '--disable-plugins',
+    '--disable-images',
+    '--disable-javascript',
+    '--disable-animations',
+    '--disable-web-security',
+    '--window-size=1920,1080',
+    '--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-breakpad',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-default-apps',
+    '--disable-hang-monitor',
+    '--disable-ipc-flooding-protection',
+    '--disable-prompt-on-repost',
+    '--disable-renderer-backgrounding',
+    '--disable-sync',
+    '--disable-domain-reliability',
+    '--disable-client-side-phishing-detection',
+    '--disable-features=UserAgentClientHint',
+    '--metrics-recording-only',
+    '--no-default-browser-check',
+    '--no-first-run',
+    '--no-pings',
+]
+
+# همان تنظیمات قبلی Z4CarScraper.setup_driver (صفحه با JavaScript رندر می‌شود)
+Z4CAR_ARGUMENTS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+]
+
+# همان تنظیمات قبلی hamrah_mechanic_scraper.py (جدول‌های قیمت با XHR ساخته می‌شوند)
+HAMRAH_ARGUMENTS = [
+    '--headless',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+]
+
+# همان تنظیمات حداقلی قبلی OptimizedDivarScraper.create_driver
+ENHANCED_ARGUMENTS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+]
+
+# timeout های پیش‌فرض Selenium برای پروفایل‌هایی که قبلاً آن‌ها را تغییر نمی‌دادند
+SELENIUM_PAGE_LOAD_TIMEOUT = 300
+SELENIUM_SCRIPT_TIMEOUT = 30
+
+PROFILES = {
+    'divar': {
+        'arguments': DIVAR_ARGUMENTS,
+        'page_load_timeout': 60,
+        'implicit_wait': 10,
+        'script_timeout': 60,
+        'window_size': (1366, 768),
+        # رویدادهای شبکه برای آمار resource_policy.record_page
+        'performance_log': True,
+    },
+    'prices': {
+        'arguments': PRICE_ARGUMENTS,
+        'page_load_timeout': 20,
+        'implicit_wait': 0,
+        'script_timeout': 30,
+        'window_size': None,
+        'performance_log': False,
+    },
+    'z4car': {
+        'arguments': Z4CAR_ARGUMENTS,
+        'page_load_timeout': 30,
+        'implicit_wait': 0,
+        'script_timeout': SELENIUM_SCRIPT_TIMEOUT,
+        'window_size': None,
+        'performance_log': False,
+    },
+    'hamrah': {
+        'arguments': HAMRAH_ARGUMENTS,
+        'page_load_timeout': SELENIUM_PAGE_LOAD_TIMEOUT,
+        'implicit_wait': 0,
+        'script_timeout': SELENIUM_SCRIPT_TIMEOUT,
+        'window_size': None,
+        'performance_log': False,
+    },
+    'enhanced': {
+        'arguments': ENHANCED_ARGUMENTS,
+        'page_load_timeout': 60,
+        'implicit_wait': 0,
+        'script_timeout': SELENIUM_SCRIPT_TIMEOUT,
+        'window_size': None,
+        'performance_log': False,
+        # بدون excludeSwitches و پنهان کردن navigator.webdriver (مثل قبل)
+        'stealth': False,
+    },
+}
+
+
+def build_options(profile):
+    """Options کروم برای یک پروفایل نام‌دار"""
+    options = Options()
+    for argument in PROFILES[profile]['arguments']:
+        options.add_argument(argument)
+    if PROFILES[profile].get('stealth', True):
+        options.add_experimental_option('excludeSwitches', EXCLUDE_SWITCHES)
+        options.add_experimental_option('useAutomationExtension', False)
+    if PROFILES[profile]['performance_log']:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+    return options
+
+
+def is_stale_driver_error(error):
+    """آیا خطای راه‌اندازی یعنی chromedriver ذخیره‌شده قابل استفاده نیست؟"""
+    error_str = str(error).lower()
+    return any(keyword in error_str for keyword in STALE_DRIVER_KEYWORDS)
+
+
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def _is_alive(driver):
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+class DriverFactory:
+    """
+    ساخت WebDriver با مسیر chromedriver ذخیره‌شده، پروفایل‌های نام‌دار و مرورگرهای آماده
+
+    Parameters
+    ----------
+    cache_file : str, optional
+        فایل مسیر chromedriver؛ None یعنی فقط در حافظه
+    max_age : float
+        عمر مسیر ذخیره‌شده (ثانیه) قبل از پیدا کردن دوباره با webdriver-manager
+    """
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE, max_age=CACHE_MAX_AGE):
+        self.cache_file = cache_file
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._resolved = False
+        self._driver_path = None
+        self._warm = {profile: [] for profile in PROFILES}
+        self._keep_warm = {profile: 0 for profile in PROFILES}
+        self._warming = {profile: 0 for profile in PROFILES}
+        self._closed = False
+
+        self.driver_source = None
+        self.resolve_time = 0.0
+        # (پروفایل، ثانیه)
+        self.launches = []
+        self.warm_hits = 0
+        self.cold_starts = 0
+
+    # ---------- مسیر chromedriver ----------
+
+    def _load_cache(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ خطا در خواندن مسیر ذخیره‌شده chromedriver: {e}")
+            return None
+        path = cache.get('path')
+        if not path or not os.access(path, os.X_OK):
+            return None
+        if time.time() - cache.get('resolved_at', 0) > self.max_age:
+            return None
+        return path
+
+    def _save_cache(self, path):
+        if not self.cache_file:
+            return
+        tmp_file = self.cache_file + '.tmp'
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'path': path, 'resolved_at': time.time()}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            print(f"⚠️ خطا در ذخیره مسیر chromedriver: {e}")
+
+    def _resolve(self, refresh):
+        """(مسیر، منبع)؛ مسیر None یعنی Selenium خودش chromedriver را پیدا کند"""
+        if not refresh:
+            path = self._load_cache()
+            if path:
+                return path, 'cache'
+        if ChromeDriverManager is not None:
+            try:
+                path = ChromeDriverManager().install()
+                self._save_cache(path)
+                return path, 'webdriver-manager'
+            except Exception as e:
+                print(f"⚠️ خطا در webdriver-manager: {e}")
+        path = shutil.which('chromedriver')
+        if path:
+            self._save_cache(path)
+        return path, 'system'
+
+    def driver_path(self, refresh=False):
+        """
+        مسیر chromedriver (فقط یک بار در هر اجرا و در اجراهای بعدی از فایل)
+
+        Parameters
+        ----------
+        refresh : bool
+            نادیده گرفتن مسیر ذخیره‌شده و پیدا کردن دوباره
+
+        Returns
+        -------
+        str or None
+        """
+        with self._lock:
+            if self._resolved and not refresh:
+                return self._driver_path
+            start_time = time.perf_counter()
+            self._driver_path, self.driver_source = self._resolve(refresh)
+            self.resolve_time = time.perf_counter() - start_time
+            self._resolved = True
+            print(f"📍 chromedriver: {self._driver_path or 'Selenium Manager'} "
+                  f"({self.driver_source}، {self.resolve_time * 1000:.0f}ms)")
+            return self._driver_path
+
+    # ---------- راه‌اندازی ----------
+
+    def _start_chrome(self, path, options):
+        if path:
+            return webdriver.Chrome(service=Service(path), options=options)
+        return webdriver.Chrome(options=options)
+
+    def _configure(self, driver, profile):
+        settings = PROFILES[profile]
+        driver.set_page_load_timeout(settings['page_load_timeout'])
+        if settings['implicit_wait']:
+            driver.implicitly_wait(settings['implicit_wait'])
+        driver.set_script_timeout(settings['script_timeout'])
+        if settings.get('stealth', True):
+            driver.execute_script(HIDE_WEBDRIVER_SCRIPT)
+        if settings['window_size']:
+            driver.set_window_size(*settings['window_size'])
+
+    def launch(self, profile='divar'):
+        """
+        راه‌اندازی یک Chrome جدید (بدون استفاده از مرورگرهای آماده)
+
+        اگر chromedriver ذخیره‌شده با Chrome نخواند، مسیر یک بار دیگر پیدا می‌شود و اگر
+        باز هم نشد Selenium خودش chromedriver را پیدا می‌کند.
+
+        Raises
+        ------
+        Exception
+            خطای راه‌اندازی Chrome
+        """
+        options = build_options(profile)
+        start_time = time.perf_counter()
+        path = self.driver_path()
+        try:
+            driver = self._start_chrome(path, options)
+        except Exception as e:
+            if not path:
+                raise
+            print(f"⚠️ خطا در راه‌اندازی با chromedriver ذخیره‌شده: {e}")
+            fresh_path = self.driver_path(refresh=True) if is_stale_driver_error(e) else None
+            driver = self._start_chrome(fresh_path if fresh_path != path else None, options)
+        try:
+            self._configure(driver, profile)
+        except Exception:
+            _quit_driver(driver)
+            raise
+        elapsed = time.perf_counter() - start_time
+        with self._lock:
+            self.launches.append((profile, elapsed))
+        return driver
+
+    def get_driver(self, profile='divar'):
+        """
+        یک درایور آماده برای پروفایل: اول از مرورگرهای آماده، وگرنه راه‌اندازی جدید
+
+        Returns
+        -------
+        WebDriver or None
+            None یعنی راه‌اندازی ناموفق
+        """
+        while True:
+            with self._lock:
+                driver = self._warm[profile].pop() if self._warm[profile] else None
+            if driver is None:
+                break
+            if _is_alive(driver):
+                with self._lock:
+                    self.warm_hits += 1
+                self._refill(profile)
+                return driver
+            _quit_driver(driver)
+
+        self._refill(profile)
+        start_time = time.perf_counter()
+        try:
+            driver = self.launch(profile)
+        except Exception as e:
+            print(f"❌ خطا در راه‌اندازی Chrome ({profile}): {e}")
+            return None
+        with self._lock:
+            self.cold_starts += 1
+        print(f"✅ Chrome ({profile}) در {time.perf_counter() - start_time:.1f}s راه‌اندازی شد")
+        return driver
+
+    # ---------- مرورگرهای آماده ----------
+
+    def _warm_one(self, profile):
+        try:
+            driver = self.launch(profile)
+        except Exception as e:
+            print(f"⚠️ خطا در آماده‌سازی Chrome ({profile}): {e}")
+            driver = None
+        with self._lock:
+            self._warming[profile] -= 1
+            if driver is not None and not self._closed:
+                self._warm[profile].append(driver)
+                driver = None
+        if driver is not None:
+            # close در حین راه‌اندازی صدا زده شده است
+            _quit_driver(driver)
+
+    def prewarm(self, profile='divar', count=1):
+        """راه‌اندازی count مرورگر در پس‌زمینه برای get_driver های بعدی"""
+        with self._lock:
+            self._closed = False
+            self._warming[profile] += count
+        for _ in range(count):
+            threading.Thread(target=self._warm_one, args=(profile,),
+                             name=f"driver-prewarm-{profile}", daemon=True).start()
+
+    def keep_warm(self, profile='divar', count=1):
+        """همیشه count مرورگر آماده برای پروفایل نگه داشته شود (بعد از هر get_driver پر می‌شود)"""
+        with self._lock:
+            self._keep_warm[profile] = count
+        self._refill(profile)
+
+    def _refill(self, profile):
+        with self._lock:
+            missing = self._keep_warm[profile] - len(self._warm[profile]) - self._warming[profile]
+        if missing > 0:
+            self.prewarm(profile, missing)
+
+    def warm_count(self, profile='divar'):
+        with self._lock:
+            return len(self._warm[profile])
+
+    def stats(self):
+        with self._lock:
+            times = sorted(seconds for _, seconds in self.launches)
+            return {
+                'driver_path': self._driver_path,
+                'driver_source': self.driver_source,
+                'resolve_time': self.resolve_time,
+                'launches': len(times),
+                'launch_mean': sum(times) / len(times) if times else 0.0,
+                'launch_p50': times[len(times) // 2] if times else 0.0,
+                'warm_hits': self.warm_hits,
+                'cold_starts': self.cold_starts,
+                'warm_idle': {profile: len(drivers) for profile, drivers in self._warm.items()},
+            }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"{stats['launches']} راه‌اندازی (میانگین {stats['launch_mean']:.1f}s)، "
+                f"{stats['warm_hits']} درایور آماده، {stats['cold_starts']} راه‌اندازی در لحظه")
+
+    def close(self):
+        """بستن مرورگرهای آماده‌ای که استفاده نشده‌اند (و آن‌هایی که هنوز در حال راه‌اندازی‌اند)"""
+        with self._lock:
+            self._closed = True
+            self._keep_warm = {profile: 0 for profile in PROFILES}
+            drivers = [driver for warm in self._warm.values() for driver in warm]
+            for warm in self._warm.values():
+                warm.clear()
+        for driver in drivers:
+            _quit_driver(driver)
+
+
+_factory = None
+_factory_lock = threading.Lock()
+
+
+def get_factory():
+    """کارخانه مشترک درایور (یک نمونه برای کل برنامه)"""
+    global _factory
+    with _factory_lock:
+        if _factory is None:
+            _factory = DriverFactory()
+        return _factory
+
+
+def get_driver(profile='divar'):
+    """get_driver روی کارخانه مشترک"""
+    return get_factory().get_driver(profile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="کارخانه مشترک WebDriver")
+    parser.add_argument('--refresh', action='store_true', help="پیدا کردن دوباره مسیر chromedriver")
+    parser.add_argument('--launch', choices=sorted(PROFILES), help="راه‌اندازی آزمایشی یک مرورگر")
+    args = parser.parse_args()
+
+    factory = get_factory()
+    factory.driver_path(refresh=args.refresh)
+    if args.launch:
+        driver = factory.get_driver(args.launch)
+        if driver is not None:
+            _quit_driver(driver)
+        print(f"📊 {factory.summary()}")
+
+
+if __name__ == "__main__":
+    main()
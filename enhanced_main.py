@@ -4,19 +4,16 @@
 اسکریپت بهبود یافته اسکرپ دیوار با قیمت‌گذاری هوشمند
 """
 
-import os
 import sys
 import time
 import pandas as pd
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_factory import get_driver
+from market_snapshot import DEFAULT_SNAPSHOT_FILE as MARKET_SNAPSHOT_FILE, SNAPSHOT_MAX_AGE_HOURS, load_snapshot
 import signal
 import random
 import re
@@ -82,119 +79,27 @@ class OptimizedDivarScraper:
             print(f"⚠️ خطا در بارگذاری محاسبه‌گرها: {e}")
     
     def load_market_prices(self):
-        """بارگذاری قیمت‌های بازار از فایل‌های اکسل"""
+        """بارگذاری قیمت‌های بازار از snapshot (فایل‌های اکسل فقط خروجی هستند)"""
         try:
-            # بارگذاری از فایل همراه مکانیک
-            hamrah_file = "hamrah_mechanic_prices.xlsx"
-            if os.path.exists(hamrah_file):
-                df_hamrah = pd.read_excel(hamrah_file)
-                for _, row in df_hamrah.iterrows():
-                    car_name = str(row.get('Car Name', '')).strip()
-                    price_str = str(row.get('Price', '')).strip()
-                    # استخراج عدد از متن قیمت
-                    price_numbers = re.findall(r'\d{1,3}(?:,\d{3})*', price_str)
-                    if price_numbers:
-                        try:
-                            price = int(price_numbers[0].replace(',', ''))
-                            # تبدیل میلیون به تومان
-                            if 'میلیون' in price_str:
-                                price = price * 1000000
-                            elif 'هزار' in price_str:
-                                price = price * 1000
-                            elif price < 100000:  # احتمالاً میلیون تومان است
-                                price = price * 1000000
-                        except:
-                            price = 0
-                    else:
-                        price = 0
-                    if car_name and price > 100000:  # حداقل 100 هزار تومان
-                        self.market_prices[car_name] = price
-                print(f"📊 بارگذاری {len(df_hamrah)} قیمت از همراه مکانیک")
-            
-            # بارگذاری از فایل Z4Car
-            z4car_file = "z4car_prices.xlsx"
-            if os.path.exists(z4car_file):
-                df_z4car = pd.read_excel(z4car_file)
-                for _, row in df_z4car.iterrows():
-                    car_name = str(row.get('نام خودرو', '')).strip()
-                    price_str = str(row.get('قیمت (تومان)', '')).strip()
-                    # استخراج عدد از متن قیمت
-                    price_numbers = re.findall(r'\d{1,3}(?:,\d{3})*', price_str)
-                    if price_numbers:
-                        try:
-                            price = int(price_numbers[0].replace(',', ''))
-                            # تبدیل میلیون به تومان
-                            if 'میلیون' in price_str:
-                                price = price * 1000000
-                            elif 'هزار' in price_str:
-                                price = price * 1000
-                            elif price < 100000:  # احتمالاً میلیون تومان است
-                                price = price * 1000000
-                        except:
-                            price = 0
-                    else:
-                        price = 0
-                    if car_name and price > 100000:  # حداقل 100 هزار تومان
-                        # اگر قیمت از قبل وجود دارد، میانگین بگیر
-                        if car_name in self.market_prices:
-                            self.market_prices[car_name] = int((self.market_prices[car_name] + price) / 2)
-                        else:
-                            self.market_prices[car_name] = price
-                print(f"📊 بارگذاری {len(df_z4car)} قیمت از Z4Car")
-            
-            # بارگذاری از فایل ترکیبی اگر وجود دارد
-            combined_file = "combined_market_prices.xlsx"
-            if os.path.exists(combined_file):
-                df_combined = pd.read_excel(combined_file)
-                for _, row in df_combined.iterrows():
-                    car_name = str(row.get('نام خودرو', '')).strip()
-                    price_str = str(row.get('قیمت', '')).strip()
-                    if not price_str or price_str == 'nan':
-                        price_str = str(row.get('قیمت (تومان)', '')).strip()
-                    
-                    # استخراج عدد از متن قیمت
-                    price_numbers = re.findall(r'\d{1,3}(?:,\d{3})*', price_str)
-                    if price_numbers:
-                        try:
-                            price = int(price_numbers[0].replace(',', ''))
-                            # تبدیل میلیون به تومان
-                            if 'میلیون' in price_str:
-                                price = price * 1000000
-                            elif 'هزار' in price_str:
-                                price = price * 1000
-                            elif price < 100000:  # احتمالاً میلیون تومان است
-                                price = price * 1000000
-                        except:
-                            price = 0
-                    else:
-                        price = 0
-                    if car_name and price > 100000:  # حداقل 100 هزار تومان
-                        self.market_prices[car_name] = price
-                print(f"📊 بارگذاری {len(df_combined)} قیمت از فایل ترکیبی")
+            snapshot = load_snapshot(MARKET_SNAPSHOT_FILE)
+            if snapshot is None:
+                print(f"⚠️ snapshot قیمت‌ها پیدا نشد: {MARKET_SNAPSHOT_FILE} (python cli.py refresh-prices)")
+                return
+            if snapshot.age_hours >= SNAPSHOT_MAX_AGE_HOURS:
+                print(f"⚠️ snapshot قیمت‌ها {snapshot.age_hours:.1f} ساعت پیش ساخته شده است")
             
+            self.market_prices = {name: prices['market_price']
+                                  for name, prices in snapshot.to_market_prices().items()
+                                  if prices['market_price']}
             print(f"📊 مجموع {len(self.market_prices)} قیمت روز بارگذاری شد")
             
         except Exception as e:
             print(f"⚠️ خطا در بارگذاری قیمت‌های بازار: {e}")
     
     def create_driver(self):
-        """ایجاد Chrome driver ساده"""
-        try:
-            chrome_options = Options()
-            # تنظیمات حداقلی
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.set_page_load_timeout(60)
-            
-            print("✅ Chrome driver راه‌اندازی شد")
-            return True
-            
-        except Exception as e:
-            print(f"❌ خطا در راه‌اندازی Chrome driver: {e}")
-            return False
+        """ایجاد Chrome driver با پروفایل 'enhanced' کارخانه مشترک درایور"""
+        self.driver = get_driver('enhanced')
+        return self.driver is not None
     
     def find_market_price(self, car_name, year=None):
         """یافتن قیمت بازار برای خودروی مشخص"""
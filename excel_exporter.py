@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+خروجی اکسل جریانی (xlsxwriter در حالت constant_memory)
+
+ردیف‌ها یکی‌یکی نوشته می‌شوند و هر ردیف بلافاصله روی دیسک می‌رود، پس حافظه مصرفی
+به تعداد آگهی‌ها بستگی ندارد. رنگ سبز آگهی‌های فوری با یک قانون conditional
+format روی کل جدول اعمال می‌شود (نه fill جداگانه برای هر سلول) و عرض ستون‌ها از
+روی نمونه‌ای از ردیف‌های اول محاسبه می‌شود.
+"""
+
+import math
+import os
+from itertools import chain, islice
+
+import xlsxwriter
+from xlsxwriter.utility import xl_col_to_name
+
+# ترتیب مطلوب ستون‌ها در خروجی (ستون‌های دیگر بعد از این‌ها می‌آیند)
+DESIRED_COLUMNS = [
+    'عنوان آگهی', 'برند و تیپ', 'نام خودرو', 'سال', 'کیلومتر', 'رنگ',
+    'قیمت آگهی (تومان)', 'قیمت روز (تومان)', 'قیمت تخمینی (تومان)', 'منبع قیمت',
+    'وضعیت موتور', 'وضعیت شاسی', 'وضعیت بدنه', 'مشکلات تشخیص داده شده',
+    'مشکلات موتور/گیربکس', 'فروش فوری', 'افت کارکرد', 'افت سن خودرو',
+    'افت مشکلات', 'درصد افت کل', 'توضیحات', 'گیربکس', 'بیمه شخص ثالث',
+    'معاوضه', 'دسته بندی خودرو', 'شماره تلفن', 'زمان و مکان', 'لینک آگهی',
+    'رنگ‌بندی', 'تاریخ ذخیره'
+]
+
+HIGHLIGHT_COLUMN = 'رنگ‌بندی'
+HIGHLIGHT_VALUE = 'سبز'
+HIGHLIGHT_COLOR = '#90EE90'
+
+MAX_COLUMN_WIDTH = 50
+WIDTH_SAMPLE_SIZE = 1000
+
+
+def order_columns(columns):
+    """مرتب‌سازی ستون‌ها مطابق DESIRED_COLUMNS"""
+    columns = list(columns)
+    return [col for col in DESIRED_COLUMNS if col in columns] + [col for col in columns if col not in DESIRED_COLUMNS]
+
+
+def column_widths(columns, sample_rows):
+    """عرض ستون‌ها از روی طول رشته‌ای مقادیر نمونه (همان فرمول قبلی: (طول + 2) × 1.2، حداکثر 50)"""
+    widths = []
+    for col in columns:
+        max_length = len(str(col))
+        for row in sample_rows:
+            value = row.get(col)
+            if value is not None:
+                max_length = max(max_length, len(str(value)))
+        widths.append(min((max_length + 2) * 1.2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _cell_value(value):
+    """تبدیل مقدار به نوعی که xlsxwriter می‌نویسد؛ None یعنی سلول خالی"""
+    if value is None:
+        return None
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        # numpy scalar
+        return _cell_value(value.item())
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def export_rows(rows, filename, columns=None, sheet_name='آگهی‌های دیوار', sample_size=WIDTH_SAMPLE_SIZE):
+    """
+    نوشتن جریانی ردیف‌ها در فایل اکسل
+
+    Parameters
+    ----------
+    rows : iterable of dict
+        ردیف‌ها (مثلاً ResultStore.iter_ads)؛ فقط sample_size ردیف اول در حافظه نگه داشته می‌شود
+    filename : str
+        مسیر فایل خروجی
+    columns : list, optional
+        ستون‌ها؛ اگر داده نشود از ردیف‌های نمونه گرفته می‌شود
+    sheet_name : str
+        نام شیت
+    sample_size : int
+        تعداد ردیف برای محاسبه عرض ستون‌ها
+
+    Returns
+    -------
+    tuple
+        (تعداد ردیف‌ها، تعداد آگهی‌های فوری)
+    """
+    rows = iter(rows)
+    sample = list(islice(rows, sample_size))
+    if columns is None:
+        columns = []
+        for row in sample:
+            columns.extend(col for col in row if col not in columns)
+    columns = order_columns(columns)
+    if not columns:
+        return 0, 0
+
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    workbook = xlsxwriter.Workbook(filename, {
+        'constant_memory': True,
+        # لینک‌ها و متن‌های شبیه فرمول همان‌طور که هستند ذخیره شوند
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+    })
+    try:
+        worksheet = workbook.add_worksheet(sheet_name[:31])
+        for col_idx, width in enumerate(column_widths(columns, sample)):
+            worksheet.set_column(col_idx, col_idx, width)
+
+        worksheet.write_row(0, 0, columns)
+        highlight_index = columns.index(HIGHLIGHT_COLUMN) if HIGHLIGHT_COLUMN in columns else None
+
+        row_idx = 0
+        urgent_count = 0
+        for row in chain(sample, rows):
+            row_idx += 1
+            for col_idx, col in enumerate(columns):
+                value = _cell_value(row.get(col))
+                if value is not None:
+                    worksheet.write(row_idx, col_idx, value)
+            if highlight_index is not None and row.get(HIGHLIGHT_COLUMN) == HIGHLIGHT_VALUE:
+                urgent_count += 1
+
+        if highlight_index is not None and row_idx:
+            # یک قانون برای کل جدول: ردیفی که ستون رنگ‌بندی آن «سبز» است
+            highlight_letter = xl_col_to_name(highlight_index)
+            worksheet.conditional_format(1, 0, row_idx, len(columns) - 1, {
+                'type': 'formula',
+                'criteria': f'=${highlight_letter}2="{HIGHLIGHT_VALUE}"',
+                'format': workbook.add_format({'bg_color': HIGHLIGHT_COLOR}),
+            })
+    finally:
+        workbook.close()
+
+    return row_idx, urgent_count
+
+
+def export_dataframe(df, filename, **kwargs):
+    """خروجی جریانی یک DataFrame (ردیف به ردیف، بدون ساختن workbook در حافظه)"""
+    columns = [str(col) for col in df.columns]
+    rows = (dict(zip(columns, values)) for values in df.itertuples(index=False, name=None))
+    return export_rows(rows, filename, columns=columns, **kwargs)
+
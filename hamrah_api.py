@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+کلاینت API قیمت خودروی همراه مکانیک با درخواست شرطی
+
+Session ماندگار (keep-alive و gzip)، تلاش مجدد با تأخیر تصادفی (jitter) و
+هدرهای If-None-Match / If-Modified-Since. اعتبارسنج‌های آخرین پاسخ به همراه
+قیمت‌های پارس‌شده در hamrah_api_state.json نگه داشته می‌شوند؛ اگر سرور 304
+برگرداند همان داده‌ها بدون دانلود و پارس دوباره برگردانده می‌شوند و فایل‌های
+خروجی دست نمی‌خورند.
+
+python hamrah_api.py [--force]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HAMRAH_API_URL = "https://www.hamrah-mechanic.com/api/v1/car-price/all"
+DEFAULT_STATE_FILE = "hamrah_api_state.json"
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate',
+    'Referer': 'https://www.hamrah-mechanic.com/carprice/',
+}
+
+# (اتصال، خواندن)
+DEFAULT_TIMEOUT = (5, 30)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# پاسخ‌های کوچک‌تر از این احتمالاً خطا یا صفحه خالی هستند
+MIN_CAR_COUNT = 10
+
+
+def parse_car_prices(data):
+    """تبدیل پاسخ JSON به لیست {'نام خودرو', 'قیمت (تومان)'} (همان قالب scrape_hamrah_mechanic)"""
+    car_data = []
+    for item in data:
+        if 'name' in item and 'price' in item:
+            price_number = re.sub(r'[^\d]', '', str(item['price']))
+            car_data.append({
+                'نام خودرو': item['name'],
+                'قیمت (تومان)': int(price_number) if price_number else 0,
+            })
+    return car_data
+
+
+class HamrahApiClient:
+    """
+    کلاینت API همراه مکانیک
+
+    Parameters
+    ----------
+    url : str
+        آدرس API
+    state_file : str, optional
+        فایل اعتبارسنج‌ها و قیمت‌های آخرین پاسخ؛ None یعنی فقط در حافظه
+    retries : int
+        تعداد تلاش مجدد برای خطای اتصال و کدهای RETRY_STATUS_CODES
+    backoff : float
+        تأخیر پایه (ثانیه)؛ تأخیر تلاش n برابر backoff × 2^n × عددی تصادفی بین 0.5 و 1.5 است
+    timeout : tuple
+        timeout اتصال و خواندن
+    """
+
+    def __init__(self, url=HAMRAH_API_URL, state_file=DEFAULT_STATE_FILE, retries=3, backoff=0.5,
+                 timeout=DEFAULT_TIMEOUT, session=None):
+        self.url = url
+        self.state_file = state_file
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = session or self._create_session()
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+        self.last_status = None
+        self.last_elapsed = 0.0
+        self.last_bytes = 0
+
+    @staticmethod
+    def _create_session():
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return state if state.get('url') == self.url and state.get('car_data') else {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ خطا در خواندن وضعیت API همراه مکانیک: {e}")
+            return {}
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        tmp_file = self.state_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+    def _conditional_headers(self):
+        headers = {}
+        if self.state.get('etag'):
+            headers['If-None-Match'] = self.state['etag']
+        if self.state.get('last_modified'):
+            headers['If-Modified-Since'] = self.state['last_modified']
+        return headers
+
+    def _get(self, headers):
+        """GET با تلاش مجدد و jitter برای خطاهای گذرا"""
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.retries:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    raise
+                reason = type(e).__name__
+            delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+            print(f"⚠️ API همراه مکانیک: {reason}، تلاش مجدد {attempt + 1}/{self.retries} بعد از {delay:.1f}s")
+            time.sleep(delay)
+
+    def fetch(self, force=False):
+        """
+        دریافت قیمت‌ها
+
+        Parameters
+        ----------
+        force : bool
+            True یعنی درخواست بدون هدرهای شرطی (دانلود کامل)
+
+        Returns
+        -------
+        tuple
+            (car_data, changed)؛ changed=False یعنی پاسخ 304 و car_data همان داده ذخیره‌شده است.
+            car_data خالی یعنی API پاسخ قابل استفاده نداد.
+        """
+        with self._lock:
+            headers = {} if force or not self.state.get('car_data') else self._conditional_headers()
+            start_time = time.perf_counter()
+            response = self._get(headers)
+            self.last_elapsed = time.perf_counter() - start_time
+            self.last_status = response.status_code
+            self.last_bytes = int(response.headers.get('Content-Length') or len(response.content))
+
+            if response.status_code == 304 and self.state.get('car_data'):
+                return self.state['car_data'], False
+            if response.status_code != 200:
+                print(f"⚠️ پاسخ نامعتبر از API همراه مکانیک: HTTP {response.status_code}")
+                return [], False
+
+            data = response.json()
+            if not isinstance(data, list) or len(data) <= MIN_CAR_COUNT:
+                print("⚠️ پاسخ API همراه مکانیک داده کافی ندارد")
+                return [], False
+
+            car_data = parse_car_prices(data)
+            self.state = {
+                'url': self.url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': time.time(),
+                'car_data': car_data,
+            }
+            try:
+                self._save_state()
+            except OSError as e:
+                print(f"⚠️ خطا در ذخیره وضعیت API همراه مکانیک: {e}")
+            return car_data, True
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """کلاینت مشترک (یک Session برای همه به‌روزرسانی‌های قیمت در یک اجرا)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HamrahApiClient()
+        return _client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="دریافت قیمت‌های همراه مکانیک از API")
+    parser.add_argument('--force', action='store_true', help="دانلود کامل بدون درخواست شرطی")
+    args = parser.parse_args()
+
+    client = get_client()
+    car_data, changed = client.fetch(force=args.force)
+    status = "تغییر کرده" if changed else "بدون تغییر (304)" if car_data else "ناموفق"
+    print(f"📡 HTTP {client.last_status}: {len(car_data)} خودرو، {status}، "
+          f"{client.last_bytes / 1024:.1f}KB در {client.last_elapsed * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,11 @@
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_factory import get_driver
+from page_waits import wait_for_selector, wait_for_settle
+from combined_scraper import HAMRAH_PRICE_TABLES
 from bs4 import BeautifulSoup
-import time
 import re
 
 def scrape_hamrah_mechanic():
@@ -16,29 +15,10 @@ def scrape_hamrah_mechanic():
     url = "https://www.hamrah-mechanic.com/carprice/"
     
     print("Initializing WebDriver...")
-    try:
-        service = Service(ChromeDriverManager().install())
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    except Exception as e:
-        print(f"Failed to initialize WebDriver with webdriver-manager: {e}")
-        print("Falling back to system chromedriver.")
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        driver = webdriver.Chrome(options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    driver = get_driver('hamrah')
+    if driver is None:
+        print("Failed to initialize WebDriver.")
+        return
 
     print(f"Navigating to {url}...")
     driver.get(url)
@@ -47,13 +27,15 @@ def scrape_hamrah_mechanic():
         # Wait for the page to load completely
         wait = WebDriverWait(driver, 60)
         print("Waiting for page to load...")
-        time.sleep(10)  # Additional wait for dynamic content
+        # Wait for the price tables (XHR-rendered), then until the page stops changing,
+        # instead of fixed 10+5+3 seconds
+        wait_for_selector(driver, HAMRAH_PRICE_TABLES, 10, label='hamrah_prices')
+        wait_for_settle(driver, 3, label='hamrah_load')
         
         # Scroll down to trigger loading of dynamic content
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(5)
+        wait_for_settle(driver, 5, label='hamrah_scroll')
         driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(3)
         
         # Try to find the main container
         main_container_xpath = '//*[@id="__next"]/main/div[4]/div[1]'
@@ -4,6 +4,8 @@ import re
 from datetime import datetime
 import os
 from difflib import SequenceMatcher
+from parallel_pricing import price_ads, add_workers_argument
+from car_catalog import CarCatalog
 
 class ImprovedCarPriceCalculator:
     def __init__(self):
@@ -327,6 +329,13 @@ class ImprovedCarPriceCalculator:
         
         return min(total_depreciation, 0.7), issues_depreciation  # حداکثر 70% افت کل و افت مشکلات جداگانه
     
+    def get_catalog(self):
+        """کاتالوگ کلیدهای استاندارد نام‌های price_dict؛ برای هر price_dict فقط یک بار ساخته می‌شود"""
+        if getattr(self, '_catalog_source', None) is not self.price_dict:
+            self._catalog = CarCatalog(self.price_dict)
+            self._catalog_source = self.price_dict
+        return self._catalog
+    
     def find_market_price(self, car_info, market_df, brand_type=""):
         """یافتن دقیق‌تر قیمت روز با استفاده از برند + تیپ + سال"""
         if market_df is None:
@@ -348,6 +357,11 @@ class ImprovedCarPriceCalculator:
         if not search_terms:
             return None
         
+        # کلید استاندارد (برند، مدل، تیپ، سال)؛ امتیازدهی زیر فقط اگر در کاتالوگ نباشد
+        entry = self.get_catalog().lookup_terms([term for term in (brand_type_lower, car_name) if term], year)
+        if entry is not None:
+            return self.price_dict[entry.name]
+        
         best_match = None
         best_score = 0
         
@@ -389,20 +403,10 @@ class ImprovedCarPriceCalculator:
         estimated_price = market_price * (1 - total_depreciation)
         return max(estimated_price, market_price * 0.25)  # حداقل 25% قیمت روز
     
-    def process_ads(self, divar_file, market_file, output_file):
-        """پردازش کامل آگهی‌ها"""
-        print("بارگذاری داده‌ها...")
-        market_df = self.load_market_prices(market_file)
-        divar_df = self.load_divar_ads(divar_file)
-        
-        if market_df is None or divar_df is None:
-            print("خطا در بارگذاری فایل‌ها")
-            return
-        
+    def price_rows(self, divar_df, market_df):
+        """قیمت‌گذاری ردیف‌های آگهی و برگرداندن لیست نتایج (هسته process_ads)"""
         results = []
         
-        print(f"پردازش {len(divar_df)} آگهی...")
-        
         for index, row in divar_df.iterrows():
             try:
                 # استخراج عنوان و توضیحات
@@ -421,7 +425,7 @@ class ImprovedCarPriceCalculator:
                 )
                 
                 # محاسبه کل افت قیمت
-                total_depreciation = self.calculate_total_depreciation(issues, mileage_depreciation)
+                total_depreciation, issues_depreciation = self.calculate_total_depreciation(issues, mileage_depreciation)
                 
                 # یافتن قیمت روز
                 market_price = self.find_market_price(car_info, market_df)
@@ -451,6 +455,22 @@ class ImprovedCarPriceCalculator:
                 print(f"خطا در پردازش آگهی {index + 1}: {e}")
                 continue
         
+        return results
+    
+    def process_ads(self, divar_file, market_file, output_file, workers=1):
+        """پردازش کامل آگهی‌ها"""
+        print("بارگذاری داده‌ها...")
+        market_df = self.load_market_prices(market_file)
+        divar_df = self.load_divar_ads(divar_file)
+        
+        if market_df is None or divar_df is None:
+            print("خطا در بارگذاری فایل‌ها")
+            return
+        
+        print(f"پردازش {len(divar_df)} آگهی...")
+        
+        results = price_ads(self, divar_df, market_df, workers)
+        
         # ذخیره نتایج
         results_df = pd.DataFrame(results)
         results_df.to_excel(output_file, index=False, engine='openpyxl')
@@ -473,6 +493,10 @@ class ImprovedCarPriceCalculator:
 
 # اجرای اسکریپت بهبود یافته
 if __name__ == "__main__":
+    import argparse
+    parser = add_workers_argument(argparse.ArgumentParser(description="پردازش دسته‌ای آگهی‌های دیوار"))
+    args = parser.parse_args()
+    
     calculator = ImprovedCarPriceCalculator()
     
     # مسیر فایل‌ها
@@ -481,7 +505,7 @@ if __name__ == "__main__":
     output_file = "/Users/erfantaghavi/PycharmProjects/pythonProject/improved_car_price_analysis.xlsx"
     
     # پردازش آگهی‌ها
-    results = calculator.process_ads(divar_file, market_file, output_file)
+    results = calculator.process_ads(divar_file, market_file, output_file, workers=args.workers)
     
     if results is not None:
         print("\n=== نمونه نتایج بهبود یافته ===")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+اسکنر چندکلمه‌ای برای تشخیص مشکلات، موتور/گیربکس و فروش فوری
+
+همه جداول کلمات کلیدی یک بار در یک regex درختی (trie) مشترک کامپایل می‌شوند و متن
+با یک عبور scan بررسی می‌شود. تعداد رخداد هر کلمه در همان عبور جمع می‌شود؛ خروجی
+KeywordHits بررسی وجود، شمارش و فهرست کلمات هر گروه را از همین شمارش‌ها می‌خواند
+و متن را دوباره اسکن نمی‌کند.
+"""
+
+import re
+from collections import Counter
+
+# کلمات کلیدی مشکلات موتور (check_engine_gearbox_issues)
+ENGINE_ISSUE_KEYWORDS = [
+    'موتور تعمیر', 'موتور تعویض', 'موتور خراب', 'موتور معیوب',
+    'تعمیر موتور', 'تعویض موتور', 'خرابی موتور', 'مشکل موتور',
+    'موتور آسیب', 'موتور ضربه', 'موتور سوخته', 'اورهال موتور',
+    'موتور اورهال', 'بازسازی موتور', 'موتور بازسازی', 'موتور تازه تعمیر',
+    'موتور نو', 'موتور جدید', 'تعمیر کامل موتور', 'موتور کامل تعمیر',
+    'موتور نیاز به تعمیر', 'موتور مشکل دار', 'موتور دود می‌کند',
+    'موتور صدا دارد', 'موتور لرزش', 'موتور ویبره', 'موتور گرم می‌کند'
+]
+
+# کلمات کلیدی مشکلات گیربکس (check_engine_gearbox_issues)
+GEARBOX_ISSUE_KEYWORDS = [
+    'گیربکس تعمیر', 'گیربکس تعویض', 'گیربکس خراب', 'گیربکس معیوب',
+    'تعمیر گیربکس', 'تعویض گیربکس', 'خرابی گیربکس', 'مشکل گیربکس',
+    'گیربکس آسیب', 'گیربکس ضربه', 'گیربکس سوخته', 'اورهال گیربکس',
+    'گیربکس اورهال', 'بازسازی گیربکس', 'گیربکس بازسازی', 'گیربکس تازه تعمیر',
+    'گیربکس نو', 'گیربکس جدید', 'تعمیر کامل گیربکس', 'گیربکس کامل تعمیر',
+    'گیربکس نیاز به تعمیر', 'گیربکس مشکل دار', 'گیربکس صدا دارد',
+    'گیربکس سخت می‌گیرد', 'دنده سخت', 'دنده نمی‌گیرد', 'کلاچ تعمیر',
+    'کلاچ خراب', 'کلاچ معیوب', 'مشکل کلاچ', 'کلاچ سوخته'
+]
+
+# کلمات کلیدی فروش فوری (check_urgent_sale_keywords)
+URGENT_SALE_KEYWORDS = [
+    'پول لازم', 'فروش فوری', 'نیاز مالی', 'زیر قیمت',
+    'فوری فروش', 'نقدی فوری', 'ضروری فروش', 'سریع فروش',
+    'گیر پولم', 'عجله دارم', 'فوری نقد', 'قیمت پایین', 'ارزان فروش'
+]
+
+DESCRIPTION_TABLES = {
+    'engine': ENGINE_ISSUE_KEYWORDS,
+    'gearbox': GEARBOX_ISSUE_KEYWORDS,
+    'urgent': URGENT_SALE_KEYWORDS,
+}
+
+
+class KeywordHits:
+    """نتیجه یک بار اسکن متن: تعداد رخداد هر کلمه کلیدی موجود در متن"""
+
+    def __init__(self, scanner, counts):
+        self.scanner = scanner
+        self.counts = counts
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def has(self, keyword):
+        return keyword in self.counts
+
+    def count(self, keyword):
+        """تعداد رخدادهای بدون هم‌پوشانی (همان رفتار str.count)"""
+        return self.counts.get(keyword, 0)
+
+    def found(self, group):
+        """کلمات یافت‌شده از یک گروه، به ترتیب جدول"""
+        if not self.any(group):
+            return []
+        return [keyword for keyword in self.scanner.tables[group] if keyword in self.counts]
+
+    def any(self, group):
+        return not self.scanner.group_sets[group].isdisjoint(self.counts)
+
+    def count_present(self, group):
+        """تعداد کلمات متفاوت یک گروه که در متن آمده‌اند"""
+        return len(self.scanner.group_sets[group] & self.counts.keys())
+
+    def count_all(self, group):
+        """مجموع تعداد رخدادهای همه کلمات یک گروه"""
+        return sum(self.counts[keyword] for keyword in self.scanner.group_sets[group] & self.counts.keys())
+
+
+class KeywordScanner:
+    """
+    اسکنر کامپایل‌شده برای چند جدول کلمه کلیدی
+
+    کلمات همه جداول (بدون تکرار) در یک regex درختی جمع می‌شوند که در هر موقعیت
+    طولانی‌ترین کلمه را پیدا می‌کند. کلمات داخل یک تطبیق (مثل «رنگ» در «رنگ شده») از
+    جدول inner همان کلمه شمرده می‌شوند و اگر انتهای کلمه می‌تواند ابتدای کلمه دیگری
+    باشد (مثل «موتور تعمیر» و «تعمیر موتور»)، جستجو از همان نقطه ادامه می‌یابد. نتیجه
+    دقیقاً با بررسی تک‌تک کلمات با `in` و `str.count` یکسان است.
+
+    Parameters
+    ----------
+    tables : dict
+        نام گروه -> لیست کلمات کلیدی (ترتیب لیست در found حفظ می‌شود)
+    """
+
+    def __init__(self, tables):
+        self.tables = {group: [keyword.lower() for keyword in keywords] for group, keywords in tables.items()}
+        self.group_sets = {group: frozenset(keywords) for group, keywords in self.tables.items()}
+        keywords = {keyword for group_keywords in self.tables.values() for keyword in group_keywords if keyword}
+        self.pattern = re.compile(_trie_pattern(keywords)) if keywords else None
+        self.matches = _build_matches(keywords)
+        # بدون کلمه‌ای که انتهایش ابتدای کلمه دیگری باشد، همه رخدادها داخل تطبیق‌های
+        # بدون هم‌پوشانی findall هستند و شمارش از تعداد هر تطبیق به دست می‌آید
+        self.disjoint = all(resume == len(keyword) for keyword, (inner, resume) in self.matches.items())
+        self.inner_counts = {keyword: _count_inner(inner) for keyword, (inner, resume) in self.matches.items()}
+
+    def scan(self, text):
+        """شمارش همه کلمات موجود در متن با یک عبور regex"""
+        if not text or self.pattern is None:
+            return KeywordHits(self, {})
+
+        text = text.lower()
+        if self.disjoint:
+            counts = {}
+            for match, times in Counter(self.pattern.findall(text)).items():
+                for keyword, inner_count in self.inner_counts[match]:
+                    counts[keyword] = counts.get(keyword, 0) + times * inner_count
+            return KeywordHits(self, counts)
+
+        counts = {}
+        # اولین موقعیتی که رخداد بعدی هر کلمه می‌تواند شروع شود (شمارش بدون هم‌پوشانی)
+        next_start = {}
+        search = self.pattern.search
+        match = search(text)
+        while match:
+            start = match.start()
+            inner, resume = self.matches[match.group()]
+            for offset, keyword in inner:
+                position = start + offset
+                if position >= next_start.get(keyword, 0):
+                    counts[keyword] = counts.get(keyword, 0) + 1
+                    next_start[keyword] = position + len(keyword)
+            match = search(text, start + resume)
+        return KeywordHits(self, counts)
+
+
+def _trie_pattern(keywords):
+    """regex درختی که در هر موقعیت طولانی‌ترین کلمه کلیدی را تطبیق می‌دهد"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if '' in node else '')
+
+    return build(trie)
+
+
+def _build_matches(keywords):
+    """
+    برای هر کلمه: کلمات داخل آن و فاصله ادامه جستجو بعد از تطبیق آن
+
+    Returns
+    -------
+    dict
+        کلمه -> (لیست (فاصله، کلمه) مرتب بر اساس فاصله، فاصله ادامه جستجو)؛ جستجو از
+        اولین فاصله‌ای ادامه می‌یابد که بقیه کلمه ابتدای کلمه بلندتری است و کلمات داخل
+        قبل از آن فاصله در inner هستند
+    """
+    prefixes = {keyword[:length] for keyword in keywords for length in range(1, len(keyword))}
+    matches = {}
+    for keyword in keywords:
+        resume = next((offset for offset in range(1, len(keyword)) if keyword[offset:] in prefixes), len(keyword))
+        inner = sorted((offset, other) for offset in range(resume) for other in keywords
+                       if keyword.startswith(other, offset))
+        matches[keyword] = (inner, resume)
+    return matches
+
+
+def _count_inner(inner):
+    """تعداد رخدادهای بدون هم‌پوشانی هر کلمه داخل یک تطبیق"""
+    counts = {}
+    next_start = {}
+    for offset, keyword in inner:
+        if offset >= next_start.get(keyword, 0):
+            counts[keyword] = counts.get(keyword, 0) + 1
+            next_start[keyword] = offset + len(keyword)
+    return list(counts.items())
+
+
+_scanners = {}
+
+
+def get_scanner(tables):
+    """اسکنر مشترک برای یک مجموعه جدول (هر مجموعه فقط یک بار کامپایل می‌شود)"""
+    key = tuple((group, tuple(keywords)) for group, keywords in tables.items())
+    scanner = _scanners.get(key)
+    if scanner is None:
+        scanner = KeywordScanner(tables)
+        _scanners[key] = scanner
+    return scanner
+
+
+def scan_description(description):
+    """اسکن توضیحات آگهی با جداول موتور/گیربکس/فروش فوری"""
+    return get_scanner(DESCRIPTION_TABLES).scan(description)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+جمع‌آوری افزایشی لینک آگهی‌های صفحه لیست دیوار با یک execute_script در هر مرحله
+
+getads قبلی بعد از هر اسکرول همه article ها را با find_elements می‌گرفت و برای هر
+کارت find_element('a') و get_attribute('href') صدا می‌زد (دو رفت و برگشت WebDriver
+برای هر کارت، حتی کارت‌هایی که قبلاً دیده شده بودند). اینجا یک MutationObserver در
+صفحه کارت‌های تازه (اضافه‌شده یا با href تغییرکرده) را در صف نگه می‌دارد و هر
+harvest فقط همین صف را تخلیه می‌کند: href و متن قابل مشاهده کارت‌های جدید در یک
+رفت و برگشت.
+
+وضعیت صفحه در window.__listingHarvest است؛ با بارگذاری سند جدید (رفتن به صفحه دیگر
+یا restart درایور) از نو ساخته می‌شود و لینک‌های جمع‌شده هم از نو شروع می‌شوند.
+"""
+
+import time
+
+# arguments[0]: سلکتور کارت آگهی
+HARVEST_SCRIPT = """
+var selector = arguments[0];
+var state = window.__listingHarvest;
+var fresh = !state;
+if (fresh) {
+    state = window.__listingHarvest = {pending: new Set(), seen: new Set()};
+    var enqueue = function (card) { if (card) { state.pending.add(card); } };
+    document.querySelectorAll(selector).forEach(enqueue);
+    new MutationObserver(function (mutations) {
+        mutations.forEach(function (mutation) {
+            if (mutation.type === 'attributes') {
+                enqueue(mutation.target.closest(selector));
+                return;
+            }
+            mutation.addedNodes.forEach(function (node) {
+                if (node.nodeType !== 1) { return; }
+                var card = node.closest(selector);
+                if (card) { enqueue(card); } else { node.querySelectorAll(selector).forEach(enqueue); }
+            });
+        });
+    }).observe(document.body, {childList: true, subtree: true, attributes: true, attributeFilter: ['href']});
+}
+var cards = [];
+state.pending.forEach(function (card) {
+    if (!card.isConnected) { return; }
+    var link = card.querySelector('a');
+    var href = link ? link.href : '';
+    if (href.indexOf('/v/') === -1 || state.seen.has(href)) { return; }
+    state.seen.add(href);
+    var lines = (card.innerText || '').split('\\n').map(function (line) { return line.trim(); })
+        .filter(function (line) { return line; });
+    cards.push({href: href, title: lines[0] || '', lines: lines.slice(1)});
+});
+state.pending.clear();
+return {fresh: fresh, cards: cards};
+"""
+
+
+class ListingHarvester:
+    """
+    لینک و متن کارت‌های آگهی صفحه لیست فعلی
+
+    Parameters
+    ----------
+    selector : str
+        سلکتور CSS کارت آگهی
+    """
+
+    def __init__(self, selector='article'):
+        self.selector = selector
+        # href -> {'href', 'title', 'lines'} به ترتیب ظاهر شدن در صفحه
+        self.cards = {}
+        self.calls = 0
+        self.elapsed = 0.0
+
+    def harvest(self, driver):
+        """
+        کارت‌هایی که از harvest قبلی روی همین صفحه ظاهر شده‌اند
+
+        Returns
+        -------
+        list of dict
+            href، title (سطر اول متن کارت) و lines (بقیه سطرها: کارکرد، قیمت، زمان و محل)
+        """
+        start_time = time.perf_counter()
+        result = driver.execute_script(HARVEST_SCRIPT, self.selector)
+        self.calls += 1
+        self.elapsed += time.perf_counter() - start_time
+        if result['fresh']:
+            self.cards = {}
+        new_cards = [card for card in result['cards'] if card['href'] not in self.cards]
+        for card in new_cards:
+            self.cards[card['href']] = card
+        return new_cards
+
+    def links(self):
+        """همه لینک‌های جمع‌شده از صفحه فعلی"""
+        return list(self.cards)
+
+    def summary(self):
+        mean = self.elapsed / self.calls * 1000 if self.calls else 0
+        return f"{self.calls} فراخوانی (میانگین {mean:.1f}ms)، {len(self.cards)} لینک در صفحه فعلی"
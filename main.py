@@ -10,13 +10,10 @@ import sys
 import time
 import pandas as pd
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
 import time
 import random
@@ -28,20 +25,50 @@ import signal
 import sys
 from bs4 import BeautifulSoup
 import re
-import concurrent.futures
+import threading
 
 # Import market price scrapers
 try:
-    from combined_scraper import scrape_hamrah_mechanic, scrape_z4car
+    from combined_scraper import scrape_market_sources
     MARKET_PRICE_AVAILABLE = True
     print("✅ اسکرایپرهای قیمت بازار بهبود یافته با موفقیت بارگذاری شدند")
 except ImportError as e:
     print(f"⚠️ خطا در بارگذاری اسکرایپرهای قیمت بازار: {e}")
     MARKET_PRICE_AVAILABLE = False
 
-# Import webdriver_manager for both local and GitHub Actions
-import os
-from webdriver_manager.chrome import ChromeDriverManager
+# پارسر snapshot صفحه آگهی (یک بار page_source به جای ده‌ها find_element)
+try:
+    from divar_ad_parser import parse_ad_page, has_required_fields
+    AD_PARSER_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ پارسر HTML آگهی در دسترس نیست: {e}")
+    AD_PARSER_AVAILABLE = False
+
+# دریافت HTTP صفحه آگهی (requests.Session مشترک) با fallback مرورگر
+try:
+    from ad_fetcher import AdFetcher
+    AD_FETCHER_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ دریافت HTTP آگهی‌ها در دسترس نیست: {e}")
+    AD_FETCHER_AVAILABLE = False
+
+# ایندکس نام خودروهای بازار و امتیاز تطابق نام
+from market_index import MarketNameIndex
+from car_catalog import CarCatalog, parse_year
+from keyword_scanner import scan_description
+from result_store import ResultStore, DEFAULT_DB_FILE
+from excel_exporter import export_rows, export_dataframe
+from seen_registry import SeenRegistry, ad_id_from_url
+from browser_pool import BrowserPool
+from market_snapshot import (PriceSnapshot, load_snapshot, diff_snapshots, apply_price_changes, DEFAULT_SNAPSHOT_FILE,
+                             SNAPSHOT_MAX_AGE_HOURS)
+from price_history import PriceHistory
+
+from driver_factory import get_driver, get_factory
+from resource_policy import ResourcePolicy
+from page_waits import get_wait_stats, page_state, wait_for_growth, wait_for_selector
+from listing_harvester import ListingHarvester
+from challenge_probe import ChallengeMonitor
 import subprocess  # برای صدای هشدار در مک
 try:
     import winsound  # برای صدای هشدار در ویندوز
@@ -72,6 +99,7 @@ def signal_handler(signum, frame):
             print("✅ مرورگر بسته شد")
     except:
         pass
+    get_factory().close()
     
     print(f"🎯 تعداد کل آگهی‌های پردازش شده: {processed_count}")
     print("👋 خروج از برنامه...")
@@ -96,49 +124,53 @@ except ImportError as e:
     print(f"⚠️ خطا در بارگذاری سیستم افت قیمت: {e}")
     IMPROVED_PRICING_AVAILABLE = False
 
+# موتور قیمت‌گذاری سراسری: فایل قیمت بازار فقط در صورت تغییر دوباره خوانده می‌شود
+try:
+    from pricing_engine import get_pricing_engine
+    PRICING_ENGINE_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ موتور قیمت‌گذاری سراسری در دسترس نیست: {e}")
+    PRICING_ENGINE_AVAILABLE = False
+
 # دیکشنری برای ذخیره قیمت‌های بازار
 market_prices = {}
+# snapshot دودویی منبع اصلی قیمت‌هاست؛ اکسل فقط خروجی برای مشاهده است
+MARKET_SNAPSHOT_FILE = DEFAULT_SNAPSHOT_FILE
+MARKET_EXCEL_FILE = 'combined_market_prices.xlsx'
+market_snapshot = None
+# python main.py --refresh-prices (یا python cli.py crawl --refresh-prices)
+FORCE_MARKET_REFRESH = '--refresh-prices' in sys.argv[1:]
+# هر به‌روزرسانی قیمت‌ها فقط تغییرات را اعمال می‌کند و به این توابع می‌دهد:
+# listener(changes, affected_keys) تا فقط آگهی‌های متأثر دوباره قیمت‌گذاری شوند
+last_market_changes = None
+market_change_listeners = []
+# هر snapshot دریافت‌شده به تاریخچه قیمت‌ها (در پایگاه نتایج) اضافه می‌شود
+price_history = None
+# قیمت بازار هر آگهی از تاریخچه در زمان انتشار آن (به جای قیمت فعلی) خوانده شود (--price-as-of-posting)
+PRICE_AS_OF_POSTING = '--price-as-of-posting' in sys.argv[1:]
 
 def fetch_market_prices(force_update=False):
     """دریافت قیمت‌های بازار از منابع مختلف با بهینه‌سازی سرعت
     
     Args:
-        force_update (bool): اگر True باشد، بدون توجه به زمان فایل، داده‌ها مجدداً استخراج می‌شوند
+        force_update (bool): اگر True باشد، بدون توجه به زمان snapshot، داده‌ها مجدداً استخراج می‌شوند
     """
-    global market_prices
-    
-    # بررسی وجود فایل اکسل قبلی برای جلوگیری از استخراج مجدد
-    excel_file = 'combined_market_prices.xlsx'
-    use_cached_data = False
-    
-    if not force_update and os.path.exists(excel_file):
-        try:
-            # بررسی تاریخ فایل - اگر کمتر از 12 ساعت از ایجاد آن گذشته باشد، از آن استفاده کن
-            file_time = os.path.getmtime(excel_file)
-            current_time = time.time()
-            hours_diff = (current_time - file_time) / 3600
-            
-            # کاهش زمان به 12 ساعت برای اطمینان از به‌روز بودن داده‌ها
-            if hours_diff < 12:  # اگر کمتر از 12 ساعت گذشته باشد
+    global market_prices, market_snapshot
+    
+    # بررسی snapshot قبلی برای جلوگیری از استخراج مجدد (بارگذاری در چند میلی‌ثانیه)
+    if not force_update:
+        snapshot = load_snapshot(MARKET_SNAPSHOT_FILE)
+        if snapshot is not None:
+            # اگر کمتر از 12 ساعت از ساخت snapshot گذشته باشد، از آن استفاده کن
+            hours_diff = snapshot.age_hours
+            if hours_diff < SNAPSHOT_MAX_AGE_HOURS:
                 print(f"📊 استفاده از قیمت‌های ذخیره شده قبلی ({hours_diff:.1f} ساعت پیش)")
-                df = pd.read_excel(excel_file)
-                combined_data = {}
-                
-                for _, row in df.iterrows():
-                    name = row['نام خودرو']
-                    hamrah_price = row['قیمت همراه مکانیک (تومان)']
-                    z4car_price = row['قیمت زد فور (تومان)']
-                    combined_data[name] = {'hamrah_mechanic': hamrah_price, 'z4car': z4car_price}
-                
-                market_prices = combined_data
-                print(f"✅ {len(combined_data)} قیمت خودرو از فایل قبلی بارگذاری شد")
-                use_cached_data = True
-                return combined_data
-            else:
-                print(f"⚠️ فایل قیمت‌های بازار قدیمی است ({hours_diff:.1f} ساعت). در حال به‌روزرسانی...")
-        except Exception as e:
-            print(f"⚠️ خطا در بارگذاری فایل قبلی: {e}")
-    elif force_update:
+                market_prices = snapshot.to_market_prices()
+                market_snapshot = snapshot
+                print(f"✅ {len(market_prices)} قیمت خودرو از snapshot قبلی بارگذاری شد")
+                return market_prices
+            print(f"⚠️ snapshot قیمت‌های بازار قدیمی است ({hours_diff:.1f} ساعت). در حال به‌روزرسانی...")
+    else:
         print("🔄 درخواست به‌روزرسانی اجباری قیمت‌های بازار...")
     
     if not MARKET_PRICE_AVAILABLE:
@@ -147,124 +179,102 @@ def fetch_market_prices(force_update=False):
     
     print("🔍 در حال دریافت قیمت‌های بازار...")
     
-    # اجرای بهینه‌شده اسکرایپرها با تایم‌اوت کوتاه‌تر
+    # اجرای هم‌زمان اسکرایپرها با تایم‌اوت 2 دقیقه (در صورت timeout نتایج جزئی)
     try:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            # اجرای همزمان با تایم‌اوت کاهش یافته
-            hamrah_future = executor.submit(scrape_hamrah_mechanic, force_update)
-            z4car_future = executor.submit(scrape_z4car, force_update)
-            
-            # دریافت نتایج با تایم‌اوت کاهش یافته
-            hamrah_data = hamrah_future.result(timeout=120)  # کاهش به 2 دقیقه
-            z4car_data = z4car_future.result(timeout=120)    # کاهش به 2 دقیقه
-            
-            # ادغام سریع داده‌ها - محاسبه قیمت روز از میانگین
-            combined_data = {}
-            
-            # پردازش داده‌های همراه مکانیک
-            if hamrah_data:
-                for car in hamrah_data:
-                    name = car.get('نام خودرو')
-                    price_str = car.get('قیمت (تومان)')
-                    if name and price_str:
-                        # استخراج عدد از قیمت
-                        price_num = int(re.sub(r'[^\d]', '', str(price_str))) if re.sub(r'[^\d]', '', str(price_str)) else 0
-                        if price_num > 0:
-                            combined_data[name] = {'prices': [price_num], 'count': 1}
-            
-            # پردازش داده‌های زد فور
-            if z4car_data:
-                for car in z4car_data:
-                    name = car.get('نام خودرو')
-                    price_str = car.get('قیمت (تومان)')
-                    if name and price_str:
-                        # استخراج عدد از قیمت
-                        price_num = int(re.sub(r'[^\d]', '', str(price_str))) if re.sub(r'[^\d]', '', str(price_str)) else 0
-                        if price_num > 0:
-                            if name in combined_data:
-                                combined_data[name]['prices'].append(price_num)
-                                combined_data[name]['count'] += 1
-                            else:
-                                combined_data[name] = {'prices': [price_num], 'count': 1}
-            
-            # محاسبه قیمت روز از میانگین قیمت‌ها
-            market_prices = {}
-            for name, data in combined_data.items():
-                avg_price = sum(data['prices']) / len(data['prices'])
-                market_prices[name] = {'market_price': int(avg_price)}
-            
-            # ذخیره در فایل اکسل برای استفاده بعدی
-            save_market_prices_to_excel(combined_data)
-            
-            print(f"✅ قیمت‌های بازار برای {len(combined_data)} خودرو دریافت شد")
-            return combined_data
-            
-    except concurrent.futures.TimeoutError:
-        print("⚠️ زمان استخراج قیمت‌ها به پایان رسید. استفاده از داده‌های موجود...")
-        # تلاش برای استفاده از نتایج جزئی
-        combined_data = {}
-        
-        try:
-            if hamrah_future.done():
-                hamrah_data = hamrah_future.result(timeout=1)
-                for car in hamrah_data:
-                    car_name = car['نام خودرو']
-                    price = car['قیمت (تومان)']
-                    combined_data[car_name] = {'hamrah_mechanic': price, 'z4car': None}
-        except Exception as e:
-            print(f"⚠️ خطا در دریافت داده‌های همراه مکانیک: {e}")
-            
-        try:
-            if z4car_future.done():
-                z4car_data = z4car_future.result(timeout=1)
-                for car in z4car_data:
-                    car_name = car['نام خودرو']
-                    price = car['قیمت (تومان)']
-                    if car_name not in combined_data:
-                        combined_data[car_name] = {'hamrah_mechanic': None, 'z4car': price}
-                    else:
-                        combined_data[car_name]['z4car'] = price
-        except Exception as e:
-            print(f"⚠️ خطا در دریافت داده‌های زد فور: {e}")
-            
-        if combined_data:
-            market_prices = combined_data
-            save_market_prices_to_excel(combined_data)
-            print(f"✅ قیمت‌های بازار جزئی برای {len(combined_data)} خودرو دریافت شد")
-            return combined_data
-        
-        return {}
-        
+        source_data = scrape_market_sources(force_update, timeout=120)
+        # ادغام منابع و محاسبه قیمت روز از میانگین در snapshot
+        snapshot = PriceSnapshot.from_sources(source_data)
+        if len(source_data) < 2 and len(snapshot):
+            print(f"✅ قیمت‌های بازار جزئی برای {len(snapshot)} خودرو دریافت شد")
     except Exception as e:
         print(f"❌ خطا در دریافت قیمت‌های بازار: {e}")
         return {}
+    
+    if not len(snapshot):
+        return {}
+    
+    # تفاوت با snapshot قبلی؛ در حافظه فقط همین تغییرات اعمال می‌شوند
+    previous = market_snapshot or load_snapshot(MARKET_SNAPSHOT_FILE)
+    changes = diff_snapshots(previous, snapshot)
+    print(f"🔁 تغییرات قیمت بازار: {changes.summary()}")
+    if market_prices:
+        affected_keys = apply_market_changes(changes)
+    else:
+        market_prices = snapshot.to_market_prices()
+        affected_keys = set()
+    market_snapshot = snapshot
+    save_market_snapshot(snapshot, export_excel=bool(changes) or not os.path.exists(MARKET_EXCEL_FILE))
+    record_market_history(snapshot)
+    notify_market_changes(changes, affected_keys)
+    print(f"✅ قیمت‌های بازار برای {len(snapshot)} خودرو دریافت شد")
+    return market_prices
+
+def get_price_history():
+    """تاریخچه قیمت‌ها (اتصال یک بار و در اولین استفاده باز می‌شود)"""
+    global price_history
+    if price_history is None:
+        price_history = PriceHistory(RESULTS_DB_FILE)
+    return price_history
+
+def record_market_history(snapshot):
+    try:
+        rows = get_price_history().record_snapshot(snapshot)
+        if rows:
+            print(f"📈 {rows} قیمت به تاریخچه قیمت‌ها اضافه شد")
+    except Exception as e:
+        print(f"⚠️ خطا در ثبت تاریخچه قیمت‌ها: {e}")
 
-def save_market_prices_to_excel(data):
-    """ذخیره قیمت‌های روز در فایل اکسل"""
+def notify_market_changes(changes, affected_keys):
+    """ارسال مجموعه تغییرات به مصرف‌کننده‌ها (فقط اگر چیزی تغییر کرده باشد)"""
+    global last_market_changes
+    last_market_changes = changes
+    if not changes:
+        return
+    for listener in market_change_listeners:
+        try:
+            listener(changes, affected_keys)
+        except Exception as e:
+            print(f"⚠️ خطا در اعمال تغییرات قیمت: {e}")
+
+def save_market_snapshot(snapshot, export_excel=True):
+    """ذخیره snapshot قیمت‌ها و خروجی اکسل آن برای مشاهده"""
     try:
-        # تبدیل دیکشنری به دیتافریم
-        rows = []
-        for car_name, prices in data.items():
-            row = {
-                'نام خودرو': car_name,
-                'قیمت روز (تومان)': prices['market_price']
-            }
-            rows.append(row)
-        
-        df = pd.DataFrame(rows)
-        
-        # ذخیره در فایل اکسل
-        df.to_excel('combined_market_prices.xlsx', index=False)
-        print("✅ قیمت‌های روز در فایل combined_market_prices.xlsx ذخیره شدند")
+        snapshot.save(MARKET_SNAPSHOT_FILE)
+        print(f"✅ snapshot قیمت‌های بازار در {MARKET_SNAPSHOT_FILE} ذخیره شد")
+    except Exception as e:
+        print(f"❌ خطا در ذخیره snapshot قیمت‌ها: {e}")
+    if not export_excel:
+        return
+    try:
+        snapshot.export_excel(MARKET_EXCEL_FILE)
+        print(f"✅ قیمت‌های روز در فایل {MARKET_EXCEL_FILE} ذخیره شدند")
     except Exception as e:
         print(f"❌ خطا در ذخیره قیمت‌های روز: {e}")
 
-def get_market_price_for_car(car_name, force_update=False):
-    """دریافت قیمت بازار برای یک خودروی خاص با الگوریتم تطبیق بهینه‌شده"""
-    global market_prices
+def apply_market_changes(changes):
+    """
+    اعمال تغییرات قیمت روی market_prices، ایندکس نام‌ها و کش تطبیق get_market_price_for_car
+
+    Returns
+    -------
+    set
+        کلیدهای کش (نام خودروی جستجوشده) که قیمت یا تطبیق آن‌ها عوض شده است
+    """
+    index = getattr(get_market_price_for_car, 'index', None)
+    catalog = getattr(get_market_price_for_car, 'catalog', None)
+    if getattr(get_market_price_for_car, 'index_source', None) is not market_prices:
+        index = catalog = None
+    return apply_price_changes(market_prices, changes, index, getattr(get_market_price_for_car, 'cache', None), catalog)
+
+def get_market_price_for_car(car_name, force_update=False, year=None):
+    """دریافت قیمت بازار برای یک خودروی خاص با الگوریتم تطبیق بهینه‌شده (year: سال آگهی برای کاتالوگ)"""
+    global market_prices, market_snapshot
     
-    # کش برای جلوگیری از محاسبات تکراری
+    # کش برای جلوگیری از محاسبات تکراری (سال به شکلی که کاتالوگ هم از کلید کش بخواند)
     cache_key = car_name.strip().lower()
+    year = parse_year(year)
+    if year:
+        cache_key = f"{cache_key} مدل {year}"
     
     # اگر به‌روزرسانی اجباری نباشد، از کش استفاده کن
     if not force_update and hasattr(get_market_price_for_car, 'cache') and cache_key in get_market_price_for_car.cache:
@@ -280,17 +290,13 @@ def get_market_price_for_car(car_name, force_update=False):
             print("🔄 به‌روزرسانی اجباری قیمت‌های بازار...")
             fetch_market_prices(force_update=True)
         else:
-            # اگر قیمت‌های بازار قبلاً دریافت نشده‌اند، سعی کن از فایل اکسل بخوان
-            try:
-                df = pd.read_excel('combined_market_prices.xlsx')
-                market_prices = {}
-                for _, row in df.iterrows():
-                    name = row['نام خودرو']
-                    market_price = row['قیمت روز (تومان)']
-                    market_prices[name] = {'market_price': market_price}
-                print(f"✅ قیمت‌های روز از فایل اکسل برای {len(market_prices)} خودرو بارگذاری شدند")
-            except Exception as e:
-                print(f"⚠️ خطا در بارگذاری قیمت‌های بازار از فایل اکسل: {e}")
+            # اگر قیمت‌های بازار قبلاً دریافت نشده‌اند، سعی کن از snapshot بخوان
+            snapshot = load_snapshot(MARKET_SNAPSHOT_FILE)
+            if snapshot is not None:
+                market_prices = snapshot.to_market_prices()
+                market_snapshot = snapshot
+                print(f"✅ قیمت‌های روز از snapshot برای {len(market_prices)} خودرو بارگذاری شدند")
+            else:
                 # اگر فایل وجود نداشت، قیمت‌ها را دریافت کن
                 fetch_market_prices()
     
@@ -300,53 +306,31 @@ def get_market_price_for_car(car_name, force_update=False):
         get_market_price_for_car.cache[cache_key] = result
         return result
     
-    # پیش‌پردازش نام خودرو برای تطبیق بهتر
-    processed_car_name = car_name.lower().strip().replace('،', ' ').replace(',', ' ')
-    
-    # فیلتر اولیه برای کاهش تعداد مقایسه‌ها
-    # ابتدا بررسی کن آیا نام دقیقاً در لیست وجود دارد
-    if processed_car_name in [name.lower().strip() for name in market_prices.keys()]:
-        for name in market_prices.keys():
-            if name.lower().strip() == processed_car_name:
-                result = market_prices[name]
-                get_market_price_for_car.cache[cache_key] = result
-                return result
-    
-    # جستجوی خودرو در قیمت‌های بازار با الگوریتم بهینه‌شده
-    best_matches = []
-    
-    # استخراج کلمات کلیدی از نام خودرو
-    car_name_words = set(processed_car_name.split())
-    important_words = [w for w in car_name_words if len(w) > 2 and w not in {'و', 'با', 'در', 'از', 'به'}]
-    
-    # فیلتر اولیه برای کاهش تعداد مقایسه‌ها
-    candidates = []
-    for market_car_name in market_prices.keys():
-        # بررسی سریع برای فیلتر کردن موارد نامرتبط
-        market_name_lower = market_car_name.lower()
-        if any(word in market_name_lower for word in important_words):
-            candidates.append(market_car_name)
-    
-    # اگر کاندیدایی پیدا نشد، از همه خودروها استفاده کن
-    if not candidates and len(market_prices) < 100:  # فقط اگر تعداد خودروها کم باشد
-        candidates = list(market_prices.keys())
-    
-    # محاسبه امتیاز برای کاندیداها
-    for market_car_name in candidates:
-        score = calculate_name_match_score(car_name, market_car_name)
-        if score > 0.4:  # فقط موارد با امتیاز بالاتر از آستانه را نگه دار
-            best_matches.append((market_car_name, score))
-    
-    # مرتب‌سازی بر اساس امتیاز
-    best_matches.sort(key=lambda x: x[1], reverse=True)
+    # ایندکس معکوس نام‌ها و کاتالوگ کلیدها فقط یک بار برای هر snapshot از market_prices ساخته می‌شوند
+    index = getattr(get_market_price_for_car, 'index', None)
+    if index is None or getattr(get_market_price_for_car, 'index_source', None) is not market_prices:
+        index = MarketNameIndex(market_prices.keys())
+        if market_snapshot is not None and market_snapshot.names == list(market_prices):
+            get_market_price_for_car.catalog = market_snapshot.catalog()
+        else:
+            get_market_price_for_car.catalog = CarCatalog(market_prices.keys())
+        get_market_price_for_car.index = index
+        get_market_price_for_car.index_source = market_prices
+        get_market_price_for_car.cache = {}
+    
+    # کلید استاندارد (برند، مدل، تیپ)؛ تطبیق فازی فقط اگر در کاتالوگ نباشد
+    entry = get_market_price_for_car.catalog.lookup(car_name, year)
+    if entry is not None:
+        best_match, best_score = entry.name, 1.0
+    else:
+        best_match, best_score = index.best_match(car_name)
     
     # اگر تطابقی پیدا شد و امتیاز آن کافی است
-    if best_matches and best_matches[0][1] > 0.5:
-        best_match = best_matches[0][0]
+    if best_match is not None and best_score > 0.5:
         result = market_prices[best_match]
         # افزودن اطلاعات تطابق
         result['matched_name'] = best_match
-        result['match_score'] = best_matches[0][1]
+        result['match_score'] = best_score
         # ذخیره در کش
         get_market_price_for_car.cache[cache_key] = result
         return result
@@ -356,199 +340,55 @@ def get_market_price_for_car(car_name, force_update=False):
     get_market_price_for_car.cache[cache_key] = result
     return result
 
-def calculate_name_match_score(name1, name2):
-    """محاسبه امتیاز تطابق بین دو نام خودرو با الگوریتم پیشرفته"""
-    # پیش‌پردازش نام‌ها
-    name1 = name1.lower().strip().replace('،', ' ').replace(',', ' ')
-    name2 = name2.lower().strip().replace('،', ' ').replace(',', ' ')
-    
-    # حذف کلمات بی‌اهمیت
-    stop_words = {'و', 'با', 'در', 'از', 'به', 'که', 'این', 'است', 'برای', 'یک', 'را', 'با', 'هم', 'خودرو', 'ماشین', 'اتومبیل'}
-    
-    # اگر نام‌ها دقیقاً یکسان باشند
-    if name1 == name2:
-        return 1.0
-    
-    # بررسی اگر یکی شامل دیگری باشد
-    if name1 in name2 or name2 in name1:
-        return 0.9
-    
-    # تقسیم به کلمات و حذف کلمات بی‌اهمیت
-    words1 = [w for w in name1.split() if w not in stop_words and len(w) > 1]
-    words2 = [w for w in name2.split() if w not in stop_words and len(w) > 1]
-    
-    # اگر پس از حذف کلمات بی‌اهمیت، کلمه‌ای باقی نماند
-    if not words1 or not words2:
-        return 0.0
-    
-    # تبدیل به مجموعه برای محاسبه اشتراک
-    set_words1 = set(words1)
-    set_words2 = set(words2)
-    common_words = set_words1.intersection(set_words2)
-    
-    # محاسبه امتیاز جاکارد (نسبت اشتراک به اجتماع)
-    jaccard_score = len(common_words) / len(set_words1.union(set_words2)) if set_words1 or set_words2 else 0
-    
-    # محاسبه امتیاز تطابق دقیق کلمات (با وزن بیشتر)
-    exact_match_score = len(common_words) / min(len(set_words1), len(set_words2)) if common_words else 0
-    
-    # بررسی تطابق برند و مدل (کلمات اول و دوم معمولاً برند و مدل هستند)
-    brand_model_score = 0
-    if len(words1) >= 1 and len(words2) >= 1:
-        # بررسی تطابق کلمه اول (معمولاً برند)
-        if words1[0] == words2[0]:
-            brand_model_score += 0.5
-        # بررسی تطابق کلمه دوم (معمولاً مدل) اگر وجود داشته باشد
-        if len(words1) >= 2 and len(words2) >= 2 and words1[1] == words2[1]:
-            brand_model_score += 0.3
-    
-    # بررسی تطابق جزئی کلمات (برای مواردی که کلمات مشابه اما نه دقیقاً یکسان هستند)
-    partial_match_score = 0
-    for w1 in words1:
-        for w2 in words2:
-            if w1 != w2 and (w1 in w2 or w2 in w1) and min(len(w1), len(w2)) > 2:
-                # امتیاز بر اساس نسبت طول کلمه کوتاه‌تر به بلندتر
-                partial_match_score += min(len(w1), len(w2)) / max(len(w1), len(w2))
-    
-    # نرمال‌سازی امتیاز تطابق جزئی
-    max_possible_partial = max(len(words1), len(words2))
-    if max_possible_partial > 0:
-        partial_match_score = min(partial_match_score / max_possible_partial, 1.0)
-    
-    # ترکیب امتیازها با وزن‌های مختلف
-    final_score = (jaccard_score * 0.3) + (exact_match_score * 0.3) + (brand_model_score * 0.3) + (partial_match_score * 0.1)
-    
-    # محدود کردن امتیاز نهایی بین 0 و 1
-    return min(max(final_score, 0.0), 1.0)
-
-
-##driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()))
-
-# مسیر پروفایل کاربری منحصر به فرد
 
-import os
-profile_path = os.path.expanduser(f'~/chrome_divar_profile_{int(time.time())}')
-
-# تنظیمات بهینه Chrome برای macOS ARM64 و حل مشکل timeout
-chrome_options = Options()
-
-# تنظیمات اساسی برای macOS ARM64
-chrome_options.add_argument('--no-sandbox')
-chrome_options.add_argument('--disable-dev-shm-usage')
-
-# حل مشکل timeout در macOS ARM64 - تنظیمات پیشرفته
-chrome_options.add_argument('--disable-features=VizDisplayCompositor,VizServiceDisplayCompositor')
-chrome_options.add_argument('--disable-gpu-sandbox')
-chrome_options.add_argument('--disable-software-rasterizer')
-chrome_options.add_argument('--disable-background-timer-throttling')
-chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-chrome_options.add_argument('--disable-renderer-backgrounding')
-chrome_options.add_argument('--disable-field-trial-config')
-chrome_options.add_argument('--disable-back-forward-cache')
-chrome_options.add_argument('--disable-ipc-flooding-protection')
-chrome_options.add_argument('--max_old_space_size=4096')
-chrome_options.add_argument('--js-flags=--max-old-space-size=4096')
-
-# تنظیمات اضافی برای حل مشکل timeout
-chrome_options.add_argument('--disable-dev-tools')
-chrome_options.add_argument('--disable-logging')
-chrome_options.add_argument('--disable-gpu-process-crash-limit')
-chrome_options.add_argument('--disable-crash-reporter')
-chrome_options.add_argument('--no-crash-upload')
-chrome_options.add_argument('--disable-in-process-stack-traces')
-chrome_options.add_argument('--disable-logging-redirect')
-chrome_options.add_argument('--log-level=3')
-chrome_options.add_argument('--silent')
-chrome_options.add_argument('--disable-gpu-process-for-dx12-vulkan-info-collection')
-chrome_options.add_argument('--disable-gpu-process-for-dx12-vulkan-info-collection')
-chrome_options.add_argument('--single-process')  # اجرا در یک پروسه برای کاهش مشکلات IPC
-
-# تنظیمات بهینه‌سازی سرعت
-chrome_options.add_argument('--disable-gpu')
-chrome_options.add_argument('--disable-extensions')
-chrome_options.add_argument('--disable-plugins')
-chrome_options.add_argument('--disable-infobars')
-chrome_options.add_argument('--disable-notifications')
-chrome_options.add_argument('--disable-popup-blocking')
-chrome_options.add_argument('--disable-save-password-bubble')
-chrome_options.add_argument('--disable-translate')
-chrome_options.add_argument('--disable-web-security')
-chrome_options.add_argument('--disable-features=TranslateUI,BlinkGenPropertyTrees')
-chrome_options.add_argument('--disable-site-isolation-trials')
-chrome_options.add_argument('--ignore-certificate-errors')
-chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
-chrome_options.add_experimental_option('useAutomationExtension', False)
-
-# تنظیمات حافظه
-chrome_options.add_argument('--aggressive-cache-discard')
-chrome_options.add_argument('--disable-application-cache')
-chrome_options.add_argument('--disable-cache')
-chrome_options.add_argument('--disable-offline-load-stale-cache')
-chrome_options.add_argument('--disk-cache-size=0')
-
-# تنظیمات پردازش
-chrome_options.add_argument('--disable-background-networking')
-chrome_options.add_argument('--disable-background-timer-throttling')
-chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-chrome_options.add_argument('--disable-breakpad')
-chrome_options.add_argument('--disable-component-extensions-with-background-pages')
-chrome_options.add_argument('--disable-default-apps')
-chrome_options.add_argument('--disable-hang-monitor')
-chrome_options.add_argument('--disable-ipc-flooding-protection')
-chrome_options.add_argument('--disable-prompt-on-repost')
-chrome_options.add_argument('--disable-renderer-backgrounding')
-chrome_options.add_argument('--disable-sync')
-chrome_options.add_argument('--disable-domain-reliability')
-chrome_options.add_argument('--disable-client-side-phishing-detection')
-chrome_options.add_argument('--disable-features=UserAgentClientHint')
-chrome_options.add_argument('--metrics-recording-only')
-chrome_options.add_argument('--no-default-browser-check')
-chrome_options.add_argument('--no-first-run')
-chrome_options.add_argument('--no-pings')
-chrome_options.add_argument('--password-store=basic')
-chrome_options.add_argument('--use-mock-keychain')
-chrome_options.add_argument('--process-per-tab')
-chrome_options.add_argument('--enable-low-end-device-mode')
+def get_market_price_as_of(car_name, ad_data, max_age_days=7):
+    """
+    قیمت بازار خودرو در زمان انتشار آگهی (از تاریخچه قیمت‌ها)
 
-def create_driver():
-    """ایجاد driver بهینه‌سازی شده برای macOS ARM64"""
+    نام خودرو مثل get_market_price_for_car تطبیق داده می‌شود؛ اگر برای آن زمان قیمتی
+    ثبت نشده باشد، همان قیمت فعلی برگردانده می‌شود.
+    """
+    result = get_market_price_for_car(car_name, year=ad_data.get('سال'))
+    matched_name = result.get('matched_name')
+    if not matched_name:
+        return result
     try:
-        print("🚀 راه‌اندازی Chrome driver...")
-        
-        # استفاده از webdriver-manager یا chromedriver سیستم
-        try:
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        except Exception as e:
-            print(f"⚠️ خطا در webdriver-manager: {e}")
-            print("🔄 تلاش برای استفاده از chromedriver سیستم...")
-            driver = webdriver.Chrome(options=chrome_options)
-        
-        # تنظیمات timeout بهینه برای macOS ARM64
-        driver.set_page_load_timeout(60)  # افزایش بیشتر timeout
-        driver.implicitly_wait(10)  # افزایش implicit wait
-        driver.set_script_timeout(60)  # تنظیم script timeout
-        
-        # مخفی کردن ماهیت وب‌درایور
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        # تنظیم اندازه پنجره برای بهینه‌سازی مصرف منابع
-        driver.set_window_size(1366, 768)
-        
-        # تست اولیه برای اطمینان از عملکرد driver
-        try:
-            driver.get("data:text/html,<html><body><h1>Test</h1></body></html>")
-            time.sleep(1)
-        except Exception as test_error:
-            print(f"⚠️ خطا در تست اولیه driver: {test_error}")
-            # ادامه می‌دهیم چون ممکن است در استفاده واقعی کار کند
-        
-        print("✅ Chrome driver راه‌اندازی شد")
-        return driver
+        row = get_price_history().price_for_ad(matched_name, ad_data, max_age_days=max_age_days)
     except Exception as e:
-        print(f"❌ خطا در ایجاد driver: {e}")
-        return None
+        print(f"⚠️ خطا در خواندن تاریخچه قیمت‌ها: {e}")
+        row = None
+    if row is None:
+        return result
+    return dict(result, market_price=row[1], price_date=datetime.fromtimestamp(row[0]).strftime('%Y-%m-%d %H:%M'))
+
+
+def market_price_for_ad(car_name, ad_data):
+    """قیمت بازار آگهی: فعلی، یا با PRICE_AS_OF_POSTING در زمان انتشار آگهی"""
+    if PRICE_AS_OF_POSTING:
+        return get_market_price_as_of(car_name, ad_data)
+    return get_market_price_for_car(car_name, force_update=False, year=ad_data.get('سال'))
+
+
+# درایورها از کارخانه مشترک ساخته می‌شوند (مسیر chromedriver ذخیره‌شده و پروفایل 'divar')
+# تعداد مرورگر آماده در پس‌زمینه برای راه‌اندازی مجدد بعد از crash؛ 0 یعنی راه‌اندازی در لحظه
+SPARE_DRIVERS = 1
+# مسدودسازی تصاویر، فونت‌ها، بنرها و اسکریپت‌های آمار/تبلیغات در صفحات لیست و آگهی (DevTools)
+RESOURCE_BLOCKING_ENABLED = True
+resource_policy = ResourcePolicy(enabled=RESOURCE_BLOCKING_ENABLED)
+# سقف انتظارهای رویدادمحور (ثانیه)؛ معمولاً خیلی زودتر با ظاهر شدن/اضافه شدن آگهی‌ها تمام می‌شوند
+LISTING_WAIT = 5
+SCROLL_WAIT = 3
+LOAD_MORE_WAIT = 4
+# لینک‌های صفحه لیست فعلی (فقط کارت‌های تازه در هر اسکرول، با یک execute_script)
+listing_harvester = ListingHarvester()
+# بررسی کپچا/مسدودیت یک بار برای هر صفحه؛ کمتر از 1 یعنی فقط بخشی از صفحات بررسی شوند
+CHALLENGE_SAMPLE_RATE = 1.0
+challenge_monitor = ChallengeMonitor(sample_rate=CHALLENGE_SAMPLE_RATE)
+
+def create_driver():
+    """ایجاد driver بهینه‌سازی شده برای macOS ARM64 (پروفایل 'divar' کارخانه درایور)"""
+    print("🚀 راه‌اندازی Chrome driver...")
+    return get_driver('divar')
 
 def safe_driver_operation(operation_func, *args, max_retries=3, **kwargs):
     """اجرای ایمن عملیات driver با retry برای مشکلات timeout"""
@@ -565,11 +405,13 @@ def safe_driver_operation(operation_func, *args, max_retries=3, **kwargs):
                 raise e
     return None
 
-def safe_page_load(driver, url, max_retries=5):
+def safe_page_load(driver, url, max_retries=5, page_type='listing'):
     """بارگذاری ایمن صفحه با retry برای مشکلات timeout"""
+    resource_policy.apply(driver, page_type)
     for attempt in range(max_retries):
         try:
             print(f"🔄 تلاش {attempt + 1} برای بارگذاری: {url}")
+            challenge_monitor.mark_navigation(driver)
             driver.get(url)
             print("✅ صفحه با موفقیت بارگذاری شد")
             return True
@@ -616,18 +458,17 @@ def restart_driver():
             if current_url and current_url != "data:,":
                 print(f"🔄 بازگشت به موقعیت قبلی: {current_url}")
                 safe_page_load(driver, current_url)
-                # کاهش زمان انتظار تصادفی برای افزایش سرعت
-                time.sleep(random.uniform(1.5, 3))
+                wait_for_selector(driver, "article", LISTING_WAIT, label='restart')
             else:
                 print("🏠 رفتن به صفحه اصلی")
                 safe_page_load(driver, "https://divar.ir/s/iran/car")
-                time.sleep(random.uniform(1, 2))
+                wait_for_selector(driver, "article", LISTING_WAIT, label='restart')
         except Exception as e:
             print(f"⚠️ خطا در بازگشت به موقعیت قبلی: {e}")
             print("🏠 تلاش مجدد برای رفتن به صفحه اصلی")
             try:
                 safe_page_load(driver, "https://divar.ir/s/iran/car")
-                time.sleep(1)
+                wait_for_selector(driver, "article", LISTING_WAIT, label='restart')
             except:
                 pass
         
@@ -644,18 +485,17 @@ def restart_driver():
 driver = create_driver()
 if not driver:
     exit(1)
+if SPARE_DRIVERS:
+    get_factory().keep_warm('divar', SPARE_DRIVERS)
 
 # اسکریپت‌های فوق پیشرفته برای مخفی کردن کامل ماهیت ربات
 # حذف اسکریپت stealth برای جلوگیری از crash
 
-# تنظیم اندازه پنجره ثابت
-driver.set_window_size(1366, 768)
-
 # رفتن به صفحه خودرو با retry mechanism
 if not safe_page_load(driver, 'https://divar.ir/s/iran/car'):
     print("❌ نتوانستیم به صفحه اصلی برویم، خروج از برنامه")
     exit(1)
-time.sleep(2)
+wait_for_selector(driver, "article", LISTING_WAIT, label='listing')
 
 
 def append_to_csv_old(a, b, filename="data.csv"):
@@ -679,6 +519,23 @@ record_count = 0
 data_batch = []
 BATCH_SIZE = 50  # افزایش اندازه batch برای عملکرد بهتر
 
+# پایگاه نتایج: هر batch به انتهای آن اضافه می‌شود و اکسل فقط در پایان ساخته می‌شود
+RESULTS_DB_FILE = DEFAULT_DB_FILE
+result_store = ResultStore(RESULTS_DB_FILE)
+MAIN_EXCEL_FILE = "divar_ads_main.xlsx"
+
+# تعداد مرورگرهای صفحات جزئیات آگهی؛ 1 یعنی همان درایور اصلی بدون استخر
+DETAIL_WORKERS = 1
+detail_pool = None
+# کارگرهای استخر هم‌زمان در batch می‌نویسند
+save_lock = threading.Lock()
+# حداکثر انتظار ذخیره نهایی برای save_lock (اگر سیگنال داخل قفل رسیده باشد، بدون قفل ذخیره می‌شود)
+SAVE_LOCK_TIMEOUT = 10
+
+# صفحه آگهی اول با HTTP دریافت می‌شود؛ مرورگر فقط برای صفحات ناقص یا چالش ربات
+HTTP_FETCH_ENABLED = AD_FETCHER_AVAILABLE
+ad_fetcher = AdFetcher() if HTTP_FETCH_ENABLED else None
+
 def load_existing_data():
     """بارگذاری داده‌های موجود (اختیاری)"""
     global record_count
@@ -724,28 +581,22 @@ def save_to_excel(ad_data, batch_size=BATCH_SIZE):
         return True
 
 def save_batch_to_improved_file():
-    """ذخیره batch فعلی در فایل بهبود یافته"""
+    """ذخیره batch فعلی در پایگاه نتایج (افزودن به انتهای جدول)"""
     global data_batch
     
     if not data_batch:
         return
-        
-    try:
-        # ایجاد نام فایل با timestamp
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"improved_divar_ads_{timestamp}.xlsx"
-        
-        # تبدیل batch به DataFrame
-        df_new = pd.DataFrame(data_batch)
-        
-        # ذخیره با رنگ‌بندی
-        save_with_coloring(df_new, filename)
-        
-        print(f"💾 {len(df_new)} رکورد در فایل {filename} ذخیره شد")
-        
+    
+    if write_batch(data_batch):
         # پاک کردن batch
         data_batch = []
+
+def write_batch(batch):
+    """نوشتن رکوردها در پایگاه نتایج و در صورت خطا در فایل اضطراری؛ True یعنی ذخیره شد"""
+    try:
+        elapsed = result_store.append_many(batch)
+        print(f"💾 {len(batch)} رکورد در {RESULTS_DB_FILE} ذخیره شد ({elapsed * 1000:.1f}ms)")
+        return True
         
     except Exception as e:
         print(f"❌ خطا در ذخیره batch: {e}")
@@ -754,83 +605,35 @@ def save_batch_to_improved_file():
             from datetime import datetime
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             emergency_file = f"divar_ads_emergency_{timestamp}.xlsx"
-            df_emergency = pd.DataFrame(data_batch)
+            df_emergency = pd.DataFrame(batch)
             df_emergency.to_excel(emergency_file, index=False, engine='openpyxl')
             print(f"🚨 ذخیره اضطراری در {emergency_file}")
-            data_batch = []
+            return True
         except Exception as e2:
             print(f"❌ خطا در ذخیره اضطراری: {e2}")
+            return False
 
 def save_with_coloring(df, filename):
-    """ذخیره DataFrame با رنگ‌بندی سبز برای آگهی‌های فوری"""
+    """ذخیره DataFrame با رنگ‌بندی سبز برای آگهی‌های فوری (خروجی جریانی)"""
+    # اطمینان از اینکه DataFrame خالی نیست
+    if df.empty:
+        print("⚠️ DataFrame خالی است - فایل اکسل ایجاد نمی‌شود")
+        return
+    
     try:
-        from openpyxl import Workbook
-        from openpyxl.styles import PatternFill
-        from openpyxl.utils.dataframe import dataframe_to_rows
-        
-        # اطمینان از وجود دایرکتوری
-        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
-        
-        # اطمینان از اینکه DataFrame خالی نیست
-        if df.empty:
-            print("⚠️ DataFrame خالی است - فایل اکسل ایجاد نمی‌شود")
-            return
-            
-        # ایجاد workbook
-        wb = Workbook()
-        ws = wb.active
-        
-        # اضافه کردن داده‌ها
-        for r in dataframe_to_rows(df, index=False, header=True):
-            ws.append(r)
-        
-        # رنگ‌بندی سبز برای آگهی‌های فوری
-        green_fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
-        
-        # پیدا کردن ستون رنگ‌بندی
-        color_col_index = None
-        for idx, col in enumerate(df.columns, 1):
-            if col == 'رنگ‌بندی':
-                color_col_index = idx
-                break
-        
-        if color_col_index:
-            # رنگ‌بندی ردیف‌های سبز
-            urgent_count = 0
-            for row_idx in range(2, len(df) + 2):  # شروع از ردیف 2 (بعد از header)
-                cell_value = ws.cell(row=row_idx, column=color_col_index).value
-                if cell_value == 'سبز':
-                    urgent_count += 1
-                    for col_idx in range(1, len(df.columns) + 1):
-                        ws.cell(row=row_idx, column=col_idx).fill = green_fill
-            
-            if urgent_count > 0:
-                print(f"✅ {urgent_count} آگهی فوری با رنگ سبز مشخص شدند")
-        
-        # تنظیم عرض ستون‌ها برای خوانایی بهتر
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2) * 1.2
-            ws.column_dimensions[column_letter].width = min(adjusted_width, 50)  # حداکثر عرض 50
-        
-        # ذخیره فایل با مدیریت خطا
         try:
-            wb.save(filename)
+            rows, urgent_count = export_dataframe(df, filename)
             print(f"✅ فایل اکسل با موفقیت در {filename} ذخیره شد")
         except PermissionError:
             # تلاش برای ذخیره با نام متفاوت در صورت باز بودن فایل
             from datetime import datetime
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             alt_filename = f"{os.path.splitext(filename)[0]}_{timestamp}{os.path.splitext(filename)[1]}"
-            wb.save(alt_filename)
+            rows, urgent_count = export_dataframe(df, alt_filename)
             print(f"⚠️ فایل اصلی باز است - ذخیره در {alt_filename}")
+        
+        if urgent_count > 0:
+            print(f"✅ {urgent_count} آگهی فوری با رنگ سبز مشخص شدند")
     except Exception as e:
         print(f"❌ خطا در ذخیره فایل اکسل: {e}")
         # تلاش برای ذخیره ساده بدون رنگ‌بندی
@@ -839,151 +642,77 @@ def save_with_coloring(df, filename):
             print("🔄 فایل اکسل ساده (بدون رنگ‌بندی) ذخیره شد")
         except Exception as e2:
             print(f"❌ خطا در ذخیره ساده: {e2}")
-        
-    except Exception as e:
-        print(f"خطا در رنگ‌بندی: {e} - ذخیره ساده")
-        # ذخیره ساده بدون رنگ‌بندی
-        df.to_excel(filename, index=False, engine='openpyxl')
+
+def export_session_to_excel(filename, columns, saved_at):
+    """خروجی جریانی آگهی‌های اجرای فعلی از پایگاه نتایج به اکسل"""
+    rows = (dict(ad, **{'تاریخ ذخیره': saved_at}) for ad in result_store.iter_ads(result_store.session))
+    return export_rows(rows, filename, columns=columns, sheet_name="آگهی‌های دیوار بهبود یافته")
 
 def finalize_excel_save():
     """ذخیره نهایی تمام داده‌ها در فایل اکسل بهبود یافته مشابه improved_divar_ads"""
     global record_count, data_batch
     
+    if detail_pool is not None:
+        # لینک‌های باقی‌مانده صف پردازش و مرورگرهای استخر بسته می‌شوند
+        detail_pool.shutdown(wait=True)
+    if ad_fetcher is not None:
+        print(f"📡 {ad_fetcher.summary()}")
+    
     try:
         # ایجاد timestamp برای نام فایل
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"improved_divar_ads_{timestamp}.xlsx"
         
-        # استفاده از داده‌های batch فعلی
-        all_data = data_batch
-        print(f"\n💾 آماده‌سازی {len(all_data)} آگهی برای ذخیره نهایی...")
-        
-        # اگر قیمت‌های بازار هنوز دریافت نشده‌اند، آنها را دریافت کن
-        if MARKET_PRICE_AVAILABLE and not market_prices:
-            print("🔍 دریافت قیمت‌های بازار برای ادغام با داده‌های دیوار...")
-            fetch_market_prices(force_update=True)
-        
-        # ایجاد DataFrame با ستون‌های مرتب شده مشابه improved_divar_ads
-        # (آگهی‌ها قبلاً پردازش شده‌اند)
-        df = pd.DataFrame(all_data)
+        # batch باقی‌مانده به پایگاه نتایج اضافه می‌شود و خروجی از آگهی‌های همین اجرا ساخته می‌شود
+        save_batch_to_improved_file()
+        total_ads = result_store.count(session=result_store.session)
+        print(f"\n💾 آماده‌سازی {total_ads} آگهی برای ذخیره نهایی...")
+        if not total_ads:
+            print("⚠️ آگهی‌ای برای ذخیره نهایی وجود ندارد")
+            return
         
         try:
-            # افزودن قیمت‌های بازار به داده‌ها
-            if MARKET_PRICE_AVAILABLE:
-                print("🔄 در حال ادغام قیمت‌های بازار با داده‌های دیوار...")
-                
-                # اگر قیمت‌های بازار هنوز دریافت نشده‌اند یا نیاز به به‌روزرسانی دارند، آنها را دریافت کن
-                if not market_prices:
-                    print("🔍 دریافت قیمت‌های بازار برای ادغام با داده‌های دیوار...")
-                    fetch_market_prices(force_update=True)
-                
-                # قیمت روز قبلاً در process_ad_with_pricing محاسبه شده است
-                print("قیمت‌های روز در مرحله پردازش آگهی‌ها محاسبه شده‌اند")
+            # اگر قیمت‌های بازار هنوز دریافت نشده‌اند، آنها را دریافت کن
+            if MARKET_PRICE_AVAILABLE and not market_prices:
+                print("🔍 دریافت قیمت‌های بازار برای ادغام با داده‌های دیوار...")
+                fetch_market_prices(force_update=True)
+            
+            # قیمت روز قبلاً در process_ad_with_pricing محاسبه شده است
+            print("قیمت‌های روز در مرحله پردازش آگهی‌ها محاسبه شده‌اند")
         except Exception as e:
             print(f"❌ خطا در افزودن قیمت‌های بازار: {e}")
         
-        print(f"✅ قیمت‌های بازار برای {len(df)} خودرو اضافه شد")
-        
-        # مرتب‌سازی ستون‌ها مطابق فرمت مطلوب (بدون ستون‌های همراه مکانیک و زد فور)
-        desired_columns = [
-            'عنوان آگهی', 'برند و تیپ', 'نام خودرو', 'سال', 'کیلومتر', 'رنگ',
-            'قیمت آگهی (تومان)', 'قیمت روز (تومان)', 'قیمت تخمینی (تومان)', 'منبع قیمت',
-            'وضعیت موتور', 'وضعیت شاسی', 'وضعیت بدنه', 'مشکلات تشخیص داده شده',
-            'مشکلات موتور/گیربکس', 'فروش فوری', 'افت کارکرد', 'افت سن خودرو', 
-            'افت مشکلات', 'درصد افت کل', 'توضیحات', 'گیربکس', 'بیمه شخص ثالث',
-            'معاوضه', 'دسته بندی خودرو', 'شماره تلفن', 'زمان و مکان', 'لینک آگهی',
-            'رنگ‌بندی', 'تاریخ ذخیره'
-        ]
-        
-        # اضافه کردن تاریخ ذخیره
-        df['تاریخ ذخیره'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # مرتب‌سازی ستون‌ها
-        available_columns = [col for col in desired_columns if col in df.columns]
-        remaining_columns = [col for col in df.columns if col not in desired_columns]
-        final_columns = available_columns + remaining_columns
-        df = df[final_columns]
-        
-        # ذخیره با رنگ‌بندی
-        from openpyxl import Workbook
-        from openpyxl.styles import PatternFill
-        from openpyxl.utils.dataframe import dataframe_to_rows
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "آگهی‌های دیوار بهبود یافته"
-        
-        # اضافه کردن داده‌ها
-        for r in dataframe_to_rows(df, index=False, header=True):
-            ws.append(r)
-        
-        # رنگ‌بندی سبز برای آگهی‌های فوری
-        green_fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
-        
-        # پیدا کردن ستون رنگ‌بندی
-        color_col_index = None
-        for idx, col in enumerate(df.columns, 1):
-            if col == 'رنگ‌بندی':
-                color_col_index = idx
-                break
+        # اضافه کردن تاریخ ذخیره (ستون‌ها در excel_exporter مطابق DESIRED_COLUMNS مرتب می‌شوند)
+        saved_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        columns = result_store.columns(result_store.session) + ['تاریخ ذخیره']
         
+        # ذخیره فایل بهبود یافته با رنگ‌بندی (ردیف به ردیف از پایگاه نتایج)
         urgent_count = 0
-        if color_col_index:
-            # رنگ‌بندی ردیف‌های سبز
-            for row_idx in range(2, len(df) + 2):  # شروع از ردیف 2 (بعد از header)
-                cell_value = ws.cell(row=row_idx, column=color_col_index).value
-                if cell_value == 'سبز':
-                    urgent_count += 1
-                    for col_idx in range(1, len(df.columns) + 1):
-                        ws.cell(row=row_idx, column=col_idx).fill = green_fill
-        
-        # ذخیره فایل بهبود یافته با رنگ‌بندی
         try:
-            # تنظیم عرض ستون‌ها برای خوانایی بهتر
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2) * 1.2
-                ws.column_dimensions[column_letter].width = min(adjusted_width, 50)  # حداکثر عرض 50
-            
-            wb.save(filename)
+            total_ads, urgent_count = export_session_to_excel(filename, columns, saved_at)
             print(f"✅ فایل بهبود یافته ذخیره شد: {filename}")
         except Exception as e:
             print(f"⚠️ خطا در ذخیره فایل بهبود یافته: {e}")
             # تلاش برای ذخیره با نام متفاوت
             try:
                 alt_filename = f"improved_divar_ads_{timestamp}_alt.xlsx"
-                wb.save(alt_filename)
+                total_ads, urgent_count = export_session_to_excel(alt_filename, columns, saved_at)
                 print(f"✅ فایل بهبود یافته با نام جایگزین ذخیره شد: {alt_filename}")
             except Exception as e2:
                 print(f"❌ خطا در ذخیره جایگزین: {e2}")
         
-        # همچنین داده‌ها را در فایل اصلی نیز ذخیره کنیم با استفاده از تابع save_with_coloring
+        # همچنین داده‌ها را در فایل اصلی نیز ذخیره کنیم
         try:
-            save_with_coloring(df, MAIN_EXCEL_FILE)
+            export_session_to_excel(MAIN_EXCEL_FILE, columns, saved_at)
             print(f"✅ فایل اصلی به‌روزرسانی شد: {MAIN_EXCEL_FILE}")
         except Exception as e:
             print(f"⚠️ خطا در به‌روزرسانی فایل اصلی: {e}")
-            # تلاش برای ذخیره ساده
-            try:
-                df.to_excel(MAIN_EXCEL_FILE, index=False, engine='openpyxl')
-                print(f"✅ فایل اصلی با روش ساده به‌روزرسانی شد")
-            except Exception as e2:
-                print(f"❌ خطا در به‌روزرسانی ساده فایل اصلی: {e2}")
         
         print(f"📊 آمار نهایی:")
-        print(f"   - تعداد کل آگهی‌ها: {len(df)}")
+        print(f"   - تعداد کل آگهی‌ها: {total_ads}")
         print(f"   - آگهی‌های فوری (سبز): {urgent_count}")
-        print(f"   - تعداد ستون‌ها: {len(df.columns)}")
-        
-        data_batch = []
+        print(f"   - تعداد ستون‌ها: {len(columns)}")
         
     except Exception as e:
         print(f"❌ خطا در ذخیره نهایی: {e}")
@@ -1089,62 +818,11 @@ def human_typing(element, text):
 
 # time.sleep(10000)
 
-def check_for_critical_bot_detection():
-    """تشخیص مشکلات جدی که نیاز به مداخله دارند"""
-    try:
-        # بررسی کپچاهای مختلف
-        captcha_selectors = [
-            "iframe[src*='recaptcha']",
-            ".g-recaptcha",
-            "iframe[src*='hcaptcha']",
-            "#arc-checkbox",  # ARCaptcha
-            "[id*='captcha']",
-            "[class*='captcha']",
-            "input[name='arcaptcha-token']"
-        ]
-        
-        for selector in captcha_selectors:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            if elements and any(elem.is_displayed() for elem in elements):
-                return "CAPTCHA_DETECTED"
-        
-        # بررسی متن‌های مربوط به کپچا
-        captcha_texts = [
-            "من ربات نیستم",
-            "i'm not a robot",
-            "verify you are human",
-            "arcaptcha",
-            "recaptcha"
-        ]
-        
-        page_text = driver.page_source.lower()
-        for text in captcha_texts:
-            if text.lower() in page_text:
-                return f"CAPTCHA_TEXT: {text}"
-        
-        # بررسی پیام‌های مسدودیت جدی
-        critical_blocking_texts = [
-            "تایید هویت",
-            "مسدود شده",
-            "blocked permanently",
-            "403 forbidden",
-            "access denied",
-            "too many requests"
-        ]
-        
-        for text in critical_blocking_texts:
-            if text.lower() in page_text:
-                return f"CRITICAL_BLOCK: {text}"
-        
-        # بررسی ریدایرکت به صفحات غیرمرتبط
-        current_url = driver.current_url.lower()
-        if "divar.ir" not in current_url and "google.com" not in current_url and "arcaptcha" not in current_url:
-            return f"REDIRECT: {current_url}"
-            
-        return None
-        
-    except Exception as e:
-        return None
+def check_for_critical_bot_detection(driver=None):
+    """تشخیص مشکلات جدی که نیاز به مداخله دارند (پیش‌فرض روی درایور اصلی)؛ هر صفحه فقط یک بار بررسی می‌شود"""
+    if driver is None:
+        driver = globals()['driver']
+    return challenge_monitor.check(driver)
 
 def handle_verification_issue():
     """مدیریت مشکلات تایید هویت"""
@@ -1201,8 +879,23 @@ def alert_user_critical(message):
 
 
 
-def extract_ad_details():
-    """استخراج کامل اطلاعات آگهی از دیوار"""
+def extract_ad_details(driver=None):
+    """استخراج کامل اطلاعات آگهی از دیوار (پیش‌فرض از درایور اصلی؛ کارگرهای استخر درایور خودشان را می‌دهند)"""
+    if driver is None:
+        driver = globals()['driver']
+    # روش سریع: یک snapshot از صفحه و پارس کامل در پایتون
+    if AD_PARSER_AVAILABLE:
+        try:
+            start_time = time.perf_counter()
+            ad_data = parse_ad_page(driver.page_source, driver.current_url)
+            if has_required_fields(ad_data):
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
+                print(f"⚡ اطلاعات آگهی از snapshot صفحه استخراج شد ({elapsed_ms:.1f}ms)")
+                return ad_data
+            print("⚠️ snapshot صفحه ناقص بود، استخراج با WebDriver...")
+        except Exception as e:
+            print(f"⚠️ خطا در پارس snapshot صفحه: {e}")
+
     ad_data = {
         'عنوان آگهی': '',
         'برند و تیپ': '',
@@ -1758,71 +1451,31 @@ def extract_ad_details():
     return ad_data
 
 
-def check_engine_gearbox_issues(description):
+def check_engine_gearbox_issues(description, hits=None):
     """تشخیص مشکلات موتور و گیربکس از متن توضیحات با کلمات کلیدی گسترده‌تر"""
     if not description:
         return False, []
     
-    description_lower = description.lower()
-    
-    # کلمات کلیدی مشکلات موتور (گسترده‌تر)
-    engine_issues = [
-        'موتور تعمیر', 'موتور تعویض', 'موتور خراب', 'موتور معیوب',
-        'تعمیر موتور', 'تعویض موتور', 'خرابی موتور', 'مشکل موتور',
-        'موتور آسیب', 'موتور ضربه', 'موتور سوخته', 'اورهال موتور',
-        'موتور اورهال', 'بازسازی موتور', 'موتور بازسازی', 'موتور تازه تعمیر',
-        'موتور نو', 'موتور جدید', 'تعمیر کامل موتور', 'موتور کامل تعمیر',
-        'موتور نیاز به تعمیر', 'موتور مشکل دار', 'موتور دود می‌کند',
-        'موتور صدا دارد', 'موتور لرزش', 'موتور ویبره', 'موتور گرم می‌کند'
-    ]
-    
-    # کلمات کلیدی مشکلات گیربکس (گسترده‌تر)
-    gearbox_issues = [
-        'گیربکس تعمیر', 'گیربکس تعویض', 'گیربکس خراب', 'گیربکس معیوب',
-        'تعمیر گیربکس', 'تعویض گیربکس', 'خرابی گیربکس', 'مشکل گیربکس',
-        'گیربکس آسیب', 'گیربکس ضربه', 'گیربکس سوخته', 'اورهال گیربکس',
-        'گیربکس اورهال', 'بازسازی گیربکس', 'گیربکس بازسازی', 'گیربکس تازه تعمیر',
-        'گیربکس نو', 'گیربکس جدید', 'تعمیر کامل گیربکس', 'گیربکس کامل تعمیر',
-        'گیربکس نیاز به تعمیر', 'گیربکس مشکل دار', 'گیربکس صدا دارد',
-        'گیربکس سخت می‌گیرد', 'دنده سخت', 'دنده نمی‌گیرد', 'کلاچ تعمیر',
-        'کلاچ خراب', 'کلاچ معیوب', 'مشکل کلاچ', 'کلاچ سوخته'
-    ]
-    
-    found_issues = []
-    
-    # بررسی مشکلات موتور
-    for issue in engine_issues:
-        if issue in description_lower:
-            found_issues.append(f"موتور: {issue}")
-    
-    # بررسی مشکلات گیربکس
-    for issue in gearbox_issues:
-        if issue in description_lower:
-            found_issues.append(f"گیربکس: {issue}")
+    # همه جداول کلمات کلیدی با یک بار اسکن توضیحات بررسی می‌شوند
+    if hits is None:
+        hits = scan_description(description)
+    
+    found_issues = [f"موتور: {issue}" for issue in hits.found('engine')]
+    found_issues += [f"گیربکس: {issue}" for issue in hits.found('gearbox')]
     
     has_issues = len(found_issues) > 0
     return has_issues, found_issues
 
 
-def check_urgent_sale_keywords(description):
+def check_urgent_sale_keywords(description, hits=None):
     """تشخیص کلمات فوری فروش از متن توضیحات"""
     if not description:
         return False
     
-    description_lower = description.lower()
+    if hits is None:
+        hits = scan_description(description)
     
-    # کلمات کلیدی فروش فوری
-    urgent_keywords = [
-        'پول لازم', 'فروش فوری', 'نیاز مالی', 'زیر قیمت',
-        'فوری فروش', 'نقدی فوری', 'ضروری فروش', 'سریع فروش',
-        'گیر پولم','عجله دارم', 'فوری نقد', 'قیمت پایین', 'ارزان فروش'
-    ]
-    
-    for keyword in urgent_keywords:
-        if keyword in description_lower:
-            return True
-    
-    return False
+    return hits.any('urgent')
 
 
 # کد همراه مکانیک و Z4Car حذف شد و با combined_scraper.py جایگزین شده است
@@ -1836,10 +1489,11 @@ def process_ad_with_pricing(ad_data):
         
         # بررسی مشکلات موتور و گیربکس
         description = ad_data.get('توضیحات', '')
-        has_engine_issues, engine_issues_list = check_engine_gearbox_issues(description)
+        description_hits = scan_description(description)
+        has_engine_issues, engine_issues_list = check_engine_gearbox_issues(description, description_hits)
         
         # بررسی کلمات فوری فروش
-        is_urgent_sale = check_urgent_sale_keywords(description)
+        is_urgent_sale = check_urgent_sale_keywords(description, description_hits)
         
         # اضافه کردن فیلدهای جدید
         ad_data['مشکلات موتور/گیربکس'] = ', '.join(engine_issues_list) if engine_issues_list else 'سالم'
@@ -1870,24 +1524,25 @@ def process_ad_with_pricing(ad_data):
         market_price = None
         if IMPROVED_PRICING_AVAILABLE:
             try:
-                calculator = ImprovedCarPriceCalculator()
-                
-                # بارگذاری قیمت‌های بازار
-                try:
-                    market_df = pd.read_excel('combined_market_prices.xlsx')
-                    calculator.load_market_prices('combined_market_prices.xlsx')
-                except:
-                    market_df = None
-                
                 # استخراج اطلاعات خودرو برای جستجوی دقیق‌تر
                 title = ad_data.get('عنوان آگهی', '')
                 description = ad_data.get('توضیحات', '')
                 brand_type = ad_data.get('برند و تیپ', '')
                 
-                car_info = calculator.extract_car_info(title, description)
-                
-                # جستجوی قیمت با اطلاعات کامل
-                market_price = calculator.find_market_price(car_info, market_df, brand_type)
+                if PRICING_ENGINE_AVAILABLE:
+                    # snapshot آماده در حافظه - بدون خواندن اکسل برای هر آگهی
+                    engine = get_pricing_engine(MARKET_SNAPSHOT_FILE)
+                    car_info = engine.calculator.extract_car_info(title, description)
+                    market_price = engine.find_market_price(car_info, brand_type)
+                else:
+                    calculator = ImprovedCarPriceCalculator()
+                    try:
+                        market_df = pd.read_excel('combined_market_prices.xlsx')
+                        calculator.load_market_prices('combined_market_prices.xlsx')
+                    except:
+                        market_df = None
+                    car_info = calculator.extract_car_info(title, description)
+                    market_price = calculator.find_market_price(car_info, market_df, brand_type)
                 
                 if market_price:
                     ad_data['قیمت روز (تومان)'] = f"{market_price:,} تومان"
@@ -1896,7 +1551,7 @@ def process_ad_with_pricing(ad_data):
                     # fallback به روش قبلی
                     car_name = brand_type or ad_data.get('نام خودرو') or title
                     if car_name:
-                        market_price_data = get_market_price_for_car(car_name, force_update=False)
+                        market_price_data = market_price_for_ad(car_name, ad_data)
                         market_price = market_price_data.get('market_price')
                         if market_price:
                             ad_data['قیمت روز (تومان)'] = f"{market_price:,} تومان"
@@ -1913,7 +1568,7 @@ def process_ad_with_pricing(ad_data):
                 # fallback به روش قبلی
                 car_name = ad_data.get('برند و تیپ') or ad_data.get('نام خودرو') or ad_data.get('عنوان آگهی')
                 if car_name:
-                    market_price_data = get_market_price_for_car(car_name, force_update=False)
+                    market_price_data = market_price_for_ad(car_name, ad_data)
                     market_price = market_price_data.get('market_price')
                     if market_price:
                         ad_data['قیمت روز (تومان)'] = f"{market_price:,} تومان"
@@ -1928,7 +1583,7 @@ def process_ad_with_pricing(ad_data):
             # روش قبلی اگر سیستم بهبود یافته در دسترس نباشد
             car_name = ad_data.get('برند و تیپ') or ad_data.get('نام خودرو') or ad_data.get('عنوان آگهی')
             if car_name:
-                market_price_data = get_market_price_for_car(car_name, force_update=False)
+                market_price_data = market_price_for_ad(car_name, ad_data)
                 market_price = market_price_data.get('market_price')
                 if market_price:
                     ad_data['قیمت روز (تومان)'] = f"{market_price:,} تومان"
@@ -1943,7 +1598,7 @@ def process_ad_with_pricing(ad_data):
         # محاسبه درصدهای افت قیمت با ImprovedCarPriceCalculator
         if IMPROVED_PRICING_AVAILABLE:
             try:
-                calculator = ImprovedCarPriceCalculator()
+                calculator = get_pricing_engine(MARKET_SNAPSHOT_FILE).calculator if PRICING_ENGINE_AVAILABLE else ImprovedCarPriceCalculator()
                 
                 # استخراج اطلاعات خودرو
                 title = ad_data.get('عنوان آگهی', '')
@@ -2027,11 +1682,54 @@ def process_ad_with_pricing(ad_data):
         return ad_data
 
 
+def fetch_ad(ad_driver, ad_href):
+    """
+    دریافت اطلاعات آگهی: اول HTTP و در صورت نیاز بارگذاری در مرورگر
+
+    Returns
+    -------
+    tuple
+        (ad_data، آیا مرورگر به صفحه آگهی رفته است)
+    """
+    def browser_fetch(url):
+        resource_policy.apply(ad_driver, 'detail')
+        challenge_monitor.mark_navigation(ad_driver)
+        ad_driver.get(url)
+        ad_data = extract_ad_details(ad_driver)
+        resource_policy.record_page(ad_driver, 'detail')
+        return ad_data
+
+    if ad_fetcher is None:
+        return browser_fetch(ad_href), True
+    ad_data, source = ad_fetcher.fetch(ad_href, fallback=browser_fetch)
+    return ad_data, source != 'http'
+
+
+def process_ad_in_worker(worker_driver, ad_href):
+    """پردازش یک آگهی در یکی از کارگرهای استخر مرورگر (بارگذاری، استخراج، قیمت‌گذاری و ذخیره)"""
+    global processed_count
+
+    ad_data, used_browser = fetch_ad(worker_driver, ad_href)
+    critical_issue = check_for_critical_bot_detection(worker_driver) if used_browser else None
+    if critical_issue:
+        alert_user_critical(critical_issue)
+        return False
+
+    if not (ad_data and ad_data.get('عنوان آگهی')):
+        print(f"❌ خطا در استخراج: {ad_href[-20:]}")
+        return False
+
+    processed_ad = process_ad_with_pricing(ad_data)
+    with save_lock:
+        save_to_excel(processed_ad)
+        seen_registry.mark(ad_id_from_url(ad_href))
+        processed_count += 1
+    print(f"✅ {threading.current_thread().name}: {ad_data['عنوان آگهی'][:50]}")
+    return True
+
+
 def getads():
     """دریافت لیست آگهی‌ها با اسکرول برای آگهی‌های بیشتر"""
-    ads = []
-    unique_ads = set()
-    
     try:
         # انتظار برای بارگذاری اولیه - کاهش timeout برای سرعت بیشتر
         WebDriverWait(driver, 3).until(
@@ -2039,6 +1737,8 @@ def getads():
         )
         
         print("🔄 شروع اسکرول برای یافتن آگهی‌های بیشتر...")
+        # آگهی‌های تازه با اسکرول و بدون جابجایی بارگذاری می‌شوند؛ صفحه لیست در هر دور دوباره بررسی شود
+        challenge_monitor.mark_navigation(driver)
         
         # اسکرول برای بارگذاری آگهی‌های بیشتر
         last_count = 0
@@ -2046,19 +1746,10 @@ def getads():
         max_scrolls = 5  # حداکثر 5 بار اسکرول
         
         while scroll_attempts < max_scrolls:
-            # جمع‌آوری آگهی‌های فعلی
-            current_ads = driver.find_elements(By.TAG_NAME, "article")
+            # فقط کارت‌هایی که از مرحله قبل ظاهر شده‌اند (یک رفت و برگشت WebDriver)
+            listing_harvester.harvest(driver)
             
-            for ad_element in current_ads:
-                try:
-                    link_element = ad_element.find_element(By.TAG_NAME, "a")
-                    href = link_element.get_attribute('href')
-                    if href and '/v/' in href and href not in unique_ads:
-                        unique_ads.add(href)
-                except:
-                    continue
-            
-            current_count = len(unique_ads)
+            current_count = len(listing_harvester.cards)
             print(f"📊 آگهی‌های یافت شده: {current_count}")
             
             # اگر آگهی جدیدی پیدا نشد، توقف
@@ -2071,17 +1762,19 @@ def getads():
             
             last_count = current_count
             
-            # اسکرول به پایین
+            # اسکرول به پایین و انتظار تا آگهی‌های جدید اضافه شوند (یا صفحه آرام شود)
+            baseline = page_state(driver, "article")
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1.5)  # کاهش زمان انتظار برای سرعت بیشتر
+            wait_for_growth(driver, baseline, "article", SCROLL_WAIT, label='scroll')
             
             # بررسی وجود دکمه "آگهی بیشتر" و کلیک روی آن
             try:
                 more_ads_button = driver.find_element(By.CSS_SELECTOR, "#post-list-container-id > div.post-list__bottom-container-cac2f > div")
                 if more_ads_button.is_displayed():
+                    baseline = page_state(driver, "article")
                     driver.execute_script("arguments[0].click();", more_ads_button)
                     print("🔄 کلیک روی دکمه آگهی بیشتر")
-                    time.sleep(2)  # انتظار برای بارگذاری آگهی‌های جدید
+                    wait_for_growth(driver, baseline, "article", LOAD_MORE_WAIT, label='load_more')
             except:
                 pass  # اگر دکمه وجود نداشت، ادامه بده
             
@@ -2089,8 +1782,9 @@ def getads():
             if current_count >= 300:  # حداکثر 300 آگهی
                 break
         
-        ad_links = list(unique_ads)
+        ad_links = listing_harvester.links()
         print(f"✅ مجموع {len(ad_links)} آگهی منحصر به فرد یافت شد")
+        resource_policy.record_page(driver, 'listing')
         
         return ad_links
         
@@ -2121,25 +1815,25 @@ def cleanup_and_exit(reason="نامشخص"):
     print(f"\n🛑 دریافت سیگنال توقف ({reason})...")
     print("💾 در حال ذخیره داده‌های باقی‌مانده...")
     
-    # ذخیره batch باقی‌مانده
-    if data_batch:
-        try:
-            save_batch_to_improved_file()
-            print(f"💾 ذخیره نهایی: {len(data_batch)} رکورد باقی‌مانده ذخیره شد")
-        except Exception as e:
-            print(f"❌ خطا در ذخیره نهایی: {e}")
-            # تلاش برای ذخیره اضطراری
-            try:
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                emergency_file = f"divar_ads_emergency_{timestamp}.xlsx"
-                df = pd.DataFrame(data_batch)
-                df.to_excel(emergency_file, index=False, engine='openpyxl')
-                print(f"🚨 ذخیره اضطراری در {emergency_file}")
-            except:
-                print("❌ خطا در ذخیره اضطراری")
-    else:
-        print("⚠️ هیچ داده باقی‌مانده‌ای برای ذخیره وجود ندارد")
+    # توقف کارگرهای استخر بدون پردازش بقیه صف (آگهی‌های نیمه‌کاره در اجرای بعد دوباره امتحان می‌شوند)
+    if detail_pool is not None:
+        detail_pool.shutdown(wait=False, timeout=10)
+    
+    # ذخیره batch باقی‌مانده: کارگری که هنوز در process_ad_in_worker است ممکن است زیر
+    # save_lock به batch اضافه کند، پس کپی batch زیر همان قفل گرفته می‌شود
+    locked = save_lock.acquire(timeout=SAVE_LOCK_TIMEOUT)
+    if not locked:
+        print(f"⚠️ save_lock بعد از {SAVE_LOCK_TIMEOUT} ثانیه آزاد نشد؛ ذخیره بدون قفل")
+    try:
+        pending = list(data_batch)
+        if pending and write_batch(pending):
+            data_batch = []
+            print(f"💾 ذخیره نهایی: {len(pending)} رکورد باقی‌مانده ذخیره شد")
+        elif not pending:
+            print("⚠️ هیچ داده باقی‌مانده‌ای برای ذخیره وجود ندارد")
+    finally:
+        if locked:
+            save_lock.release()
     
     print(f"✅ پردازش کامل شد")
     print(f"📊 مجموع آگهی‌های پردازش شده: {record_count}")
@@ -2150,6 +1844,12 @@ def cleanup_and_exit(reason="نامشخص"):
         print("🔒 Chrome driver بسته شد")
     except:
         pass
+    get_factory().close()
+    print(f"🌐 مرورگرها: {get_factory().summary()}")
+    print(f"🧱 مسدودسازی منابع: {resource_policy.summary()}")
+    print(f"⏱️ انتظارها: {get_wait_stats().summary()}")
+    print(f"📋 لیست آگهی‌ها: {listing_harvester.summary()}")
+    print(f"🛡️ بررسی چالش ربات: {challenge_monitor.summary()}")
     
     print("👋 خروج از برنامه...")
     sys.exit(0)
@@ -2187,9 +1887,10 @@ print("💾 ذخیره خودکار هر 50 آگهی")
 print("💡 برای توقف و ذخیره داده‌ها، Ctrl+C را فشار دهید")
 
 # استخراج قیمت‌های روز بازار قبل از شروع
-print("🔄 در حال استخراج قیمت‌های روز بازار...")
-fetch_market_prices(force_update=True)
-print("✅ قیمت‌های روز بازار با موفقیت به‌روز شدند")
+# snapshot تازه (کمتر از 12 ساعت) دوباره استفاده می‌شود؛ --refresh-prices استخراج مجدد را اجباری می‌کند
+print("🔄 در حال آماده‌سازی قیمت‌های روز بازار...")
+fetch_market_prices(force_update=FORCE_MARKET_REFRESH)
+print("✅ قیمت‌های روز بازار آماده هستند")
 
 # بارگذاری داده‌های موجود
 load_existing_data()
@@ -2197,7 +1898,10 @@ load_existing_data()
 print("🚀 شروع پردازش آگهی‌ها...")
 print("🔄 پردازش بدون محدودیت - تا زمان توقف دستی")
 
-passed = []
+# آگهی‌های ذخیره‌شده در اجراهای قبلی (تا SEEN_TTL_DAYS روز) دوباره باز نمی‌شوند
+SEEN_TTL_DAYS = 7
+seen_registry = SeenRegistry(RESULTS_DB_FILE, ttl_days=SEEN_TTL_DAYS)
+print(f"📚 {len(seen_registry)} آگهی از اجراهای قبلی قبلاً ذخیره شده‌اند")
 processed_count = 0
 
 restart_attempts = 0
@@ -2207,6 +1911,10 @@ max_restart_attempts = 3
 consecutive_pagination_errors = 0
 max_consecutive_pagination_errors = 3
 
+# با چند کارگر، این درایور فقط لیست آگهی‌ها را می‌خواند و صفحات جزئیات در استخر باز می‌شوند
+if DETAIL_WORKERS > 1:
+    detail_pool = BrowserPool(create_driver, process_ad_in_worker, workers=DETAIL_WORKERS).start()
+
 while True:
     try:
         # بررسی graceful_exit در ابتدای هر حلقه
@@ -2222,23 +1930,35 @@ while True:
         ad_links = getads()
         print(f"📊 تعداد آگهی‌های یافت شده: {len(ad_links)}")
         
+        # حذف آگهی‌های دیده‌شده قبل از بارگذاری هر صفحه
+        # (ad_links دست‌نخورده می‌ماند چون بررسی بارگذاری آگهی‌های جدید با تعداد آن است)
+        pending_links = seen_registry.filter_new(ad_links)
+        if len(pending_links) != len(ad_links):
+            print(f"⏭️ {len(ad_links) - len(pending_links)} آگهی قبلاً پردازش شده کنار گذاشته شد")
+        
         new_ads_found = False
         restart_attempts = 0  # Reset restart attempts on successful operation
         
-        print(f"🔍 شروع پردازش {len(ad_links)} آگهی...")
-        for i, ad_href in enumerate(ad_links, 1):
+        print(f"🔍 شروع پردازش {len(pending_links)} آگهی...")
+        for i, ad_href in enumerate(pending_links, 1):
             try:
                 # بررسی graceful_exit در هر آگهی
                 if graceful_exit:
                     print("🛑 خروج درخواست شده - متوقف می‌شویم...")
                     break
                     
-                print(f"📝 پردازش آگهی {i}/{len(ad_links)}: {ad_href[-20:]}...")
-                adId = ad_href.split('/')[-1]
+                print(f"📝 پردازش آگهی {i}/{len(pending_links)}: {ad_href[-20:]}...")
+                adId = ad_id_from_url(ad_href)
 
-                if adId not in passed:
+                if not seen_registry.is_seen(adId):
                     print(f"✅ آگهی جدید یافت شد: {adId}")
-                    passed.append(adId)
+                    # فقط برای همین اجرا؛ بعد از ذخیره موفق به صورت ماندگار ثبت می‌شود
+                    seen_registry.mark(adId, persist=False)
+                    
+                    # اگر استخر کارگری ندارد، آگهی با همین درایور پردازش می‌شود
+                    if detail_pool is not None and detail_pool.submit(ad_href):
+                        new_ads_found = True
+                        continue
                     
                     # بررسی فقط مشکلات جدی قبل از کلیک
                     critical_issue = check_for_critical_bot_detection()
@@ -2250,16 +1970,10 @@ while True:
                         else:
                             break
                     
-                    # رفتن مستقیم به آگهی با بهینه‌سازی سرعت
-                    print(f"🌐 بارگذاری آگهی: {ad_href}")
-                    driver.get(ad_href)
-                    
-                    # حذف انتظار برای سرعت بیشتر
-                    # time.sleep(0.1)  # حذف شد
-                    
-                    # استخراج سریع اطلاعات
+                    # دریافت آگهی (HTTP یا در صورت نیاز رفتن مستقیم به آگهی در مرورگر)
+                    print(f"🌐 دریافت آگهی: {ad_href}")
                     print("📊 استخراج اطلاعات...")
-                    ad_data = extract_ad_details()
+                    ad_data, used_browser = fetch_ad(driver, ad_href)
                     
                     if ad_data and ad_data.get('عنوان آگهی'):
                         print(f"✅ استخراج شد: {ad_data['عنوان آگهی'][:50]}...")
@@ -2270,6 +1984,7 @@ while True:
                         
                         # ذخیره سریع
                         save_to_excel(processed_ad)
+                        seen_registry.mark(adId)
                         
                         processed_count += 1
                         new_ads_found = True
@@ -2277,9 +1992,12 @@ while True:
                     else:
                         print("❌ خطا در استخراج")
                         
-                    # برگشت سریع (کاهش انتظار)
-                    driver.back()
-                    time.sleep(0.1)
+                    # برگشت سریع (کاهش انتظار)؛ در حالت HTTP مرورگر روی لیست مانده است
+                    if used_browser:
+                        resource_policy.apply(driver, 'listing')
+                        challenge_monitor.mark_navigation(driver)
+                        driver.back()
+                        wait_for_selector(driver, "article", LISTING_WAIT, label='back')
                 else:
                     print(f"⏭️ آگهی قبلاً پردازش شده: {adId}")
                     continue
@@ -2310,8 +2028,9 @@ while True:
             print("🔄 اسکرول برای بارگذاری آگهی‌های بیشتر...")
             
             # اسکرول مستقیم به انتها
+            baseline = page_state(driver, "article")
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)  # کاهش انتظار
+            wait_for_growth(driver, baseline, "article", SCROLL_WAIT, label='scroll')
             
             # بررسی اینکه آیا آگهی جدیدی بارگذاری شده یا نه
             new_ad_links = getads()
@@ -2334,12 +2053,12 @@ while True:
                             print(f"🔘 دکمه بارگذاری بیشتر پیدا شد با selector: {selector}")
                             driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", load_more_button)
                             time.sleep(0.5)
+                            baseline = page_state(driver, "article")
                             load_more_button.click()
-                            time.sleep(1)
                             print("✅ کلیک روی دکمه 'آگهی‌های بیشتر' موفق بود")
                             
                             # بررسی مجدد آگهی‌های جدید بعد از کلیک
-                            time.sleep(1)
+                            wait_for_growth(driver, baseline, "article", LOAD_MORE_WAIT, label='load_more')
                             newer_ad_links = getads()
                             if len(newer_ad_links) > len(ad_links):
                                 print("✅ آگهی‌های جدید بارگذاری شدند")
@@ -2365,8 +2084,9 @@ while True:
                     load_more_btn = driver.find_element(By.CSS_SELECTOR, "span.kt-button__ripple, button[class*='load-more']")
                     if load_more_btn and load_more_btn.is_displayed():
                         print("🔘 کلیک روی دکمه بارگذاری بیشتر...")
+                        baseline = page_state(driver, "article")
                         driver.execute_script("arguments[0].click();", load_more_btn)
-                        time.sleep(1)
+                        wait_for_growth(driver, baseline, "article", LOAD_MORE_WAIT, label='load_more')
                         
                         # بررسی آگهی‌های جدید
                         newer_ad_links = getads()
@@ -2457,6 +2177,12 @@ try:
     driver.quit()
 except:
     pass
+get_factory().close()
+print(f"🌐 مرورگرها: {get_factory().summary()}")
+print(f"🧱 مسدودسازی منابع: {resource_policy.summary()}")
+print(f"⏱️ انتظارها: {get_wait_stats().summary()}")
+print(f"📋 لیست آگهی‌ها: {listing_harvester.summary()}")
+print(f"🛡️ بررسی چالش ربات: {challenge_monitor.summary()}")
 
 print(f"🎉 پردازش کامل شد! تعداد کل آگهی‌های پردازش شده: {processed_count}")
 print("📁 فایل‌های اکسل در پوشه پروژه ذخیره شده‌اند")
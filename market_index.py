@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ایندکس معکوس نام خودروهای بازار برای تطبیق سریع نام
+
+برای هر snapshot از قیمت‌های بازار یک بار ساخته می‌شود:
+- دیکشنری نام نرمال‌شده برای تطبیق دقیق
+- ایندکس سه‌حرفی (character trigram) برای یافتن نام‌هایی که یک کلمه را در خود دارند
+- بلاک برند (کلمه اول نام) برای اولویت‌دهی به کاندیداهای هم‌برند
+
+فقط تعداد محدودی کاندیدا با calculate_name_match_score امتیازدهی می‌شوند.
+"""
+
+from collections import defaultdict
+
+STOP_WORDS = {'و', 'با', 'در', 'از', 'به', 'که', 'این', 'است', 'برای', 'یک', 'را', 'هم', 'خودرو', 'ماشین', 'اتومبیل'}
+QUERY_STOP_WORDS = {'و', 'با', 'در', 'از', 'به'}
+NGRAM_SIZE = 3
+
+
+def normalize_name(name):
+    """پیش‌پردازش نام خودرو (همان قواعد get_market_price_for_car)"""
+    return str(name).lower().strip().replace('،', ' ').replace(',', ' ')
+
+
+def query_words(car_name):
+    """کلمات مهم نام جستجو؛ کاندیداها نام‌هایی هستند که حداقل یکی از این‌ها را دارند"""
+    return [w for w in set(normalize_name(car_name).split()) if len(w) > 2 and w not in QUERY_STOP_WORDS]
+
+
+def char_ngrams(text, size=NGRAM_SIZE):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def calculate_name_match_score(name1, name2):
+    """محاسبه امتیاز تطابق بین دو نام خودرو با الگوریتم پیشرفته"""
+    # پیش‌پردازش نام‌ها
+    name1 = normalize_name(name1)
+    name2 = normalize_name(name2)
+
+    # اگر نام‌ها دقیقاً یکسان باشند
+    if name1 == name2:
+        return 1.0
+
+    # بررسی اگر یکی شامل دیگری باشد
+    if name1 in name2 or name2 in name1:
+        return 0.9
+
+    # تقسیم به کلمات و حذف کلمات بی‌اهمیت
+    words1 = [w for w in name1.split() if w not in STOP_WORDS and len(w) > 1]
+    words2 = [w for w in name2.split() if w not in STOP_WORDS and len(w) > 1]
+
+    # اگر پس از حذف کلمات بی‌اهمیت، کلمه‌ای باقی نماند
+    if not words1 or not words2:
+        return 0.0
+
+    # تبدیل به مجموعه برای محاسبه اشتراک
+    set_words1 = set(words1)
+    set_words2 = set(words2)
+    common_words = set_words1.intersection(set_words2)
+
+    # محاسبه امتیاز جاکارد (نسبت اشتراک به اجتماع)
+    jaccard_score = len(common_words) / len(set_words1.union(set_words2)) if set_words1 or set_words2 else 0
+
+    # محاسبه امتیاز تطابق دقیق کلمات (با وزن بیشتر)
+    exact_match_score = len(common_words) / min(len(set_words1), len(set_words2)) if common_words else 0
+
+    # بررسی تطابق برند و مدل (کلمات اول و دوم معمولاً برند و مدل هستند)
+    brand_model_score = 0
+    if len(words1) >= 1 and len(words2) >= 1:
+        # بررسی تطابق کلمه اول (معمولاً برند)
+        if words1[0] == words2[0]:
+            brand_model_score += 0.5
+        # بررسی تطابق کلمه دوم (معمولاً مدل) اگر وجود داشته باشد
+        if len(words1) >= 2 and len(words2) >= 2 and words1[1] == words2[1]:
+            brand_model_score += 0.3
+
+    # بررسی تطابق جزئی کلمات (برای مواردی که کلمات مشابه اما نه دقیقاً یکسان هستند)
+    partial_match_score = 0
+    for w1 in words1:
+        for w2 in words2:
+            if w1 != w2 and (w1 in w2 or w2 in w1) and min(len(w1), len(w2)) > 2:
+                # امتیاز بر اساس نسبت طول کلمه کوتاه‌تر به بلندتر
+                partial_match_score += min(len(w1), len(w2)) / max(len(w1), len(w2))
+
+    # نرمال‌سازی امتیاز تطابق جزئی
+    max_possible_partial = max(len(words1), len(words2))
+    if max_possible_partial > 0:
+        partial_match_score = min(partial_match_score / max_possible_partial, 1.0)
+
+    # ترکیب امتیازها با وزن‌های مختلف
+    final_score = (jaccard_score * 0.3) + (exact_match_score * 0.3) + (brand_model_score * 0.3) + (partial_match_score * 0.1)
+
+    # محدود کردن امتیاز نهایی بین 0 و 1
+    return min(max(final_score, 0.0), 1.0)
+
+
+class MarketNameIndex:
+    """
+    ایندکس معکوس روی نام‌های یک snapshot از قیمت‌های بازار
+
+    Parameters
+    ----------
+    names : iterable of str
+        نام خودروها به همان شکلی که کلید market_prices هستند
+    max_candidates : int
+        حداکثر تعداد کاندیدایی که امتیاز کامل می‌گیرند
+    """
+
+    def __init__(self, names, max_candidates=40):
+        self.names = []
+        self.normalized = []
+        self.max_candidates = max_candidates
+
+        self.exact = {}
+        self.ngram_postings = defaultdict(set)
+        self.brand_blocks = defaultdict(set)
+        # شناسه‌ها به ترتیب افزودن می‌مانند؛ نام حذف‌شده None می‌شود
+        self.entry_ids = {}
+        self._live = 0
+
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return self._live
+
+    def __contains__(self, name):
+        return name in self.entry_ids
+
+    def add(self, name):
+        """افزودن یک نام (نتیجه مثل ساختن دوباره ایندکس با نام در انتهای لیست)"""
+        if name in self.entry_ids:
+            return
+        entry_id = len(self.names)
+        norm = normalize_name(name)
+        self.names.append(name)
+        self.normalized.append(norm)
+        self.entry_ids[name] = entry_id
+        self._live += 1
+
+        # اولین نام با این شکل نرمال‌شده برنده است (مانند پیمایش قبلی کلیدها)
+        self.exact.setdefault(norm.strip(), entry_id)
+        for gram in char_ngrams(norm):
+            self.ngram_postings[gram].add(entry_id)
+        words = self._brand_words(norm)
+        if words:
+            self.brand_blocks[words[0]].add(entry_id)
+
+    def remove(self, name):
+        """حذف یک نام بدون ساختن دوباره ایندکس"""
+        entry_id = self.entry_ids.pop(name, None)
+        if entry_id is None:
+            return
+        norm = self.normalized[entry_id]
+        self.names[entry_id] = None
+        self._live -= 1
+
+        for gram in char_ngrams(norm):
+            posting = self.ngram_postings.get(gram)
+            if posting is not None:
+                posting.discard(entry_id)
+                if not posting:
+                    del self.ngram_postings[gram]
+        words = self._brand_words(norm)
+        if words:
+            block = self.brand_blocks.get(words[0])
+            if block is not None:
+                block.discard(entry_id)
+                if not block:
+                    del self.brand_blocks[words[0]]
+
+        key = norm.strip()
+        if self.exact.get(key) == entry_id:
+            # نام بعدی با همین شکل نرمال‌شده (به ترتیب افزودن) جایگزین می‌شود
+            del self.exact[key]
+            for other_id in sorted(self.entry_ids.values()):
+                if self.normalized[other_id].strip() == key:
+                    self.exact[key] = other_id
+                    break
+
+    def apply_changes(self, added=(), removed=()):
+        """اعمال نام‌های اضافه و حذف‌شده یک به‌روزرسانی قیمت (تغییر قیمت روی ایندکس اثری ندارد)"""
+        for name in removed:
+            self.remove(name)
+        for name in added:
+            self.add(name)
+
+    @staticmethod
+    def _brand_words(norm):
+        return [w for w in norm.split() if w not in STOP_WORDS and len(w) > 1]
+
+    def exact_match(self, car_name):
+        entry_id = self.exact.get(normalize_name(car_name))
+        return self.names[entry_id] if entry_id is not None else None
+
+    def _entries_containing(self, word):
+        """شناسه نام‌هایی که word را به عنوان زیررشته دارند"""
+        grams = char_ngrams(word)
+        if not grams:
+            return set()
+        postings = sorted((self.ngram_postings.get(gram, set()) for gram in grams), key=len)
+        if not postings[0]:
+            return set()
+        found = set(postings[0])
+        for posting in postings[1:]:
+            found &= posting
+            if not found:
+                return found
+        # تایید نهایی زیررشته (اشتراک سه‌حرفی‌ها شرط لازم است نه کافی)
+        return {entry_id for entry_id in found if word in self.normalized[entry_id]}
+
+    def candidates(self, car_name):
+        """
+        نام‌های کاندیدا برای امتیازدهی، به ترتیب اولویت
+
+        کاندیدا نامی است که حداقل یکی از کلمات مهم جستجو را در خود دارد؛
+        نام‌های هم‌برند و نام‌هایی که کلمات بیشتری را پوشش می‌دهند جلوتر هستند.
+        """
+        processed = normalize_name(car_name)
+
+        hits = defaultdict(int)
+        for word in query_words(car_name):
+            for entry_id in self._entries_containing(word):
+                hits[entry_id] += 1
+
+        if not hits:
+            # مانند قبل: فقط برای لیست‌های کوچک همه نام‌ها بررسی می‌شوند
+            return [name for name in self.names if name is not None] if len(self) < 100 else []
+
+        words = [w for w in processed.split() if w not in STOP_WORDS and len(w) > 1]
+        brand_block = self.brand_blocks.get(words[0], set()) if words else set()
+
+        ranked = sorted(hits, key=lambda entry_id: (-(entry_id in brand_block), -hits[entry_id], entry_id))
+        return [self.names[entry_id] for entry_id in ranked[:self.max_candidates]]
+
+    def best_match(self, car_name, min_score=0.4):
+        """
+        بهترین نام بازار برای car_name
+
+        Returns
+        -------
+        tuple
+            (نام تطبیق‌یافته, امتیاز) یا (None, 0)
+        """
+        name = self.exact_match(car_name)
+        if name is not None:
+            return name, 1.0
+
+        best_name, best_score = None, 0
+        for market_car_name in self.candidates(car_name):
+            score = calculate_name_match_score(car_name, market_car_name)
+            if score > min_score and score > best_score:
+                best_name, best_score = market_car_name, score
+        return best_name, best_score
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تطبیق دسته‌ای آگهی‌ها با قیمت‌های بازار به صورت برداری
+
+جدول ویژگی‌های ستونی نام‌های بازار (مدل عددی، برند، توکن‌ها، منبع) یک بار
+ساخته می‌شود و امتیاز هر عبارت جستجو با عملیات NumPy روی کل جدول حساب
+می‌شود. قواعد امتیازدهی همان CarPriceCalculator.find_market_price هستند.
+آگهی‌هایی که کلید استاندارد آن‌ها در کاتالوگ (car_catalog) هست امتیازدهی نمی‌شوند.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from car_catalog import CarCatalog
+
+# مدل‌هایی که نباید با هم اشتباه گرفته شوند (آخرین مورد یافت‌شده ملاک است)
+MODEL_NUMBERS = ['206', '207', '405', '508', '2008', '3008', '5008']
+
+# مدل‌های عددی برای امتیاز تطبیق مدل
+MODEL_PATTERNS = ['206', '207', '405', '508', '2008', '3008', '5008', '131', '132']
+
+# الگوهای برند برای امتیاز تطبیق برند
+BRAND_PATTERNS = {
+    'پژو': ['پژو', 'peugeot'],
+    'پراید': ['پراید', 'pride'],
+    'سمند': ['سمند', 'samand'],
+    'تویوتا': ['تویوتا', 'toyota'],
+    'هوندا': ['هوندا', 'honda'],
+    'نیسان': ['نیسان', 'nissan'],
+    'هیوندای': ['هیوندای', 'hyundai'],
+    'کیا': ['کیا', 'kia'],
+    'مزدا': ['مزدا', 'mazda']
+}
+
+# کلمات کلیدی برند برای جستجوی عمومی (مرحله 2)
+BRAND_KEYWORDS = {
+    # برندهای ایرانی
+    'پژو': ['پژو', 'peugeot', '206', '207', '405', 'پارس'],
+    'پراید': ['پراید', 'pride', '131', '132'],
+    'سمند': ['سمند', 'samand'],
+    'دنا': ['دنا', 'dena'],
+    'رانا': ['رانا', 'rana'],
+    'تیبا': ['تیبا', 'tiba'],
+    'ساینا': ['ساینا', 'saina'],
+    'آریو': ['آریو', 'ario'],
+    'شاهین': ['شاهین', 'shahin'],
+    'تارا': ['تارا', 'tara'],
+    'کوییک': ['کوییک', 'quick'],
+    # برندهای آسیایی
+    'تویوتا': ['تویوتا', 'toyota', 'کمری', 'کرولا', 'پرادو', 'لندکروزر'],
+    'هوندا': ['هوندا', 'honda', 'سیویک', 'آکورد', 'crv'],
+    'نیسان': ['نیسان', 'nissan', 'قشقایی', 'تینا', 'سانی', 'مورانو'],
+    'هیوندای': ['هیوندای', 'hyundai', 'النترا', 'سوناتا', 'توسان', 'آزرا'],
+    'کیا': ['کیا', 'kia', 'سراتو', 'اسپورتیج', 'سورنتو', 'پیکانتو'],
+    'مزدا': ['مزدا', 'mazda', '323', '626'],
+    'میتسوبیشی': ['میتسوبیشی', 'mitsubishi', 'لنسر', 'پاجرو', 'اوتلندر'],
+    # برندهای اروپایی
+    'بی ام و': ['بی ام و', 'bmw', 'سری', 'x1', 'x3', 'x5', 'x6'],
+    'بنز': ['بنز', 'mercedes', 'مرسدس', 'کلاس'],
+    'آئودی': ['آئودی', 'audi', 'a3', 'a4', 'a6', 'q3', 'q5', 'q7'],
+    'فولکس': ['فولکس', 'volkswagen', 'پاسات', 'جتا', 'گلف'],
+    'رنو': ['رنو', 'renault', 'ساندرو', 'تندر', 'فلوئنس'],
+    'پورشه': ['پورشه', 'porsche', '911', 'کاین', 'ماکان'],
+    # برندهای لوکس
+    'لکسوس': ['لکسوس', 'lexus', 'es', 'ls', 'rx', 'lx', 'nx'],
+    'اینفینیتی': ['اینفینیتی', 'infiniti', 'g35', 'fx35', 'qx56'],
+    'جگوار': ['جگوار', 'jaguar', 'xf', 'xj', 'f-pace'],
+    'لندرور': ['لندرور', 'land rover', 'range rover', 'discovery'],
+    # برندهای چینی
+    'چری': ['چری', 'chery', 'آریزو', 'تیگو'],
+    'ام وی ام': ['ام وی ام', 'mvm', 'x33', 'x22', '315', '110'],
+    'هاوال': ['هاوال', 'haval', 'h2', 'h6', 'h9'],
+    'گک': ['گک', 'gac', 'گونو', 'امزوم', 'امکو'],
+    'لیفان': ['لیفان', 'lifan', 'x60', 'x70', '520', '620'],
+    'گریت وال': ['گریت وال', 'great wall', 'ولکس', 'وینگل'],
+    # برندهای دیگر
+    'ولوو': ['ولوو', 'volvo', 'xc60', 'xc90', 's60', 'v40'],
+    'مینی': ['مینی', 'mini', 'cooper', 'countryman'],
+    'فیات': ['فیات', 'fiat', 'پاندا', 'پونتو'],
+    'دوو': ['دوو', 'daewoo', 'سیلو', 'نکسیا', 'ماتیز']
+}
+
+EXPENSIVE_PRICE = 2000000000  # بیش از 2 میلیارد
+MIN_MATCH_SCORE = 0.4
+
+
+def build_search_terms(car_name, brand_type=""):
+    """عبارت‌های جستجو به همان ترتیب find_market_price"""
+    search_terms = []
+    if brand_type and brand_type != 'نامشخص':
+        search_terms.append(brand_type.lower().strip())
+    if car_name:
+        search_terms.append(car_name.lower())
+    return search_terms
+
+
+def last_model_number(text):
+    model = None
+    for candidate in MODEL_NUMBERS:
+        if candidate in text:
+            model = candidate
+    return model
+
+
+class MarketFeatureTable:
+    """
+    جدول ویژگی‌های ستونی نام‌های بازار برای امتیازدهی برداری
+
+    Parameters
+    ----------
+    market_df : DataFrame
+        خروجی CarPriceCalculator.load_market_prices با ستون‌های
+        Car Name / Numeric Price / Source (ترتیب ردیف‌ها حفظ می‌شود)
+    """
+
+    def __init__(self, market_df):
+        raw_names = market_df['Car Name'].astype(str).tolist()
+        self.names = [name.lower() for name in raw_names]
+        self.names_arr = np.array(self.names, dtype=str)
+        self.size = len(self.names)
+
+        self.prices = pd.to_numeric(market_df['Numeric Price'], errors='coerce').to_numpy(dtype=float)
+        if 'Source' in market_df.columns:
+            self.sources = market_df['Source'].tolist()
+        else:
+            self.sources = ['نامشخص'] * self.size
+        sources_arr = np.array(self.sources, dtype=object)
+        self.is_z4car = sources_arr == 'z4car'
+        self.is_hamrah = sources_arr == 'همراه مکانیک'
+        self.is_expensive = self.prices > EXPENSIVE_PRICE
+
+        # شناسه مدل عددی (آخرین مدل یافت‌شده در نام) - برای فیلتر مدل‌های متفاوت
+        model_ids = {model: i for i, model in enumerate(MODEL_NUMBERS)}
+        self.model_id = np.array([model_ids.get(last_model_number(name), -1) for name in self.names])
+
+        self.has = {}
+        for literal in set(MODEL_PATTERNS) | {'207', '508'}:
+            self.has[literal] = self._contains(literal)
+        self.peugeot_508 = np.array(['پژو ۵۰۸' in name for name in raw_names], dtype=bool)
+
+        self.brand_hit = {
+            brand: np.logical_or.reduce([self._contains(p) for p in patterns])
+            for brand, patterns in BRAND_PATTERNS.items()
+        }
+        self.brand_keyword_hit = {
+            brand: market_df['Car Name'].str.contains('|'.join(keywords), case=False, na=False).to_numpy()
+            for brand, keywords in BRAND_KEYWORDS.items()
+        }
+
+        # ایندکس توکن -> ردیف‌ها برای شمارش کلمات مشترک
+        self.word_lists = [name.split() for name in self.names]
+        postings = defaultdict(list)
+        for row_id, words in enumerate(self.word_lists):
+            for word in set(words):
+                postings[word].append(row_id)
+        self.token_rows = {word: np.array(rows) for word, rows in postings.items()}
+
+        # کلید استاندارد هر ردیف (position ورودی‌ها همان شماره ردیف است)
+        self.catalog = CarCatalog(raw_names)
+
+        self._term_cache = {}
+        self._year_cache = {}
+
+    def __len__(self):
+        return self.size
+
+    def _contains(self, literal):
+        return np.char.find(self.names_arr, literal) >= 0
+
+    def _year_hit(self, year):
+        if year not in self._year_cache:
+            self._year_cache[year] = self._contains(str(year))
+        return self._year_cache[year]
+
+    def term_scores(self, term):
+        """
+        امتیاز پایه یک عبارت جستجو روی همه ردیف‌ها
+
+        Returns
+        -------
+        tuple
+            (امتیاز بدون امتیاز سال/منبع, ماسک ردیف‌های مجاز)
+        """
+        if term in self._term_cache:
+            return self._term_cache[term]
+
+        valid = np.ones(self.size, dtype=bool)
+        search_model = last_model_number(term)
+        if search_model:
+            search_id = MODEL_NUMBERS.index(search_model)
+            valid &= ~((self.model_id >= 0) & (self.model_id != search_id))
+        if '207' in term:
+            valid &= ~self.has['508']
+        if '508' in term:
+            valid &= ~self.has['207']
+        if 'tu5' in term:
+            valid &= self.has['207']
+
+        # تطبیق کامل / شامل بودن
+        equal = self.names_arr == term
+        term_in_name = np.char.find(self.names_arr, term) >= 0
+        name_in_term = np.char.find(np.str_(term), self.names_arr) >= 0
+
+        search_words = term.split()
+        mostly_matched = np.zeros(self.size, dtype=bool)
+        for row_id in np.flatnonzero(term_in_name & ~equal):
+            market_words = self.word_lists[row_id]
+            exact_matches = sum(1 for word in search_words if word in market_words)
+            mostly_matched[row_id] = exact_matches >= len(search_words) * 0.8
+
+        score = np.where(equal, 1.0,
+                         np.where(term_in_name, np.where(mostly_matched, 0.9, 0.6),
+                                  np.where(name_in_term, 0.5, 0.0)))
+
+        # برند و مدل
+        brand_in_market = np.zeros(self.size, dtype=bool)
+        for brand, patterns in BRAND_PATTERNS.items():
+            if any(pattern in term for pattern in patterns):
+                brand_in_market |= self.brand_hit[brand]
+        model_in_market = np.zeros(self.size, dtype=bool)
+        for model in MODEL_PATTERNS:
+            if model in term:
+                model_in_market |= self.has[model]
+
+        score = score + np.where(brand_in_market, 0.3, 0.0)
+        score = score + np.where(model_in_market, 0.4, 0.0)
+        score = score + np.where(brand_in_market & model_in_market, 0.5, 0.0)
+
+        # کلمات مشترک
+        common_counts = np.zeros(self.size, dtype=int)
+        for word in set(search_words):
+            rows = self.token_rows.get(word)
+            if rows is not None:
+                common_counts[rows] += 1
+        score = score + common_counts * 0.3
+
+        self._term_cache[term] = (score, valid)
+        return score, valid
+
+    def score_ad(self, search_terms, year):
+        """امتیاز نهایی همه ردیف‌ها برای یک آگهی (-1 برای ردیف‌های حذف‌شده)"""
+        bonus_year = self._year_hit(year) if year else None
+        new_car = bool(year and year >= 1400)
+        old_car = not year or year < 1400
+        prefers_z4car = any(brand in term for term in search_terms for brand in ['پراید', 'پژو'])
+
+        best = np.zeros(self.size)
+        for term in search_terms:
+            score, valid = self.term_scores(term)
+            if bonus_year is not None:
+                score = score + np.where(bonus_year, 0.4, 0.0)
+            if new_car:
+                score = score + np.where(self.is_z4car, 0.1, 0.0)
+            if old_car:
+                score = score + np.where(self.is_hamrah, 0.1, 0.0)
+            if prefers_z4car:
+                score = score + np.where(self.is_z4car, 0.15, 0.0)
+            best = np.maximum(best, np.where(valid, score, 0.0))
+
+        excluded = np.zeros(self.size, dtype=bool)
+        if any('207' in term for term in search_terms):
+            excluded |= self.peugeot_508
+        if year and year < 1400:
+            excluded |= self.is_expensive
+        return np.where(excluded, -1.0, best)
+
+    def fallback_match(self, search_terms, year):
+        """مرحله 2: جستجوی عمومی بر اساس برند اصلی"""
+        query = ' '.join(search_terms)
+        for brand, keywords in BRAND_KEYWORDS.items():
+            if not any(keyword in query for keyword in keywords):
+                continue
+            brand_rows = np.flatnonzero(self.brand_keyword_hit[brand])
+            if not len(brand_rows):
+                continue
+            if year:
+                year_rows = brand_rows[self._year_hit(year)[brand_rows]]
+                if len(year_rows):
+                    return int(year_rows[0])
+            return int(brand_rows[0])
+        return None
+
+    def catalog_row(self, search_terms, year):
+        """ردیف کلید استاندارد اولین عبارت جستجو (یا None برای تطبیق فازی)"""
+        entry = self.catalog.lookup_terms(search_terms, year)
+        if entry is None or not self.prices[entry.position] > 0:
+            return None
+        return entry.position
+
+    def match(self, car_name, year, brand_type=""):
+        """
+        بهترین قیمت بازار برای یک آگهی
+
+        Returns
+        -------
+        tuple
+            (قیمت, منبع) یا (None, None)
+        """
+        search_terms = build_search_terms(car_name, brand_type)
+        if not search_terms or not self.size:
+            return None, None
+
+        row = self.catalog_row(search_terms, year)
+        if row is not None:
+            return self.prices[row], self.sources[row]
+
+        scores = self.score_ad(search_terms, year)
+        best_row = int(np.argmax(scores))
+        if scores[best_row] > MIN_MATCH_SCORE:
+            price, source = self.prices[best_row], self.sources[best_row]
+        else:
+            price, source = None, None
+
+        if not price:
+            fallback_row = self.fallback_match(search_terms, year)
+            if fallback_row is not None:
+                return self.prices[fallback_row], self.sources[fallback_row]
+        return price, source
+
+    def match_many(self, ads_df):
+        """
+        تطبیق دسته‌ای آگهی‌ها
+
+        Parameters
+        ----------
+        ads_df : DataFrame
+            ستون‌های car_name، year و brand_type
+
+        Returns
+        -------
+        DataFrame
+            ستون‌های market_price و price_source با همان ایندکس ads_df
+        """
+        prices = []
+        sources = []
+        columns = [ads_df[col] if col in ads_df.columns else pd.Series([None] * len(ads_df), index=ads_df.index)
+                   for col in ('car_name', 'year', 'brand_type')]
+        for car_name, year, brand_type in zip(*columns):
+            car_name = car_name if isinstance(car_name, str) else None
+            brand_type = brand_type if isinstance(brand_type, str) else ""
+            year = int(year) if year is not None and not pd.isna(year) else None
+            price, source = self.match(car_name, year, brand_type)
+            prices.append(price)
+            sources.append(source)
+        return pd.DataFrame({'market_price': prices, 'price_source': sources}, index=ads_df.index, dtype=object)
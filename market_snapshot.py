@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+فایل snapshot دودویی قیمت‌های بازار
+
+قیمت‌های همراه مکانیک و زد فور به صورت ستونی (آرایه‌های numpy) همراه با نام‌های
+اصلی و نرمال‌شده، قیمت روز (میانگین منابع) و متادیتای هر منبع (تعداد، checksum و
+زمان دریافت) و کلید استاندارد هر نام (car_catalog) در یک فایل pickle ذخیره می‌شوند. ابتدای فایل شامل نشانه قالب، نسخه و
+sha256 محتوا است؛ فایل خراب یا قدیمی رد می‌شود. بارگذاری چند میلی‌ثانیه طول می‌کشد
+و فایل combined_market_prices.xlsx فقط یک خروجی برای مشاهده است.
+
+هر به‌روزرسانی با diff_snapshots به مجموعه تغییرات (اضافه، حذف و تغییر قیمت) تبدیل
+می‌شود و apply_price_changes فقط همان‌ها را روی قیمت‌ها، ایندکس نام‌ها و کش تطبیق
+اعمال می‌کند.
+
+python market_snapshot.py [market_prices.snapshot] [--export combined_market_prices.xlsx]
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import re
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+
+from car_catalog import CarCatalog
+from market_index import normalize_name, query_words
+
+DEFAULT_SNAPSHOT_FILE = 'market_prices.snapshot'
+SNAPSHOT_MAGIC = b'DIVARMKT'
+SNAPSHOT_VERSION = 1
+# snapshot جوان‌تر از این (ساعت) بدون استخراج مجدد استفاده می‌شود
+SNAPSHOT_MAX_AGE_HOURS = 12
+_HEADER = struct.Struct('<8sH32s')
+
+# منابع قیمت به ترتیب اولویت و ستون هر کدام در خروجی اکسل
+SOURCES = ('hamrah_mechanic', 'z4car')
+SOURCE_COLUMNS = {
+    'hamrah_mechanic': 'قیمت همراه مکانیک (تومان)',
+    'z4car': 'قیمت زد فور (تومان)',
+}
+
+
+class SnapshotError(Exception):
+    """فایل snapshot خراب، ناقص یا با نسخه ناسازگار"""
+
+
+def parse_price(value):
+    """عدد قیمت از «1,234 تومان» یا عدد؛ 0 یعنی نامعتبر"""
+    digits = re.sub(r'[^\d]', '', str(value))
+    return int(digits) if digits else 0
+
+
+def source_prices(car_data):
+    """{نام: قیمت} از خروجی اسکرایپرها ([{'نام خودرو', 'قیمت (تومان)'}])؛ برای نام تکراری آخرین قیمت"""
+    prices = {}
+    for car in car_data or []:
+        name = car.get('نام خودرو')
+        price = parse_price(car.get('قیمت (تومان)'))
+        if name and price > 0:
+            prices[name] = price
+    return prices
+
+
+def source_checksum(prices):
+    """checksum داده یک منبع (مستقل از ترتیب ردیف‌ها)"""
+    digest = hashlib.sha256()
+    for name in sorted(prices):
+        digest.update(f"{name}\t{prices[name]}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PriceSnapshot:
+    """
+    قیمت‌های بازار به صورت ستونی
+
+    Parameters
+    ----------
+    names : list of str
+        نام خودروها
+    prices : dict
+        {منبع: np.ndarray[int64]} هم‌طول با names؛ 0 یعنی منبع این خودرو را ندارد
+    sources : dict
+        {منبع: {'count', 'checksum', 'fetched_at'}}
+    created_at : float, optional
+        زمان ساخت (epoch)
+    keys : list, optional
+        کلیدهای کاتالوگ هم‌طول با names (از فایل ذخیره‌شده)؛ در غیر این صورت هنگام نیاز محاسبه می‌شوند
+    """
+
+    def __init__(self, names, prices, sources, created_at=None, keys=None):
+        self.names = list(names)
+        self._keys = keys
+        self._catalog = None
+        self.normalized = [normalize_name(name) for name in self.names]
+        self.prices = {source: np.asarray(prices[source], dtype=np.int64) for source in SOURCES}
+        self.sources = sources
+        self.created_at = created_at or time.time()
+
+        # قیمت روز: میانگین منابع موجود (همان محاسبه fetch_market_prices)
+        stacked = np.vstack([self.prices[source] for source in SOURCES])
+        counts = (stacked > 0).sum(axis=0)
+        self.market_price = (stacked.sum(axis=0) // np.maximum(counts, 1)).astype(np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_sources(cls, source_data, fetched_at=None):
+        """
+        ساخت snapshot از خروجی اسکرایپرها
+
+        Parameters
+        ----------
+        source_data : dict
+            {منبع: car_data}؛ منبعی که None باشد (مثلاً timeout) خالی در نظر گرفته می‌شود
+        """
+        fetched_at = fetched_at or time.time()
+        per_source = {source: source_prices(source_data.get(source)) for source in SOURCES}
+
+        names = []
+        seen = set()
+        for source in SOURCES:
+            for name in per_source[source]:
+                if name not in seen:
+                    seen.add(name)
+                    names.append(name)
+
+        prices = {source: np.array([per_source[source].get(name, 0) for name in names], dtype=np.int64)
+                  for source in SOURCES}
+        sources = {
+            source: {
+                'count': len(per_source[source]),
+                'checksum': source_checksum(per_source[source]),
+                'fetched_at': fetched_at if source_data.get(source) else None,
+            }
+            for source in SOURCES
+        }
+        return cls(names, prices, sources)
+
+    def catalog(self):
+        """کاتالوگ کلیدهای استاندارد نام‌ها (یک بار برای هر snapshot)"""
+        if self._catalog is None:
+            self._catalog = CarCatalog(self.names, self._keys)
+            self._keys = self._catalog.keys()
+        return self._catalog
+
+    @property
+    def age_hours(self):
+        return (time.time() - self.created_at) / 3600
+
+    def to_market_prices(self):
+        """دیکشنری {نام: {'market_price', 'hamrah_mechanic', 'z4car'}} برای get_market_price_for_car"""
+        columns = [self.market_price.tolist()] + [self.prices[source].tolist() for source in SOURCES]
+        return {
+            name: {'market_price': market, **{source: price or None for source, price in zip(SOURCES, source_values)}}
+            for name, market, *source_values in zip(self.names, *columns)
+        }
+
+    def to_frame(self):
+        """DataFrame با ستون‌های فایل combined_market_prices.xlsx"""
+        import pandas as pd
+
+        frame = pd.DataFrame({'نام خودرو': self.names, 'قیمت روز (تومان)': self.market_price})
+        for source in SOURCES:
+            frame[SOURCE_COLUMNS[source]] = pd.Series(self.prices[source]).replace(0, np.nan)
+        return frame
+
+    def save(self, file_path=DEFAULT_SNAPSHOT_FILE):
+        """ذخیره اتمی (فایل موقت و سپس os.replace)"""
+        payload = pickle.dumps({
+            'names': self.names,
+            'prices': self.prices,
+            'sources': self.sources,
+            'created_at': self.created_at,
+            'keys': self.catalog().keys(),
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+        header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, hashlib.sha256(payload).digest())
+        tmp_file = file_path + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp_file, file_path)
+        return file_path
+
+    @classmethod
+    def load(cls, file_path=DEFAULT_SNAPSHOT_FILE):
+        """بارگذاری و بررسی نسخه و checksum؛ در صورت مشکل SnapshotError"""
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise SnapshotError(f"فایل snapshot ناقص است: {file_path}")
+        magic, version, digest = _HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"قالب فایل snapshot نامعتبر است: {file_path}")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"نسخه snapshot ({version}) با نسخه فعلی ({SNAPSHOT_VERSION}) سازگار نیست")
+        payload = memoryview(data)[_HEADER.size:]
+        if hashlib.sha256(payload).digest() != digest:
+            raise SnapshotError(f"checksum فایل snapshot مطابقت ندارد: {file_path}")
+        state = pickle.loads(payload)
+        return cls(state['names'], state['prices'], state['sources'], state['created_at'], state.get('keys'))
+
+    def export_excel(self, file_path):
+        """خروجی اکسل برای مشاهده (در بارگذاری استفاده نمی‌شود)"""
+        from excel_exporter import export_dataframe
+        return export_dataframe(self.to_frame(), file_path, sheet_name='قیمت‌های بازار')
+
+
+class PriceChangeSet:
+    """
+    تفاوت دو snapshot قیمت بازار
+
+    Attributes
+    ----------
+    added : dict
+        {نام: قیمت روز جدید}
+    removed : dict
+        {نام: قیمت روز قبلی}
+    changed : dict
+        {نام: (قیمت روز قبلی، قیمت روز جدید)}
+    entries : dict
+        {نام: ورودی جدید to_market_prices} برای نام‌های اضافه یا تغییرکرده
+    """
+
+    def __init__(self, added=None, removed=None, changed=None, entries=None):
+        self.added = added or {}
+        self.removed = removed or {}
+        self.changed = changed or {}
+        self.entries = entries or {}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    @property
+    def names(self):
+        """همه نام‌هایی که به‌روزرسانی روی آن‌ها اثر دارد"""
+        return set(self.added) | set(self.removed) | set(self.changed)
+
+    def affects(self, market_name):
+        return market_name in self.added or market_name in self.removed or market_name in self.changed
+
+    def summary(self):
+        return f"{len(self.added)} خودروی جدید، {len(self.removed)} حذف‌شده، {len(self.changed)} تغییر قیمت"
+
+
+def diff_snapshots(old, new):
+    """
+    محاسبه تغییرات قیمت بین دو snapshot
+
+    Parameters
+    ----------
+    old : PriceSnapshot or None
+        snapshot قبلی؛ None یعنی همه نام‌ها جدید هستند
+    new : PriceSnapshot
+
+    Returns
+    -------
+    PriceChangeSet
+        تغییر قیمت روز یا قیمت هر منبع (مثلاً افتادن یک منبع) «تغییر» حساب می‌شود
+    """
+    new_entries = new.to_market_prices()
+    if old is None:
+        return PriceChangeSet(added={name: entry['market_price'] for name, entry in new_entries.items()},
+                              entries=new_entries)
+
+    old_entries = old.to_market_prices()
+    added, removed, changed, entries = {}, {}, {}, {}
+    for name, entry in new_entries.items():
+        previous = old_entries.get(name)
+        if previous is None:
+            added[name] = entry['market_price']
+            entries[name] = entry
+        elif previous != entry:
+            changed[name] = (previous['market_price'], entry['market_price'])
+            entries[name] = entry
+    for name, entry in old_entries.items():
+        if name not in new_entries:
+            removed[name] = entry['market_price']
+    return PriceChangeSet(added, removed, changed, entries)
+
+
+def apply_price_changes(market_prices, changes, index=None, match_cache=None, catalog=None):
+    """
+    اعمال تغییرات روی market_prices، ایندکس نام‌ها و کش تطبیق بدون ساختن دوباره آن‌ها
+
+    Parameters
+    ----------
+    market_prices : dict
+        {نام: ورودی} که در جا به‌روز می‌شود؛ ورودی نام‌های تغییرکرده در همان dict عوض می‌شود
+        تا نتایج کش‌شده‌ای که به آن اشاره دارند قیمت جدید را ببینند
+    changes : PriceChangeSet
+    index : MarketNameIndex, optional
+        ایندکس ساخته‌شده روی market_prices
+    match_cache : dict, optional
+        {نام جستجوشده: نتیجه} با کلید 'matched_name' در نتایج تطبیق‌یافته
+    catalog : CarCatalog, optional
+        کاتالوگ ساخته‌شده روی market_prices
+
+    Returns
+    -------
+    set
+        کلیدهای کش که تطبیق یا قیمت آن‌ها عوض شده است (تطبیق‌های نامعتبر از کش حذف می‌شوند)
+    """
+    for name in changes.removed:
+        market_prices.pop(name, None)
+    for name, entry in changes.entries.items():
+        if name in market_prices:
+            market_prices[name].update(entry)
+        else:
+            market_prices[name] = dict(entry)
+
+    if catalog is not None:
+        churned_models = {catalog.parse(name)[1:3] for name in list(changes.added) + list(changes.removed)}
+        catalog.apply_changes(changes.added, changes.removed)
+    if index is None:
+        return set()
+    index.apply_changes(changes.added, changes.removed)
+    if match_cache is None:
+        return set()
+
+    # هر جستجویی که نام اضافه یا حذف‌شده می‌توانست کاندیدای آن باشد (همان نام یا نامی شامل
+    # یکی از کلمات مهم جستجو) دوباره تطبیق داده می‌شود؛ حذف یک کاندیدا هم می‌تواند جا را
+    # برای کاندیدای بهتری باز کند. برای لیست‌های کوچک همه نام‌ها کاندیدا هستند.
+    churned = [normalize_name(name) for name in list(changes.added) + list(changes.removed)]
+    if churned and len(index) < 100:
+        affected_keys = set(match_cache)
+    elif churned:
+        affected_keys = set()
+        for key in match_cache:
+            norm_key = normalize_name(key)
+            words = query_words(key)
+            if any(norm == norm_key or any(word in norm for word in words) for norm in churned):
+                affected_keys.add(key)
+    else:
+        affected_keys = set()
+    # جستجوهایی که کلید کاتالوگ آن‌ها (مدل و تیپ) با نام اضافه یا حذف‌شده یکی است
+    if catalog is not None and churned_models:
+        affected_keys.update(key for key in match_cache if catalog.parse(key)[1:3] in churned_models)
+    for key in affected_keys:
+        del match_cache[key]
+
+    # تطبیق عوض نشده ولی قیمت نام تطبیق‌یافته تغییر کرده
+    affected_keys.update(key for key, result in match_cache.items() if result.get('matched_name') in changes.changed)
+    return affected_keys
+
+
+def load_snapshot(file_path=DEFAULT_SNAPSHOT_FILE, max_age_hours=None):
+    """
+    بارگذاری snapshot در صورت وجود و تازه بودن
+
+    Returns
+    -------
+    PriceSnapshot or None
+        None اگر فایل وجود نداشته باشد، خراب باشد یا از max_age_hours قدیمی‌تر باشد
+    """
+    if not os.path.exists(file_path):
+        return None
+    try:
+        snapshot = PriceSnapshot.load(file_path)
+    except (SnapshotError, OSError, pickle.UnpicklingError, KeyError) as e:
+        print(f"⚠️ خطا در بارگذاری snapshot قیمت‌ها: {e}")
+        return None
+    if max_age_hours is not None and snapshot.age_hours >= max_age_hours:
+        return None
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="نمایش یا خروجی snapshot قیمت‌های بازار")
+    parser.add_argument('snapshot', nargs='?', default=DEFAULT_SNAPSHOT_FILE)
+    parser.add_argument('--export', help="خروجی اکسل")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    snapshot = PriceSnapshot.load(args.snapshot)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    created = datetime.fromtimestamp(snapshot.created_at).strftime('%Y-%m-%d %H:%M:%S')
+    print(f"📦 {len(snapshot)} خودرو، نسخه {SNAPSHOT_VERSION}، ساخته‌شده {created} (بارگذاری {elapsed_ms:.1f}ms)")
+    for source, meta in snapshot.sources.items():
+        print(f"   {source}: {meta['count']} قیمت، checksum {meta['checksum'][:12]}")
+    if args.export:
+        snapshot.export_excel(args.export)
+        print(f"✅ خروجی اکسل: {args.export}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,123 @@ from datetime import datetime
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
-from sklearn.preprocessing import LabelEncoder
 import joblib
 import warnings
 warnings.filterwarnings('ignore')
 
+# ستون ویژگی -> (ستون آگهی، کلید جایگزین در car_data)؛ همان column_mapping آموزش
+FEATURE_SOURCES = {
+    'year': ('سال', 'year'),
+    'mileage': ('کیلومتر', 'mileage'),
+    'market_price': ('قیمت روز (تومان)', 'market_price'),
+    'engine_status': ('وضعیت موتور', 'engine_status'),
+    'chassis_status': ('وضعیت شاسی', 'chassis_status'),
+    'body_status': ('وضعیت بدنه', 'body_status'),
+    'brand': ('نام خودرو', 'brand'),
+    'issues': ('مشکلات تشخیص داده شده', 'issues'),
+}
+CATEGORICAL_COLUMNS = ['engine_status', 'chassis_status', 'body_status', 'brand']
+# کد رزروشده مقدار کیفی که encoder آن را ندیده است
+UNKNOWN_CODE = -1
+# نسخه قالب فایل مدل (مدل و encoder ها در یک فایل)
+MODEL_FORMAT = 2
+ISSUE_FLAGS = {
+    'has_accident': ('accident',),
+    'has_paint_issue': ('paint', 'رنگ'),
+    'has_engine_issue': ('engine',),
+    'has_gearbox_issue': ('gearbox',),
+}
+# به ترتیب اولویت extract_features_from_issues
+PAINT_SEVERITY = [('full_paint', 4), ('paint_four_plus', 4), ('paint_three_parts', 3), ('paint_two_parts', 2), ('paint_one_part', 1)]
+
+
+def _source_values(cars_data, feature):
+    """مقدار هر خودرو برای یک ویژگی (ستون آگهی و در نبود آن کلید انگلیسی)"""
+    column, key = FEATURE_SOURCES[feature]
+    return pd.Series([car[column] if column in car else car.get(key) for car in cars_data], dtype=object)
+
+
+def _first_number(values):
+    """اولین عدد هر مقدار بعد از حذف جداکننده هزارگان (همان str.extract آموزش)"""
+    return values.astype(str).str.replace(',', '', regex=False).str.extract(r'(\d+)', expand=False).astype(float)
+
+
+def _issue_features(values):
+    """ویژگی‌های extract_features_from_issues برای یک ستون به صورت برداری"""
+    missing = values.isna() | (values == 'هیچ')
+    text = values.astype(str).str.lower().where(~missing, '')
+    features = {name: np.zeros(len(text), dtype=np.int64) for name in ISSUE_FLAGS}
+    for name, words in ISSUE_FLAGS.items():
+        for word in words:
+            features[name] |= text.str.contains(word, regex=False).to_numpy(dtype=np.int64)
+    features['paint_severity'] = np.select(
+        [text.str.contains(word, regex=False).to_numpy() for word, _ in PAINT_SEVERITY],
+        [severity for _, severity in PAINT_SEVERITY], default=0)
+    parts = text.str.split(',').explode().str.strip()
+    features['total_issues_count'] = (((parts != '') & (parts != 'هیچ'))
+                                      .groupby(level=0).sum().reindex(range(len(text)), fill_value=0).to_numpy())
+    return features
+
+
+class CategoryEncoder:
+    """
+    کدگذاری پایدار یک ویژگی کیفی با دیکشنری مقدار -> کد
+    
+    کد هر مقدار بعد از اولین fit هرگز عوض نمی‌شود: fit فقط مقادیر تازه را (به ترتیب
+    مرتب‌شده) با کدهای بعدی اضافه می‌کند و در این صورت version یکی بالا می‌رود. transform
+    و encode چیزی را تغییر نمی‌دهند و مقدار ناشناخته UNKNOWN_CODE می‌گیرد.
+    
+    Parameters
+    ----------
+    mapping : dict, optional
+        مقدار (str) -> کد
+    version : int
+        تعداد دفعاتی که مقدار تازه اضافه شده است
+    """
+    
+    def __init__(self, mapping=None, version=0):
+        self.mapping = dict(mapping or {})
+        self.version = version
+    
+    def __len__(self):
+        return len(self.mapping)
+    
+    def fit(self, values):
+        """افزودن مقادیر تازه با کدهای بعدی (کد مقادیر قبلی ثابت می‌ماند)"""
+        new_values = sorted(set(pd.Series(values, dtype=object).astype(str)) - self.mapping.keys())
+        if new_values:
+            start = len(self.mapping)
+            self.mapping.update((value, start + offset) for offset, value in enumerate(new_values))
+            self.version += 1
+        return self
+    
+    def transform(self, values):
+        """کد هر مقدار (آرایه int64؛ ناشناخته UNKNOWN_CODE)"""
+        return (pd.Series(values, dtype=object).astype(str).map(self.mapping)
+                .fillna(UNKNOWN_CODE).to_numpy(dtype=np.int64))
+    
+    def encode(self, value):
+        """کد یک مقدار"""
+        return self.mapping.get(str(value), UNKNOWN_CODE)
+    
+    def to_dict(self):
+        return {'version': self.version, 'mapping': dict(self.mapping)}
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['mapping'], data['version'])
+    
+    @classmethod
+    def from_label_encoder(cls, encoder):
+        """تبدیل LabelEncoder فایل‌های قدیمی با همان کدهایی که مدل با آن آموزش دیده است"""
+        return cls({str(value): code for code, value in enumerate(encoder.classes_)}, version=1)
+
+
 class MachineLearningPriceCalculator:
     def __init__(self, base_calculator=None):
         self.base_calculator = base_calculator
         self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.label_encoders = {}
+        self.category_encoders = {}
         self.feature_columns = [
             'year', 'mileage', 'market_price', 'engine_status_encoded', 
             'chassis_status_encoded', 'body_status_encoded', 'brand_encoded',
@@ -23,6 +130,7 @@ class MachineLearningPriceCalculator:
             'paint_severity', 'total_issues_count'
         ]
         self.model_file = 'ml_price_model.joblib'
+        # فایل LabelEncoder های مدل‌های قدیمی (فقط برای بارگذاری)
         self.encoders_file = 'label_encoders.joblib'
         self.learning_data_file = 'learning_data.json'
         self.performance_log = 'model_performance.json'
@@ -30,25 +138,24 @@ class MachineLearningPriceCalculator:
         # بارگذاری مدل و encoders در صورت وجود
         self.load_model()
         
-    def encode_categorical_features(self, df):
-        """تبدیل ویژگی‌های کیفی به عددی"""
-        categorical_columns = ['engine_status', 'chassis_status', 'body_status', 'brand']
+    def encode_categorical_features(self, df, fit=True):
+        """
+        تبدیل ویژگی‌های کیفی به عددی
         
-        for col in categorical_columns:
+        با fit=True (آموزش) مقادیر تازه به encoder ها اضافه می‌شوند؛ کد مقادیر قبلی
+        تغییر نمی‌کند. با fit=False مقدار ناشناخته UNKNOWN_CODE می‌گیرد.
+        """
+        for col in CATEGORICAL_COLUMNS:
             if col in df.columns:
-                encoded_col = f"{col}_encoded"
-                if col not in self.label_encoders:
-                    self.label_encoders[col] = LabelEncoder()
-                    df[encoded_col] = self.label_encoders[col].fit_transform(df[col].astype(str))
-                else:
-                    # برای داده‌های جدید که ممکن است مقادیر جدیدی داشته باشند
-                    try:
-                        df[encoded_col] = self.label_encoders[col].transform(df[col].astype(str))
-                    except ValueError:
-                        # اگر مقدار جدیدی وجود دارد، آن را به encoder اضافه کن
-                        unique_values = list(self.label_encoders[col].classes_) + list(df[col].unique())
-                        self.label_encoders[col].classes_ = np.array(list(set(unique_values)))
-                        df[encoded_col] = self.label_encoders[col].transform(df[col].astype(str))
+                encoder = self.category_encoders.get(col)
+                if encoder is None:
+                    if not fit:
+                        df[f"{col}_encoded"] = UNKNOWN_CODE
+                        continue
+                    encoder = self.category_encoders[col] = CategoryEncoder()
+                if fit:
+                    encoder.fit(df[col])
+                df[f"{col}_encoded"] = encoder.transform(df[col])
         
         return df
     
@@ -201,34 +308,81 @@ class MachineLearningPriceCalculator:
             print(f"❌ خطا در آموزش مدل: {e}")
             return False
     
-    def predict_price(self, car_data):
-        """پیش‌بینی قیمت با استفاده از مدل آموزش دیده"""
+    def model_features(self):
+        """ستون‌های ویژگی به ترتیبی که مدل با آن آموزش دیده است"""
+        return list(getattr(self.model, 'feature_names_in_', self.feature_columns))
+    
+    def build_features(self, cars_data):
+        """
+        ماتریس ویژگی یک دسته خودرو برای پیش‌بینی (بدون مراحل مخصوص آموزش)
+        
+        همان ویژگی‌های prepare_training_data با عملیات برداری روی کل دسته ساخته می‌شوند؛
+        ردیفی حذف نمی‌شود و encoder ها تغییر نمی‌کنند (مقدار کیفی ناشناخته UNKNOWN_CODE می‌گیرد).
+        """
+        features = self.model_features()
+        columns = {}
+        if 'year' in features:
+            columns['year'] = pd.to_numeric(_source_values(cars_data, 'year'), errors='coerce').to_numpy(dtype=float)
+        for name in ('mileage', 'market_price'):
+            if name in features:
+                columns[name] = _first_number(_source_values(cars_data, name)).to_numpy()
+        for col in CATEGORICAL_COLUMNS:
+            if f"{col}_encoded" in features:
+                encoder = self.category_encoders.get(col) or CategoryEncoder()
+                columns[f"{col}_encoded"] = encoder.transform(_source_values(cars_data, col))
+        if any(name in features for name in list(ISSUE_FLAGS) + ['paint_severity', 'total_issues_count']):
+            columns.update(_issue_features(_source_values(cars_data, 'issues')))
+        return pd.DataFrame({name: columns.get(name, np.full(len(cars_data), np.nan)) for name in features})
+    
+    def predict_many(self, cars_data):
+        """
+        پیش‌بینی قیمت یک دسته خودرو با یک فراخوانی model.predict
+        
+        Parameters
+        ----------
+        cars_data : list of dict
+            اطلاعات خودروها (ستون‌های آگهی یا کلیدهای year، mileage، market_price، ...)
+        
+        Returns
+        -------
+        list
+            قیمت پیش‌بینی‌شده هر خودرو؛ پیش‌بینی غیرمثبت با روش پایه جایگزین می‌شود
+            و None یعنی پیش‌بینی ممکن نبود (مثلاً مدل آموزش ندیده است)
+        """
+        cars_data = list(cars_data)
+        if not cars_data or not hasattr(self.model, 'estimators_'):
+            return [None] * len(cars_data)
+        
+        X = self.build_features(cars_data)
         try:
-            # آماده‌سازی داده‌ها
-            df = pd.DataFrame([car_data])
-            data = self.prepare_training_data(df)
-            
-            # انتخاب ویژگی‌ها
-            available_features = [col for col in self.feature_columns if col in data.columns]
-            X = data[available_features]
-            
-            # پیش‌بینی
-            if hasattr(self.model, 'predict') and len(X) > 0:
-                prediction = self.model.predict(X)[0]
-                
-                # اطمینان از اینکه پیش‌بینی منطقی است
-                if prediction > 0:
-                    return float(prediction)
-            
-            # در صورت عدم موفقیت، از روش پایه استفاده کن
-            if self.base_calculator:
-                return self.base_calculator.calculate_estimated_price(
+            predictions = self.model.predict(X)
+        except ValueError:
+            # مدل‌هایی که مقدار خالی را نمی‌پذیرند: فقط ردیف‌های کامل پیش‌بینی می‌شوند
+            complete = ~X.isna().any(axis=1).to_numpy()
+            predictions = np.full(len(X), np.nan)
+            if complete.any():
+                predictions[complete] = self.model.predict(X[complete])
+        
+        results = []
+        for car_data, prediction in zip(cars_data, predictions):
+            if np.isnan(prediction):
+                results.append(None)
+            elif prediction > 0:
+                results.append(float(prediction))
+            elif self.base_calculator:
+                # در صورت عدم موفقیت، از روش پایه استفاده کن
+                results.append(self.base_calculator.calculate_estimated_price(
                     car_data.get('market_price', 0),
                     car_data.get('total_depreciation', 0)
-                )
-            
-            return None
-            
+                ))
+            else:
+                results.append(None)
+        return results
+    
+    def predict_price(self, car_data):
+        """پیش‌بینی قیمت با استفاده از مدل آموزش دیده (یک خودرو؛ برای چند خودرو predict_many)"""
+        try:
+            return self.predict_many([car_data])[0]
         except Exception as e:
             print(f"⚠️ خطا در پیش‌بینی: {e}")
             return None
@@ -296,23 +450,46 @@ class MachineLearningPriceCalculator:
             print(f"❌ خطا در آموزش مجدد: {e}")
             return False
     
+    def encoder_versions(self):
+        """نسخه encoder هر ویژگی کیفی"""
+        return {col: encoder.version for col, encoder in self.category_encoders.items()}
+    
     def save_model(self):
-        """ذخیره مدل و encoders"""
+        """ذخیره مدل و encoders در یک فایل (encoder ها همیشه با مدلی که با آن‌ها آموزش دیده ذخیره می‌شوند)"""
         try:
-            joblib.dump(self.model, self.model_file)
-            joblib.dump(self.label_encoders, self.encoders_file)
+            bundle = {
+                'format': MODEL_FORMAT,
+                'model': self.model,
+                'encoders': {col: encoder.to_dict() for col, encoder in self.category_encoders.items()},
+            }
+            temp_file = self.model_file + '.tmp'
+            joblib.dump(bundle, temp_file)
+            os.replace(temp_file, self.model_file)
             print("💾 مدل ذخیره شد")
         except Exception as e:
             print(f"❌ خطا در ذخیره مدل: {e}")
     
     def load_model(self):
-        """بارگذاری مدل و encoders"""
+        """بارگذاری مدل و encoders (فایل‌های قدیمی مدل + LabelEncoder هم پذیرفته می‌شوند)"""
         try:
-            if os.path.exists(self.model_file) and os.path.exists(self.encoders_file):
-                self.model = joblib.load(self.model_file)
-                self.label_encoders = joblib.load(self.encoders_file)
-                print("📂 مدل بارگذاری شد")
-                return True
+            if not os.path.exists(self.model_file):
+                return False
+            model = joblib.load(self.model_file)
+            if isinstance(model, dict):
+                if model.get('format') != MODEL_FORMAT:
+                    print(f"⚠️ قالب فایل مدل ناشناخته است: {model.get('format')}")
+                    return False
+                encoders = {col: CategoryEncoder.from_dict(data) for col, data in model['encoders'].items()}
+                model = model['model']
+            elif os.path.exists(self.encoders_file):
+                encoders = {col: CategoryEncoder.from_label_encoder(encoder)
+                            for col, encoder in joblib.load(self.encoders_file).items()}
+            else:
+                return False
+            self.model = model
+            self.category_encoders = encoders
+            print("📂 مدل بارگذاری شد")
+            return True
         except Exception as e:
             print(f"⚠️ خطا در بارگذاری مدل: {e}")
         return False
@@ -366,7 +543,8 @@ class MachineLearningPriceCalculator:
         info = {
             'model_exists': hasattr(self.model, 'predict'),
             'features_count': len(self.feature_columns),
-            'encoders_count': len(self.label_encoders)
+            'encoders_count': len(self.category_encoders),
+            'encoder_versions': self.encoder_versions()
         }
         
         # آخرین عملکرد
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+انتظارهای رویدادمحور و محدود برای صفحات دیوار و سایت‌های قیمت
+
+به جای time.sleep ثابت بعد از بارگذاری، اسکرول یا کلیک، وضعیت صفحه با یک اسکریپت
+کوچک (PROBE_SCRIPT) خوانده می‌شود و انتظار به محض برقرار شدن شرط تمام می‌شود:
+- wait_for_selector: ظاهر شدن یک سلکتور (مثلاً article یا جدول قیمت)
+- wait_for_growth: بیشتر شدن تعداد عناصر یا ارتفاع صفحه نسبت به قبل از اسکرول/کلیک
+- wait_for_settle: document.readyState == 'complete' و سکوت صفحه
+
+«سکوت» یعنی در quiet ثانیه اخیر نه DOM تغییر کرده (MutationObserver) و نه منبعی از
+شبکه کامل شده است (PerformanceObserver)؛ این همان شبکه-بیکار است بدون دست زدن به
+fetch / XMLHttpRequest صفحه. wait_for_growth اگر چیزی اضافه نشود با سکوت صفحه
+(مثلاً انتهای لیست) زودتر از سقف تمام می‌شود.
+
+هر انتظار سقف زمانی دارد و به جای exception مقدار bool برمی‌گرداند. مدت واقعی هر
+انتظار با برچسب آن در get_wait_stats() ثبت می‌شود.
+"""
+
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+POLL_INTERVAL = 0.1
+# سکوت لازم برای «آرام شدن» صفحه (ثانیه)
+QUIET_PERIOD = 0.5
+# بدون تغییر در این مدت بعد از اسکرول/کلیک یعنی چیزی بارگذاری نمی‌شود
+GROWTH_QUIET_PERIOD = 2.0
+
+# arguments[0]: سلکتور CSS (یا null)، arguments[1]: true یعنی شروع سکوت از همین لحظه
+PROBE_SCRIPT = """
+var probe = window.__pageWaitProbe;
+if (!probe) {
+    probe = window.__pageWaitProbe = {lastChange: performance.now()};
+    var touch = function () { probe.lastChange = performance.now(); };
+    new MutationObserver(touch).observe(document, {childList: true, subtree: true});
+    if (window.PerformanceObserver) {
+        try { new PerformanceObserver(touch).observe({type: 'resource', buffered: false}); } catch (e) {}
+    }
+}
+if (arguments[1]) { probe.lastChange = performance.now(); }
+var body = document.body;
+return {
+    count: arguments[0] ? document.querySelectorAll(arguments[0]).length : 0,
+    height: body ? body.scrollHeight : 0,
+    ready: document.readyState,
+    quiet: (performance.now() - probe.lastChange) / 1000
+};
+"""
+
+
+def page_state(driver, selector=None, reset=False):
+    """
+    وضعیت فعلی صفحه
+
+    Returns
+    -------
+    dict or None
+        count (تعداد عناصر selector)، height، ready، quiet (ثانیه)؛ None اگر صفحه در حال
+        جابجایی باشد یا اسکریپت اجرا نشود
+    """
+    try:
+        return driver.execute_script(PROBE_SCRIPT, selector, reset)
+    except WebDriverException:
+        return None
+
+
+class WaitStats:
+    """مدت واقعی انتظارها به تفکیک برچسب"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = {}
+
+    def record(self, label, elapsed, satisfied):
+        with self._lock:
+            stats = self.waits.setdefault(label, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+            stats['count'] += 1
+            stats['total'] += elapsed
+            stats['max'] = max(stats['max'], elapsed)
+            if not satisfied:
+                stats['timeouts'] += 1
+
+    def total(self):
+        with self._lock:
+            return sum(stats['total'] for stats in self.waits.values())
+
+    def summary(self):
+        with self._lock:
+            parts = [f"{label}: {stats['count']}× میانگین {stats['total'] / stats['count']:.2f}s "
+                     f"(حداکثر {stats['max']:.2f}s، {stats['timeouts']} به سقف رسید)"
+                     for label, stats in self.waits.items()]
+        return '؛ '.join(parts) or "انتظاری ثبت نشده است"
+
+
+_stats = WaitStats()
+
+
+def get_wait_stats():
+    """آمار مشترک انتظارها (یک نمونه برای کل برنامه)"""
+    return _stats
+
+
+def wait_until(driver, condition, timeout, label, selector=None, poll=POLL_INTERVAL):
+    """
+    انتظار تا condition(state) برای وضعیت page_state برقرار شود یا timeout ثانیه بگذرد
+
+    سکوت صفحه از لحظه شروع انتظار حساب می‌شود.
+
+    Returns
+    -------
+    bool
+        True اگر شرط قبل از سقف برقرار شد
+    """
+    start_time = time.perf_counter()
+    page_state(driver, selector, reset=True)
+
+    def check(current_driver):
+        state = page_state(current_driver, selector)
+        return state is not None and condition(state)
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(check)
+        satisfied = True
+    except TimeoutException:
+        satisfied = False
+    except WebDriverException:
+        satisfied = False
+    _stats.record(label, time.perf_counter() - start_time, satisfied)
+    return satisfied
+
+
+def wait_for_selector(driver, selector, timeout=10, label=None):
+    """انتظار تا حداقل یک عنصر selector در صفحه باشد"""
+    return wait_until(driver, lambda state: state['count'] > 0, timeout, label or selector, selector)
+
+
+def wait_for_growth(driver, baseline, selector, timeout=3, quiet=GROWTH_QUIET_PERIOD, label='growth'):
+    """
+    انتظار بعد از اسکرول/کلیک تا عناصر selector یا ارتفاع صفحه از baseline بیشتر شوند
+
+    Parameters
+    ----------
+    baseline : dict or None
+        page_state قبل از اسکرول/کلیک
+    quiet : float
+        اگر این مدت هیچ تغییری در صفحه نباشد، انتظار (بدون رشد) تمام می‌شود
+
+    Returns
+    -------
+    bool
+        True اگر محتوای جدید اضافه شد
+    """
+    if baseline is None:
+        baseline = {'count': 0, 'height': 0}
+    grew = []
+
+    def condition(state):
+        if state['count'] > baseline['count'] or state['height'] > baseline['height']:
+            grew.append(True)
+            return True
+        return state['quiet'] >= quiet
+
+    wait_until(driver, condition, timeout, label, selector)
+    return bool(grew)
+
+
+def wait_for_settle(driver, timeout=5, quiet=QUIET_PERIOD, label='settle'):
+    """انتظار تا صفحه کامل بارگذاری شود و quiet ثانیه بدون تغییر DOM یا درخواست شبکه بماند"""
+    return wait_until(driver, lambda state: state['ready'] == 'complete' and state['quiet'] >= quiet,
+                      timeout, label)
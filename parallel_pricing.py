@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+اجرای موازی قیمت‌گذاری دسته‌ای آگهی‌ها روی چند هسته
+
+آگهی‌های دیوار به چند بخش تقسیم می‌شوند و هر بخش در یک پروسه جدا با
+calculator.price_rows قیمت‌گذاری می‌شود. ماشین‌حساب و قیمت‌های بازار فقط یک بار
+هنگام راه‌اندازی هر پروسه به آن داده می‌شوند (فقط خواندنی) و نتایج به همان
+ترتیب ردیف‌های اصلی کنار هم قرار می‌گیرند، پس خروجی با اجرای تک‌پروسه یکسان است.
+"""
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# وضعیت هر پروسه کارگر (در initializer مقداردهی می‌شود)
+_worker_calculator = None
+_worker_market_df = None
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def split_chunks(divar_df, workers, chunk_size=None):
+    """تقسیم آگهی‌ها به بخش‌های پیوسته با حفظ ایندکس اصلی"""
+    if chunk_size is None:
+        # چند بخش برای هر کارگر تا بار بین پروسه‌ها متعادل بماند
+        chunk_size = max(1, -(-len(divar_df) // (workers * 4)))
+    return [divar_df.iloc[start:start + chunk_size] for start in range(0, len(divar_df), chunk_size)]
+
+
+def _init_worker(calculator, market_df):
+    global _worker_calculator, _worker_market_df
+    _worker_calculator = calculator
+    _worker_market_df = market_df
+
+
+def _price_chunk(chunk):
+    return _worker_calculator.price_rows(chunk, _worker_market_df)
+
+
+def _pool_context():
+    # روی لینوکس fork داده‌های بازار را بدون کپی/pickle با پروسه‌ها به اشتراک می‌گذارد؛
+    # جاهای دیگر (macOS: fork بعد از راه‌اندازی numpy/Accelerate یا thread ناامن است)
+    # روش پیش‌فرض پلتفرم، و initializer ماشین‌حساب و market_df را به هر پروسه می‌فرستد
+    if sys.platform.startswith('linux'):
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def price_ads(calculator, divar_df, market_df, workers=1, chunk_size=None):
+    """
+    قیمت‌گذاری آگهی‌ها به صورت تک‌پروسه یا موازی
+
+    Parameters
+    ----------
+    calculator : object
+        ماشین‌حسابی با متد price_rows(divar_df, market_df) -> list
+    divar_df : DataFrame
+        آگهی‌های دیوار
+    market_df : DataFrame
+        قیمت‌های بازار (بین پروسه‌ها فقط خواندنی است)
+    workers : int
+        تعداد پروسه‌ها؛ 1 یعنی اجرای معمولی بدون pool
+    chunk_size : int, optional
+        تعداد آگهی در هر بخش
+
+    Returns
+    -------
+    list
+        نتایج به ترتیب ردیف‌های divar_df
+    """
+    if workers is None or workers <= 0:
+        workers = default_workers()
+    if workers == 1 or len(divar_df) < 2:
+        return calculator.price_rows(divar_df, market_df)
+
+    chunks = split_chunks(divar_df, workers, chunk_size)
+    workers = min(workers, len(chunks))
+    print(f"⚙️ پردازش موازی: {len(chunks)} بخش روی {workers} پروسه")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                             initializer=_init_worker, initargs=(calculator, market_df)) as executor:
+        # map ترتیب بخش‌ها را حفظ می‌کند
+        for chunk_results in executor.map(_price_chunk, chunks):
+            results.extend(chunk_results)
+    return results
+
+
+def add_workers_argument(parser):
+    """افزودن گزینه --workers به argparse"""
+    parser.add_argument('--workers', type=int, default=1,
+                        help="تعداد پروسه‌های موازی (0 = تعداد هسته‌ها، پیش‌فرض 1)")
+    return parser
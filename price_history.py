@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تاریخچه قیمت‌های بازار در SQLite (فقط افزودنی)
+
+هر snapshot قیمت‌ها (همراه مکانیک، زد فور و قیمت روز) با زمان دریافت خود به جدول
+price_history اضافه می‌شود و چیزی بازنویسی نمی‌شود. کلید اصلی جدول
+(car, taken_at, source) است، پس قیمت یک خودرو در یک لحظه یا روند آن در یک بازه
+زمانی با یک جستجوی ایندکس و بدون نگه داشتن فایل‌های اکسل قدیمی به دست می‌آید.
+قیمت «در زمان انتشار آگهی» هم از متن زمان آگهی («۳ روز پیش در تهران») محاسبه می‌شود.
+
+python price_history.py record [market_prices.snapshot]
+python price_history.py at "پژو 206 تیپ 2" [2025-08-01] [--source z4car]
+python price_history.py trend "پژو 206 تیپ 2" [--days 30]
+python price_history.py snapshots
+"""
+
+import argparse
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from market_snapshot import DEFAULT_SNAPSHOT_FILE, SOURCES, PriceSnapshot
+from result_store import DEFAULT_DB_FILE
+
+# قیمت روز (میانگین منابع) هم مثل یک منبع ذخیره می‌شود
+MARKET_SOURCE = 'market'
+HISTORY_SOURCES = (MARKET_SOURCE,) + SOURCES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_snapshots (
+    taken_at REAL PRIMARY KEY,
+    cars INTEGER NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    car TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    PRIMARY KEY (car, taken_at, source)
+) WITHOUT ROWID;
+"""
+
+PERSIAN_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+# «۳ روز پیش»، «ساعت پیش»، «نیم ساعت پیش»، «۲ هفته پیش»
+AGO_PATTERN = re.compile(r'(\d+|یک|نیم|ربع)?\s*(دقیقه|ساعت|روز|هفته|ماه)\s*پیش')
+AGO_UNITS = {'دقیقه': 60, 'ساعت': 3600, 'روز': 86400, 'هفته': 7 * 86400, 'ماه': 30 * 86400}
+AGO_AMOUNTS = {'یک': 1, 'نیم': 0.5, 'ربع': 0.25}
+RECENT_TEXTS = ('لحظاتی پیش', 'دقایقی پیش')
+DAYS_AGO_TEXTS = {'پریروز': 2, 'دیروز': 1}
+SAVED_AT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def to_timestamp(when, end_of_day=True):
+    """
+    تبدیل زمان به timestamp
+
+    when می‌تواند datetime، date، عدد (timestamp) یا رشته '%Y-%m-%d' / '%Y-%m-%d %H:%M[:%S]'
+    باشد. برای تاریخ بدون ساعت، end_of_day=True یعنی انتهای همان روز (قیمت‌های آن روز
+    هم حساب می‌شوند) و False یعنی ابتدای روز.
+    """
+    if when is None:
+        return time.time()
+    if isinstance(when, (int, float)):
+        return float(when)
+    if isinstance(when, str):
+        text = when.strip()
+        for fmt in (SAVED_AT_FORMAT, '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S'):
+            try:
+                return datetime.strptime(text, fmt).timestamp()
+            except ValueError:
+                pass
+        when = datetime.strptime(text, '%Y-%m-%d').date()
+    if isinstance(when, datetime):
+        return when.timestamp()
+    day_start = datetime(when.year, when.month, when.day)
+    return (day_start + timedelta(days=1)).timestamp() - 1e-3 if end_of_day else day_start.timestamp()
+
+
+def ad_saved_at(ad_data):
+    """زمان ذخیره آگهی («تاریخ ذخیره») یا اکنون"""
+    try:
+        return datetime.strptime(str(ad_data.get('تاریخ ذخیره')), SAVED_AT_FORMAT).timestamp()
+    except ValueError:
+        return time.time()
+
+
+def ad_posted_at(ad_data, reference=None):
+    """
+    زمان تقریبی انتشار آگهی از «زمان و مکان» (مثل «۳ روز پیش در تهران»)
+
+    Parameters
+    ----------
+    ad_data : dict
+    reference : datetime or float, optional
+        زمان دیدن آگهی؛ پیش‌فرض «تاریخ ذخیره» آگهی یا اکنون
+
+    Returns
+    -------
+    float or None
+        timestamp؛ None اگر متن زمان قابل تشخیص نباشد (مثلاً «نردبان شده»)
+    """
+    reference = ad_saved_at(ad_data) if reference is None else to_timestamp(reference)
+
+    text = str(ad_data.get('زمان و مکان') or '').translate(PERSIAN_DIGITS)
+    if any(recent in text for recent in RECENT_TEXTS):
+        return reference
+    match = AGO_PATTERN.search(text)
+    if match:
+        amount, unit = match.groups()
+        amount = AGO_AMOUNTS.get(amount, amount)
+        return reference - float(amount or 1) * AGO_UNITS[unit]
+    for word, days in DAYS_AGO_TEXTS.items():
+        if word in text:
+            return reference - days * 86400
+    return None
+
+
+class PriceHistory:
+    """
+    تاریخچه فقط-افزودنی قیمت‌های بازار
+
+    Parameters
+    ----------
+    db_file : str
+        مسیر فایل SQLite (پیش‌فرض همان پایگاه نتایج)
+    """
+
+    def __init__(self, db_file=DEFAULT_DB_FILE):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def record_snapshot(self, snapshot):
+        """
+        افزودن همه قیمت‌های یک snapshot در یک تراکنش
+
+        Returns
+        -------
+        int
+            تعداد ردیف‌های اضافه‌شده؛ 0 اگر این snapshot (همان زمان دریافت) قبلاً ثبت شده باشد
+        """
+        taken_at = float(snapshot.created_at)
+        columns = [snapshot.market_price.tolist()] + [snapshot.prices[source].tolist() for source in SOURCES]
+        rows = [
+            (name, taken_at, source, price)
+            for name, values in zip(snapshot.names, zip(*columns))
+            for source, price in zip(HISTORY_SOURCES, values)
+            if price
+        ]
+        with self._lock, self._conn:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO price_snapshots (taken_at, cars, recorded_at) VALUES (?, ?, ?)",
+                (taken_at, len(snapshot), time.time())
+            ).rowcount
+            if not inserted:
+                return 0
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO price_history (car, taken_at, source, price) VALUES (?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def price_at(self, car, when=None, source=MARKET_SOURCE, max_age_days=None):
+        """
+        قیمت خودرو در یک لحظه: آخرین قیمت ثبت‌شده تا آن زمان
+
+        Parameters
+        ----------
+        car : str
+            نام بازار خودرو (همان کلید market_prices)
+        when : datetime, date, str or float, optional
+            پیش‌فرض اکنون
+        source : str
+            'market'، 'hamrah_mechanic' یا 'z4car'
+        max_age_days : float, optional
+            قیمت قدیمی‌تر از این فاصله تا when پذیرفته نمی‌شود
+
+        Returns
+        -------
+        tuple or None
+            (taken_at, price)
+        """
+        timestamp = to_timestamp(when)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT taken_at, price FROM price_history WHERE car = ? AND taken_at <= ? AND source = ? "
+                "ORDER BY taken_at DESC LIMIT 1",
+                (car, timestamp, source)
+            ).fetchone()
+        if row is None or (max_age_days is not None and timestamp - row[0] > max_age_days * 86400):
+            return None
+        return row
+
+    def trend(self, car, start=None, end=None, source=MARKET_SOURCE):
+        """
+        روند قیمت خودرو در بازه [start, end]
+
+        Returns
+        -------
+        list
+            [(taken_at, price), ...] به ترتیب زمان
+        """
+        start_ts = to_timestamp(start, end_of_day=False) if start is not None else 0.0
+        end_ts = to_timestamp(end)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT taken_at, price FROM price_history WHERE car = ? AND taken_at BETWEEN ? AND ? AND source = ? "
+                "ORDER BY taken_at",
+                (car, start_ts, end_ts, source)
+            ).fetchall()
+
+    def price_for_ad(self, car, ad_data, source=MARKET_SOURCE, max_age_days=None):
+        """
+        قیمت خودرو در زمان انتشار آگهی (یا زمان ذخیره آن اگر زمان انتشار معلوم نباشد)
+
+        Returns
+        -------
+        tuple or None
+            (taken_at, price)
+        """
+        posted_at = ad_posted_at(ad_data)
+        return self.price_at(car, ad_saved_at(ad_data) if posted_at is None else posted_at, source, max_age_days)
+
+    def snapshots(self):
+        """لیست snapshotهای ثبت‌شده: (taken_at, تعداد خودرو)"""
+        with self._lock:
+            return self._conn.execute("SELECT taken_at, cars FROM price_snapshots ORDER BY taken_at").fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="تاریخچه قیمت‌های بازار")
+    parser.add_argument('--db', default=DEFAULT_DB_FILE)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help="ثبت یک فایل snapshot")
+    record_parser.add_argument('snapshot', nargs='?', default=DEFAULT_SNAPSHOT_FILE)
+    at_parser = subparsers.add_parser('at', help="قیمت در یک تاریخ")
+    at_parser.add_argument('car')
+    at_parser.add_argument('when', nargs='?')
+    trend_parser = subparsers.add_parser('trend', help="روند قیمت")
+    trend_parser.add_argument('car')
+    trend_parser.add_argument('--days', type=float, default=30)
+    for sub in (at_parser, trend_parser):
+        sub.add_argument('--source', default=MARKET_SOURCE, choices=HISTORY_SOURCES)
+    subparsers.add_parser('snapshots', help="لیست snapshotهای ثبت‌شده")
+    args = parser.parse_args()
+
+    history = PriceHistory(args.db)
+    try:
+        if args.command == 'record':
+            rows = history.record_snapshot(PriceSnapshot.load(args.snapshot))
+            print(f"✅ {rows} قیمت ثبت شد" if rows else "ℹ️ این snapshot قبلاً ثبت شده است")
+        elif args.command == 'at':
+            row = history.price_at(args.car, args.when, args.source)
+            print(f"💰 {row[1]:,} تومان ({format_timestamp(row[0])})" if row else "⚠️ قیمتی ثبت نشده است")
+        elif args.command == 'trend':
+            rows = history.trend(args.car, time.time() - args.days * 86400, source=args.source)
+            for taken_at, price in rows:
+                print(f"{format_timestamp(taken_at)}  {price:,}")
+            if not rows:
+                print("⚠️ قیمتی در این بازه ثبت نشده است")
+        else:
+            for taken_at, cars in history.snapshots():
+                print(f"{format_timestamp(taken_at)}  {cars} خودرو")
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
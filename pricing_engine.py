@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+موتور قیمت‌گذاری سراسری با بارگذاری مجدد خودکار
+
+فایل قیمت‌های بازار فقط یک بار خوانده می‌شود و ساختارهای جستجو در حافظه
+نگه داشته می‌شوند. اگر mtime یا checksum فایل تغییر کند، snapshot جدید
+ساخته شده و به صورت اتمی جایگزین snapshot قبلی می‌شود.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from improved_car_calculator import ImprovedCarPriceCalculator
+from market_snapshot import PriceSnapshot
+
+DEFAULT_MARKET_FILE = 'combined_market_prices.xlsx'
+SNAPSHOT_EXTENSION = '.snapshot'
+
+# ستون‌های نام و قیمت در قالب‌های مختلف فایل قیمت بازار
+NAME_COLUMNS = ['Car Name', 'نام خودرو']
+PRICE_COLUMNS = ['Numeric Price', 'قیمت عددی', 'قیمت روز (تومان)', 'Price', 'قیمت', 'قیمت (تومان)',
+                 'قیمت همراه مکانیک (تومان)', 'قیمت زد فور (تومان)']
+SOURCE_COLUMNS = ['Source', 'منبع']
+
+PERSIAN_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+
+
+def file_checksum(file_path, chunk_size=1 << 20):
+    """checksum محتوای فایل (md5)"""
+    digest = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_price(value):
+    """تبدیل قیمت متنی («1,234 تومان» یا ارقام فارسی) به عدد"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    digits = re.sub(r'[^\d]', '', str(value).translate(PERSIAN_DIGITS))
+    return float(digits) if digits else None
+
+
+def normalize_market_frame(df):
+    """
+    یکسان‌سازی ستون‌های فایل قیمت بازار به Car Name / Numeric Price / Source
+
+    فایل combined_market_prices.xlsx بسته به مسیر ذخیره ستون‌های متفاوتی دارد؛
+    در هر ردیف اولین ستون قیمت غیرخالی استفاده می‌شود.
+    """
+    name_col = next((c for c in NAME_COLUMNS if c in df.columns), None)
+    if name_col is None:
+        raise ValueError(f"ستون نام خودرو یافت نشد: {list(df.columns)}")
+
+    price_cols = [c for c in PRICE_COLUMNS if c in df.columns]
+    if not price_cols:
+        raise ValueError(f"ستون قیمت یافت نشد: {list(df.columns)}")
+
+    prices = pd.Series([None] * len(df), index=df.index, dtype=object)
+    for col in price_cols:
+        missing = prices.isna()
+        if not missing.any():
+            break
+        prices[missing] = df.loc[missing, col].map(parse_price)
+
+    source_col = next((c for c in SOURCE_COLUMNS if c in df.columns), None)
+    result = pd.DataFrame({
+        'Car Name': df[name_col].astype(str).str.strip(),
+        'Numeric Price': pd.to_numeric(prices, errors='coerce'),
+        'Source': df[source_col].fillna('') if source_col else '',
+    })
+    result = result[(result['Car Name'] != '') & (result['Car Name'] != 'nan')]
+    return result.dropna(subset=['Numeric Price']).reset_index(drop=True)
+
+
+class MarketSnapshot:
+    """یک نسخه تغییرناپذیر از قیمت‌های بازار به همراه ساختارهای آماده جستجو"""
+
+    def __init__(self, file_path, mtime, checksum, market_df):
+        self.file_path = file_path
+        self.mtime = mtime
+        self.checksum = checksum
+        self.loaded_at = datetime.now()
+        self.market_df = market_df
+
+        # ماشین‌حساب مخصوص این snapshot؛ price_dict یک بار ساخته می‌شود
+        self.calculator = ImprovedCarPriceCalculator()
+        self.calculator.price_dict = dict(zip(market_df['Car Name'].str.lower(),
+                                              market_df['Numeric Price']))
+        # کلیدهای استاندارد نام‌ها هم یک بار برای هر snapshot
+        self.calculator.get_catalog()
+        self.match_cache = {}
+
+    def __len__(self):
+        return len(self.market_df)
+
+    def find_market_price(self, car_info, brand_type=""):
+        """جستجوی قیمت روز با کش نتایج در طول عمر snapshot"""
+        key = (car_info.get('car_name'), car_info.get('year'), brand_type or '')
+        if key not in self.match_cache:
+            self.match_cache[key] = self.calculator.find_market_price(car_info, self.market_df, brand_type)
+        return self.match_cache[key]
+
+
+class PricingEngine:
+    """
+    موتور قیمت‌گذاری سراسری
+
+    Parameters
+    ----------
+    market_file : str
+        مسیر فایل قیمت بازار (snapshot، xlsx یا csv)
+    check_interval : float
+        حداقل فاصله (ثانیه) بین دو بررسی mtime فایل
+    """
+
+    def __init__(self, market_file=DEFAULT_MARKET_FILE, check_interval=5.0):
+        self.market_file = market_file
+        self.check_interval = check_interval
+        self.calculator = ImprovedCarPriceCalculator()
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self.reload_count = 0
+
+    @property
+    def snapshot(self):
+        self.refresh_if_changed()
+        return self._snapshot
+
+    def _load_snapshot(self, mtime, checksum):
+        if self.market_file.endswith(SNAPSHOT_EXTENSION):
+            raw_df = PriceSnapshot.load(self.market_file).to_frame()
+        elif self.market_file.endswith('.csv'):
+            raw_df = pd.read_csv(self.market_file)
+        else:
+            raw_df = pd.read_excel(self.market_file)
+        return MarketSnapshot(self.market_file, mtime, checksum, normalize_market_frame(raw_df))
+
+    def refresh_if_changed(self, force=False):
+        """
+        بارگذاری مجدد snapshot فقط در صورت تغییر فایل
+
+        Returns
+        -------
+        bool
+            True اگر snapshot جدید جایگزین شد
+        """
+        now = time.monotonic()
+        if not force and self._snapshot is not None and now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.market_file)
+        except OSError:
+            if self._snapshot is None:
+                print(f"⚠️ فایل قیمت بازار یافت نشد: {self.market_file}")
+            return False
+
+        current = self._snapshot
+        if not force and current is not None and current.mtime == mtime:
+            return False
+
+        with self._lock:
+            current = self._snapshot
+            if not force and current is not None and current.mtime == mtime:
+                return False
+
+            checksum = file_checksum(self.market_file)
+            if not force and current is not None and current.checksum == checksum:
+                # فقط زمان فایل تغییر کرده، محتوا همان است
+                current.mtime = mtime
+                return False
+
+            try:
+                start_time = time.perf_counter()
+                new_snapshot = self._load_snapshot(mtime, checksum)
+                elapsed = time.perf_counter() - start_time
+            except Exception as e:
+                print(f"❌ خطا در بارگذاری قیمت‌های بازار: {e}")
+                return False
+
+            # جایگزینی اتمی: خواننده‌ها یا snapshot قبلی را می‌بینند یا جدید را
+            self._snapshot = new_snapshot
+            self.reload_count += 1
+            print(f"✅ snapshot قیمت بازار بارگذاری شد: {len(new_snapshot)} خودرو ({elapsed:.2f} ثانیه)")
+            return True
+
+    def find_market_price(self, car_info, brand_type=""):
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        return snapshot.find_market_price(car_info, brand_type)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_pricing_engine(market_file=DEFAULT_MARKET_FILE):
+    """نمونه سراسری موتور قیمت‌گذاری (یک بار در هر پروسه ساخته می‌شود)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = PricingEngine(market_file)
+    return _engine
+
+
+if __name__ == "__main__":
+    sample_ads = [
+        ('سمند سورن پلاس، مدل ۱۴۰۰', 'سمند سورن پلاس'),
+        ('سمند lx مدل 96 بدون رنگ', 'سمند LX ساده'),
+        ('پراید۸۸دوگانه دستی', 'پراید صندوق‌دار بنزینی'),
+        ('سورنتو', 'کیا سورنتو نسل دوم'),
+    ]
+
+    # روش قبلی: ساخت ماشین‌حساب و خواندن اکسل برای هر آگهی
+    start_time = time.perf_counter()
+    for title, brand_type in sample_ads:
+        calculator = ImprovedCarPriceCalculator()
+        market_df = normalize_market_frame(pd.read_excel(DEFAULT_MARKET_FILE))
+        calculator.price_dict = dict(zip(market_df['Car Name'].str.lower(), market_df['Numeric Price']))
+        calculator.find_market_price(calculator.extract_car_info(title), market_df, brand_type)
+    before_ms = (time.perf_counter() - start_time) * 1000 / len(sample_ads)
+
+    engine = get_pricing_engine()
+    engine.refresh_if_changed()
+    rounds = 100
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for title, brand_type in sample_ads:
+            engine.find_market_price(engine.calculator.extract_car_info(title), brand_type)
+    after_ms = (time.perf_counter() - start_time) * 1000 / (rounds * len(sample_ads))
+
+    print(f"⏱️ قبل (بارگذاری برای هر آگهی): {before_ms:.1f}ms")
+    print(f"⚡ بعد (موتور سراسری):           {after_ms:.3f}ms")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+سیاست مسدودسازی منابع برای صفحات دیوار در Chrome (DevTools)
+
+صفحات لیست و جزئیات آگهی تصویر، فونت، ویدیو، بنر تبلیغاتی، نقشه و اسکریپت‌های
+آمار/تبلیغات (گوگل، یکتانت، مدیااد و ...) دانلود می‌کنند در حالی که اسکرپر فقط متن
+صفحه را می‌خواند. برای هر نوع صفحه ('listing'، 'detail') فهرست گروه‌ها یا الگوهای
+مسدود (deny) و استثناها (allow) تعریف می‌شود و قبل از بارگذاری صفحه با
+Network.setBlockedURLs روی درایور اعمال می‌شود.
+
+نوع منبع در Network.setBlockedURLs قابل انتخاب نیست، پس هر نوع (image، font، ...) به
+الگوهای پسوند فایل تبدیل می‌شود. CDP استثنا ندارد؛ allow فقط گروه‌ها یا الگوهایی را
+از deny حذف می‌کند.
+
+اگر درایور با لاگ performance ساخته شده باشد (پروفایل 'divar' کارخانه درایور)،
+record_page رویدادهای شبکه صفحه را می‌خواند: تعداد درخواست‌ها، بایت‌های دانلودشده،
+درخواست‌های مسدودشده و بایت‌های صرفه‌جویی‌شده (تخمین با اندازه معمول هر گروه).
+
+python resource_policy.py [page_source.html ...]
+"""
+
+import json
+import re
+import threading
+import weakref
+
+# الگوهای هر گروه؛ '*' هر رشته‌ای است (همان قاعده Network.setBlockedURLs)
+PATTERN_GROUPS = {
+    'image': ('*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*', '*.bmp*'),
+    'font': ('*.woff*', '*.ttf*', '*.otf*', '*.eot*'),
+    'media': ('*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ogg*'),
+    'stylesheet': ('*.css*',),
+    'trackers': (
+        '*google-analytics.com/*', '*googletagmanager.com/*', '*doubleclick.net/*', '*googlesyndication.com/*',
+        '*googleadservices.com/*', '*yektanet.com/*', '*mediaad.org/*', '*adtrace.io/*', '*mc.yandex.ru/*',
+        '*hotjar.com/*', '*clarity.ms/*', '*connect.facebook.net/*', '*sentry.io/*', '*najva.com/*',
+        '*metrix.ir/*', '*webengage.com/*',
+    ),
+    'banners': ('*a-banners.divarcdn.com/*',),
+    'maps': ('*map.ir/*', '*neshan.org/*', '*mapbox.com/*', '*openstreetmap.org/*'),
+}
+
+# اندازه معمول هر منبع مسدودشده برای تخمین صرفه‌جویی (بایت)
+TYPICAL_BYTES = {
+    'image': 40000,
+    'font': 30000,
+    'media': 500000,
+    'stylesheet': 20000,
+    'trackers': 60000,
+    'banners': 50000,
+    'maps': 25000,
+    None: 20000,
+}
+
+# JS و XHR (API لیست آگهی‌ها و اسکرول) و CSS همیشه بارگذاری می‌شوند
+PAGE_POLICIES = {
+    'listing': {'deny': ('image', 'font', 'media', 'trackers', 'banners'), 'allow': ()},
+    'detail': {'deny': ('image', 'font', 'media', 'trackers', 'banners', 'maps'), 'allow': ()},
+}
+
+# blockedReason رویداد Network.loadingFailed برای درخواست‌های setBlockedURLs
+BLOCKED_REASON = 'inspector'
+
+
+def _pattern_regex(patterns):
+    if not patterns:
+        return None
+    parts = ['.*'.join(re.escape(piece) for piece in pattern.split('*')) for pattern in patterns]
+    return re.compile('^(?:' + '|'.join(parts) + ')$', re.I)
+
+
+def expand_rules(rules):
+    """نام گروه‌ها و الگوهای خام -> لیست الگوها (بدون تکرار، به ترتیب)"""
+    patterns = []
+    for rule in rules:
+        for pattern in PATTERN_GROUPS.get(rule, (rule,)):
+            if pattern not in patterns:
+                patterns.append(pattern)
+    return patterns
+
+
+_GROUP_REGEXES = {group: _pattern_regex(patterns) for group, patterns in PATTERN_GROUPS.items()}
+
+
+def classify_url(url, groups=None):
+    """گروه اولین الگوی منطبق بر url یا None"""
+    for group in groups or PATTERN_GROUPS:
+        if _GROUP_REGEXES[group].match(url):
+            return group
+    return None
+
+
+def summarize_network_log(entries):
+    """
+    خلاصه رویدادهای شبکه از لاگ performance کروم (driver.get_log('performance'))
+
+    Returns
+    -------
+    dict
+        requests، bytes (encodedDataLength)، blocked، blocked_by_group، failed
+    """
+    urls = {}
+    finished_bytes = 0
+    finished = 0
+    failed = 0
+    blocked_by_group = {}
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            urls[params.get('requestId')] = params.get('request', {}).get('url', '')
+        elif method == 'Network.loadingFinished':
+            finished += 1
+            finished_bytes += int(params.get('encodedDataLength') or 0)
+        elif method == 'Network.loadingFailed':
+            if params.get('blockedReason') == BLOCKED_REASON:
+                group = classify_url(urls.get(params.get('requestId'), ''))
+                blocked_by_group[group] = blocked_by_group.get(group, 0) + 1
+            else:
+                failed += 1
+    return {
+        'requests': finished + failed + sum(blocked_by_group.values()),
+        'bytes': finished_bytes,
+        'blocked': sum(blocked_by_group.values()),
+        'blocked_by_group': blocked_by_group,
+        'failed': failed,
+    }
+
+
+class ResourcePolicy:
+    """
+    اعمال سیاست مسدودسازی هر نوع صفحه روی درایورها و آمار صرفه‌جویی
+
+    Parameters
+    ----------
+    policies : dict, optional
+        {نوع صفحه: {'deny': (...), 'allow': (...)}}؛ پیش‌فرض PAGE_POLICIES
+    enabled : bool
+        False یعنی هیچ منبعی مسدود نمی‌شود (فقط آمار)
+    """
+
+    def __init__(self, policies=None, enabled=True):
+        self.policies = {page_type: dict(policy) for page_type, policy in (policies or PAGE_POLICIES).items()}
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # نوع صفحه‌ای که الان روی هر درایور اعمال شده است
+        self._applied = weakref.WeakKeyDictionary()
+        self._regexes = {}
+        self.totals = {}
+
+    def configure(self, page_type, deny=None, allow=None):
+        """تغییر فهرست deny / allow یک نوع صفحه"""
+        policy = self.policies.setdefault(page_type, {'deny': (), 'allow': ()})
+        if deny is not None:
+            policy['deny'] = tuple(deny)
+        if allow is not None:
+            policy['allow'] = tuple(allow)
+        with self._lock:
+            self._applied = weakref.WeakKeyDictionary()
+            self._regexes = {}
+
+    def blocked_patterns(self, page_type):
+        """الگوهای Network.setBlockedURLs برای یک نوع صفحه"""
+        if not self.enabled or page_type not in self.policies:
+            return []
+        policy = self.policies[page_type]
+        allowed = set(expand_rules(policy.get('allow', ())))
+        return [pattern for pattern in expand_rules(policy.get('deny', ())) if pattern not in allowed]
+
+    def is_blocked(self, url, page_type):
+        """آیا درخواست url در این نوع صفحه مسدود می‌شود؟"""
+        if page_type not in self._regexes:
+            self._regexes[page_type] = _pattern_regex(self.blocked_patterns(page_type))
+        regex = self._regexes[page_type]
+        return bool(regex and regex.match(url))
+
+    def apply(self, driver, page_type):
+        """
+        اعمال سیاست نوع صفحه قبل از بارگذاری آن (اگر همین نوع قبلاً اعمال نشده باشد)
+
+        Returns
+        -------
+        bool
+            False اگر درایور از DevTools پشتیبانی نکند
+        """
+        with self._lock:
+            current = self._applied.get(driver)
+        if current == page_type:
+            return True
+        try:
+            if current is None:
+                driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_patterns(page_type)})
+        except Exception as e:
+            print(f"⚠️ مسدودسازی منابع ({page_type}) اعمال نشد: {e}")
+            return False
+        with self._lock:
+            self._applied[driver] = page_type
+        return True
+
+    def record_page(self, driver, page_type):
+        """
+        آمار شبکه از آخرین خواندن لاگ performance تا الان (معمولاً یک صفحه)
+
+        Returns
+        -------
+        dict or None
+            خلاصه summarize_network_log به همراه saved_bytes (تخمین)؛ None اگر لاگ در دسترس نباشد
+        """
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return None
+        report = summarize_network_log(entries)
+        report['saved_bytes'] = sum(TYPICAL_BYTES.get(group, TYPICAL_BYTES[None]) * count
+                                    for group, count in report['blocked_by_group'].items())
+        if not report['requests']:
+            return report
+        with self._lock:
+            totals = self.totals.setdefault(page_type, {'pages': 0, 'requests': 0, 'bytes': 0,
+                                                        'blocked': 0, 'saved_bytes': 0})
+            totals['pages'] += 1
+            for key in ('requests', 'bytes', 'blocked', 'saved_bytes'):
+                totals[key] += report[key]
+        return report
+
+    def summary(self):
+        with self._lock:
+            parts = []
+            for page_type, totals in self.totals.items():
+                pages = totals['pages'] or 1
+                parts.append(f"{page_type}: {totals['pages']} صفحه، "
+                             f"{totals['bytes'] / pages / 1024:.0f}KB و {totals['requests'] / pages:.0f} درخواست در هر صفحه، "
+                             f"{totals['blocked'] / pages:.0f} درخواست مسدود (~{totals['saved_bytes'] / pages / 1024:.0f}KB)")
+        return '؛ '.join(parts) or "هنوز صفحه‌ای ثبت نشده است"
+
+
+def page_resource_urls(html, base_url='https://divar.ir/'):
+    """آدرس منابعی که یک صفحه HTML بارگذاری می‌کند (img، script، link، source، iframe)"""
+    from urllib.parse import urljoin
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    urls = []
+    for tag in soup.find_all(['img', 'script', 'link', 'source', 'video', 'audio', 'iframe']):
+        if tag.name == 'link':
+            rel = ' '.join(tag.get('rel') or []).lower()
+            if not any(kind in rel for kind in ('stylesheet', 'preload', 'icon', 'prefetch')):
+                continue
+            candidates = [tag.get('href')]
+        else:
+            candidates = [tag.get('src')]
+            srcset = tag.get('srcset')
+            if srcset:
+                candidates.append(srcset.split(',')[0].split()[0])
+        urls.extend(urljoin(base_url, url) for url in candidates if url and not url.startswith('data:'))
+    return urls
+
+
+if __name__ == "__main__":
+    import sys
+
+    policy = ResourcePolicy()
+    for path in sys.argv[1:] or ['debug_page_source.html']:
+        with open(path, 'r', encoding='utf-8') as f:
+            urls = page_resource_urls(f.read())
+        blocked = [url for url in urls if policy.is_blocked(url, 'detail')]
+        print(f"📄 {path}: {len(urls)} منبع، {len(blocked)} مسدود با سیاست detail")
+        for url in blocked[:10]:
+            print(f"   🚫 {classify_url(url)}: {url[:100]}")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ذخیره‌ساز افزایشی نتایج آگهی‌ها در SQLite (حالت WAL)
+
+به جای ساختن یک فایل اکسل جدید برای هر batch، هر آگهی قیمت‌گذاری‌شده با یک
+INSERT دسته‌ای به انتهای جدول ads اضافه می‌شود؛ هزینه هر batch چند میلی‌ثانیه
+است و با بزرگ شدن داده‌ها ثابت می‌ماند. خروجی اکسل یک مرحله جدا و در صورت نیاز است:
+
+python result_store.py export out.xlsx [--session 20250830_120939] [--db divar_results.db]
+python result_store.py sessions
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from excel_exporter import export_rows
+
+DEFAULT_DB_FILE = 'divar_results.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    url TEXT,
+    urgent INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ads_session ON ads (session);
+"""
+
+
+class ResultStore:
+    """
+    جدول فقط-افزودنی آگهی‌ها
+
+    Parameters
+    ----------
+    db_file : str
+        مسیر فایل SQLite
+    session : str, optional
+        شناسه اجرای فعلی (پیش‌فرض: زمان شروع به شکل %Y%m%d_%H%M%S)
+    """
+
+    def __init__(self, db_file=DEFAULT_DB_FILE, session=None):
+        self.db_file = db_file
+        self.session = session or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(db_file))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        # WAL: نوشتن فقط به انتهای فایل log، بدون بازنویسی صفحات و بدون قفل کردن خواننده‌ها
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def append_many(self, ads):
+        """
+        افزودن دسته‌ای آگهی‌ها در یک تراکنش
+
+        Returns
+        -------
+        float
+            زمان نوشتن به ثانیه
+        """
+        start_time = time.perf_counter()
+        saved_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [
+            (self.session, saved_at, ad.get('لینک آگهی'), int(ad.get('رنگ‌بندی') == 'سبز'),
+             json.dumps(ad, ensure_ascii=False, default=str))
+            for ad in ads
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO ads (session, saved_at, url, urgent, data) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        return time.perf_counter() - start_time
+
+    def count(self, session=None):
+        query, params = self._filter("SELECT COUNT(*) FROM ads", session)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    def sessions(self):
+        """لیست اجراها: (session, تعداد آگهی، اولین و آخرین زمان ذخیره)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT session, COUNT(*), MIN(saved_at), MAX(saved_at) FROM ads GROUP BY session ORDER BY session"
+            ).fetchall()
+
+    def iter_ads(self, session=None, batch_size=1000):
+        """پیمایش آگهی‌ها به ترتیب ذخیره بدون بارگذاری کل جدول در حافظه"""
+        query, params = self._filter("SELECT data FROM ads", session)
+        with self._lock:
+            cursor = self._conn.execute(query + " ORDER BY id", params)
+            rows = cursor.fetchmany(batch_size)
+        while rows:
+            for (data,) in rows:
+                yield json.loads(data)
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+
+    def columns(self, session=None):
+        """ستون‌های آگهی‌ها به ترتیب اولین ظهور (بدون نگه داشتن ردیف‌ها در حافظه)"""
+        columns = {}
+        for ad in self.iter_ads(session):
+            for col in ad:
+                columns.setdefault(col, None)
+        return list(columns)
+
+    def to_dataframe(self, session=None):
+        import pandas as pd
+
+        return pd.DataFrame(list(self.iter_ads(session)))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _filter(query, session):
+        if session is None:
+            return query, ()
+        return query + " WHERE session = ?", (session,)
+
+
+def export_to_excel(store, filename, session=None):
+    """خروجی اکسل جریانی از آگهی‌های ذخیره‌شده (کل جدول یا یک اجرا)"""
+    rows, urgent_count = export_rows(store.iter_ads(session), filename, columns=store.columns(session))
+    if not rows:
+        print("⚠️ آگهی‌ای برای خروجی وجود ندارد")
+        return 0
+    print(f"✅ {rows} آگهی ({urgent_count} فوری) در {filename} ذخیره شد")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="مدیریت پایگاه نتایج آگهی‌ها")
+    parser.add_argument('--db', default=DEFAULT_DB_FILE)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help="خروجی اکسل")
+    export_parser.add_argument('output')
+    export_parser.add_argument('--session', help="فقط آگهی‌های یک اجرا")
+    subparsers.add_parser('sessions', help="لیست اجراها")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    try:
+        if args.command == 'export':
+            export_to_excel(store, args.output, args.session)
+        else:
+            for session, count, first, last in store.sessions():
+                print(f"{session}: {count} آگهی ({first} تا {last})")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
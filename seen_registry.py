@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+فهرست ماندگار آگهی‌های دیده‌شده بین اجراها
+
+شناسه آگهی‌های ذخیره‌شده در جدول seen_ads (SQLite، حالت WAL) نگه داشته می‌شود و
+هنگام شروع، شناسه‌های منقضی‌نشده در یک dict بارگذاری می‌شوند؛ پس بررسی هر شناسه
+O(1) است. بعد از TTL، آگهی دوباره بازدید می‌شود (مثلاً برای تغییر قیمت).
+"""
+
+import sqlite3
+import threading
+import time
+
+from result_store import DEFAULT_DB_FILE
+
+DEFAULT_TTL_DAYS = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_ads (
+    ad_id TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_seen_ads_seen_at ON seen_ads (seen_at);
+"""
+
+
+def ad_id_from_url(href):
+    """شناسه آگهی از انتهای لینک (https://divar.ir/v/<slug>/<id>)"""
+    return href.rstrip('/').split('/')[-1]
+
+
+class SeenRegistry:
+    """
+    فهرست آگهی‌های دیده‌شده با انقضای زمانی
+
+    Parameters
+    ----------
+    db_file : str
+        مسیر فایل SQLite (پیش‌فرض همان پایگاه نتایج)
+    ttl_days : float
+        بعد از این مدت آگهی دوباره «جدید» حساب می‌شود؛ None یعنی بدون انقضا
+    """
+
+    def __init__(self, db_file=DEFAULT_DB_FILE, ttl_days=DEFAULT_TTL_DAYS):
+        self.db_file = db_file
+        self.ttl = ttl_days * 86400 if ttl_days is not None else None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        # فقط شناسه‌های منقضی‌نشده در حافظه نگه داشته می‌شوند
+        self._seen = dict(self._conn.execute(
+            "SELECT ad_id, seen_at FROM seen_ads WHERE seen_at >= ?", (self._cutoff(),)
+        ).fetchall())
+
+    def __len__(self):
+        return len(self._seen)
+
+    def _cutoff(self):
+        return time.time() - self.ttl if self.ttl is not None else float('-inf')
+
+    def is_seen(self, ad_id):
+        seen_at = self._seen.get(ad_id)
+        return seen_at is not None and seen_at >= self._cutoff()
+
+    def mark(self, ad_id, persist=True):
+        """
+        ثبت آگهی به عنوان دیده‌شده
+
+        persist=False فقط برای همین اجرا ثبت می‌کند (مثلاً آگهی در حال پردازش که
+        ممکن است ذخیره نشود و در اجرای بعدی باید دوباره امتحان شود).
+        """
+        seen_at = time.time()
+        self._seen[ad_id] = seen_at
+        if persist:
+            with self._lock, self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO seen_ads (ad_id, seen_at) VALUES (?, ?)", (ad_id, seen_at))
+
+    def filter_new(self, hrefs):
+        """حذف دسته‌ای لینک‌های دیده‌شده (و تکراری) قبل از بارگذاری هر صفحه، با حفظ ترتیب"""
+        cutoff = self._cutoff()
+        new_hrefs = []
+        batch_ids = set()
+        for href in hrefs:
+            ad_id = ad_id_from_url(href)
+            if ad_id in batch_ids:
+                continue
+            seen_at = self._seen.get(ad_id)
+            if seen_at is not None and seen_at >= cutoff:
+                continue
+            batch_ids.add(ad_id)
+            new_hrefs.append(href)
+        return new_hrefs
+
+    def purge_expired(self):
+        """حذف شناسه‌های منقضی از جدول و حافظه"""
+        cutoff = self._cutoff()
+        self._seen = {ad_id: seen_at for ad_id, seen_at in self._seen.items() if seen_at >= cutoff}
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM seen_ads WHERE seen_at < ?", (cutoff,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
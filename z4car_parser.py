@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+پارسر سریع صفحه قیمت زد فور (z4car.com/price)
+
+صفحه قیمت حدود ۱.۵ مگابایت است ولی فقط کارت‌های div.entry-body حاوی قیمت‌ها هستند.
+صفحه با lxml (بدون ساختن درخت BeautifulSoup) خوانده می‌شود و فقط همین کارت‌ها با
+XPath پیمایش می‌شوند؛ اگر lxml نصب نباشد، BeautifulSoup با SoupStrainer فقط کارت‌ها
+را می‌سازد. نام، وضعیت، سال و قیمت هر کارت در یک عبور از ستون‌های آن استخراج می‌شود
+و خروجی همان رکوردهای Z4CarScraper.extract_car_prices است (یک رکورد برای هر نام با
+بیشترین قیمت).
+
+python z4car_parser.py [z4car_debug.html]
+"""
+
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+# کارت‌های قیمت؛ بقیه صفحه (منو، تبلیغات، اسکریپت‌ها) پیمایش نمی‌شود
+PRICE_CARDS = SoupStrainer('div', class_='entry-body')
+PRICE_CARD_LISTS = '//div[contains(concat(" ", normalize-space(@class), " "), " entry-body ")]//ul'
+# همان کارت‌ها به صورت سلکتور CSS برای انتظار در مرورگر
+PRICE_CARD_SELECTOR = 'div.entry-body ul'
+
+UNKNOWN = "نامشخص"
+ALT_BRAND_PATTERN = re.compile(
+    r'(آئودی|پژو|سمند|پراید|تیبا|دنا|رانا|سایپا|کوییک|آریو|شاهین|تارا|ساینا|مزدا|هوندا|تویوتا|نیسان|'
+    r'هیوندای|کیا|چری|ام وی ام|دوو|رنو|فولکس|بی ام و|بنز|آلفارومئو|آمیکو)[^\n]*', re.I)
+TITLE_PATTERN = re.compile(r'قیمت\s+([^\n]+)', re.I)
+YEAR_PATTERN = re.compile(r'(20\d{2}|13\d{2}|14\d{2})')
+PRICE_PATTERN = re.compile(r'\d{1,3}(?:,\d{3})+')
+# قیمت‌های کمتر از ۱۰ میلیون تومان (کارکرد، شماره مدل و ...) نادیده گرفته می‌شوند
+MIN_PRICE = 10000000
+
+
+def first_price(text):
+    """اولین قیمت معتبر (بیشتر از ۱۰ میلیون تومان) در متن؛ مثل Z4CarScraper.clean_price"""
+    for match in PRICE_PATTERN.findall(text):
+        price = int(match.replace(',', ''))
+        if price > MIN_PRICE:
+            return price
+    return None
+
+
+def parse_card_columns(columns):
+    """
+    استخراج یک رکورد از ستون‌های (li) یک کارت قیمت
+
+    ستون اول عنوان کارت («قیمت ...») یا تصویر با alt است؛ وضعیت، سال و متن قیمت
+    از آخرین ستونی که آن‌ها را دارد خوانده می‌شود (همان ترتیب extract_from_columns).
+
+    Parameters
+    ----------
+    columns : list
+        [(متن ستون بدون فاصله‌های اضافه، alt اولین تصویر ستون), ...]
+
+    Returns
+    -------
+    dict or None
+    """
+    car_name = condition = year = UNKNOWN
+    price_text = None
+
+    for index, (text, alt_text) in enumerate(columns):
+        if index == 0:
+            match = ALT_BRAND_PATTERN.search(alt_text) if alt_text else None
+            if match:
+                car_name = match.group()
+            else:
+                match = TITLE_PATTERN.search(text)
+                if match:
+                    car_name = match.group(1)
+
+        if "صفر" in text:
+            condition = "صفر کیلومتر"
+        elif "کارکرده" in text:
+            condition = "کارکرده"
+
+        match = YEAR_PATTERN.search(text)
+        if match:
+            year = match.group(1)
+
+        if ',' in text and PRICE_PATTERN.search(text):
+            price_text = text
+
+    price = first_price(price_text) if price_text else None
+    if not price:
+        return None
+    return {
+        'نام خودرو': car_name.strip(),
+        'وضعیت': condition,
+        'سال': year,
+        'قیمت (تومان)': f"{price:,}",
+        'قیمت عددی': price
+    }
+
+
+def _lxml_card_columns(html):
+    """ستون‌های هر لیست داخل کارت‌های قیمت با lxml؛ متن ستون مثل get_text(strip=True)"""
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    root = lxml.html.fromstring(html, parser=lxml.html.HTMLParser(encoding='utf-8'))
+    for ul in root.xpath(PRICE_CARD_LISTS):
+        columns = []
+        for li in ul.iter('li'):
+            img = li.find('.//img')
+            text = ''.join(part.strip() for part in li.itertext())
+            columns.append((text, img.get('alt') if img is not None else None))
+        yield columns
+
+
+def _soup_card_columns(html):
+    """همان ستون‌ها با BeautifulSoup وقتی lxml نصب نیست (فقط کارت‌ها پارس می‌شوند)"""
+    soup = BeautifulSoup(html, 'html.parser', parse_only=PRICE_CARDS)
+    for ul in soup.find_all('ul'):
+        columns = []
+        for li in ul.find_all('li'):
+            img = li.find('img')
+            columns.append((li.get_text(strip=True), img.get('alt') if img is not None else None))
+        yield columns
+
+
+def parse_price_page(html):
+    """
+    استخراج قیمت‌های زد فور از HTML صفحه قیمت
+
+    Parameters
+    ----------
+    html : str
+        محتوای صفحه (driver.page_source یا z4car_debug.html)
+
+    Returns
+    -------
+    list
+        رکوردهای {'نام خودرو', 'وضعیت', 'سال', 'قیمت (تومان)', 'قیمت عددی'}؛ برای نام‌های
+        تکراری رکورد با بیشترین قیمت در جای اولین رخداد می‌ماند. لیست خالی یعنی ساختار
+        صفحه تغییر کرده و باید از روش عمومی استفاده شود.
+    """
+    unique_cars = {}
+
+    for columns in (_lxml_card_columns(html) if LXML_AVAILABLE else _soup_card_columns(html)):
+        if len(columns) < 2:
+            continue
+        car_info = parse_card_columns(columns)
+        if car_info is None:
+            continue
+        car_name = car_info['نام خودرو']
+        if car_name not in unique_cars or car_info['قیمت عددی'] > unique_cars[car_name]['قیمت عددی']:
+            unique_cars[car_name] = car_info
+
+    return list(unique_cars.values())
+
+
+def parse_price_file(file_path):
+    """خواندن یک صفحه قیمت ذخیره‌شده و استخراج رکوردها"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return parse_price_page(f.read())
+
+
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:] or ['z4car_debug.html']:
+        cars_data = parse_price_file(path)
+        print(f"📄 {path}: {len(cars_data)} خودرو")
+        for car in cars_data[:10]:
+            print(f"   {car['نام خودرو']} | {car['وضعیت']} | {car['سال']} | {car['قیمت (تومان)']}")
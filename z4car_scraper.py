@@ -2,14 +2,9 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import re
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+from driver_factory import get_driver
+from page_waits import wait_for_selector, wait_for_settle
+from z4car_parser import PRICE_CARD_SELECTOR, parse_price_page
 
 class Z4CarScraper:
     def __init__(self):
@@ -19,35 +14,12 @@ class Z4CarScraper:
         
     def setup_driver(self):
         """راه‌اندازی WebDriver"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-            
-            # تلاش برای استفاده از webdriver-manager
-            try:
-                service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                print("WebDriver با webdriver-manager راه‌اندازی شد")
-            except Exception as e:
-                print(f"خطا در webdriver-manager: {e}")
-                print("تلاش برای استفاده از chromedriver سیستم...")
-                self.driver = webdriver.Chrome(options=chrome_options)
-                print("WebDriver با chromedriver سیستم راه‌اندازی شد")
-            
-            # تنظیمات اضافی
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.set_page_load_timeout(30)
-            
-            return True
-            
-        except Exception as e:
-            print(f"خطا در راه‌اندازی WebDriver: {e}")
+        # پروفایل 'z4car' کارخانه مشترک درایور (مسیر chromedriver ذخیره‌شده)
+        self.driver = get_driver('z4car')
+        if self.driver is None:
+            print("خطا در راه‌اندازی WebDriver")
             return False
+        return True
     
     def get_page_content(self, url):
         """دریافت محتوای صفحه با Selenium"""
@@ -55,17 +27,12 @@ class Z4CarScraper:
             print(f"بارگذاری صفحه: {url}")
             self.driver.get(url)
             
-            # انتظار برای بارگذاری کامل صفحه
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+            # انتظار تا کارت‌های قیمت ظاهر شوند (به جای 5 ثانیه ثابت)
+            wait_for_selector(self.driver, PRICE_CARD_SELECTOR, 20, label='z4car_prices')
             
-            # انتظار اضافی برای بارگذاری محتوای JavaScript
-            time.sleep(5)
-            
-            # اسکرول برای بارگذاری محتوای بیشتر
+            # اسکرول برای بارگذاری محتوای بیشتر و انتظار تا صفحه آرام شود (به جای 3 ثانیه ثابت)
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
+            wait_for_settle(self.driver, 3, label='z4car_scroll')
             
             return self.driver.page_source
             
@@ -118,6 +85,13 @@ class Z4CarScraper:
     
     def extract_car_prices(self, html_content):
         """استخراج قیمت‌های خودرو از HTML"""
+        # مسیر سریع: فقط کارت‌های قیمت (div.entry-body) در یک عبور
+        cars_data = parse_price_page(html_content)
+        if cars_data:
+            print(f"⚡ {len(cars_data)} خودرو از کارت‌های قیمت استخراج شد")
+            return cars_data
+        
+        # ساختار صفحه تغییر کرده است: روش قبلی روی کل صفحه
         soup = BeautifulSoup(html_content, 'html.parser')
         cars_data = []
         